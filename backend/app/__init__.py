@@ -6,44 +6,62 @@ from app.extensions import db, login_manager, bcrypt, migrate
 def create_app(config_name='development'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.config['CONFIG_NAME'] = config_name
     
-    # Log CORS configuration
-    print(f"[CORS CONFIG] Allowed origins: {app.config['CORS_ORIGINS']}")
+    app.logger.info("CORS allowed origins: %s", app.config['CORS_ORIGINS'])
     
     # Simplified CORS configuration
     CORS(app,
          origins=app.config['CORS_ORIGINS'],
          methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
          allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
-         expose_headers=["Content-Type", "Authorization"],
+         expose_headers=["Content-Type", "Authorization", "X-Query-Count", "Server-Timing"],
          supports_credentials=True,
          max_age=3600)
     
-    # Middleware para loguear todas las requests
+    # Log estructurado y muestreado de requests (REQUEST_LOG_SAMPLE_RATE)
+    from app.utils import request_logging
+    request_logging.init_app(app)
+
+    # Consultas SQL y tiempos por request, con estadísticas por ruta
+    from app.utils.request_profiler import request_profiler
+    request_profiler.init_app(app)
+    
     @app.before_request
-    def log_request_info():
-        print(f"\n[REQUEST] {request.method} {request.path}")
-        print(f"[REQUEST] Origin: {request.headers.get('Origin', 'No Origin header')}")
-        print(f"[REQUEST] Authorization: {request.headers.get('Authorization', 'No Auth header')[:50] if request.headers.get('Authorization') else 'No Auth header'}")
-        print(f"[REQUEST] Content-Type: {request.headers.get('Content-Type', 'No Content-Type')}")
-        
+    def handle_preflight():
         # Manejar preflight OPTIONS requests explícitamente
         if request.method == 'OPTIONS':
             response = app.make_default_options_response()
             return response
     
-    @app.after_request
-    def log_response_info(response):
-        print(f"[RESPONSE] Status: {response.status}")
-        print(f"[RESPONSE] CORS headers: {response.headers.get('Access-Control-Allow-Origin', 'Not set')}")
-        return response
-    
     db.init_app(app)
     login_manager.init_app(app)
     bcrypt.init_app(app)
     migrate.init_app(app, db)
+
+    # Mantener los agregados de ventas sincronizados con las escrituras ORM
+    from app.services.sales_rollup_service import SalesRollupService
+    SalesRollupService.register_listeners()
+
+    # Totales de minutos trabajados por registro (TimeTracking) al escribir WorkBlock
+    from app.services.worked_time_service import WorkedTimeService
+    WorkedTimeService.register_listeners()
+
+    from app.utils.report_cache import report_cache
+    report_cache.init_app(app)
+
+    from app.utils.holiday_calendar import holiday_calendar
+    holiday_calendar.init_app(app)
+
+    # Usuario autenticado por (user_id, versión del token) sin consultar en cada request
+    from app.utils.principal_cache import principal_cache
+    principal_cache.init_app(app)
+
+    # Modelo de predicción activo, cargado una vez por versión
+    from app.ml.model_registry import model_registry
+    model_registry.init_app(app)
     
-    from app.routes import auth, schedules, sales, expenses, reports, employees, shifts, schedule_summary, notifications, coverage, ml_predictions, ml_dashboard, employee_schedule, job_positions, time_tracking, payroll, csv_import, holidays, store_hours, vacation_periods, absence_requests, social_security, employee_documents, fudo_sync
+    from app.routes import auth, schedules, sales, expenses, reports, employees, shifts, schedule_summary, notifications, coverage, ml_predictions, ml_dashboard, employee_schedule, job_positions, time_tracking, payroll, csv_import, holidays, store_hours, vacation_periods, absence_requests, social_security, employee_documents, fudo_sync, perf_stats
     app.register_blueprint(auth.bp)
     app.register_blueprint(schedules.bp)
     app.register_blueprint(shifts.bp)
@@ -68,6 +86,7 @@ def create_app(config_name='development'):
     app.register_blueprint(social_security.social_security_bp)
     app.register_blueprint(employee_documents.employee_documents_bp)
     app.register_blueprint(fudo_sync.bp)
+    app.register_blueprint(perf_stats.bp)
     
     @app.route('/health')
     def health():
@@ -17,9 +17,60 @@ class Config:
     
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5173,http://localhost:5174,http://localhost:5175').split(',')
 
+    # Cache de reportes: 'memory' (LRU por proceso), 'redis' o 'paquete.modulo:Clase'
+    REPORT_CACHE_ENABLED = os.environ.get('REPORT_CACHE_ENABLED', 'true').lower() == 'true'
+    REPORT_CACHE_BACKEND = os.environ.get('REPORT_CACHE_BACKEND', 'memory')
+    REPORT_CACHE_REDIS_URL = os.environ.get('REPORT_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    REPORT_CACHE_MAX_ENTRIES = int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', 512))
+    REPORT_CACHE_TTL_OPEN = int(os.environ.get('REPORT_CACHE_TTL_OPEN', 60))
+    # Con 'memory' cada worker invalida sólo su propio cache: los demás siguen
+    # sirviendo lo cacheado hasta que expire. Por eso, si no se indica, los rangos
+    # cerrados usan REPORT_CACHE_TTL_OPEN con 'memory' y 24 h con un backend
+    # compartido (redis o propio). Un TTL largo con 'memory' sólo es seguro con un worker.
+    REPORT_CACHE_TTL_CLOSED = (
+        int(os.environ['REPORT_CACHE_TTL_CLOSED']) if os.environ.get('REPORT_CACHE_TTL_CLOSED') else None
+    )
+
+    # Sincronización con Fudo: páginas pedidas en paralelo y minutos sin avance
+    # tras los cuales un job 'running' se considera caído y se puede reanudar
+    FUDO_SYNC_CONCURRENCY = int(os.environ.get('FUDO_SYNC_CONCURRENCY', 4))
+    FUDO_SYNC_STALE_MINUTES = int(os.environ.get('FUDO_SYNC_STALE_MINUTES', 10))
+    # Sincronización incremental: las ventas se piden por hora de cierre desde la
+    # última marca menos FUDO_SYNC_OVERLAP_HOURS. Los gastos se pueden cargar con
+    # fecha atrasada, así que en cada corrida se vuelven a pedir los últimos
+    # FUDO_SYNC_EXPENSES_LOOKBACK_DAYS días; los cargados con más atraso sólo
+    # entran con una sincronización completa. Sin marca se traen FUDO_SYNC_INITIAL_DAYS días
+    FUDO_SYNC_OVERLAP_HOURS = int(os.environ.get('FUDO_SYNC_OVERLAP_HOURS', 6))
+    FUDO_SYNC_EXPENSES_LOOKBACK_DAYS = int(os.environ.get('FUDO_SYNC_EXPENSES_LOOKBACK_DAYS', 30))
+    FUDO_SYNC_INITIAL_DAYS = int(os.environ.get('FUDO_SYNC_INITIAL_DAYS', 30))
+    FUDO_SYNC_INLINE = False
+
+    # Segundos que token_required reutiliza el usuario autenticado sin consultarlo
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))
+    # Fracción de requests registradas en el log estructurado 'app.requests' (0 a 1)
+    REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', 0))
+    # Conteo de consultas y tiempos por request (headers X-Query-Count / Server-Timing)
+    REQUEST_PROFILER_ENABLED = os.environ.get('REQUEST_PROFILER_ENABLED', 'true').lower() == 'true'
+    REQUEST_PROFILER_WINDOW = int(os.environ.get('REQUEST_PROFILER_WINDOW', 500))
+    # Umbrales a partir de los cuales un request se registra como lento en 'app.profiler'
+    SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 1000))
+    SLOW_REQUEST_QUERIES = int(os.environ.get('SLOW_REQUEST_QUERIES', 50))
+    # Modelos entrenados (archivos versionados por MLModelVersion) y carga con memory-map
+    ML_MODELS_DIR = os.environ.get('ML_MODELS_DIR', os.path.join(os.path.dirname(__file__), 'ml', 'models'))
+    ML_MODEL_MMAP = os.environ.get('ML_MODEL_MMAP', 'true').lower() == 'true'
+    # Entrenamiento en segundo plano: procesos del pool, núcleos por entrenamiento (-1 = todos),
+    # minutos sin progreso tras los que un entrenamiento se considera abandonado y cada
+    # cuántos segundos el worker marca el job como vivo mientras ajusta el modelo
+    ML_TRAINING_PROCESSES = int(os.environ.get('ML_TRAINING_PROCESSES', 1))
+    ML_TRAINING_N_JOBS = int(os.environ.get('ML_TRAINING_N_JOBS', -1))
+    ML_TRAINING_STALE_MINUTES = int(os.environ.get('ML_TRAINING_STALE_MINUTES', 30))
+    ML_TRAINING_HEARTBEAT_SECONDS = int(os.environ.get('ML_TRAINING_HEARTBEAT_SECONDS', 60))
+    ML_TRAINING_INLINE = False
+
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_ECHO = True
+    REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', 1))
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -29,7 +80,11 @@ class ProductionConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # TEST_DATABASE_URL permite correr la suite contra PostgreSQL (por defecto SQLite en memoria)
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    # La base en memoria no se comparte entre hilos: los jobs corren en el request
+    FUDO_SYNC_INLINE = True
+    ML_TRAINING_INLINE = True
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,82 @@
+"""
+Feature pipeline shared by training and inference.
+
+Both StaffingPredictor.train and StaffingPredictor.predict_range build their
+model input through `build_features` + `feature_matrix`, so the columns and
+encodings used to fit the model are exactly the ones used to predict.
+"""
+import numpy as np
+import pandas as pd
+from app.utils.holiday_calendar import holiday_calendar
+
+# Model input columns, in the order the scaler and the model were fitted with
+FEATURE_COLUMNS = [
+    'hour', 'day_of_week', 'is_weekend', 'is_morning',
+    'is_afternoon', 'is_evening', 'is_holiday', 'holiday_impact',
+    'hour_sin', 'hour_cos', 'day_sin', 'day_cos'
+]
+
+
+def slot_frame(start_date, end_date, hours):
+    """One row per (date, hour) slot between start_date and end_date (inclusive)."""
+    hours = np.asarray(list(hours), dtype=np.int64)
+    dates = pd.date_range(start_date, end_date, freq='D')
+
+    return pd.DataFrame({
+        'date': np.repeat(dates.date, len(hours)),
+        'hour': np.tile(hours, len(dates)),
+        'day_of_week': np.repeat(dates.dayofweek.values, len(hours))
+    })
+
+
+def holiday_frame(start_date, end_date):
+    """Holidays of the window as a DataFrame (date, is_holiday, holiday_impact), one calendar lookup."""
+    holidays = holiday_calendar.holidays_between(start_date, end_date)
+    return pd.DataFrame({
+        'date': list(holidays.keys()),
+        'is_holiday': 1,
+        'holiday_impact': [float(impact) for impact in holidays.values()]
+    }, columns=['date', 'is_holiday', 'holiday_impact'])
+
+
+def build_features(df):
+    """
+    Add the derived feature columns to a frame with date, hour and day_of_week.
+
+    Features:
+    - is_weekend, is_morning (6-12), is_afternoon (12-18), is_evening (18-24)
+    - hour_sin, hour_cos / day_sin, day_cos: cyclical encodings
+    - is_holiday, holiday_impact: left join with the holidays of the window
+    """
+    df = df.drop(columns=['is_holiday', 'holiday_impact'], errors='ignore').copy()
+    hour = df['hour'].to_numpy(dtype=np.float64)
+    day_of_week = df['day_of_week'].to_numpy(dtype=np.float64)
+
+    # Cyclical features for hour (24-hour cycle) and day of week (7-day cycle)
+    df['hour_sin'] = np.sin(2 * np.pi * hour / 24)
+    df['hour_cos'] = np.cos(2 * np.pi * hour / 24)
+    df['day_sin'] = np.sin(2 * np.pi * day_of_week / 7)
+    df['day_cos'] = np.cos(2 * np.pi * day_of_week / 7)
+
+    # Time of day features
+    df['is_weekend'] = (day_of_week >= 5).astype(int)
+    df['is_morning'] = ((hour >= 6) & (hour < 12)).astype(int)
+    df['is_afternoon'] = ((hour >= 12) & (hour < 18)).astype(int)
+    df['is_evening'] = ((hour >= 18) & (hour < 24)).astype(int)
+
+    if not len(df):
+        df['is_holiday'] = 0
+        df['holiday_impact'] = 1.0
+        return df
+
+    dates = pd.to_datetime(df['date']).dt.date
+    holidays = holiday_frame(dates.min(), dates.max())
+    merged = pd.DataFrame({'date': dates}).merge(holidays, on='date', how='left')
+    df['is_holiday'] = merged['is_holiday'].fillna(0).astype(int).to_numpy()
+    df['holiday_impact'] = merged['holiday_impact'].fillna(1.0).astype(float).to_numpy()
+    return df
+
+
+def feature_matrix(df):
+    """Model input array from a frame produced by build_features."""
+    return df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
@@ -0,0 +1,179 @@
+"""
+Registry of trained staffing models.
+
+Each training run stores its files under versioned names keyed by the
+MLModelVersion id (sales_model_<id>.pkl, scaler_<id>.pkl), written to a
+temporary file and renamed with os.replace, so a new training never touches
+the files a running worker is reading.
+
+The active model is kept in a process-level cache (app.extensions) keyed by
+MLModelVersion id: requests only pay one small query to check which version
+is active and unpickle the model again only when it changes. With
+ML_MODEL_MMAP the forest arrays are memory-mapped instead of copied, so
+several workers share the same pages.
+
+Models trained before the registry existed (sales_model.pkl / scaler.pkl
+without version) are still loaded while no MLModelVersion is active. An active
+version whose files are missing (e.g. ML_MODELS_DIR not shared with this
+worker) means there is no usable model: the legacy files may not match the
+current features.
+"""
+import logging
+import os
+import tempfile
+import threading
+
+import joblib
+from flask import current_app
+from app.extensions import db
+from app.models.ml_tracking import MLModelVersion
+
+LEGACY_SALES_MODEL = 'sales_model.pkl'
+LEGACY_SCALER = 'scaler.pkl'
+LEGACY_METADATA = 'metadata.pkl'
+
+logger = logging.getLogger(__name__)
+
+
+class LoadedModel:
+    """
+    Sales model and scaler of one MLModelVersion (version_id None for legacy
+    files), plus the cross-validation RMSE recorded for it at training time.
+    """
+
+    __slots__ = ('version_id', 'version', 'sales_model', 'scaler', 'cv_rmse')
+
+    def __init__(self, version_id, version, sales_model, scaler, cv_rmse=None):
+        self.version_id = version_id
+        self.version = version
+        self.sales_model = sales_model
+        self.scaler = scaler
+        self.cv_rmse = cv_rmse
+
+
+class _ModelCache:
+    def __init__(self):
+        self.entry = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    EXTENSION_KEY = 'model_registry'
+
+    def init_app(self, app):
+        app.config.setdefault('ML_MODELS_DIR', os.path.join(os.path.dirname(__file__), 'models'))
+        app.config.setdefault('ML_MODEL_MMAP', True)
+        app.extensions[self.EXTENSION_KEY] = _ModelCache()
+
+    @staticmethod
+    def _cache():
+        return current_app.extensions[ModelRegistry.EXTENSION_KEY]
+
+    @staticmethod
+    def models_dir():
+        return current_app.config['ML_MODELS_DIR']
+
+    @staticmethod
+    def paths(version_id):
+        """(sales_model, scaler) file paths of a model version"""
+        models_dir = ModelRegistry.models_dir()
+        return (
+            os.path.join(models_dir, f'sales_model_{version_id}.pkl'),
+            os.path.join(models_dir, f'scaler_{version_id}.pkl')
+        )
+
+    def save(self, version_id, sales_model, scaler):
+        """Write the files of a new version atomically (temporary file + os.replace)"""
+        os.makedirs(self.models_dir(), exist_ok=True)
+        for obj, path in zip((sales_model, scaler), self.paths(version_id)):
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            os.close(fd)
+            try:
+                joblib.dump(obj, tmp_path)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def discard(self, version_id):
+        """Remove the files of a version that was not committed"""
+        for path in self.paths(version_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def activate(self, version_id, version, sales_model, scaler, cv_rmse=None):
+        """Put a just-trained model in the cache, avoiding a reload from disk"""
+        cache = self._cache()
+        with cache.lock:
+            cache.entry = LoadedModel(version_id, version, sales_model, scaler, cv_rmse)
+
+    def get_active(self):
+        """
+        Return the LoadedModel of the active MLModelVersion, or None if there is
+        no usable model. Loads from disk only when the active version changed.
+        """
+        active = db.session.query(MLModelVersion.id, MLModelVersion.version).filter(
+            MLModelVersion.is_active.is_(True)
+        ).order_by(MLModelVersion.id.desc()).first()
+
+        cache = self._cache()
+        entry = cache.entry
+        if entry is not None and active is not None and entry.version_id == active.id:
+            return entry
+
+        with cache.lock:
+            entry = cache.entry
+            if entry is not None and active is not None and entry.version_id == active.id:
+                return entry
+
+            if active is not None:
+                entry = self._load_version(active.id, active.version)
+                if entry is None:
+                    logger.error(
+                        f"Files of active ML model version {active.id} not found in {self.models_dir()}"
+                    )
+                    cache.entry = None
+                    return None
+            elif cache.entry is not None and cache.entry.version_id is None:
+                return cache.entry
+            else:
+                entry = self._load_legacy()
+            cache.entry = entry
+            return entry
+
+    def invalidate(self):
+        """Drop the cached model so the next get_active reloads it"""
+        cache = self._cache()
+        with cache.lock:
+            cache.entry = None
+
+    def _load(self, path):
+        mmap_mode = 'r' if current_app.config['ML_MODEL_MMAP'] else None
+        return joblib.load(path, mmap_mode=mmap_mode)
+
+    def _load_version(self, version_id, version):
+        sales_path, scaler_path = self.paths(version_id)
+        if not (os.path.exists(sales_path) and os.path.exists(scaler_path)):
+            return None
+        hyperparameters = db.session.query(MLModelVersion.hyperparameters).filter(
+            MLModelVersion.id == version_id
+        ).scalar() or {}
+        cv_rmse = (hyperparameters.get('selection') or {}).get('cv_rmse')
+        return LoadedModel(version_id, version, self._load(sales_path), self._load(scaler_path), cv_rmse)
+
+    def _load_legacy(self):
+        models_dir = self.models_dir()
+        sales_path = os.path.join(models_dir, LEGACY_SALES_MODEL)
+        scaler_path = os.path.join(models_dir, LEGACY_SCALER)
+        if not (os.path.exists(sales_path) and os.path.exists(scaler_path)):
+            return None
+
+        version = '1.0.0'
+        metadata_path = os.path.join(models_dir, LEGACY_METADATA)
+        if os.path.exists(metadata_path):
+            version = joblib.load(metadata_path).get('model_version', version)
+        return LoadedModel(None, version, self._load(sales_path), self._load(scaler_path))
+
+
+model_registry = ModelRegistry()
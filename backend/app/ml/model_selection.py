@@ -0,0 +1,92 @@
+"""
+Model selection for the staffing model.
+
+Candidates (RandomForest and HistGradientBoosting over a small grid) are
+scored with rolling-origin cross-validation (TimeSeriesSplit): every fold
+trains on the past and validates on the period right after it, so no future
+rows leak into training. The scaler is fitted inside each fold as well.
+
+Among the candidates whose mean R² is within `tolerance` of the best one,
+the fastest (fit + predict time per fold) is chosen.
+"""
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import ParameterGrid, TimeSeriesSplit
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+DEFAULT_CV_SPLITS = 4
+DEFAULT_TOLERANCE = 0.02
+
+CANDIDATES = {
+    'random_forest': (
+        RandomForestRegressor(min_samples_split=5, random_state=42),
+        {'n_estimators': [50, 100], 'max_depth': [6, 10]}
+    ),
+    'hist_gradient_boosting': (
+        HistGradientBoostingRegressor(random_state=42),
+        {'max_iter': [100], 'max_depth': [None, 6], 'learning_rate': [0.1]}
+    ),
+}
+
+
+def candidate_configs():
+    """(estimator name, params) for every point of every candidate grid"""
+    return [(name, params) for name, (_, grid) in CANDIDATES.items() for params in ParameterGrid(grid)]
+
+
+def build_estimator(name, params, n_jobs=None):
+    estimator = clone(CANDIDATES[name][0]).set_params(**params)
+    if n_jobs is not None and 'n_jobs' in estimator.get_params():
+        estimator.set_params(n_jobs=n_jobs)
+    return estimator
+
+
+def _evaluate(name, params, X, y, splits):
+    scores, errors, fit_seconds, predict_seconds = [], [], [], []
+    for train_index, test_index in splits:
+        model = make_pipeline(StandardScaler(), build_estimator(name, params, n_jobs=1))
+
+        started = time.perf_counter()
+        model.fit(X[train_index], y[train_index])
+        fit_seconds.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        predicted = model.predict(X[test_index])
+        predict_seconds.append(time.perf_counter() - started)
+
+        scores.append(r2_score(y[test_index], predicted))
+        errors.append(mean_squared_error(y[test_index], predicted) ** 0.5)
+
+    return {
+        'estimator': name,
+        'params': params,
+        'cv_score': float(np.mean(scores)),
+        'cv_rmse': float(np.mean(errors)),
+        'fit_seconds': float(np.mean(fit_seconds)),
+        'predict_seconds': float(np.mean(predict_seconds))
+    }
+
+
+def select_model(X, y, n_splits=DEFAULT_CV_SPLITS, tolerance=DEFAULT_TOLERANCE, n_jobs=-1):
+    """
+    Cross-validate every candidate (in parallel, n_jobs) over rows sorted by time.
+
+    Returns (best, results): best is the fastest result within `tolerance`
+    of the top mean R²; results has every candidate, best score first.
+    """
+    splits = list(TimeSeriesSplit(n_splits=n_splits).split(X))
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate)(name, params, X, y, splits) for name, params in candidate_configs()
+    )
+    results.sort(key=lambda r: r['cv_score'], reverse=True)
+
+    top_score = results[0]['cv_score']
+    eligible = [r for r in results if r['cv_score'] >= top_score - tolerance]
+    best = min(eligible, key=lambda r: r['fit_seconds'] + r['predict_seconds'])
+    return best, results
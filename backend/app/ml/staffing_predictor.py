@@ -1,14 +1,13 @@
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-import joblib
-import os
 from datetime import datetime, timedelta
+from sqlalchemy import insert, update
 from app.extensions import db
 from app.models.staffing_metrics import StaffingMetrics, StaffingPrediction
-from app.models.ml_tracking import MLModelVersion, Holiday
+from app.models.ml_tracking import MLModelVersion
+from app.ml import feature_pipeline, model_selection
+from app.ml.model_registry import model_registry
 
 class StaffingPredictor:
     """
@@ -16,58 +15,26 @@ class StaffingPredictor:
     Uses Random Forest Regressor to predict sales and recommend staff count.
     """
     
+    FEATURE_COLUMNS = feature_pipeline.FEATURE_COLUMNS
+    
+    # Business hours covered by generated predictions (8-20)
+    BUSINESS_HOURS = range(8, 21)
+    
     def __init__(self):
         self.sales_model = None
         self.staff_model = None
         self.scaler = StandardScaler()
         self.model_version = "1.0.0"
-        self.models_dir = os.path.join(os.path.dirname(__file__), 'models')
-        
-        # Create models directory if it doesn't exist
-        os.makedirs(self.models_dir, exist_ok=True)
+        self.model_version_id = None
+        # Cross-validation RMSE of the active version (MLModelVersion.hyperparameters)
+        self.cv_rmse = None
     
     def prepare_features(self, metrics_df):
         """
         Prepare features from metrics dataframe for ML model.
-        
-        Features:
-        - hour: Hour of day (0-23)
-        - day_of_week: Day of week (0-6, Monday=0)
-        - is_weekend: Boolean
-        - is_morning: 6-12
-        - is_afternoon: 12-18
-        - is_evening: 18-24
-        - employees_scheduled: Number of employees
-        - hour_sin, hour_cos: Cyclical encoding of hour
-        - day_sin, day_cos: Cyclical encoding of day
+        See feature_pipeline.build_features for the feature list.
         """
-        df = metrics_df.copy()
-        
-        # Cyclical features for hour (24-hour cycle)
-        df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-        df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
-        
-        # Cyclical features for day of week (7-day cycle)
-        df['day_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
-        df['day_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
-        
-        # Time of day features
-        df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
-        df['is_morning'] = ((df['hour'] >= 6) & (df['hour'] < 12)).astype(int)
-        df['is_afternoon'] = ((df['hour'] >= 12) & (df['hour'] < 18)).astype(int)
-        df['is_evening'] = ((df['hour'] >= 18) & (df['hour'] < 24)).astype(int)
-        
-        # Holiday feature - check database
-        df['is_holiday'] = 0
-        df['holiday_impact'] = 1.0
-        
-        for idx, row in df.iterrows():
-            holiday = Holiday.query.filter_by(date=row['date']).first()
-            if holiday:
-                df.at[idx, 'is_holiday'] = 1
-                df.at[idx, 'holiday_impact'] = holiday.impact_multiplier
-        
-        return df
+        return feature_pipeline.build_features(metrics_df)
     
     def load_training_data(self, min_weeks=4):
         """
@@ -78,37 +45,53 @@ class StaffingPredictor:
         end_date = datetime.now().date()
         start_date = end_date - timedelta(weeks=min_weeks)
         
-        metrics = StaffingMetrics.query.filter(
+        rows = db.session.query(
+            StaffingMetrics.date,
+            StaffingMetrics.hour,
+            StaffingMetrics.day_of_week,
+            StaffingMetrics.employees_scheduled,
+            StaffingMetrics.sales_count,
+            StaffingMetrics.sales_amount
+        ).filter(
             StaffingMetrics.date >= start_date,
             StaffingMetrics.date <= end_date
         ).all()
         
-        if not metrics:
+        if not rows:
             return None
         
-        # Convert to DataFrame
-        data = []
-        for m in metrics:
-            data.append({
-                'date': m.date,
-                'hour': m.hour,
-                'day_of_week': m.day_of_week,
-                'employees_scheduled': m.employees_scheduled,
-                'sales_count': m.sales_count,
-                'sales_amount': float(m.sales_amount) if m.sales_amount else 0,
-                'is_holiday': m.is_holiday
-            })
-        
-        return pd.DataFrame(data)
+        df = pd.DataFrame(rows, columns=[
+            'date', 'hour', 'day_of_week', 'employees_scheduled', 'sales_count', 'sales_amount'
+        ])
+        df['sales_count'] = df['sales_count'].fillna(0).astype(int)
+        df['sales_amount'] = df['sales_amount'].fillna(0).astype(float)
+        return df
     
-    def train(self, min_weeks=8, test_size=0.2):
+    def train(self, min_weeks=8, test_size=0.2, n_jobs=-1, progress=None,
+              cv_splits=model_selection.DEFAULT_CV_SPLITS, tolerance=model_selection.DEFAULT_TOLERANCE,
+              commit_guard=None):
         """
         Train the ML models using historical data.
         
+        Rows are ordered by time: the last `test_size` share is held out for
+        test_score and the estimator and its hyperparameters are chosen with
+        time-series cross-validation over the rest (see model_selection).
+        Once scored, the chosen estimator and the scaler are refitted on every
+        row, so the deployed model also learns from the most recent data.
+        
+        n_jobs is used for the parallel search and the final fit (-1 uses
+        all cores). progress, if given, is called as progress(stage, percent)
+        while training advances. commit_guard, if given, is called as
+        commit_guard(model_version_id) inside the transaction that activates the
+        new version; if it returns False the version is discarded.
+        
         Returns:
         - Dictionary with training metrics (accuracy, etc.)
         """
+        report = progress or (lambda stage, percent: None)
+        
         # Load data
+        report('loading_data', 10)
         df = self.load_training_data(min_weeks=min_weeks)
         
         if df is None or len(df) < 50:
@@ -118,50 +101,51 @@ class StaffingPredictor:
                 'records': len(df) if df is not None else 0
             }
         
-        # Prepare features
-        df = self.prepare_features(df)
+        # Prepare features, in time order so no future rows end up in training
+        df = self.prepare_features(df.sort_values(['date', 'hour'], kind='stable').reset_index(drop=True))
         
-        # Feature columns
-        feature_cols = [
-            'hour', 'day_of_week', 'is_weekend', 'is_morning', 
-            'is_afternoon', 'is_evening', 'is_holiday', 'holiday_impact',
-            'hour_sin', 'hour_cos', 'day_sin', 'day_cos'
-        ]
+        feature_cols = self.FEATURE_COLUMNS
         
-        X = df[feature_cols].values
-        y_sales = df['sales_count'].values
-        y_amount = df['sales_amount'].values
+        X = feature_pipeline.feature_matrix(df)
+        y_sales = df['sales_count'].to_numpy(dtype=np.float64)
         
-        # Split data
-        X_train, X_test, y_sales_train, y_sales_test = train_test_split(
-            X, y_sales, test_size=test_size, random_state=42
-        )
+        # Chronological holdout: the most recent rows are the test set
+        split_at = int(len(df) * (1 - test_size))
+        X_train, X_test = X[:split_at], X[split_at:]
+        y_sales_train, y_sales_test = y_sales[:split_at], y_sales[split_at:]
         
-        _, _, y_amount_train, y_amount_test = train_test_split(
-            X, y_amount, test_size=test_size, random_state=42
+        # Choose estimator and hyperparameters with rolling-origin cross-validation
+        report('selecting_model', 20)
+        best, candidates = model_selection.select_model(
+            X_train, y_sales_train, n_splits=cv_splits, tolerance=tolerance, n_jobs=n_jobs
         )
         
         # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Train sales count model
-        self.sales_model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=5,
-            random_state=42
-        )
-        self.sales_model.fit(X_train_scaled, y_sales_train)
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+        
+        # Train sales count model on the older rows only, to score it
+        report('fitting', 60)
+        holdout_model = model_selection.build_estimator(best['estimator'], best['params'], n_jobs=n_jobs)
+        holdout_model.fit(X_train_scaled, y_sales_train)
         
         # Evaluate
-        train_score = self.sales_model.score(X_train_scaled, y_sales_train)
-        test_score = self.sales_model.score(X_test_scaled, y_sales_test)
+        report('evaluating', 70)
+        train_score = holdout_model.score(X_train_scaled, y_sales_train)
+        test_score = holdout_model.score(X_test_scaled, y_sales_test)
         
-        # Save models
-        self.save_models()
+        # Deployed model: refit scaler and estimator on every row, most recent included
+        report('refitting', 75)
+        self.scaler = StandardScaler()
+        X_scaled = self.scaler.fit_transform(X)
+        self.sales_model = model_selection.build_estimator(best['estimator'], best['params'], n_jobs=n_jobs)
+        self.sales_model.fit(X_scaled, y_sales)
+        # Used for confidence when the estimator has no per-tree spread
+        self.cv_rmse = best['cv_rmse']
         
         # Save model version to database
+        report('saving', 90)
         model_version_record = MLModelVersion(
             version=self.model_version,
             trained_at=datetime.utcnow(),
@@ -170,9 +154,16 @@ class StaffingPredictor:
             test_score=test_score,
             features_used=feature_cols,
             hyperparameters={
-                'n_estimators': 100,
-                'max_depth': 10,
-                'min_samples_split': 5
+                'estimator': best['estimator'],
+                **best['params'],
+                'n_jobs': n_jobs,
+                'selection': {
+                    'cv_splits': cv_splits,
+                    'tolerance': tolerance,
+                    'cv_score': best['cv_score'],
+                    'cv_rmse': best['cv_rmse'],
+                    'candidates': candidates
+                }
             },
             is_active=True
         )
@@ -181,7 +172,28 @@ class StaffingPredictor:
         MLModelVersion.query.update({'is_active': False})
         
         db.session.add(model_version_record)
+        db.session.flush()
+        
+        # Versioned files: running workers keep reading the previous ones
+        self.model_version_id = model_version_record.id
+        try:
+            self.save_models()
+            if commit_guard is not None and not commit_guard(self.model_version_id):
+                db.session.rollback()
+                model_registry.discard(self.model_version_id)
+                return {
+                    'success': False,
+                    'error': 'Training is no longer active, model discarded',
+                    'records': len(df)
+                }
+        except Exception:
+            db.session.rollback()
+            model_registry.discard(self.model_version_id)
+            raise
         db.session.commit()
+        model_registry.activate(
+            self.model_version_id, self.model_version, self.sales_model, self.scaler, self.cv_rmse
+        )
         
         return {
             'success': True,
@@ -189,6 +201,8 @@ class StaffingPredictor:
             'train_score': round(train_score, 3),
             'test_score': round(test_score, 3),
             'model_version': self.model_version,
+            'model_version_id': self.model_version_id,
+            'estimator': best['estimator'],
             'trained_at': datetime.utcnow().isoformat()
         }
     
@@ -202,147 +216,129 @@ class StaffingPredictor:
         - recommended_staff_count
         - confidence_score
         """
+        predictions = self.predict_range(date, date, hours=[hour])
+        if predictions is None:
+            return None
+        
+        row = predictions.iloc[0]
+        return {
+            'predicted_sales_count': int(row['predicted_sales_count']),
+            'predicted_sales_amount': float(row['predicted_sales_amount']),
+            'recommended_staff_count': int(row['recommended_staff_count']),
+            'confidence_score': float(row['confidence_score'])
+        }
+    
+    def build_feature_matrix(self, start_date, end_date, hours=None):
+        """
+        Build the feature frame for every (date, hour) slot in the range.
+        Holidays come from a single calendar lookup for the whole range.
+        """
+        df = feature_pipeline.slot_frame(start_date, end_date, self.BUSINESS_HOURS if hours is None else hours)
+        return self.prepare_features(df)
+    
+    def predict_range(self, start_date, end_date, hours=None):
+        """
+        Predict every (date, hour) slot of the range with one predict call.
+        
+        Returns a DataFrame with date, hour, predicted_sales_count,
+        predicted_sales_amount, recommended_staff_count and confidence_score,
+        or None if no model is available.
+        """
         if self.sales_model is None:
             self.load_models()
         
         if self.sales_model is None:
             return None
         
-        # Prepare features
-        day_of_week = date.weekday()
-        
-        # Check for holiday
-        holiday = Holiday.query.filter_by(date=date).first()
-        is_holiday = 1 if holiday else 0
-        holiday_impact = holiday.impact_multiplier if holiday else 1.0
-        
-        features = {
-            'hour': hour,
-            'day_of_week': day_of_week,
-            'is_weekend': 1 if day_of_week >= 5 else 0,
-            'is_morning': 1 if 6 <= hour < 12 else 0,
-            'is_afternoon': 1 if 12 <= hour < 18 else 0,
-            'is_evening': 1 if 18 <= hour < 24 else 0,
-            'is_holiday': is_holiday,
-            'holiday_impact': holiday_impact,
-            'hour_sin': np.sin(2 * np.pi * hour / 24),
-            'hour_cos': np.cos(2 * np.pi * hour / 24),
-            'day_sin': np.sin(2 * np.pi * day_of_week / 7),
-            'day_cos': np.cos(2 * np.pi * day_of_week / 7)
-        }
-        
-        feature_cols = [
-            'hour', 'day_of_week', 'is_weekend', 'is_morning', 
-            'is_afternoon', 'is_evening', 'is_holiday', 'holiday_impact',
-            'hour_sin', 'hour_cos', 'day_sin', 'day_cos'
-        ]
+        df = self.build_feature_matrix(start_date, end_date, hours)
+        X_scaled = self.scaler.transform(feature_pipeline.feature_matrix(df))
         
-        X = np.array([[features[col] for col in feature_cols]])
-        X_scaled = self.scaler.transform(X)
-        
-        # Predict sales count
-        predicted_sales = max(0, self.sales_model.predict(X_scaled)[0])
+        predicted_sales = np.maximum(0, self.sales_model.predict(X_scaled))
         
+        result = df[['date', 'hour']].copy()
+        result['predicted_sales_count'] = np.round(predicted_sales).astype(int)
         # Estimate sales amount (average $500 per sale)
-        predicted_amount = predicted_sales * 500
-        
-        # Calculate recommended staff (1 staff per 8-10 sales, minimum 1)
-        recommended_staff = max(1, int(np.ceil(predicted_sales / 9)))
-        
-        # Confidence based on model's feature importances and variance
-        confidence = min(0.95, self.sales_model.score(X_scaled, [predicted_sales]))
-        
-        return {
-            'predicted_sales_count': int(round(predicted_sales)),
-            'predicted_sales_amount': round(predicted_amount, 2),
-            'recommended_staff_count': recommended_staff,
-            'confidence_score': round(confidence, 2)
-        }
+        result['predicted_sales_amount'] = np.round(predicted_sales * 500, 2)
+        # Recommended staff: 1 per 8-10 sales, minimum 1
+        result['recommended_staff_count'] = np.maximum(1, np.ceil(predicted_sales / 9)).astype(int)
+        result['confidence_score'] = np.round(self._confidence(X_scaled, predicted_sales), 2)
+        return result
+    
+    def _confidence(self, X_scaled, predicted_sales):
+        """
+        Confidence per slot: 1 - (spread / predicted value), capped at 0.95.
+        The spread is the std across the forest's trees; estimators without
+        trees (gradient boosting) use the version's cross-validation RMSE.
+        """
+        estimators = getattr(self.sales_model, 'estimators_', None)
+        if estimators is not None:
+            spread = np.stack([tree.predict(X_scaled) for tree in estimators]).std(axis=0)
+        elif self.cv_rmse is not None:
+            spread = self.cv_rmse
+        else:
+            spread = 0.5 * predicted_sales
+        return np.clip(1 - spread / np.maximum(predicted_sales, 1), 0, 0.95)
     
     def generate_predictions(self, start_date, end_date):
         """
         Generate predictions for a date range and save to database.
+        Existing rows are prefetched in one query; inserts and updates go in bulk.
         """
-        if self.sales_model is None:
-            self.load_models()
+        predictions = self.predict_range(start_date, end_date)
         
-        if self.sales_model is None:
+        if predictions is None:
             return {'success': False, 'error': 'Model not trained'}
         
-        predictions_created = 0
-        current_date = start_date
-        
-        while current_date <= end_date:
-            # Generate predictions for business hours (8-20)
-            for hour in range(8, 21):
-                prediction = self.predict_for_date_hour(current_date, hour)
-                
-                if prediction:
-                    # Check if prediction already exists
-                    existing = StaffingPrediction.query.filter_by(
-                        date=current_date,
-                        hour=hour
-                    ).first()
-                    
-                    if existing:
-                        # Update existing
-                        existing.predicted_sales_count = prediction['predicted_sales_count']
-                        existing.predicted_sales_amount = prediction['predicted_sales_amount']
-                        existing.recommended_staff_count = prediction['recommended_staff_count']
-                        existing.confidence_score = prediction['confidence_score']
-                        existing.model_version = self.model_version
-                    else:
-                        # Create new
-                        new_prediction = StaffingPrediction(
-                            date=current_date,
-                            hour=hour,
-                            predicted_sales_count=prediction['predicted_sales_count'],
-                            predicted_sales_amount=prediction['predicted_sales_amount'],
-                            recommended_staff_count=prediction['recommended_staff_count'],
-                            confidence_score=prediction['confidence_score'],
-                            model_version=self.model_version
-                        )
-                        db.session.add(new_prediction)
-                    
-                    predictions_created += 1
-            
-            current_date += timedelta(days=1)
-        
+        existing = {}
+        for prediction_id, pred_date, hour in db.session.query(
+            StaffingPrediction.id, StaffingPrediction.date, StaffingPrediction.hour
+        ).filter(
+            StaffingPrediction.date >= start_date,
+            StaffingPrediction.date <= end_date
+        ).order_by(StaffingPrediction.id):
+            existing.setdefault((pred_date, hour), prediction_id)
+        
+        inserts, updates = [], []
+        for pred_date, hour, sales_count, sales_amount, staff_count, confidence in predictions.itertuples(index=False):
+            values = {
+                'predicted_sales_count': int(sales_count),
+                'predicted_sales_amount': float(sales_amount),
+                'recommended_staff_count': int(staff_count),
+                'confidence_score': float(confidence),
+                'model_version': self.model_version
+            }
+            prediction_id = existing.get((pred_date, int(hour)))
+            if prediction_id is not None:
+                updates.append({'id': prediction_id, **values})
+            else:
+                inserts.append({'date': pred_date, 'hour': int(hour), **values})
+        
+        if updates:
+            db.session.execute(update(StaffingPrediction), updates)
+        if inserts:
+            db.session.execute(insert(StaffingPrediction), inserts)
         db.session.commit()
         
         return {
             'success': True,
-            'predictions_created': predictions_created,
+            'predictions_created': len(predictions),
             'date_range': f"{start_date} to {end_date}"
         }
     
     def save_models(self):
-        """Save trained models to disk."""
-        if self.sales_model:
-            joblib.dump(self.sales_model, os.path.join(self.models_dir, 'sales_model.pkl'))
-            joblib.dump(self.scaler, os.path.join(self.models_dir, 'scaler.pkl'))
-            
-            # Save metadata
-            metadata = {
-                'model_version': self.model_version,
-                'trained_at': datetime.utcnow().isoformat()
-            }
-            joblib.dump(metadata, os.path.join(self.models_dir, 'metadata.pkl'))
+        """Save trained models to disk under the current model version id."""
+        if self.sales_model and self.model_version_id is not None:
+            model_registry.save(self.model_version_id, self.sales_model, self.scaler)
     
     def load_models(self):
-        """Load trained models from disk."""
-        sales_model_path = os.path.join(self.models_dir, 'sales_model.pkl')
-        scaler_path = os.path.join(self.models_dir, 'scaler.pkl')
-        
-        if os.path.exists(sales_model_path) and os.path.exists(scaler_path):
-            self.sales_model = joblib.load(sales_model_path)
-            self.scaler = joblib.load(scaler_path)
-            
-            # Load metadata if available
-            metadata_path = os.path.join(self.models_dir, 'metadata.pkl')
-            if os.path.exists(metadata_path):
-                metadata = joblib.load(metadata_path)
-                self.model_version = metadata.get('model_version', '1.0.0')
-            
-            return True
-        return False
+        """Load the active model from the registry (cached across requests)."""
+        loaded = model_registry.get_active()
+        if loaded is None:
+            return False
+        
+        self.sales_model = loaded.sales_model
+        self.scaler = loaded.scaler
+        self.model_version = loaded.version
+        self.model_version_id = loaded.version_id
+        self.cv_rmse = loaded.cv_rmse
+        return True
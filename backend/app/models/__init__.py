@@ -6,6 +6,7 @@ from app.models.schedule import Schedule
 from app.models.shift import Shift
 from app.models.time_tracking import TimeTracking
 from app.models.sale import Sale
+from app.models.sales_rollup import SalesDailyRollup, SalesHourlyRollup
 from app.models.expense import Expense, ExpenseCategory
 from app.models.supply import Supply, SupplyPrice
 from app.models.payroll import Payroll
@@ -19,6 +20,9 @@ from app.models.vacation_period import VacationPeriod
 from app.models.absence_request import AbsenceRequest
 from app.models.social_security_document import SocialSecurityDocument
 from app.models.employee_document import EmployeeDocument
+from app.models.sync_job import SyncJob
+from app.models.fudo_sync_state import FudoSyncState
+from app.models.ml_training_job import MLTrainingJob
 
 __all__ = [
     'User',
@@ -29,6 +33,8 @@ __all__ = [
     'Shift',
     'TimeTracking',
     'Sale',
+    'SalesDailyRollup',
+    'SalesHourlyRollup',
     'Expense',
     'ExpenseCategory',
     'Supply',
@@ -45,5 +51,8 @@ __all__ = [
     'VacationPeriod',
     'AbsenceRequest',
     'SocialSecurityDocument',
-    'EmployeeDocument'
+    'EmployeeDocument',
+    'SyncJob',
+    'FudoSyncState',
+    'MLTrainingJob'
 ]
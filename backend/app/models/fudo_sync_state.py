@@ -0,0 +1,31 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class FudoSyncState(db.Model):
+    """
+    Marca de avance (high-water mark) de la sincronización incremental con Fudo.
+
+    Una fila por recurso: el mayor closedAt (ventas) o fecha (gastos)
+    importado por el último job incremental completado. La próxima
+    sincronización pide sólo registros desde esa marca menos una ventana de
+    solapamiento (horas para ventas, días para gastos cargados con atraso).
+    """
+    __tablename__ = 'fudo_sync_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    resource = db.Column(db.String(20), nullable=False, unique=True)
+    last_seen_at = db.Column(db.DateTime)
+    # Parámetros por defecto de las corridas programadas (ej. category_mapping de gastos)
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    last_job_id = db.Column(db.Integer, db.ForeignKey('sync_jobs.id'))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'resource': self.resource,
+            'last_seen_at': self.last_seen_at.isoformat() if self.last_seen_at else None,
+            'params': self.params or {},
+            'last_job_id': self.last_job_id,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,55 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class MLTrainingJob(db.Model):
+    """
+    Entrenamiento del modelo de predicción ejecutado en segundo plano.
+
+    El proceso que entrena actualiza stage/progress a medida que avanza; al
+    terminar guarda las métricas en result y la versión creada en
+    model_version_id. Sólo puede haber un entrenamiento activo a la vez: lo
+    garantiza la base con la restricción única sobre active_lock, que vale True
+    mientras el job está pendiente o corriendo y NULL al terminar (los NULL no
+    chocan entre sí), así que también vale entre varios workers de gunicorn.
+    """
+    __tablename__ = 'ml_training_jobs'
+
+    STATUSES = ('pending', 'running', 'completed', 'failed')
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    stage = db.Column(db.String(30))
+    progress = db.Column(db.Integer, nullable=False, default=0)  # 0-100
+    result = db.Column(db.JSON)
+    error_message = db.Column(db.Text)
+    model_version_id = db.Column(db.Integer, db.ForeignKey('ml_model_versions.id'))
+    active_lock = db.Column(db.Boolean, unique=True)
+
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_ml_training_jobs_status', 'status'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'params': self.params,
+            'stage': self.stage,
+            'progress': self.progress,
+            'result': self.result,
+            'error_message': self.error_message,
+            'model_version_id': self.model_version_id,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
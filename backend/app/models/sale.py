@@ -64,6 +64,11 @@ class Sale(db.Model):
     @staticmethod
     def from_csv_row(row):
         """Create a Sale instance from a CSV row dict"""
+        return Sale(**Sale.parse_csv_row(row))
+
+    @staticmethod
+    def parse_csv_row(row):
+        """Parse a CSV row dict into Sale column values (used by the bulk import)"""
         from datetime import datetime as dt
         
         def parse_date(date_str):
@@ -106,7 +111,7 @@ class Sale(db.Model):
                 return False
             return val.strip().lower() in ('si', 'sí', 'yes', 'true', '1')
         
-        return Sale(
+        return dict(
             external_id=parse_int(row.get('Id')),
             fecha=parse_date(row.get('Fecha')),
             creacion=parse_datetime(row.get('Creación')) or dt.now(),
@@ -0,0 +1,64 @@
+from app.extensions import db
+
+
+class SalesDailyRollup(db.Model):
+    """
+    Agregado diario de ventas cerradas por fecha de venta y dimensiones
+    (tipo de venta, medio de pago, sala). Lo mantiene SalesRollupService.
+    """
+    __tablename__ = 'sales_daily_rollup'
+
+    id = db.Column(db.Integer, primary_key=True)
+    fecha = db.Column(db.Date, nullable=False)
+    tipo_venta = db.Column(db.String(50), nullable=True)
+    medio_pago = db.Column(db.String(100), nullable=True)
+    sala = db.Column(db.String(100), nullable=True)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('idx_sales_daily_rollup_fecha', 'fecha'),
+    )
+
+    def to_dict(self):
+        return {
+            'fecha': self.fecha.isoformat() if self.fecha else None,
+            'tipo_venta': self.tipo_venta,
+            'medio_pago': self.medio_pago,
+            'sala': self.sala,
+            'total': float(self.total) if self.total else 0,
+            'cantidad': self.cantidad
+        }
+
+
+class SalesHourlyRollup(db.Model):
+    """
+    Agregado horario de ventas cerradas. La fecha y la hora corresponden al
+    cierre de la venta en hora local Argentina (UTC-3), igual que el análisis
+    por día de semana y franja horaria de reportes.
+    """
+    __tablename__ = 'sales_hourly_rollup'
+
+    id = db.Column(db.Integer, primary_key=True)
+    fecha = db.Column(db.Date, nullable=False)
+    hora = db.Column(db.Integer, nullable=False)
+    tipo_venta = db.Column(db.String(50), nullable=True)
+    medio_pago = db.Column(db.String(100), nullable=True)
+    sala = db.Column(db.String(100), nullable=True)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('idx_sales_hourly_rollup_fecha_hora', 'fecha', 'hora'),
+    )
+
+    def to_dict(self):
+        return {
+            'fecha': self.fecha.isoformat() if self.fecha else None,
+            'hora': self.hora,
+            'tipo_venta': self.tipo_venta,
+            'medio_pago': self.medio_pago,
+            'sala': self.sala,
+            'total': float(self.total) if self.total else 0,
+            'cantidad': self.cantidad
+        }
@@ -31,6 +31,9 @@ class Schedule(db.Model):
         }
         
         if include_shifts:
-            data['shifts'] = [shift.to_dict() for shift in self.shifts]
+            from app.models.shift import Shift
+            # Load employees in the same query so Shift.to_dict does not query per shift
+            shifts = self.shifts.options(db.joinedload(Shift.employee))
+            data['shifts'] = [shift.to_dict() for shift in shifts]
         
         return data
@@ -0,0 +1,81 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class SyncJob(db.Model):
+    """
+    Ejecución de una sincronización con Fudo (ventas o gastos).
+
+    Se confirma una página por vez: last_committed_page indica hasta qué
+    página quedaron guardados los datos, para reanudar desde la siguiente si
+    el proceso se corta.
+    """
+    __tablename__ = 'sync_jobs'
+
+    STATUSES = ('pending', 'running', 'completed', 'failed')
+    RESOURCES = ('sales', 'expenses')
+    MAX_STORED_ERRORS = 100
+
+    id = db.Column(db.Integer, primary_key=True)
+    resource = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    params = db.Column(db.JSON, nullable=False, default=dict)
+
+    last_committed_page = db.Column(db.Integer, nullable=False, default=0)
+    total_fetched = db.Column(db.Integer, nullable=False, default=0)
+    imported = db.Column(db.Integer, nullable=False, default=0)
+    updated = db.Column(db.Integer, nullable=False, default=0)
+    skipped = db.Column(db.Integer, nullable=False, default=0)
+    no_category_mapping = db.Column(db.Integer, nullable=False, default=0)
+    errors_count = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.JSON, nullable=False, default=list)
+    error_message = db.Column(db.Text)
+    # Mayor closedAt (ventas) o fecha (gastos) visto en las páginas confirmadas (modo incremental)
+    high_water_at = db.Column(db.DateTime)
+
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_sync_jobs_resource_status', 'resource', 'status'),
+    )
+
+    def add_errors(self, errors):
+        """Acumula errores guardando sólo los primeros MAX_STORED_ERRORS"""
+        if not errors:
+            return
+        self.errors_count = (self.errors_count or 0) + len(errors)
+        stored = list(self.errors or [])
+        room = self.MAX_STORED_ERRORS - len(stored)
+        if room > 0:
+            self.errors = stored + errors[:room]
+
+    def advance_high_water(self, seen_at):
+        if seen_at and (not self.high_water_at or seen_at > self.high_water_at):
+            self.high_water_at = seen_at
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'resource': self.resource,
+            'status': self.status,
+            'params': self.params,
+            'last_committed_page': self.last_committed_page,
+            'total_fetched': self.total_fetched,
+            'imported': self.imported,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'no_category_mapping': self.no_category_mapping,
+            'errors_count': self.errors_count,
+            'errors': self.errors or [],
+            'error_message': self.error_message,
+            'high_water_at': self.high_water_at.isoformat() if self.high_water_at else None,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -7,6 +7,9 @@ class TimeTracking(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=False)
     tracking_date = db.Column(db.Date, nullable=False, index=True)
+    # Totales de los bloques de trabajo, mantenidos por WorkedTimeService en cada escritura de WorkBlock
+    total_worked_minutes = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    open_block = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     created_at = db.Column(db.DateTime, default=lambda: datetime.utcnow(), nullable=False)
     updated_at = db.Column(db.DateTime, default=lambda: datetime.utcnow(), onupdate=lambda: datetime.utcnow())
     
@@ -18,28 +21,7 @@ class TimeTracking(db.Model):
     employee = db.relationship('Employee', backref='time_tracking_records')
     
     def to_dict(self):
-        total_hours = 0
-        total_minutes = 0
-        
-        for block in self.work_blocks:
-            start = block.start_time
-            end = block.end_time
-            
-            # Only calculate hours for completed blocks (end_time != start_time)
-            # When end_time == start_time, the block is in progress
-            if end != start:
-                hours = end.hour - start.hour
-                minutes = end.minute - start.minute
-                
-                if minutes < 0:
-                    hours -= 1
-                    minutes += 60
-                
-                total_hours += hours
-                total_minutes += minutes
-        
-        total_hours += total_minutes // 60
-        total_minutes = total_minutes % 60
+        total_hours, total_minutes = divmod(self.total_worked_minutes or 0, 60)
         
         return {
             'id': self.id,
@@ -48,6 +30,7 @@ class TimeTracking(db.Model):
             'work_blocks': [block.to_dict() for block in self.work_blocks],
             'total_hours': total_hours,
             'total_minutes': total_minutes,
+            'open_block': bool(self.open_block),
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -10,6 +10,9 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='employee')
     is_active = db.Column(db.Boolean, default=True, nullable=False)
+    # Versión de los tokens emitidos (claim 'ver'); al cambiar la contraseña o desactivar
+    # el usuario se incrementa y los tokens anteriores dejan de ser válidos
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
     employee = db.relationship('Employee', backref='user', uselist=False, cascade='all, delete-orphan', foreign_keys='Employee.user_id')
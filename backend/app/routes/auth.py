@@ -25,6 +25,7 @@ def login():
     token = jwt.encode({
         'user_id': user.id,
         'email': user.email,
+        'ver': user.token_version or 0,
         'exp': datetime.utcnow() + timedelta(days=7)
     }, current_app.config['SECRET_KEY'], algorithm='HS256')
     
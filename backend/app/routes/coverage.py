@@ -1,113 +1,159 @@
 from flask import Blueprint, request, jsonify
-from app.models.shift import Shift
-from app.models.employee import Employee
-from sqlalchemy import func
-from datetime import datetime, timedelta, time
-from collections import defaultdict
+from datetime import datetime
+from app.services.coverage_engine import CoverageEngine, CoverageComparison, RESOLUTIONS
+from app.utils.timezone_utils import get_current_time_argentina
 from app.utils.jwt_utils import token_required
 
 bp = Blueprint('coverage', __name__, url_prefix='/api/v1/coverage')
 
-@bp.route('/hourly', methods=['GET'])
-@token_required
-def get_hourly_coverage(current_user):
-    """Get hourly coverage for a date range"""
+
+def _parse_range(default=None):
+    """Lee start_date/end_date (o usa default si faltan ambos); devuelve (start, end, error)"""
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
-    
+
+    if default is not None and not start_date and not end_date:
+        return default, default, None
+
     if not start_date or not end_date:
-        return jsonify({'error': 'start_date y end_date son requeridos'}), 400
-    
+        return None, None, 'start_date y end_date son requeridos'
+
     try:
         start = datetime.fromisoformat(start_date).date()
         end = datetime.fromisoformat(end_date).date()
     except (ValueError, AttributeError):
-        return jsonify({'error': 'Formato de fecha inválido'}), 400
-    
-    # Get all shifts in the date range
-    shifts = Shift.query.filter(
-        Shift.shift_date >= start,
-        Shift.shift_date <= end
-    ).all()
-    
-    # Calculate coverage by hour for each day
-    coverage_data = defaultdict(lambda: defaultdict(int))
-    
-    for shift in shifts:
-        date_str = str(shift.shift_date)
-        
-        # Get start and end hours
-        start_hour = shift.start_time.hour
-        end_hour = shift.end_time.hour
-        
-        # Count employee for each hour they work
-        for hour in range(start_hour, end_hour):
-            coverage_data[date_str][hour] += 1
-    
-    # Format response
+        return None, None, 'Formato de fecha inválido'
+
+    if end < start:
+        return None, None, 'end_date debe ser igual o posterior a start_date'
+
+    return start, end, None
+
+
+def _parse_resolution():
+    resolution = request.args.get('resolution', 60, type=int)
+    if resolution not in RESOLUTIONS:
+        return None, 'resolution debe ser 15, 30 o 60'
+    return resolution, None
+
+
+def _slot_labels(resolution):
+    return [f'{m // 60:02d}:{m % 60:02d}' for m in range(0, 24 * 60, resolution)]
+
+@bp.route('/hourly', methods=['GET'])
+@token_required
+def get_hourly_coverage(current_user):
+    """
+    Get staffing coverage for a date range.
+
+    Query params: resolution (15, 30 or 60 minutes, default 60) and
+    format=compact, which returns one array of counts per day instead of
+    one object per slot. Each slot holds the peak headcount within it.
+    """
+    start, end, error = _parse_range()
+    if error:
+        return jsonify({'error': error}), 400
+
+    resolution, error = _parse_resolution()
+    if error:
+        return jsonify({'error': error}), 400
+
+    engine = CoverageEngine(start, end)
+    curves = engine.curves(resolution).tolist()
+    dates = [str(d) for d in engine.dates()]
+    slot_minutes = list(range(0, 24 * 60, resolution))
+
+    if request.args.get('format') == 'compact':
+        return jsonify({
+            'start_date': str(start),
+            'end_date': str(end),
+            'resolution': resolution,
+            'slots': _slot_labels(resolution),
+            'dates': dates,
+            'coverage': curves
+        }), 200
+
     result = []
-    current_date = start
-    while current_date <= end:
-        date_str = str(current_date)
-        hourly_data = []
-        
-        for hour in range(24):
-            hourly_data.append({
-                'hour': hour,
-                'employee_count': coverage_data[date_str].get(hour, 0)
-            })
-        
+    for date_str, counts in zip(dates, curves):
+        if resolution == 60:
+            slots = [{'hour': hour, 'employee_count': count} for hour, count in enumerate(counts)]
+        else:
+            slots = [
+                {'hour': m // 60, 'minute': m % 60, 'time': f'{m // 60:02d}:{m % 60:02d}', 'employee_count': count}
+                for m, count in zip(slot_minutes, counts)
+            ]
         result.append({
             'date': date_str,
-            'hourly_coverage': hourly_data
+            'hourly_coverage': slots
         })
-        
-        current_date += timedelta(days=1)
-    
+
     return jsonify(result), 200
 
 @bp.route('/summary', methods=['GET'])
 @token_required
 def get_coverage_summary(current_user):
     """Get coverage summary statistics for a date range"""
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    
-    if not start_date or not end_date:
-        return jsonify({'error': 'start_date y end_date son requeridos'}), 400
-    
-    try:
-        start = datetime.fromisoformat(start_date).date()
-        end = datetime.fromisoformat(end_date).date()
-    except (ValueError, AttributeError):
-        return jsonify({'error': 'Formato de fecha inválido'}), 400
-    
-    # Get all shifts in the date range
-    shifts = Shift.query.filter(
-        Shift.shift_date >= start,
-        Shift.shift_date <= end
-    ).all()
-    
-    # Calculate statistics
-    total_shifts = len(shifts)
-    total_hours = sum(float(shift.hours) for shift in shifts)
-    unique_employees = len(set(shift.employee_id for shift in shifts))
-    
-    # Calculate peak hours
-    hourly_counts = defaultdict(int)
-    for shift in shifts:
-        start_hour = shift.start_time.hour
-        end_hour = shift.end_time.hour
-        for hour in range(start_hour, end_hour):
-            hourly_counts[hour] += 1
-    
-    peak_hour = max(hourly_counts.items(), key=lambda x: x[1]) if hourly_counts else (None, 0)
-    
+    start, end, error = _parse_range()
+    if error:
+        return jsonify({'error': error}), 400
+
+    engine = CoverageEngine(start, end)
+    total_shifts, total_hours, unique_employees = engine.totals()
+
+    # Peak hour of day: staffed hours summed over every day of the range
+    hourly_counts = engine.curves(60).sum(axis=0)
+    peak_hour = int(hourly_counts.argmax()) if hourly_counts.any() else None
+    peak = engine.peak()
+
     return jsonify({
         'total_shifts': total_shifts,
         'total_hours': round(total_hours, 2),
         'unique_employees': unique_employees,
-        'peak_hour': peak_hour[0],
-        'peak_hour_count': peak_hour[1],
-        'average_shifts_per_day': round(total_shifts / ((end - start).days + 1), 2)
+        'peak_hour': peak_hour,
+        'peak_hour_count': int(hourly_counts[peak_hour]) if peak_hour is not None else 0,
+        'peak_concurrency': peak[2] if peak else 0,
+        'peak_at': f'{peak[0]}T{peak[1] // 60:02d}:{peak[1] % 60:02d}' if peak else None,
+        'average_shifts_per_day': round(total_shifts / engine.days, 2)
+    }), 200
+
+@bp.route('/actual-vs-scheduled', methods=['GET'])
+@token_required
+def get_actual_vs_scheduled(current_user):
+    """
+    Compare actual staffing (time tracking work blocks) with scheduled shifts.
+
+    Defaults to today when no dates are given. Returns compact per-slot arrays
+    (peak headcount per slot and actual minus scheduled delta) plus
+    understaffed/overstaffed person-minutes per day and for the whole range,
+    counted only up to the current time.
+    """
+    now = get_current_time_argentina().replace(tzinfo=None)
+    start, end, error = _parse_range(default=now.date())
+    if error:
+        return jsonify({'error': error}), 400
+
+    resolution, error = _parse_resolution()
+    if error:
+        return jsonify({'error': error}), 400
+
+    comparison = CoverageComparison(start, end, now)
+    understaffed, overstaffed = comparison.daily_totals()
+    dates = [str(d) for d in comparison.scheduled.dates()]
+
+    return jsonify({
+        'start_date': str(start),
+        'end_date': str(end),
+        'resolution': resolution,
+        'as_of': now.isoformat(timespec='minutes'),
+        'slots': _slot_labels(resolution),
+        'dates': dates,
+        'scheduled': comparison.scheduled.curves(resolution).tolist(),
+        'actual': comparison.actual.curves(resolution).tolist(),
+        'delta': comparison.slot_delta(resolution).tolist(),
+        'days': [
+            {'date': date_str, 'understaffed_minutes': int(under), 'overstaffed_minutes': int(over)}
+            for date_str, under, over in zip(dates, understaffed, overstaffed)
+        ],
+        'understaffed_minutes': int(understaffed.sum()),
+        'overstaffed_minutes': int(overstaffed.sum())
     }), 200
@@ -1,8 +1,9 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify
 from app.extensions import db
 from app.models.expense import Expense, ExpenseCategory
 from app.utils.decorators import admin_required
 from app.utils.jwt_utils import token_required
+from app.utils.csv_export import stream_csv_response
 from datetime import datetime
 from sqlalchemy import func
 import csv
@@ -370,7 +371,17 @@ def export_expenses(current_user):
     fecha_desde = request.args.get('fecha_desde')
     fecha_hasta = request.args.get('fecha_hasta')
     
-    query = Expense.query
+    # Sólo las columnas exportadas, con la categoría en el mismo join, sin hidratar objetos Expense
+    query = db.session.query(
+        Expense.id, Expense.external_id, Expense.fecha, Expense.fecha_vencimiento,
+        Expense.proveedor, Expense.comentario, Expense.estado_pago, Expense.importe,
+        Expense.de_caja, Expense.caja, Expense.medio_pago, Expense.numero_fiscal,
+        Expense.tipo_comprobante, Expense.numero_comprobante, Expense.creado_por,
+        Expense.cancelado,
+        ExpenseCategory.id.label('category_id'),
+        ExpenseCategory.name.label('category_name'),
+        ExpenseCategory.expense_type.label('category_type')
+    ).outerjoin(ExpenseCategory, Expense.category_id == ExpenseCategory.id)
     
     if fecha_desde:
         try:
@@ -386,26 +397,23 @@ def export_expenses(current_user):
         except ValueError:
             return jsonify({'error': 'Formato de fecha_hasta inválido. Use YYYY-MM-DD'}), 400
     
-    expenses = query.order_by(Expense.fecha.desc(), Expense.id.desc()).all()
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
+    query = query.order_by(Expense.fecha.desc(), Expense.id.desc())
     
-    writer.writerow([
+    header = [
         'Id', 'Fecha', 'Fecha de vencimiento', 'Proveedor', 'Categoría', 
         'Tipo de Gasto', 'Comentario', 'Estado del pago', 'Importe', 'De Caja',
         'Caja', 'Medio de pago', 'Número Fiscal', 'Tipo de comprobante',
         'N° de comprobante', 'Creado por', 'Cancelado'
-    ])
+    ]
     
-    for expense in expenses:
-        writer.writerow([
+    def format_row(expense):
+        return [
             expense.external_id or expense.id,
             expense.fecha.strftime('%d/%m/%Y') if expense.fecha else '',
             expense.fecha_vencimiento.strftime('%d/%m/%Y') if expense.fecha_vencimiento else '',
             expense.proveedor or '',
-            expense.category_rel.name if expense.category_rel else 'Sin categoría',
-            expense.category_rel.expense_type if expense.category_rel else '',
+            expense.category_name if expense.category_id is not None else 'Sin categoría',
+            expense.category_type if expense.category_id is not None else '',
             expense.comentario or '',
             expense.estado_pago or '',
             expense.importe or 0,
@@ -417,15 +425,9 @@ def export_expenses(current_user):
             expense.numero_comprobante or '',
             expense.creado_por or '',
             'Sí' if expense.cancelado else 'No'
-        ])
+        ]
     
-    output.seek(0)
-    
-    return Response(
-        output.getvalue(),
-        mimetype='text/csv',
-        headers={'Content-Disposition': 'attachment; filename=gastos_export.csv'}
-    )
+    return stream_csv_response(query, header, format_row, 'gastos_export.csv')
 
 
 @bp.route('/filters', methods=['GET'])
@@ -1,223 +1,30 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.extensions import db
-from app.models.sale import Sale
-from app.models.expense import Expense, ExpenseCategory
+from app.models.expense import ExpenseCategory
+from app.models.sync_job import SyncJob
+from app.models.fudo_sync_state import FudoSyncState
+from app.services.fudo_sync_service import FudoSyncService
 from app.utils.jwt_utils import token_required
 from app.utils.decorators import admin_required
 from app.utils.fudo_client import FudoClient
-from datetime import datetime
-from typing import Dict, List, Optional
 import logging
-import threading
 
 bp = Blueprint('fudo_sync', __name__, url_prefix='/api/v1/fudo')
 
 logger = logging.getLogger(__name__)
 
 
-def parse_fudo_sale(fudo_sale: Dict) -> Dict:
-    """
-    Parse Fudo sale data to Galia format
-    
-    Args:
-        fudo_sale: Sale data from Fudo API
-    
-    Returns:
-        Dictionary with parsed sale data
-    """
-    attributes = fudo_sale.get('attributes', {})
-    sale_id = fudo_sale.get('id')
-    
-    created_at = attributes.get('createdAt')
-    closed_at = attributes.get('closedAt')
-    
-    creacion = None
-    if created_at:
-        try:
-            creacion = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-        except (ValueError, AttributeError):
-            creacion = datetime.now()
-    
-    cerrada = None
-    if closed_at:
-        try:
-            cerrada = datetime.fromisoformat(closed_at.replace('Z', '+00:00'))
-        except (ValueError, AttributeError):
-            pass
-    
-    fecha = cerrada.date() if cerrada else (creacion.date() if creacion else datetime.now().date())
-    
-    total = attributes.get('total', 0)
-    if total:
-        total = float(total)
-    
-    estado_map = {
-        'OPEN': 'Abierta',
-        'CLOSED': 'Cerrada',
-        'CANCELLED': 'Cancelada'
-    }
-    estado = estado_map.get(attributes.get('status'), 'Cerrada')
-    
-    tipo_venta_map = {
-        'DELIVERY': 'Delivery',
-        'TAKE_AWAY': 'Para llevar',
-        'TABLE': 'Local',
-        'COUNTER': 'Mostrador'
-    }
-    tipo_venta = tipo_venta_map.get(attributes.get('type'), 'Local')
-    
-    relationships = fudo_sale.get('relationships', {})
-    table_data = relationships.get('table', {}).get('data')
-    room_data = relationships.get('room', {}).get('data')
-    
-    return {
-        'external_id': sale_id,
-        'fecha': fecha,
-        'creacion': creacion,
-        'cerrada': cerrada,
-        'caja': attributes.get('cashRegisterName'),
-        'estado': estado,
-        'cliente': attributes.get('customerName'),
-        'mesa': table_data.get('id') if table_data else None,
-        'sala': room_data.get('id') if room_data else None,
-        'personas': attributes.get('people'),
-        'camarero': attributes.get('userName'),
-        'medio_pago': None,
-        'total': total,
-        'fiscal': attributes.get('fiscalReceipt', False),
-        'tipo_venta': tipo_venta,
-        'comentario': attributes.get('comments'),
-        'origen': 'Fudo',
-        'id_origen': sale_id
-    }
-
-
-def parse_fudo_expense(fudo_expense: Dict, category_mapping: Dict[str, int]) -> Optional[Dict]:
-    """
-    Parse Fudo expense data to Galia format
-    
-    Args:
-        fudo_expense: Expense data from Fudo API
-        category_mapping: Mapping from Fudo category IDs to Galia category IDs
-    
-    Returns:
-        Dictionary with parsed expense data or None if category not mapped
-    """
-    attributes = fudo_expense.get('attributes', {})
-    expense_id = fudo_expense.get('id')
-    
-    date_str = attributes.get('date')
-    fecha = None
-    if date_str:
-        try:
-            fecha = datetime.strptime(date_str, '%Y-%m-%d').date()
-        except ValueError:
-            fecha = datetime.now().date()
-    else:
-        fecha = datetime.now().date()
-    
-    amount = attributes.get('amount', 0)
-    # Convert to float even if amount is 0
-    try:
-        amount = float(amount) if amount is not None else 0.0
-    except (ValueError, TypeError):
-        amount = 0.0
-    
-    relationships = fudo_expense.get('relationships', {})
-    fudo_category_data = relationships.get('expenseCategory', {}).get('data')
-    fudo_category_id = fudo_category_data.get('id') if fudo_category_data else None
-    
-    galia_category_id = None
-    if fudo_category_id and category_mapping:
-        galia_category_id = category_mapping.get(fudo_category_id)
-        if not galia_category_id:
-            logger.info(f"No category mapping found for Fudo expense {expense_id} with category {fudo_category_id} - importing without category")
-    
-    provider_data = relationships.get('provider', {}).get('data')
-    provider_id = provider_data.get('id') if provider_data else None
-    
-    payment_method_data = relationships.get('paymentMethod', {}).get('data')
-    
-    estado_pago_map = {
-        'PENDING': 'Pendiente',
-        'PAID': 'Pagado',
-        'CANCELLED': 'Cancelado'
-    }
-    estado_pago = estado_pago_map.get(attributes.get('status'), 'Pendiente')
-    
-    return {
-        'external_id': expense_id,
-        'fecha': fecha,
-        'fecha_vencimiento': None,
-        'proveedor': attributes.get('providerName'),
-        'category_id': galia_category_id,
-        'comentario': attributes.get('description'),
-        'estado_pago': estado_pago,
-        'importe': amount,
-        'de_caja': attributes.get('fromCashRegister', False),
-        'caja': attributes.get('cashRegisterName'),
-        'medio_pago': attributes.get('paymentMethodName'),
-        'numero_fiscal': attributes.get('receiptNumber'),
-        'tipo_comprobante': attributes.get('receiptTypeName'),
-        'numero_comprobante': attributes.get('receiptNumber'),
-        'creado_por': 'Fudo Sync',
-        'cancelado': attributes.get('status') == 'CANCELLED'
-    }
+def _start_sync(resource, params, current_user, message):
+    job = FudoSyncService.create_job(resource, params, current_user.id)
+    FudoSyncService.start_job(current_app._get_current_object(), job.id)
 
-
-def _sync_sales_background(start_date, end_date, update_existing):
-    """Background task for syncing sales"""
-    from app import create_app
-    app = create_app('production')
-    
-    with app.app_context():
-        try:
-            logger.info(f"Starting background sales sync: {start_date} to {end_date}")
-            client = FudoClient()
-            
-            fudo_sales = client.get_all_sales(start_date=start_date, end_date=end_date)
-            
-            results = {
-                'total_fetched': len(fudo_sales),
-                'imported': 0,
-                'updated': 0,
-                'skipped': 0,
-                'errors': []
-            }
-            
-            for fudo_sale in fudo_sales:
-                try:
-                    sale_data = parse_fudo_sale(fudo_sale)
-                    external_id = sale_data.get('external_id')
-                    
-                    existing_sale = Sale.query.filter_by(external_id=external_id).first()
-                    
-                    if existing_sale:
-                        if update_existing:
-                            for key, value in sale_data.items():
-                                if key != 'external_id':
-                                    setattr(existing_sale, key, value)
-                            results['updated'] += 1
-                        else:
-                            results['skipped'] += 1
-                    else:
-                        new_sale = Sale(**sale_data)
-                        db.session.add(new_sale)
-                        results['imported'] += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error processing Fudo sale {fudo_sale.get('id')}: {str(e)}")
-                    results['errors'].append({
-                        'sale_id': fudo_sale.get('id'),
-                        'error': str(e)
-                    })
-            
-            db.session.commit()
-            logger.info(f"Sales sync completed: {results['imported']} imported, {results['updated']} updated")
-            
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Error in background sales sync: {str(e)}")
+    return jsonify({
+        'message': message,
+        'status': 'processing',
+        'job_id': job.id,
+        'start_date': params.get('start_date'),
+        'end_date': params.get('end_date')
+    }), 202
 
 
 @bp.route('/sync/sales', methods=['POST'])
@@ -231,99 +38,22 @@ def sync_sales(current_user):
         - start_date: Start date in ISO format (e.g., '2024-01-01T00:00:00Z')
         - end_date: End date in ISO format (e.g., '2024-01-31T23:59:59Z')
         - update_existing: Whether to update existing sales (default: false)
+    
+    Progress is tracked in a sync job: GET /sync/jobs/<job_id>
     """
     try:
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        update_existing = request.args.get('update_existing', 'false').lower() == 'true'
-        
-        # Start background thread
-        thread = threading.Thread(
-            target=_sync_sales_background,
-            args=(start_date, end_date, update_existing)
-        )
-        thread.daemon = True
-        thread.start()
-        
-        return jsonify({
-            'message': 'Sincronización de ventas iniciada en segundo plano',
-            'status': 'processing',
-            'start_date': start_date,
-            'end_date': end_date
-        }), 202
+        params = {
+            'start_date': request.args.get('start_date'),
+            'end_date': request.args.get('end_date'),
+            'update_existing': request.args.get('update_existing', 'false').lower() == 'true'
+        }
+        return _start_sync('sales', params, current_user, 'Sincronización de ventas iniciada en segundo plano')
         
     except Exception as e:
         logger.error(f"Error starting sales sync: {str(e)}")
         return jsonify({'error': f'Error iniciando sincronización: {str(e)}'}), 500
 
 
-def _sync_expenses_background(start_date, end_date, update_existing, category_mapping):
-    """Background task for syncing expenses"""
-    from app import create_app
-    app = create_app('production')
-    
-    with app.app_context():
-        try:
-            logger.info(f"Starting background expenses sync: {start_date} to {end_date}")
-            client = FudoClient()
-            
-            fudo_expenses = client.get_all_expenses(start_date=start_date, end_date=end_date)
-            
-            results = {
-                'total_fetched': len(fudo_expenses),
-                'imported': 0,
-                'updated': 0,
-                'skipped': 0,
-                'no_category_mapping': 0,
-                'errors': []
-            }
-            
-            for fudo_expense in fudo_expenses:
-                try:
-                    expense_data = parse_fudo_expense(fudo_expense, category_mapping)
-                    
-                    if not expense_data:
-                        results['errors'].append({
-                            'expense_id': fudo_expense.get('id'),
-                            'error': 'Error parsing expense data'
-                        })
-                        continue
-                    
-                    if not expense_data.get('category_id'):
-                        results['no_category_mapping'] += 1
-                    
-                    external_id = expense_data.get('external_id')
-                    
-                    existing_expense = Expense.query.filter_by(external_id=external_id).first()
-                    
-                    if existing_expense:
-                        if update_existing:
-                            for key, value in expense_data.items():
-                                if key != 'external_id':
-                                    setattr(existing_expense, key, value)
-                            results['updated'] += 1
-                        else:
-                            results['skipped'] += 1
-                    else:
-                        new_expense = Expense(**expense_data)
-                        db.session.add(new_expense)
-                        results['imported'] += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error processing Fudo expense {fudo_expense.get('id')}: {str(e)}")
-                    results['errors'].append({
-                        'expense_id': fudo_expense.get('id'),
-                        'error': str(e)
-                    })
-            
-            db.session.commit()
-            logger.info(f"Expenses sync completed: {results['imported']} imported, {results['updated']} updated")
-            
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Error in background expenses sync: {str(e)}")
-
-
 @bp.route('/sync/expenses', methods=['POST'])
 @token_required
 @admin_required
@@ -339,35 +69,121 @@ def sync_expenses(current_user):
     Body (optional):
         - category_mapping: Dict mapping Fudo category IDs to Galia category IDs
           Example: {"1": 5, "2": 7}
+    
+    Progress is tracked in a sync job: GET /sync/jobs/<job_id>
     """
     try:
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        update_existing = request.args.get('update_existing', 'false').lower() == 'true'
-        
-        data = request.get_json() or {}
-        category_mapping = data.get('category_mapping', {})
+        data = request.get_json(silent=True) or {}
+        params = {
+            'start_date': request.args.get('start_date'),
+            'end_date': request.args.get('end_date'),
+            'update_existing': request.args.get('update_existing', 'false').lower() == 'true',
+            'category_mapping': data.get('category_mapping', {})
+        }
+        return _start_sync('expenses', params, current_user, 'Sincronización de gastos iniciada en segundo plano')
         
-        # Start background thread
-        thread = threading.Thread(
-            target=_sync_expenses_background,
-            args=(start_date, end_date, update_existing, category_mapping)
+    except Exception as e:
+        logger.error(f"Error starting expenses sync: {str(e)}")
+        return jsonify({'error': f'Error iniciando sincronización: {str(e)}'}), 500
+
+
+@bp.route('/sync/incremental/<resource>', methods=['POST'])
+@token_required
+@admin_required
+def sync_incremental(current_user, resource):
+    """
+    Sync only what is new since the last incremental sync of the resource
+    (sales or expenses); see FudoSyncService.incremental_params for the window.
+    
+    Body (optional, expenses only):
+        - category_mapping: Dict mapping Fudo category IDs to Galia category IDs.
+          It is stored and reused by later incremental syncs.
+    """
+    if resource not in SyncJob.RESOURCES:
+        return jsonify({'error': 'Recurso inválido. Use sales o expenses'}), 400
+
+    try:
+        data = request.get_json(silent=True) or {}
+        job, created = FudoSyncService.create_incremental_job(
+            resource, current_user.id, data.get('category_mapping')
         )
-        thread.daemon = True
-        thread.start()
-        
+        if not created:
+            return jsonify({
+                'error': 'Ya hay una sincronización en curso para este recurso',
+                'job_id': job.id
+            }), 409
+
+        FudoSyncService.start_job(current_app._get_current_object(), job.id)
         return jsonify({
-            'message': 'Sincronización de gastos iniciada en segundo plano',
+            'message': 'Sincronización incremental iniciada en segundo plano',
             'status': 'processing',
-            'start_date': start_date,
-            'end_date': end_date
+            'job_id': job.id,
+            'start_date': job.params.get('start_date')
         }), 202
-        
+
     except Exception as e:
-        logger.error(f"Error starting expenses sync: {str(e)}")
+        logger.error(f"Error starting incremental {resource} sync: {str(e)}")
         return jsonify({'error': f'Error iniciando sincronización: {str(e)}'}), 500
 
 
+@bp.route('/sync/state', methods=['GET'])
+@token_required
+@admin_required
+def get_sync_state(current_user):
+    """High-water marks of the incremental sync per resource"""
+    states = FudoSyncState.query.order_by(FudoSyncState.resource).all()
+    return jsonify({'state': [state.to_dict() for state in states]}), 200
+
+
+@bp.route('/sync/jobs', methods=['GET'])
+@token_required
+@admin_required
+def list_sync_jobs(current_user):
+    """List the most recent sync jobs (optionally filtered by ?resource=sales|expenses)"""
+    query = SyncJob.query
+    resource = request.args.get('resource')
+    if resource:
+        query = query.filter_by(resource=resource)
+    limit = min(request.args.get('limit', 20, type=int), 100)
+
+    jobs = query.order_by(SyncJob.created_at.desc(), SyncJob.id.desc()).limit(limit).all()
+    return jsonify({'jobs': [job.to_dict() for job in jobs]}), 200
+
+
+@bp.route('/sync/jobs/<int:job_id>', methods=['GET'])
+@token_required
+@admin_required
+def get_sync_job(current_user, job_id):
+    """Get progress and results of a sync job"""
+    job = db.session.get(SyncJob, job_id)
+    if not job:
+        return jsonify({'error': 'Sincronización no encontrada'}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@bp.route('/sync/jobs/<int:job_id>/resume', methods=['POST'])
+@token_required
+@admin_required
+def resume_sync_job(current_user, job_id):
+    """Resume a failed (or stalled) sync job from its last committed page"""
+    job = db.session.get(SyncJob, job_id)
+    if not job:
+        return jsonify({'error': 'Sincronización no encontrada'}), 404
+    if job.status == 'completed':
+        return jsonify({'error': 'La sincronización ya fue completada'}), 400
+    if not FudoSyncService.can_resume(job) or not FudoSyncService.claim_job(job):
+        return jsonify({'error': 'La sincronización sigue en curso'}), 409
+
+    from_page = job.last_committed_page + 1
+    FudoSyncService.start_job(current_app._get_current_object(), job.id)
+    return jsonify({
+        'message': 'Sincronización reanudada',
+        'status': 'processing',
+        'job_id': job_id,
+        'from_page': from_page
+    }), 202
+
+
 @bp.route('/categories', methods=['GET'])
 @token_required
 @admin_required
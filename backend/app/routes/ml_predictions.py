@@ -1,37 +1,67 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from app.extensions import db
 from app.utils.decorators import admin_required
 from app.ml.staffing_predictor import StaffingPredictor
 from app.models.staffing_metrics import StaffingPrediction
+from app.models.ml_training_job import MLTrainingJob
+from app.services.ml_training_service import MLTrainingService
 from datetime import datetime, timedelta
 from sqlalchemy import and_
 from app.utils.jwt_utils import token_required
 
 bp = Blueprint('ml_predictions', __name__, url_prefix='/api/v1/ml')
 
+# Predictions are generated in one batch, so a full quarter fits in a request
+MAX_PREDICTION_DAYS = 92
+
 @bp.route('/train', methods=['POST'])
 @token_required
 @admin_required
 def train_model(current_user):
     """
-    Train the ML model with historical data.
+    Start training the ML model with historical data (runs in background).
     Admin only endpoint.
+    
+    If a training is already in progress its job is returned instead of
+    starting another one. Progress: GET /train/jobs/<job_id>
     """
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     min_weeks = data.get('min_weeks', 8)
+    if not isinstance(min_weeks, int) or min_weeks < 1:
+        return jsonify({'error': 'min_weeks debe ser un entero positivo'}), 400
     
-    predictor = StaffingPredictor()
-    result = predictor.train(min_weeks=min_weeks)
+    job, created = MLTrainingService.create_job({'min_weeks': min_weeks}, current_user.id)
+    if created:
+        MLTrainingService.start_job(current_app._get_current_object(), job.id)
+        db.session.refresh(job)
     
-    if result['success']:
-        return jsonify({
-            'message': 'Modelo entrenado exitosamente',
-            'details': result
-        }), 200
-    else:
-        return jsonify({
-            'error': 'Error al entrenar el modelo',
-            'details': result
-        }), 400
+    return jsonify({
+        'message': 'Entrenamiento iniciado en segundo plano' if created else 'Ya hay un entrenamiento en curso',
+        'job_id': job.id,
+        'created': created,
+        'job': job.to_dict()
+    }), 202
+
+
+@bp.route('/train/jobs', methods=['GET'])
+@token_required
+@admin_required
+def list_training_jobs(current_user):
+    """List the most recent training jobs"""
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    jobs = MLTrainingJob.query.order_by(MLTrainingJob.id.desc()).limit(limit).all()
+    return jsonify({'jobs': [job.to_dict() for job in jobs]}), 200
+
+
+@bp.route('/train/jobs/<int:job_id>', methods=['GET'])
+@token_required
+@admin_required
+def get_training_job(current_user, job_id):
+    """Get status, progress and metrics of a training job"""
+    job = db.session.get(MLTrainingJob, job_id)
+    if not job:
+        return jsonify({'error': 'Entrenamiento no encontrado'}), 404
+    return jsonify(job.to_dict()), 200
 
 @bp.route('/predict', methods=['POST'])
 @token_required
@@ -55,9 +85,9 @@ def generate_predictions(current_user):
     if end_date < start_date:
         return jsonify({'error': 'end_date debe ser mayor o igual a start_date'}), 400
     
-    # Limit to 30 days
-    if (end_date - start_date).days > 30:
-        return jsonify({'error': 'El rango máximo es de 30 días'}), 400
+    # Limit to a quarter
+    if (end_date - start_date).days > MAX_PREDICTION_DAYS:
+        return jsonify({'error': f'El rango máximo es de {MAX_PREDICTION_DAYS} días'}), 400
     
     predictor = StaffingPredictor()
     result = predictor.generate_predictions(start_date, end_date)
@@ -4,6 +4,7 @@ from app.extensions import db
 from app.models.payroll import Payroll
 from app.models.payroll_claim import PayrollClaim
 from app.models.employee import Employee
+from app.models.job_position import JobPosition
 from app.models.time_tracking import TimeTracking
 from app.models.work_block import WorkBlock
 from app.models.shift import Shift
@@ -14,10 +15,12 @@ from app.utils.payroll_utils import (
     calculate_scheduled_hours,
     calculate_hours_by_multiplier,
     calculate_employee_cost,
-    calculate_payroll_with_multipliers
+    calculate_payroll_with_multipliers,
+    get_month_range
 )
+from app.services.payroll_batch_service import PayrollBatchService, MonthSnapshot
 from datetime import datetime, timedelta
-from sqlalchemy import func, extract
+from sqlalchemy import func, extract, and_
 from decimal import Decimal
 import calendar
 import os
@@ -52,7 +55,9 @@ def calculate_payroll(current_user, employee_id, year, month):
     scheduled_hours, scheduled_records = calculate_scheduled_hours(employee_id, month, year)
     
     hourly_rate = float(employee.job_position.hourly_rate)
-    gross_salary = calculate_payroll_with_multipliers(employee_id, month, year, hourly_rate, employee.job_position)
+    gross_salary = calculate_payroll_with_multipliers(
+        employee_id, month, year, hourly_rate, employee.job_position, daily_records=daily_records
+    )
     hours_difference = worked_hours - scheduled_hours
     
     return jsonify({
@@ -98,7 +103,7 @@ def generate_payroll(current_user):
     if not employee.job_position or not employee.job_position.hourly_rate:
         return jsonify({'error': 'El empleado no tiene un puesto con tarifa horaria configurada'}), 400
     
-    worked_hours, _ = calculate_hours_from_time_tracking(employee_id, month, year)
+    worked_hours, daily_records = calculate_hours_from_time_tracking(employee_id, month, year)
     scheduled_hours, _ = calculate_scheduled_hours(employee_id, month, year)
     
     if custom_hourly_rate is not None:
@@ -108,7 +113,9 @@ def generate_payroll(current_user):
     else:
         hourly_rate = float(employee.job_position.hourly_rate)
     
-    gross_salary = calculate_payroll_with_multipliers(employee_id, month, year, hourly_rate, employee.job_position)
+    gross_salary = calculate_payroll_with_multipliers(
+        employee_id, month, year, hourly_rate, employee.job_position, daily_records=daily_records
+    )
     
     payroll = Payroll(
         employee_id=employee_id,
@@ -128,6 +135,53 @@ def generate_payroll(current_user):
     
     return jsonify(payroll.to_dict()), 200
 
+@payroll_bp.route('/generate-batch', methods=['POST'])
+@token_required
+@admin_required
+def generate_payroll_batch(current_user):
+    """
+    Genera las nóminas de un mes para todos los empleados activos con
+    registros horarios (o para los employee_ids indicados) en una sola llamada.
+    """
+    data = request.get_json() or {}
+    month = data.get('month')
+    year = data.get('year')
+    employee_ids = data.get('employee_ids')
+    notes = data.get('notes', '')
+
+    if not all([month, year]):
+        return jsonify({'error': 'Faltan datos requeridos'}), 400
+
+    try:
+        month = int(month)
+        year = int(year)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Mes y año deben ser números'}), 400
+
+    if month < 1 or month > 12:
+        return jsonify({'error': 'Mes inválido'}), 400
+
+    if employee_ids is not None and (
+        not isinstance(employee_ids, list) or not all(isinstance(i, int) for i in employee_ids)
+    ):
+        return jsonify({'error': 'employee_ids debe ser una lista de IDs'}), 400
+
+    result = PayrollBatchService.generate_month(
+        year, month, current_user.id, employee_ids=employee_ids, notes=notes
+    )
+
+    if not result['success']:
+        return jsonify({'error': result['error']}), 409
+
+    return jsonify({
+        'month': month,
+        'year': year,
+        'created': result['created'],
+        'skipped': result['skipped'],
+        'total_created': len(result['created']),
+        'total_skipped': len(result['skipped'])
+    }), 201 if result['created'] else 200
+
 @payroll_bp.route('/<int:payroll_id>', methods=['DELETE'])
 @token_required
 @admin_required
@@ -234,7 +288,7 @@ def update_payroll(current_user, payroll_id):
         payroll.extraordinary_description = data['extraordinary_description']
     
     if 'recalculate' in data and data['recalculate']:
-        worked_hours, _ = calculate_hours_from_time_tracking(
+        worked_hours, daily_records = calculate_hours_from_time_tracking(
             payroll.employee_id, payroll.month, payroll.year
         )
         scheduled_hours, _ = calculate_scheduled_hours(
@@ -243,7 +297,8 @@ def update_payroll(current_user, payroll_id):
         
         base_salary = calculate_payroll_with_multipliers(
             payroll.employee_id, payroll.month, payroll.year, 
-            float(payroll.hourly_rate), payroll.employee.job_position
+            float(payroll.hourly_rate), payroll.employee.job_position,
+            daily_records=daily_records
         )
         
         extraordinary_amount = float(payroll.extraordinary_amount) if payroll.extraordinary_amount else 0
@@ -351,52 +406,61 @@ def get_employees_payroll_status(current_user, year, month):
     mostrando si tienen nómina generada y su estado
     """
     
-    start_date = datetime(year, month, 1).date()
-    if month == 12:
-        end_date = datetime(year + 1, 1, 1).date()
-    else:
-        end_date = datetime(year, month + 1, 1).date()
+    start_date, end_date = get_month_range(month, year)
+    
+    has_time_records = db.session.query(TimeTracking.id).filter(
+        TimeTracking.employee_id == Employee.id,
+        TimeTracking.tracking_date >= start_date,
+        TimeTracking.tracking_date < end_date
+    ).exists()
+    
+    # Empleados activos con horas registradas, con su puesto y nómina del período
+    rows = db.session.query(
+        Employee.id,
+        Employee.first_name,
+        Employee.last_name,
+        Employee.dni,
+        JobPosition.name,
+        Payroll.id,
+        Payroll.status,
+        Payroll.validated_at,
+        Payroll.gross_salary,
+        Payroll.pdf_generated
+    ).outerjoin(
+        JobPosition, JobPosition.id == Employee.current_job_position_id
+    ).outerjoin(
+        Payroll, and_(
+            Payroll.employee_id == Employee.id,
+            Payroll.month == month,
+            Payroll.year == year
+        )
+    ).filter(
+        Employee.status == 'activo',
+        has_time_records
+    ).all()
     
-    # Obtener empleados activos
-    active_employees = Employee.query.filter_by(status='activo').all()
+    # Horas trabajadas (incluye ausencias aprobadas) con un número fijo de consultas
+    snapshot = MonthSnapshot(year, month, [row[0] for row in rows])
     
     employees_status = []
     
-    for employee in active_employees:
-        # Verificar si tiene horas registradas en el período
-        time_records = TimeTracking.query.filter(
-            TimeTracking.employee_id == employee.id,
-            TimeTracking.tracking_date >= start_date,
-            TimeTracking.tracking_date < end_date
-        ).first()
+    for (employee_id, first_name, last_name, dni, job_position_name,
+         payroll_id, payroll_status, validated_at, gross_salary, pdf_generated) in rows:
+        worked_hours, _ = snapshot.worked_hours(employee_id)
         
-        # Solo incluir empleados con horas registradas
-        if time_records:
-            # Buscar nómina existente
-            payroll = Payroll.query.filter_by(
-                employee_id=employee.id,
-                month=month,
-                year=year
-            ).first()
-            
-            # Calcular horas trabajadas
-            worked_hours, _ = calculate_hours_from_time_tracking(employee.id, month, year)
-            
-            employee_data = {
-                'employee_id': employee.id,
-                'employee_name': employee.full_name,
-                'dni': employee.dni,
-                'job_position': employee.job_position.name if employee.job_position else None,
-                'hours_worked': worked_hours,
-                'has_payroll': payroll is not None,
-                'payroll_id': payroll.id if payroll else None,
-                'payroll_status': payroll.status if payroll else None,
-                'payroll_validated_at': payroll.validated_at.isoformat() if payroll and payroll.validated_at else None,
-                'gross_salary': float(payroll.gross_salary) if payroll else None,
-                'pdf_generated': payroll.pdf_generated if payroll else False
-            }
-            
-            employees_status.append(employee_data)
+        employees_status.append({
+            'employee_id': employee_id,
+            'employee_name': f"{first_name} {last_name}",
+            'dni': dni,
+            'job_position': job_position_name,
+            'hours_worked': worked_hours,
+            'has_payroll': payroll_id is not None,
+            'payroll_id': payroll_id,
+            'payroll_status': payroll_status,
+            'payroll_validated_at': validated_at.isoformat() if validated_at else None,
+            'gross_salary': float(gross_salary) if payroll_id is not None else None,
+            'pdf_generated': pdf_generated if payroll_id is not None else False
+        })
     
     # Ordenar por nombre
     employees_status.sort(key=lambda x: x['employee_name'])
@@ -970,27 +1034,19 @@ def _get_semester_range(year, semester):
     return 7, 12
 
 
-def _calculate_aguinaldo_for_employee(employee_id, year, semester):
-    """
-    Return a dict with the aguinaldo calculation for one employee.
-    Looks at validated payrolls within the semester and picks the best gross_salary.
-    Aguinaldo = 50% of best gross_salary.
-    Returns None if no validated payrolls found.
-    """
+def _best_gross_salary_query(year, semester):
+    """Query of validated payrolls within the semester (max gross_salary is selected by callers)."""
     start_month, end_month = _get_semester_range(year, semester)
-
-    best = (
-        db.session.query(func.max(Payroll.gross_salary))
-        .filter(
-            Payroll.employee_id == employee_id,
-            Payroll.year == year,
-            Payroll.month >= start_month,
-            Payroll.month <= end_month,
-            Payroll.status.in_(['validated', 'employee_validated']),
-        )
-        .scalar()
+    return db.session.query(func.max(Payroll.gross_salary)).filter(
+        Payroll.year == year,
+        Payroll.month >= start_month,
+        Payroll.month <= end_month,
+        Payroll.status.in_(['validated', 'employee_validated']),
     )
 
+
+def _aguinaldo_from_best(best, year, semester):
+    """Build the aguinaldo dict from the best gross_salary of the semester (None if there is none)."""
     if best is None:
         return None
 
@@ -1004,6 +1060,17 @@ def _calculate_aguinaldo_for_employee(employee_id, year, semester):
     }
 
 
+def _calculate_aguinaldo_for_employee(employee_id, year, semester):
+    """
+    Return a dict with the aguinaldo calculation for one employee.
+    Looks at validated payrolls within the semester and picks the best gross_salary.
+    Aguinaldo = 50% of best gross_salary.
+    Returns None if no validated payrolls found.
+    """
+    best = _best_gross_salary_query(year, semester).filter(Payroll.employee_id == employee_id).scalar()
+    return _aguinaldo_from_best(best, year, semester)
+
+
 @payroll_bp.route('/aguinaldo/preview', methods=['GET'])
 @token_required
 @admin_required
@@ -1019,27 +1086,46 @@ def aguinaldo_preview(current_user):
     if semester not in (1, 2):
         return jsonify({'error': 'El semestre debe ser 1 o 2'}), 400
 
-    employees = Employee.query.filter_by(status='activo').all()
+    # Mejor sueldo del semestre y SAC ya generado de todas las empleadas en una sola consulta
+    best_salaries = (
+        _best_gross_salary_query(year, semester)
+        .add_columns(Payroll.employee_id)
+        .group_by(Payroll.employee_id)
+        .subquery()
+    )
+    best_column = best_salaries.c[0]
+    sac_month = 13 if semester == 1 else 14
+    rows = (
+        db.session.query(Employee.id, Employee.first_name, Employee.last_name, best_column, Payroll.id)
+        .outerjoin(best_salaries, best_salaries.c.employee_id == Employee.id)
+        .outerjoin(Payroll, and_(
+            Payroll.employee_id == Employee.id,
+            Payroll.month == sac_month,
+            Payroll.year == year
+        ))
+        .filter(Employee.status == 'activo')
+        .order_by(Employee.id, Payroll.id)
+        .all()
+    )
 
     results = []
-    for emp in employees:
-        calc = _calculate_aguinaldo_for_employee(emp.id, year, semester)
-
-        # Check if already generated
-        sac_month = 13 if semester == 1 else 14
-        existing = Payroll.query.filter_by(
-            employee_id=emp.id, month=sac_month, year=year
-        ).first()
+    seen = set()
+    for employee_id, first_name, last_name, best, existing_payroll_id in rows:
+        # Si hubiera más de un SAC para el período se informa el primero, como antes
+        if employee_id in seen:
+            continue
+        seen.add(employee_id)
+        calc = _aguinaldo_from_best(best, year, semester)
 
         results.append({
-            'employee_id': emp.id,
-            'employee_name': emp.full_name,
+            'employee_id': employee_id,
+            'employee_name': f"{first_name} {last_name}",
             'best_gross_salary': calc['best_gross_salary'] if calc else None,
             'aguinaldo_amount': calc['aguinaldo_amount'] if calc else None,
             'period': calc['period'] if calc else None,
             'has_payrolls': calc is not None,
-            'already_generated': existing is not None,
-            'existing_payroll_id': existing.id if existing else None,
+            'already_generated': existing_payroll_id is not None,
+            'existing_payroll_id': existing_payroll_id,
         })
 
     return jsonify({
@@ -0,0 +1,40 @@
+from flask import Blueprint, jsonify, current_app
+from app.utils.jwt_utils import token_required
+from app.utils.decorators import admin_required
+from app.utils.request_profiler import request_profiler
+
+bp = Blueprint('perf_stats', __name__, url_prefix='/api/v1/admin/perf')
+
+
+@bp.route('', methods=['GET'])
+@token_required
+@admin_required
+def get_perf_stats(current_user):
+    """
+    Latency and query count percentiles per route (this process only)
+
+    Routes are sorted by p95 latency, slowest first.
+    """
+    stats = request_profiler.stats()
+    if stats is None:
+        return jsonify({'error': 'El profiler de requests está desactivado'}), 404
+
+    return jsonify({
+        'window': stats.window,
+        'slow_request_ms': current_app.config['SLOW_REQUEST_MS'],
+        'slow_request_queries': current_app.config['SLOW_REQUEST_QUERIES'],
+        'routes': stats.snapshot()
+    }), 200
+
+
+@bp.route('', methods=['DELETE'])
+@token_required
+@admin_required
+def reset_perf_stats(current_user):
+    """Discard the collected samples"""
+    stats = request_profiler.stats()
+    if stats is None:
+        return jsonify({'error': 'El profiler de requests está desactivado'}), 404
+
+    stats.reset()
+    return jsonify({'message': 'Estadísticas reiniciadas'}), 200
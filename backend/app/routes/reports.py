@@ -1,16 +1,18 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from sqlalchemy import func, and_, or_, extract, cast, text
-from sqlalchemy import Date as SQLDate
+import numpy as np
+from sqlalchemy import func, extract
 from app.utils.decorators import admin_required
 from app.utils.jwt_utils import token_required
 from app.extensions import db
 from app.models.sale import Sale
+from app.models.sales_rollup import SalesDailyRollup, SalesHourlyRollup
 from app.models.expense import Expense, ExpenseCategory
-from app.models.payroll import Payroll
-from app.models.shift import Shift
 from app.models.report_goal import ReportGoal, DashboardSnapshot
+from app.services.dashboard_metrics_service import DashboardMetricsService
+from app.services.labor_distribution_service import LaborDistribution
+from app.utils.report_cache import report_cache
 
 bp = Blueprint('reports', __name__, url_prefix='/api/v1/reports')
 
@@ -94,17 +96,24 @@ def get_dashboard(current_user):
     prev_end_date = start_date - timedelta(days=1)
     prev_start_date = prev_end_date - timedelta(days=period_length - 1)
     
-    # Métricas de ventas
-    sales_data = get_sales_metrics(start_date, end_date)
-    prev_sales_data = get_sales_metrics(prev_start_date, prev_end_date)
-    
-    # Métricas de gastos
-    expenses_data = get_expenses_metrics(start_date, end_date)
-    prev_expenses_data = get_expenses_metrics(prev_start_date, prev_end_date)
-    
-    # Métricas de sueldos/payroll
-    payroll_data = get_payroll_metrics(start_date, end_date)
-    prev_payroll_data = get_payroll_metrics(prev_start_date, prev_end_date)
+    payload = report_cache.get_or_compute(
+        'dashboard', start_date, end_date,
+        lambda: _build_dashboard(period_type, start_date, end_date, prev_start_date, prev_end_date),
+        filters={'period': period_type},
+        depends_on=(prev_start_date, end_date)
+    )
+    return jsonify(payload), 200
+
+
+def _build_dashboard(period_type, start_date, end_date, prev_start_date, prev_end_date):
+    """Arma la respuesta del dashboard (cacheada por get_dashboard)"""
+    # Ventas, gastos y sueldos de ambos períodos: una consulta por tabla
+    metrics = DashboardMetricsService.period_comparison(
+        start_date, end_date, prev_start_date, prev_end_date
+    )
+    sales_data, prev_sales_data = metrics['sales'], metrics['prev_sales']
+    expenses_data, prev_expenses_data = metrics['expenses'], metrics['prev_expenses']
+    payroll_data, prev_payroll_data = metrics['payroll'], metrics['prev_payroll']
     
     # Calcular rentabilidad
     total_ingresos = sales_data['total']
@@ -130,7 +139,7 @@ def get_dashboard(current_user):
     # Obtener metas activas
     goals = get_goals_progress(sales_data, expenses_data, payroll_data, total_ingresos)
     
-    return jsonify({
+    return {
         'period': {
             'type': period_type,
             'start_date': start_date.isoformat(),
@@ -167,117 +176,22 @@ def get_dashboard(current_user):
         ),
         'goals': goals,
         'apalancamiento': apalancamiento
-    }), 200
+    }
 
 
 def get_sales_metrics(start_date, end_date):
-    """Calcular métricas de ventas para un período"""
-    result = db.session.query(
-        func.coalesce(func.sum(Sale.total), 0).label('total'),
-        func.count(Sale.id).label('count')
-    ).filter(
-        Sale.fecha >= start_date,
-        Sale.fecha <= end_date,
-        Sale.estado == 'Cerrada'
-    ).first()
-    
-    total = float(result.total) if result.total else 0
-    count = result.count or 0
-    
-    return {
-        'total': total,
-        'count': count,
-        'ticket_promedio': round(total / count, 2) if count > 0 else 0
-    }
+    """Calcular métricas de ventas para un período (desde el agregado diario)"""
+    return DashboardMetricsService.sales_metrics([(start_date, end_date)])[0]
 
 
 def get_expenses_metrics(start_date, end_date):
-    """Calcular métricas de gastos para un período"""
-    # Total de gastos
-    total_result = db.session.query(
-        func.coalesce(func.sum(Expense.importe), 0)
-    ).filter(
-        Expense.fecha >= start_date,
-        Expense.fecha <= end_date,
-        Expense.cancelado == False
-    ).scalar()
-    
-    total = float(total_result) if total_result else 0
-    
-    # Gastos por tipo (directo/indirecto) - basado en expense_type de la categoría
-    from app.models.expense import ExpenseCategory
-    
-    directos_result = db.session.query(
-        func.coalesce(func.sum(Expense.importe), 0)
-    ).outerjoin(ExpenseCategory, Expense.category_id == ExpenseCategory.id).filter(
-        Expense.fecha >= start_date,
-        Expense.fecha <= end_date,
-        Expense.cancelado == False,
-        ExpenseCategory.expense_type == 'directo'
-    ).scalar()
-    
-    # Indirectos incluye gastos con expense_type='indirecto' O sin categoría (NULL)
-    indirectos_result = db.session.query(
-        func.coalesce(func.sum(Expense.importe), 0)
-    ).outerjoin(ExpenseCategory, Expense.category_id == ExpenseCategory.id).filter(
-        Expense.fecha >= start_date,
-        Expense.fecha <= end_date,
-        Expense.cancelado == False,
-        or_(ExpenseCategory.expense_type == 'indirecto', Expense.category_id.is_(None))
-    ).scalar()
-    
-    directos = float(directos_result) if directos_result else 0
-    indirectos = float(indirectos_result) if indirectos_result else 0
-    
-    return {
-        'total': total,
-        'directos': directos,
-        'indirectos': indirectos
-    }
+    """Calcular métricas de gastos para un período (total, directos e indirectos en una consulta)"""
+    return DashboardMetricsService.expenses_metrics([(start_date, end_date)])[0]
 
 
 def get_payroll_metrics(start_date, end_date):
-    """Calcular métricas de sueldos/payroll para un período"""
-    start_month = start_date.month
-    start_year = start_date.year
-    end_month = end_date.month
-    end_year = end_date.year
-
-    # Nóminas regulares (meses 1-12) filtradas por rango año/mes
-    regular_payrolls = Payroll.query.filter(
-        Payroll.month <= 12,
-        or_(
-            and_(Payroll.year == start_year, Payroll.month >= start_month),
-            Payroll.year > start_year
-        ),
-        or_(
-            and_(Payroll.year == end_year, Payroll.month <= end_month),
-            Payroll.year < end_year
-        )
-    ).all()
-
-    # SAC1 (mes 13) se paga en junio, SAC2 (mes 14) en diciembre.
-    # Solo se incluye si el mes de pago cae dentro del rango consultado.
-    from datetime import date as _date
-    sac_conditions = []
-    for year in range(start_year, end_year + 1):
-        if _date(year, 6, 1) >= start_date.replace(day=1) and _date(year, 6, 1) <= end_date.replace(day=1):
-            sac_conditions.append(and_(Payroll.year == year, Payroll.month == 13))
-        if _date(year, 12, 1) >= start_date.replace(day=1) and _date(year, 12, 1) <= end_date.replace(day=1):
-            sac_conditions.append(and_(Payroll.year == year, Payroll.month == 14))
-
-    sac_payrolls = Payroll.query.filter(or_(*sac_conditions)).all() if sac_conditions else []
-
-    payrolls = regular_payrolls + sac_payrolls
-
-    # gross_salary + extraordinary_amount cubre tanto sueldos normales como aguinaldos
-    total = sum(float(p.gross_salary) + float(p.extraordinary_amount or 0) for p in payrolls)
-    horas = sum(float(p.hours_worked) for p in payrolls)
-
-    return {
-        'total': total,
-        'horas': horas
-    }
+    """Calcular métricas de sueldos/payroll para un período (sumado en SQL, incluye SAC)"""
+    return DashboardMetricsService.payroll_metrics([(start_date, end_date)])[0]
 
 
 def calculate_break_even_point(ventas, costos_directos, costos_indirectos, sueldos):
@@ -694,14 +608,13 @@ def sales_evolution(current_user):
         end_date = date.today()
     
     result = db.session.query(
-        Sale.fecha,
-        func.sum(Sale.total).label('total'),
-        func.count(Sale.id).label('count')
+        SalesDailyRollup.fecha,
+        func.sum(SalesDailyRollup.total).label('total'),
+        func.sum(SalesDailyRollup.cantidad).label('count')
     ).filter(
-        Sale.fecha >= start_date,
-        Sale.fecha <= end_date,
-        Sale.estado == 'Cerrada'
-    ).group_by(Sale.fecha).order_by(Sale.fecha).all()
+        SalesDailyRollup.fecha >= start_date,
+        SalesDailyRollup.fecha <= end_date
+    ).group_by(SalesDailyRollup.fecha).order_by(SalesDailyRollup.fecha).all()
     
     return jsonify({
         'period': {
@@ -850,6 +763,15 @@ def balance_report(current_user):
     if not end_date:
         end_date = date.today()
     
+    payload = report_cache.get_or_compute(
+        'balance', start_date, end_date,
+        lambda: _build_balance(start_date, end_date)
+    )
+    return jsonify(payload), 200
+
+
+def _build_balance(start_date, end_date):
+    """Arma la respuesta del balance (cacheada por balance_report)"""
     # Ingresos (ventas)
     sales_data = get_sales_metrics(start_date, end_date)
     
@@ -869,7 +791,7 @@ def balance_report(current_user):
     
     margen_neto_pct = (resultado_neto / total_ingresos * 100) if total_ingresos > 0 else 0
     
-    return jsonify({
+    return {
         'period': {
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat()
@@ -895,7 +817,7 @@ def balance_report(current_user):
             'gastos_indirectos_sobre_ventas': round(expenses_data['indirectos'] / total_ingresos * 100, 1) if total_ingresos > 0 else 0,
             'costo_laboral_sobre_ventas': round(payroll_data['total'] / total_ingresos * 100, 1) if total_ingresos > 0 else 0
         }
-    }), 200
+    }
 
 
 # ==================== PRODUCTIVIDAD ====================
@@ -913,6 +835,15 @@ def productivity_report(current_user):
     if not end_date:
         end_date = date.today()
     
+    payload = report_cache.get_or_compute(
+        'productivity', start_date, end_date,
+        lambda: _build_productivity(start_date, end_date)
+    )
+    return jsonify(payload), 200
+
+
+def _build_productivity(start_date, end_date):
+    """Arma la respuesta de productividad (cacheada por productivity_report)"""
     # Ventas
     sales_data = get_sales_metrics(start_date, end_date)
     
@@ -927,7 +858,7 @@ def productivity_report(current_user):
     goal = ReportGoal.get_goal_by_type('productividad')
     meta_productividad = float(goal.target_value) if goal else 0
     
-    return jsonify({
+    return {
         'period': {
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat()
@@ -939,7 +870,7 @@ def productivity_report(current_user):
         'costo_laboral_porcentaje': round(costo_laboral_pct, 1),
         'meta_productividad': meta_productividad,
         'cumple_meta': ventas_por_hora >= meta_productividad if meta_productividad > 0 else None
-    }), 200
+    }
 
 
 # ==================== CATEGORÍAS DE GASTOS ====================
@@ -1042,31 +973,25 @@ DOW_NAMES = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'D
 
 
 def get_sales_by_weekday(start_date, end_date):
-    """Ventas agrupadas por día de semana (0=lunes … 6=domingo)."""
-    import sqlalchemy
-
+    """Ventas agrupadas por día de semana (0=lunes … 6=domingo), según el cierre en hora local."""
     days_in_range = _days_in_range_by_dow(start_date, end_date)
 
-    local_cerrada = Sale.cerrada + text("INTERVAL '-3 hours'")
-    dow_expr = func.extract('dow', local_cerrada)
+    # El agregado horario ya está en fecha local: se agrupa por fecha y el día
+    # de semana se resuelve en Python (portable entre SQLite y PostgreSQL)
     rows = db.session.query(
-        dow_expr.label('dow_pg'),
-        func.sum(Sale.total).label('sum_ventas'),
-        func.count(Sale.id).label('count_ventas')
+        SalesHourlyRollup.fecha,
+        func.sum(SalesHourlyRollup.total).label('sum_ventas'),
+        func.sum(SalesHourlyRollup.cantidad).label('count_ventas')
     ).filter(
-        cast(local_cerrada, SQLDate) >= start_date,
-        cast(local_cerrada, SQLDate) <= end_date,
-        Sale.estado == 'Cerrada',
-        Sale.cerrada.isnot(None)
-    ).group_by(dow_expr).all()
+        SalesHourlyRollup.fecha >= start_date,
+        SalesHourlyRollup.fecha <= end_date
+    ).group_by(SalesHourlyRollup.fecha).all()
 
-    # Convert DOW: extract('dow') returns 0=Sunday in both SQLite and PostgreSQL
-    # Convert to Python convention: 0=Monday
     by_dow = {i: {'sum_ventas': 0.0, 'count_ventas': 0} for i in range(7)}
     for row in rows:
-        py_dow = (int(row.dow_pg) - 1) % 7  # 0(Sun)->6, 1(Mon)->0, ..., 6(Sat)->5
-        by_dow[py_dow]['sum_ventas'] = float(row.sum_ventas or 0)
-        by_dow[py_dow]['count_ventas'] = row.count_ventas or 0
+        dow = row.fecha.weekday()
+        by_dow[dow]['sum_ventas'] += float(row.sum_ventas or 0)
+        by_dow[dow]['count_ventas'] += int(row.count_ventas or 0)
 
     output = []
     for dow in range(7):
@@ -1085,23 +1010,19 @@ def get_sales_by_weekday(start_date, end_date):
 
 def get_sales_by_hour(start_date, end_date):
     """Ventas agrupadas por hora del día (0–23), en hora local Argentina (UTC-3)."""
-    local_cerrada = Sale.cerrada + text("INTERVAL '-3 hours'")
-    hour_expr = func.extract('hour', local_cerrada)
     rows = db.session.query(
-        hour_expr.label('hora'),
-        func.sum(Sale.total).label('sum_ventas'),
-        func.count(Sale.id).label('count_ventas')
+        SalesHourlyRollup.hora,
+        func.sum(SalesHourlyRollup.total).label('sum_ventas'),
+        func.sum(SalesHourlyRollup.cantidad).label('count_ventas')
     ).filter(
-        cast(local_cerrada, SQLDate) >= start_date,
-        cast(local_cerrada, SQLDate) <= end_date,
-        Sale.estado == 'Cerrada',
-        Sale.cerrada.isnot(None)
-    ).group_by(hour_expr).order_by(hour_expr).all()
+        SalesHourlyRollup.fecha >= start_date,
+        SalesHourlyRollup.fecha <= end_date
+    ).group_by(SalesHourlyRollup.hora).order_by(SalesHourlyRollup.hora).all()
 
     output = []
     for row in rows:
         sum_v = float(row.sum_ventas or 0)
-        count_v = row.count_ventas or 0
+        count_v = int(row.count_ventas or 0)
         output.append({
             'hora': int(row.hora),
             'sum_ventas': round(sum_v, 2),
@@ -1118,8 +1039,8 @@ def _build_labor_lookups(start_date, end_date):
     - holiday_dates: set de fechas que son feriados en el período
     Usa JobPosition.hourly_rate (igual que el resto de la app: time_tracking, payroll).
     """
-    from app.models.ml_tracking import Holiday
     from app.models.employee import Employee
+    from app.utils.holiday_calendar import holiday_calendar
 
     employees = Employee.query.options(
         db.joinedload(Employee.job_position)
@@ -1132,11 +1053,7 @@ def _build_labor_lookups(start_date, end_date):
         holiday_mult = float(jp.holiday_rate_multiplier) if jp and jp.holiday_rate_multiplier else 1.0
         employee_rates[emp.id] = (base_rate, sunday_mult, holiday_mult)
 
-    holidays = Holiday.query.filter(
-        Holiday.date >= start_date,
-        Holiday.date <= end_date
-    ).all()
-    holiday_dates = {h.date for h in holidays}
+    holiday_dates = set(holiday_calendar.holidays_between(start_date, end_date))
 
     return employee_rates, holiday_dates
 
@@ -1158,65 +1075,49 @@ def _shift_effective_rate(shift, employee_rates, holiday_dates):
     return base_rate
 
 
-def get_labor_by_weekday(start_date, end_date, employee_rates, holiday_dates):
+def get_labor_by_weekday(start_date, end_date, employee_rates, holiday_dates, distribution=None):
     """Costo laboral por día de semana (0=lunes … 6=domingo), con tarifa real por turno."""
     days_in_range = _days_in_range_by_dow(start_date, end_date)
 
-    shifts = Shift.query.filter(
-        Shift.shift_date >= start_date,
-        Shift.shift_date <= end_date
-    ).all()
-
-    by_dow = {i: {'sum_horas': 0.0, 'sum_costo': 0.0} for i in range(7)}
-    for shift in shifts:
-        dow = shift.shift_date.weekday()
-        horas = float(shift.hours)
-        rate = _shift_effective_rate(shift, employee_rates, holiday_dates)
-        by_dow[dow]['sum_horas'] += horas
-        by_dow[dow]['sum_costo'] += horas * rate
+    if distribution is None:
+        distribution = LaborDistribution(start_date, end_date, employee_rates, holiday_dates)
+    horas, costos = distribution.by_weekday()
 
     output = []
     for dow in range(7):
         dias = days_in_range[dow]
+        sum_horas = float(horas[dow])
+        sum_costo = float(costos[dow])
         output.append({
             'dow': dow,
             'nombre': DOW_NAMES[dow],
-            'sum_horas': round(by_dow[dow]['sum_horas'], 2),
-            'sum_costo': round(by_dow[dow]['sum_costo'], 2),
-            'promedio_horas': round(by_dow[dow]['sum_horas'] / dias, 2) if dias > 0 else 0,
-            'promedio_costo': round(by_dow[dow]['sum_costo'] / dias, 2) if dias > 0 else 0,
+            'sum_horas': round(sum_horas, 2),
+            'sum_costo': round(sum_costo, 2),
+            'promedio_horas': round(sum_horas / dias, 2) if dias > 0 else 0,
+            'promedio_costo': round(sum_costo / dias, 2) if dias > 0 else 0,
             'dias_en_rango': dias
         })
     return output
 
 
-def get_labor_by_hour(start_date, end_date, employee_rates, holiday_dates):
+def get_labor_by_hour(start_date, end_date, employee_rates, holiday_dates, distribution=None):
     """Costo laboral por franja horaria, con tarifa real por turno (incluye multiplicador dom/feriado)."""
     total_dias = (end_date - start_date).days + 1
 
-    shifts = Shift.query.filter(
-        Shift.shift_date >= start_date,
-        Shift.shift_date <= end_date
-    ).all()
-
-    by_hour = {}
-    for shift in shifts:
-        rate = _shift_effective_rate(shift, employee_rates, holiday_dates)
-        slots = distribute_shift_hours(shift.start_time, shift.end_time)
-        for hora, fraccion in slots.items():
-            if hora not in by_hour:
-                by_hour[hora] = {'sum_horas': 0.0, 'sum_costo': 0.0}
-            by_hour[hora]['sum_horas'] += fraccion
-            by_hour[hora]['sum_costo'] += fraccion * rate
+    if distribution is None:
+        distribution = LaborDistribution(start_date, end_date, employee_rates, holiday_dates)
+    horas, costos, cubiertas = distribution.by_hour()
 
     output = []
-    for hora in sorted(by_hour.keys()):
+    for hora in np.flatnonzero(cubiertas):
+        sum_horas = float(horas[hora])
+        sum_costo = float(costos[hora])
         output.append({
-            'hora': hora,
-            'sum_horas': round(by_hour[hora]['sum_horas'], 2),
-            'sum_costo': round(by_hour[hora]['sum_costo'], 2),
-            'promedio_horas': round(by_hour[hora]['sum_horas'] / total_dias, 2),
-            'promedio_costo': round(by_hour[hora]['sum_costo'] / total_dias, 2)
+            'hora': int(hora),
+            'sum_horas': round(sum_horas, 2),
+            'sum_costo': round(sum_costo, 2),
+            'promedio_horas': round(sum_horas / total_dias, 2),
+            'promedio_costo': round(sum_costo / total_dias, 2)
         })
     return output
 
@@ -1234,12 +1135,24 @@ def time_analysis(current_user):
     if not end_date:
         end_date = date.today()
 
+    payload = report_cache.get_or_compute(
+        'time-analysis', start_date, end_date,
+        lambda: _build_time_analysis(start_date, end_date)
+    )
+    return jsonify(payload), 200
+
+
+def _build_time_analysis(start_date, end_date):
+    """Arma la respuesta del análisis horario (cacheada por time_analysis)"""
     employee_rates, holiday_dates = _build_labor_lookups(start_date, end_date)
 
+    # Los turnos se cargan una sola vez para ambas distribuciones
+    distribution = LaborDistribution(start_date, end_date, employee_rates, holiday_dates)
+
     sales_wd = get_sales_by_weekday(start_date, end_date)
     sales_hr = get_sales_by_hour(start_date, end_date)
-    labor_wd = get_labor_by_weekday(start_date, end_date, employee_rates, holiday_dates)
-    labor_hr = get_labor_by_hour(start_date, end_date, employee_rates, holiday_dates)
+    labor_wd = get_labor_by_weekday(start_date, end_date, employee_rates, holiday_dates, distribution)
+    labor_hr = get_labor_by_hour(start_date, end_date, employee_rates, holiday_dates, distribution)
 
     # Tasa efectiva promedio para mostrar en el header (costo total / horas totales)
     total_costo = sum(row['sum_costo'] for row in labor_wd)
@@ -1258,7 +1171,7 @@ def time_analysis(current_user):
             'ratio': round(costo / ventas, 4) if ventas > 0 else None
         })
 
-    return jsonify({
+    return {
         'period': {
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat()
@@ -1273,4 +1186,4 @@ def time_analysis(current_user):
             'ventas': sales_hr,
             'labor': labor_hr
         }
-    }), 200
+    }
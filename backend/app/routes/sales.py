@@ -1,8 +1,10 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify
 from app.extensions import db
 from app.models.sale import Sale
 from app.utils.jwt_utils import token_required
 from app.utils.decorators import admin_required
+from app.utils.csv_export import stream_csv_response
+from app.services.sales_import_service import SalesImportService
 from datetime import datetime, date, timedelta
 from sqlalchemy import func, extract
 import csv
@@ -260,50 +262,11 @@ def import_sales(current_user):
         return jsonify({'error': 'El archivo debe ser un CSV'}), 400
     
     try:
-        stream = io.StringIO(file.stream.read().decode('utf-8-sig'))
+        stream = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
         reader = csv.DictReader(stream)
         
-        results = {
-            'total_rows': 0,
-            'imported': 0,
-            'updated': 0,
-            'skipped': 0,
-            'errors': []
-        }
-        
-        for row_num, row in enumerate(reader, start=2):
-            results['total_rows'] += 1
-            
-            try:
-                external_id = row.get('Id', '').strip()
-                
-                if external_id:
-                    existing = Sale.query.filter_by(external_id=int(external_id)).first()
-                    if existing:
-                        results['skipped'] += 1
-                        continue
-                
-                sale = Sale.from_csv_row(row)
-                
-                if not sale.fecha:
-                    results['errors'].append({
-                        'row': row_num,
-                        'data': dict(row),
-                        'errors': ['La fecha es requerida o tiene formato inválido']
-                    })
-                    continue
-                
-                db.session.add(sale)
-                results['imported'] += 1
-                
-            except Exception as e:
-                results['errors'].append({
-                    'row': row_num,
-                    'data': dict(row),
-                    'errors': [str(e)]
-                })
-        
-        db.session.commit()
+        # Prefetch de ids existentes e inserción en bloque por cada lote de filas
+        results = SalesImportService.import_rows(reader)
         
         return jsonify({
             'message': f"Importación completada: {results['imported']} registros importados",
@@ -323,7 +286,13 @@ def export_sales(current_user):
     fecha_desde = request.args.get('fecha_desde')
     fecha_hasta = request.args.get('fecha_hasta')
     
-    query = Sale.query
+    # Sólo las columnas exportadas, sin hidratar objetos Sale
+    query = db.session.query(
+        Sale.id, Sale.external_id, Sale.fecha, Sale.creacion, Sale.cerrada, Sale.caja,
+        Sale.estado, Sale.cliente, Sale.mesa, Sale.sala, Sale.personas, Sale.camarero,
+        Sale.medio_pago, Sale.total, Sale.fiscal, Sale.tipo_venta, Sale.comentario,
+        Sale.origen, Sale.id_origen
+    )
     
     if fecha_desde:
         try:
@@ -339,19 +308,16 @@ def export_sales(current_user):
         except ValueError:
             return jsonify({'error': 'Formato de fecha_hasta inválido. Use YYYY-MM-DD'}), 400
     
-    sales = query.order_by(Sale.fecha.desc(), Sale.creacion.desc()).all()
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
+    query = query.order_by(Sale.fecha.desc(), Sale.creacion.desc())
     
-    writer.writerow([
+    header = [
         'Id', 'Fecha', 'Creación', 'Cerrada', 'Caja', 'Estado', 'Cliente',
         'Mesa', 'Sala', 'Personas', 'Camarero / Repartidor', 'Medio de Pago',
         'Total', 'Fiscal', 'Tipo de Venta', 'Comentario', 'Origen', 'Id. Origen'
-    ])
+    ]
     
-    for sale in sales:
-        writer.writerow([
+    def format_row(sale):
+        return [
             sale.external_id or sale.id,
             sale.fecha.strftime('%d/%m/%Y') if sale.fecha else '',
             sale.creacion.strftime('%d/%m/%Y %H:%M:%S') if sale.creacion else '',
@@ -370,15 +336,9 @@ def export_sales(current_user):
             sale.comentario or '',
             sale.origen or '',
             sale.id_origen or ''
-        ])
+        ]
     
-    output.seek(0)
-    
-    return Response(
-        output.getvalue(),
-        mimetype='text/csv',
-        headers={'Content-Disposition': 'attachment; filename=ventas_export.csv'}
-    )
+    return stream_csv_response(query, header, format_row, 'ventas_export.csv')
 
 
 @bp.route('/filters', methods=['GET'])
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.utils.decorators import admin_required
 from app.services.schedule_service import ScheduleService
+from app.services.schedule_summary_service import ScheduleSummaryService
 from app.utils.jwt_utils import token_required
 
 bp = Blueprint('schedule_summary', __name__, url_prefix='/api/v1/schedules')
@@ -10,13 +11,7 @@ bp = Blueprint('schedule_summary', __name__, url_prefix='/api/v1/schedules')
 @admin_required
 def get_schedule_summary(current_user, schedule_id):
     """Get summary of hours and costs for a schedule"""
-    cost_summary = ScheduleService.calculate_schedule_cost(schedule_id)
-    hours_summary = ScheduleService.get_employee_hours_summary(schedule_id)
-    
-    return jsonify({
-        'cost_summary': cost_summary,
-        'hours_summary': hours_summary
-    }), 200
+    return jsonify(ScheduleSummaryService.summarize(schedule_id)), 200
 
 @bp.route('/<int:schedule_id>/publish', methods=['POST'])
 @token_required
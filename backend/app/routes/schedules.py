@@ -105,6 +105,63 @@ def delete_schedule(current_user, schedule_id):
     
     return jsonify({'message': 'Grilla eliminada exitosamente'}), 200
 
+@bp.route('/<int:schedule_id>/clone-week', methods=['POST'])
+@token_required
+@admin_required
+def clone_week(current_user, schedule_id):
+    """
+    Copia los turnos de una semana de la grilla a otra semana (mismo día de la
+    semana y horario), en la misma grilla o en target_schedule_id.
+    Body: {source_week_start, target_week_start, target_schedule_id?}
+    """
+    from app.services.schedule_service import ScheduleService
+
+    data = request.get_json() or {}
+
+    if not data.get('source_week_start') or not data.get('target_week_start'):
+        return jsonify({'error': 'source_week_start y target_week_start son requeridos'}), 400
+
+    try:
+        source_week_start = datetime.fromisoformat(data['source_week_start']).date()
+        target_week_start = datetime.fromisoformat(data['target_week_start']).date()
+    except (ValueError, TypeError, AttributeError):
+        return jsonify({'error': 'Formato de fecha inválido'}), 400
+
+    if source_week_start == target_week_start and not data.get('target_schedule_id'):
+        return jsonify({'error': 'La semana de destino debe ser distinta a la de origen'}), 400
+
+    source = db.session.get(Schedule, schedule_id)
+    target = db.session.get(Schedule, data['target_schedule_id']) if data.get('target_schedule_id') else source
+    if not source or not target:
+        return jsonify({'error': 'Grilla no encontrada'}), 404
+
+    candidates = ScheduleService.week_clone_candidates(source, source_week_start, target_week_start)
+    if not candidates:
+        return jsonify({'error': 'La semana de origen no tiene turnos'}), 400
+
+    outside = [c for c in candidates if not target.start_date <= c['shift_date'] <= target.end_date]
+    if outside:
+        return jsonify({
+            'error': 'La semana de destino queda fuera del rango de la grilla',
+            'schedule_start': target.start_date.isoformat(),
+            'schedule_end': target.end_date.isoformat()
+        }), 400
+
+    conflicts = ScheduleService.find_batch_conflicts(candidates)
+    if conflicts:
+        return jsonify({
+            'error': 'Hay turnos que se superponen con otros turnos',
+            'conflicts': ScheduleService.serialize_conflicts(conflicts, candidates)
+        }), 409
+
+    shifts = ScheduleService.add_shifts_bulk(target, candidates, changed_by_user_id=current_user.id)
+
+    return jsonify({
+        'message': f'{len(shifts)} turnos copiados exitosamente',
+        'created': len(shifts),
+        'shifts': [shift.to_dict() for shift in shifts]
+    }), 201
+
 @bp.route('/coverage', methods=['GET'])
 @token_required
 def get_daily_coverage(current_user):
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from app.extensions import db
 from app.models.shift import Shift
+from app.models.schedule import Schedule
+from app.models.employee import Employee
 from app.utils.decorators import admin_required
 from app.services.schedule_service import ScheduleService
 from datetime import datetime, time
@@ -8,6 +10,9 @@ from app.utils.jwt_utils import token_required
 
 bp = Blueprint('shifts', __name__, url_prefix='/api/v1/shifts')
 
+MAX_BULK_SHIFTS = 1000
+
+
 @bp.route('', methods=['POST'])
 @token_required
 @admin_required
@@ -52,6 +57,71 @@ def create_shift(current_user):
         'shift': shift.to_dict()
     }), 201
 
+@bp.route('/bulk', methods=['POST'])
+@token_required
+@admin_required
+def create_shifts_bulk(current_user):
+    """
+    Crea varios turnos de una grilla en una sola transacción.
+    Body: {schedule_id, shifts: [{employee_id, shift_date, start_time, end_time}]}.
+    Si algún turno se superpone (con turnos existentes o del mismo lote) no se crea ninguno.
+    """
+    data = request.get_json() or {}
+    items = data.get('shifts')
+
+    if not data.get('schedule_id') or not isinstance(items, list) or not items:
+        return jsonify({'error': 'schedule_id y una lista de shifts son requeridos'}), 400
+
+    if len(items) > MAX_BULK_SHIFTS:
+        return jsonify({'error': f'No se pueden crear más de {MAX_BULK_SHIFTS} turnos por solicitud'}), 400
+
+    schedule = db.session.get(Schedule, data['schedule_id'])
+    if not schedule:
+        return jsonify({'error': 'Grilla no encontrada'}), 404
+
+    required_fields = ['employee_id', 'shift_date', 'start_time', 'end_time']
+    candidates = []
+    errors = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not all(field in item for field in required_fields):
+            errors.append({'index': index, 'error': 'Todos los campos son requeridos'})
+            continue
+        try:
+            candidates.append({
+                'employee_id': int(item['employee_id']),
+                'shift_date': datetime.fromisoformat(item['shift_date']).date(),
+                'start_time': datetime.strptime(item['start_time'], '%H:%M').time(),
+                'end_time': datetime.strptime(item['end_time'], '%H:%M').time()
+            })
+        except (ValueError, TypeError, AttributeError):
+            errors.append({'index': index, 'error': 'Formato de fecha u hora inválido'})
+
+    if not errors:
+        employee_ids = {c['employee_id'] for c in candidates}
+        found = {row[0] for row in db.session.query(Employee.id).filter(Employee.id.in_(employee_ids))}
+        errors = [
+            {'index': index, 'error': 'Empleado no encontrado'}
+            for index, c in enumerate(candidates) if c['employee_id'] not in found
+        ]
+
+    if errors:
+        return jsonify({'error': 'Hay turnos inválidos', 'errors': errors}), 400
+
+    conflicts = ScheduleService.find_batch_conflicts(candidates)
+    if conflicts:
+        return jsonify({
+            'error': 'Hay turnos que se superponen con otros turnos',
+            'conflicts': ScheduleService.serialize_conflicts(conflicts, candidates)
+        }), 409
+
+    shifts = ScheduleService.add_shifts_bulk(schedule, candidates, changed_by_user_id=current_user.id)
+
+    return jsonify({
+        'message': f'{len(shifts)} turnos creados exitosamente',
+        'created': len(shifts),
+        'shifts': [shift.to_dict() for shift in shifts]
+    }), 201
+
 @bp.route('/<int:shift_id>', methods=['PUT'])
 @token_required
 @admin_required
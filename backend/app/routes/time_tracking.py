@@ -8,11 +8,13 @@ from app.models.shift import Shift
 from datetime import datetime, date, timedelta
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
 from calendar import monthrange
 import logging
 import pytz
 from app.utils.jwt_utils import token_required
 from app.utils.payroll_utils import calculate_employee_cost, calculate_total_hours_from_dict
+from app.utils.holiday_calendar import holiday_calendar
 from app.utils.timezone_utils import get_current_time_argentina, get_current_time_only_argentina, get_current_date_argentina
 
 logger = logging.getLogger(__name__)
@@ -232,25 +234,16 @@ def get_current_week_worked(current_user):
     this_monday = today - timedelta(days=days_since_monday)
     this_sunday = this_monday + timedelta(days=6)
     
-    records = TimeTracking.query.filter_by(
-        employee_id=current_user.employee.id
+    worked_minutes, record_count = db.session.query(
+        func.coalesce(func.sum(TimeTracking.total_worked_minutes), 0),
+        func.count(TimeTracking.id)
     ).filter(
+        TimeTracking.employee_id == current_user.employee.id,
         TimeTracking.tracking_date >= this_monday,
         TimeTracking.tracking_date <= this_sunday
-    ).all()
-    
-    total_hours = 0
-    total_minutes = 0
-    
-    for record in records:
-        record_dict = record.to_dict()
-        total_hours += record_dict['total_hours']
-        total_minutes += record_dict['total_minutes']
-    
-    extra_hours = total_minutes // 60
-    total_hours += extra_hours
-    total_minutes = total_minutes % 60
+    ).one()
     
+    total_hours, total_minutes = divmod(int(worked_minutes), 60)
     total_hours_decimal = total_hours + (total_minutes / 60)
     
     return jsonify({
@@ -259,7 +252,7 @@ def get_current_week_worked(current_user):
         'total_hours': total_hours,
         'total_minutes': total_minutes,
         'total_hours_decimal': round(total_hours_decimal, 2),
-        'record_count': len(records)
+        'record_count': record_count
     }), 200
 
 @bp.route('/record-hours', methods=['POST'])
@@ -374,7 +367,11 @@ def get_calendar_data(current_user):
     last_day = monthrange(year, month)[1]
     end_date = date(year, month, last_day)
     
-    query = db.session.query(TimeTracking).join(Employee)
+    # Empleado y puesto se cargan en la misma consulta; las horas vienen de
+    # total_worked_minutes, así que no hace falta leer los bloques
+    query = db.session.query(TimeTracking).join(TimeTracking.employee).options(
+        contains_eager(TimeTracking.employee).joinedload(Employee.job_position)
+    )
     
     if employee_id:
         query = query.filter(TimeTracking.employee_id == employee_id)
@@ -392,6 +389,9 @@ def get_calendar_data(current_user):
     
     records = query.all()
     
+    # Feriados del mes cargados una sola vez para todos los costos
+    holiday_dates = set(holiday_calendar.holidays_between(start_date, end_date))
+    
     calendar_data = {}
     for day in range(1, last_day + 1):
         day_date = date(year, month, day)
@@ -405,35 +405,39 @@ def get_calendar_data(current_user):
         }
     
     total_cost = 0.0
+    missing_rate = set()
     
     for record in records:
         day_key = record.tracking_date.isoformat()
         if day_key in calendar_data:
-            record_data = record.to_dict()
-            calendar_data[day_key]['total_hours'] += record_data['total_hours']
-            calendar_data[day_key]['total_minutes'] += record_data['total_minutes']
+            record_hours, record_minutes = divmod(record.total_worked_minutes or 0, 60)
+            calendar_data[day_key]['total_hours'] += record_hours
+            calendar_data[day_key]['total_minutes'] += record_minutes
             calendar_data[day_key]['employee_count'] += 1
             calendar_data[day_key]['employees'].append({
                 'employee_id': record.employee_id,
                 'employee_name': record.employee.full_name,
-                'hours': record_data['total_hours'],
-                'minutes': record_data['total_minutes']
+                'hours': record_hours,
+                'minutes': record_minutes
             })
             
-            if record.employee.job_position and record.employee.job_position.hourly_rate:
-                employee_total_hours = calculate_total_hours_from_dict(record_data['total_hours'], record_data['total_minutes'])
-                hourly_rate = record.employee.job_position.hourly_rate
+            job_position = record.employee.job_position
+            if job_position and job_position.hourly_rate:
+                employee_total_hours = calculate_total_hours_from_dict(record_hours, record_minutes)
                 employee_cost = calculate_employee_cost(
                     employee_total_hours, 
-                    hourly_rate,
+                    job_position.hourly_rate,
                     work_date=record.tracking_date,
-                    job_position=record.employee.job_position
+                    job_position=job_position,
+                    holiday_dates=holiday_dates
                 )
                 calendar_data[day_key]['daily_cost'] += employee_cost
                 total_cost += employee_cost
-                logger.info(f"Added cost for {record.employee.full_name} on {day_key}: ${employee_cost:.2f} (total now: ${total_cost:.2f})")
             else:
-                logger.warning(f"Employee {record.employee.full_name} (ID: {record.employee_id}) missing job_position or hourly_rate")
+                missing_rate.add(record.employee_id)
+    
+    if missing_rate:
+        logger.warning(f"Calendar {year}-{month:02d}: employees without job_position or hourly_rate: {sorted(missing_rate)}")
     
     for day_key in calendar_data:
         extra_hours = calendar_data[day_key]['total_minutes'] // 60
@@ -516,9 +520,7 @@ def get_day_detail(current_user):
                         'end_time': block.end_time.strftime('%H:%M')
                     })
         
-        record_dict = record.to_dict()
-        employee_data['total_hours'] = record_dict['total_hours']
-        employee_data['total_minutes'] = record_dict['total_minutes']
+        employee_data['total_hours'], employee_data['total_minutes'] = divmod(record.total_worked_minutes or 0, 60)
         employees_summary.append(employee_data)
     
     hours_with_work = {
@@ -0,0 +1,157 @@
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models.shift import Shift
+from app.models.time_tracking import TimeTracking
+from app.models.work_block import WorkBlock
+
+
+MINUTES_PER_DAY = 24 * 60
+RESOLUTIONS = (15, 30, 60)
+
+
+SCHEDULED = 'scheduled'
+ACTUAL = 'actual'
+
+
+class CoverageEngine:
+    """
+    Staffing curves of a date range at minute resolution.
+
+    Each shift (or, for source='actual', each work block) is an interval
+    [start, end) on a single minute timeline that begins the day before
+    start_date, so intervals crossing midnight (end_time before start_time)
+    spill into the next day, including the previous day's overnight ones into
+    start_date. Headcount per minute is the running sum of a difference array
+    (+1 at each start, -1 at each end), computed once for the whole range and
+    reshaped to days x minutes.
+
+    Intervals are loaded with a single column query (no ORM objects). Work
+    blocks still in progress (end_time == start_time) count until `now` on
+    its date and are empty on other days.
+    """
+
+    def __init__(self, start_date, end_date, source=SCHEDULED, now=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.days = max((end_date - start_date).days + 1, 0)
+
+        origin = start_date - timedelta(days=1)
+        if source == ACTUAL:
+            rows = db.session.query(
+                TimeTracking.tracking_date,
+                WorkBlock.start_time,
+                WorkBlock.end_time
+            ).join(
+                TimeTracking, WorkBlock.time_tracking_id == TimeTracking.id
+            ).filter(
+                TimeTracking.tracking_date >= origin,
+                TimeTracking.tracking_date <= end_date
+            ).all()
+        else:
+            rows = db.session.query(
+                Shift.shift_date,
+                Shift.start_time,
+                Shift.end_time
+            ).filter(
+                Shift.shift_date >= origin,
+                Shift.shift_date <= end_date
+            ).all()
+
+        count = len(rows)
+        day_offsets = np.fromiter((row[0].toordinal() for row in rows), dtype=np.int64, count=count)
+        day_offsets -= origin.toordinal()
+        start_minutes = np.fromiter(
+            (row[1].hour * 60 + row[1].minute for row in rows), dtype=np.int64, count=count
+        )
+        end_minutes = np.fromiter(
+            (row[2].hour * 60 + row[2].minute for row in rows), dtype=np.int64, count=count
+        )
+
+        if source == ACTUAL and now is not None:
+            # A block in progress on now's date runs until now (elsewhere it stays empty)
+            running = (end_minutes == start_minutes) & (day_offsets == now.date().toordinal() - origin.toordinal())
+            end_minutes = np.where(running, np.maximum(start_minutes, now.hour * 60 + now.minute), end_minutes)
+
+        # Same rule as Shift.calculate_hours: an end before the start is on the next day
+        end_minutes = np.where(end_minutes < start_minutes, end_minutes + MINUTES_PER_DAY, end_minutes)
+
+        starts = day_offsets * MINUTES_PER_DAY + start_minutes
+        ends = day_offsets * MINUTES_PER_DAY + end_minutes
+        timeline = (self.days + 2) * MINUTES_PER_DAY + 1
+        diff = np.bincount(starts, minlength=timeline) - np.bincount(ends, minlength=timeline)
+        headcount = np.cumsum(diff[:timeline])
+
+        self.minutes = headcount[MINUTES_PER_DAY:(self.days + 1) * MINUTES_PER_DAY].reshape(
+            self.days, MINUTES_PER_DAY
+        )
+
+    def totals(self):
+        """(shift count, scheduled hours, distinct employees) of the shifts dated in the range"""
+        shift_count, total_hours, employee_count = db.session.query(
+            func.count(Shift.id),
+            func.coalesce(func.sum(Shift.hours), 0),
+            func.count(func.distinct(Shift.employee_id))
+        ).filter(
+            Shift.shift_date >= self.start_date,
+            Shift.shift_date <= self.end_date
+        ).one()
+        return int(shift_count), float(total_hours), int(employee_count)
+
+    @staticmethod
+    def _check_resolution(resolution):
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f'resolution must be one of {RESOLUTIONS}')
+
+    def dates(self):
+        return [self.start_date + timedelta(days=i) for i in range(self.days)]
+
+    def curves(self, resolution=60):
+        """days x slots array with the peak headcount of each slot"""
+        self._check_resolution(resolution)
+        return self.minutes.reshape(self.days, MINUTES_PER_DAY // resolution, resolution).max(axis=2)
+
+    def person_minutes(self, resolution=60):
+        """days x slots array with the staffed person-minutes of each slot"""
+        self._check_resolution(resolution)
+        return self.minutes.reshape(self.days, MINUTES_PER_DAY // resolution, resolution).sum(axis=2)
+
+    def peak(self):
+        """(date, minute of day, headcount) of the highest headcount in the range, or None"""
+        if not self.days or not self.minutes.any():
+            return None
+        day, minute = np.unravel_index(int(self.minutes.argmax()), self.minutes.shape)
+        return self.start_date + timedelta(days=int(day)), int(minute), int(self.minutes[day, minute])
+
+
+class CoverageComparison:
+    """
+    Actual (work blocks) against scheduled (shifts) staffing for a date range.
+
+    Minute deltas are actual minus scheduled headcount. Understaffed and
+    overstaffed totals are person-minutes and only count minutes up to `now`,
+    so a live view of today does not report the rest of the day as missing.
+    """
+
+    def __init__(self, start_date, end_date, now):
+        self.now = now
+        self.scheduled = CoverageEngine(start_date, end_date)
+        self.actual = CoverageEngine(start_date, end_date, source=ACTUAL, now=now)
+        self.delta = self.actual.minutes - self.scheduled.minutes
+
+        elapsed = (now - datetime.combine(start_date, time.min)).total_seconds() // 60
+        minute_index = np.arange(self.scheduled.days * MINUTES_PER_DAY).reshape(self.scheduled.days, MINUTES_PER_DAY)
+        self.elapsed = minute_index < elapsed
+
+    def slot_delta(self, resolution=60):
+        """days x slots array: actual minus scheduled peak headcount of each slot"""
+        return self.actual.curves(resolution) - self.scheduled.curves(resolution)
+
+    def daily_totals(self):
+        """(understaffed[days], overstaffed[days]) person-minutes elapsed up to now"""
+        understaffed = np.where(self.elapsed, np.clip(-self.delta, 0, None), 0).sum(axis=1)
+        overstaffed = np.where(self.elapsed, np.clip(self.delta, 0, None), 0).sum(axis=1)
+        return understaffed, overstaffed
@@ -0,0 +1,138 @@
+from datetime import date
+
+from sqlalchemy import func, case, and_, or_
+
+from app.extensions import db
+from app.models.expense import Expense, ExpenseCategory
+from app.models.payroll import Payroll
+from app.models.sales_rollup import SalesDailyRollup
+
+
+class DashboardMetricsService:
+    """
+    Period metrics for the reports dashboard.
+
+    Every method receives a list of (start_date, end_date) periods and scans
+    its table once, using conditional aggregation (SUM(CASE WHEN ...)) to
+    compute all periods - e.g. current and previous - in the same query.
+    Results are returned in the same order as the periods.
+    """
+
+    @staticmethod
+    def sales_metrics(periods):
+        """Total, count and average ticket of closed sales per period"""
+        columns = []
+        for start_date, end_date in periods:
+            in_period = SalesDailyRollup.fecha.between(start_date, end_date)
+            columns.append(func.coalesce(func.sum(case((in_period, SalesDailyRollup.total), else_=0)), 0))
+            columns.append(func.coalesce(func.sum(case((in_period, SalesDailyRollup.cantidad), else_=0)), 0))
+
+        row = db.session.query(*columns).filter(
+            SalesDailyRollup.fecha >= min(p[0] for p in periods),
+            SalesDailyRollup.fecha <= max(p[1] for p in periods)
+        ).one()
+
+        results = []
+        for i in range(len(periods)):
+            total = float(row[2 * i] or 0)
+            count = int(row[2 * i + 1] or 0)
+            results.append({
+                'total': total,
+                'count': count,
+                'ticket_promedio': round(total / count, 2) if count > 0 else 0
+            })
+        return results
+
+    @staticmethod
+    def expenses_metrics(periods):
+        """Total, direct and indirect (incl. uncategorized) expenses per period"""
+        is_directo = ExpenseCategory.expense_type == 'directo'
+        is_indirecto = or_(ExpenseCategory.expense_type == 'indirecto', Expense.category_id.is_(None))
+
+        columns = []
+        for start_date, end_date in periods:
+            in_period = Expense.fecha.between(start_date, end_date)
+            columns.append(func.coalesce(func.sum(case((in_period, Expense.importe), else_=0)), 0))
+            columns.append(func.coalesce(func.sum(case((and_(in_period, is_directo), Expense.importe), else_=0)), 0))
+            columns.append(func.coalesce(func.sum(case((and_(in_period, is_indirecto), Expense.importe), else_=0)), 0))
+
+        row = db.session.query(*columns).select_from(Expense).outerjoin(
+            ExpenseCategory, Expense.category_id == ExpenseCategory.id
+        ).filter(
+            Expense.fecha >= min(p[0] for p in periods),
+            Expense.fecha <= max(p[1] for p in periods),
+            Expense.cancelado == False
+        ).one()
+
+        return [{
+            'total': float(row[3 * i] or 0),
+            'directos': float(row[3 * i + 1] or 0),
+            'indirectos': float(row[3 * i + 2] or 0)
+        } for i in range(len(periods))]
+
+    @staticmethod
+    def payroll_metrics(periods):
+        """Salaries (gross + extraordinary, SAC included) and hours per period"""
+        amount = Payroll.gross_salary + func.coalesce(Payroll.extraordinary_amount, 0)
+
+        conditions = [DashboardMetricsService.payroll_period_condition(s, e) for s, e in periods]
+        columns = []
+        for in_period in conditions:
+            columns.append(func.coalesce(func.sum(case((in_period, amount), else_=0)), 0))
+            columns.append(func.coalesce(func.sum(case((in_period, Payroll.hours_worked), else_=0)), 0))
+
+        row = db.session.query(*columns).filter(or_(*conditions)).one()
+
+        return [{
+            'total': float(row[2 * i] or 0),
+            'horas': float(row[2 * i + 1] or 0)
+        } for i in range(len(periods))]
+
+    @staticmethod
+    def payroll_period_condition(start_date, end_date):
+        """
+        Payroll rows that belong to a period: regular months (1-12) within the
+        year/month range, plus SAC1 (month 13, paid in June) and SAC2 (month
+        14, paid in December) when their payment month falls in the range.
+        """
+        start_month, start_year = start_date.month, start_date.year
+        end_month, end_year = end_date.month, end_date.year
+
+        regular = and_(
+            Payroll.month <= 12,
+            or_(
+                and_(Payroll.year == start_year, Payroll.month >= start_month),
+                Payroll.year > start_year
+            ),
+            or_(
+                and_(Payroll.year == end_year, Payroll.month <= end_month),
+                Payroll.year < end_year
+            )
+        )
+
+        range_start = start_date.replace(day=1)
+        range_end = end_date.replace(day=1)
+        sac = []
+        for year in range(start_year, end_year + 1):
+            if range_start <= date(year, 6, 1) <= range_end:
+                sac.append(and_(Payroll.year == year, Payroll.month == 13))
+            if range_start <= date(year, 12, 1) <= range_end:
+                sac.append(and_(Payroll.year == year, Payroll.month == 14))
+
+        return or_(regular, *sac)
+
+    @staticmethod
+    def period_comparison(start_date, end_date, prev_start_date, prev_end_date):
+        """Sales, expenses and payroll for the current and previous period (3 queries)"""
+        periods = [(start_date, end_date), (prev_start_date, prev_end_date)]
+        sales, prev_sales = DashboardMetricsService.sales_metrics(periods)
+        expenses, prev_expenses = DashboardMetricsService.expenses_metrics(periods)
+        payroll, prev_payroll = DashboardMetricsService.payroll_metrics(periods)
+        return {
+            'sales': sales,
+            'prev_sales': prev_sales,
+            'expenses': expenses,
+            'prev_expenses': prev_expenses,
+            'payroll': payroll,
+            'prev_payroll': prev_payroll
+        }
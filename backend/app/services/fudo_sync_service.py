@@ -0,0 +1,552 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from flask import current_app
+from sqlalchemy import insert, update
+
+from app.extensions import db
+from app.models.sale import Sale
+from app.models.expense import Expense
+from app.models.sync_job import SyncJob
+from app.models.fudo_sync_state import FudoSyncState
+from app.services.sales_rollup_service import SalesRollupService
+from app.utils.fudo_client import FudoClient
+from app.utils.report_cache import report_cache
+
+logger = logging.getLogger(__name__)
+
+
+class JobSuperseded(Exception):
+    """The job was claimed by another worker (resumed while this one was considered stale)"""
+
+
+def parse_fudo_sale(fudo_sale: Dict) -> Dict:
+    """
+    Parse Fudo sale data to Galia format
+
+    Args:
+        fudo_sale: Sale data from Fudo API
+
+    Returns:
+        Dictionary with parsed sale data
+    """
+    attributes = fudo_sale.get('attributes', {})
+    sale_id = fudo_sale.get('id')
+
+    created_at = attributes.get('createdAt')
+    closed_at = attributes.get('closedAt')
+
+    creacion = None
+    if created_at:
+        try:
+            creacion = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        except (ValueError, AttributeError):
+            creacion = datetime.now()
+
+    cerrada = None
+    if closed_at:
+        try:
+            cerrada = datetime.fromisoformat(closed_at.replace('Z', '+00:00'))
+        except (ValueError, AttributeError):
+            pass
+
+    fecha = cerrada.date() if cerrada else (creacion.date() if creacion else datetime.now().date())
+
+    total = attributes.get('total', 0)
+    if total:
+        total = float(total)
+
+    estado_map = {
+        'OPEN': 'Abierta',
+        'CLOSED': 'Cerrada',
+        'CANCELLED': 'Cancelada'
+    }
+    estado = estado_map.get(attributes.get('status'), 'Cerrada')
+
+    tipo_venta_map = {
+        'DELIVERY': 'Delivery',
+        'TAKE_AWAY': 'Para llevar',
+        'TABLE': 'Local',
+        'COUNTER': 'Mostrador'
+    }
+    tipo_venta = tipo_venta_map.get(attributes.get('type'), 'Local')
+
+    relationships = fudo_sale.get('relationships', {})
+    table_data = relationships.get('table', {}).get('data')
+    room_data = relationships.get('room', {}).get('data')
+
+    return {
+        'external_id': sale_id,
+        'fecha': fecha,
+        'creacion': creacion,
+        'cerrada': cerrada,
+        'caja': attributes.get('cashRegisterName'),
+        'estado': estado,
+        'cliente': attributes.get('customerName'),
+        'mesa': table_data.get('id') if table_data else None,
+        'sala': room_data.get('id') if room_data else None,
+        'personas': attributes.get('people'),
+        'camarero': attributes.get('userName'),
+        'medio_pago': None,
+        'total': total,
+        'fiscal': attributes.get('fiscalReceipt', False),
+        'tipo_venta': tipo_venta,
+        'comentario': attributes.get('comments'),
+        'origen': 'Fudo',
+        'id_origen': sale_id
+    }
+
+
+def parse_fudo_expense(fudo_expense: Dict, category_mapping: Dict[str, int]) -> Optional[Dict]:
+    """
+    Parse Fudo expense data to Galia format
+
+    Args:
+        fudo_expense: Expense data from Fudo API
+        category_mapping: Mapping from Fudo category IDs to Galia category IDs
+
+    Returns:
+        Dictionary with parsed expense data or None if category not mapped
+    """
+    attributes = fudo_expense.get('attributes', {})
+    expense_id = fudo_expense.get('id')
+
+    date_str = attributes.get('date')
+    fecha = None
+    if date_str:
+        try:
+            fecha = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except ValueError:
+            fecha = datetime.now().date()
+    else:
+        fecha = datetime.now().date()
+
+    amount = attributes.get('amount', 0)
+    # Convert to float even if amount is 0
+    try:
+        amount = float(amount) if amount is not None else 0.0
+    except (ValueError, TypeError):
+        amount = 0.0
+
+    relationships = fudo_expense.get('relationships', {})
+    fudo_category_data = relationships.get('expenseCategory', {}).get('data')
+    fudo_category_id = fudo_category_data.get('id') if fudo_category_data else None
+
+    galia_category_id = None
+    if fudo_category_id and category_mapping:
+        galia_category_id = category_mapping.get(fudo_category_id)
+        if not galia_category_id:
+            logger.info(f"No category mapping found for Fudo expense {expense_id} with category {fudo_category_id} - importing without category")
+
+    provider_data = relationships.get('provider', {}).get('data')
+    provider_id = provider_data.get('id') if provider_data else None
+
+    payment_method_data = relationships.get('paymentMethod', {}).get('data')
+
+    estado_pago_map = {
+        'PENDING': 'Pendiente',
+        'PAID': 'Pagado',
+        'CANCELLED': 'Cancelado'
+    }
+    estado_pago = estado_pago_map.get(attributes.get('status'), 'Pendiente')
+
+    return {
+        'external_id': expense_id,
+        'fecha': fecha,
+        'fecha_vencimiento': None,
+        'proveedor': attributes.get('providerName'),
+        'category_id': galia_category_id,
+        'comentario': attributes.get('description'),
+        'estado_pago': estado_pago,
+        'importe': amount,
+        'de_caja': attributes.get('fromCashRegister', False),
+        'caja': attributes.get('cashRegisterName'),
+        'medio_pago': attributes.get('paymentMethodName'),
+        'numero_fiscal': attributes.get('receiptNumber'),
+        'tipo_comprobante': attributes.get('receiptTypeName'),
+        'numero_comprobante': attributes.get('receiptNumber'),
+        'creado_por': 'Fudo Sync',
+        'cancelado': attributes.get('status') == 'CANCELLED'
+    }
+
+
+class FudoSyncService:
+    """
+    Page-by-page Fudo sync tracked in sync_jobs.
+
+    Pages are fetched concurrently by FudoClient.iter_pages and processed in
+    order; each page is upserted (one IN lookup, one bulk insert, one bulk
+    update) and committed together with the job progress, so a failed or
+    interrupted job resumes from last_committed_page + 1.
+
+    Incremental jobs start from the resource's high-water mark in
+    fudo_sync_state and advance it when they complete, so a scheduled sync
+    only downloads what is new. Sales are requested by close time (Fudo only
+    returns them once closed); expenses re-request a lookback window of
+    business dates, since they can be entered backdated.
+    """
+
+    @staticmethod
+    def create_job(resource, params, user_id=None):
+        job = SyncJob(resource=resource, status='pending', params=params, created_by=user_id, errors=[])
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    @staticmethod
+    def active_job(resource):
+        """Pending/running job for the resource that is still making progress"""
+        jobs = SyncJob.query.filter(
+            SyncJob.resource == resource,
+            SyncJob.status.in_(('pending', 'running'))
+        ).order_by(SyncJob.id.desc()).all()
+        for job in jobs:
+            if not FudoSyncService.can_resume(job):
+                return job
+        return None
+
+    @staticmethod
+    def get_state(resource):
+        state = FudoSyncState.query.filter_by(resource=resource).first()
+        if not state:
+            state = FudoSyncState(resource=resource, params={})
+            db.session.add(state)
+            db.session.flush()
+        return state
+
+    @staticmethod
+    def incremental_params(resource, category_mapping=None):
+        """
+        Params for a sync from the stored high-water mark.
+
+        Sales: closed since the mark (latest closedAt) minus FUDO_SYNC_OVERLAP_HOURS,
+        so a sale that stayed open for hours is still picked up when it closes.
+        Expenses: dated since FUDO_SYNC_EXPENSES_LOOKBACK_DAYS before the mark
+        (or today, if the mark is in the future), to catch backdated entries.
+        Without a mark, the last FUDO_SYNC_INITIAL_DAYS are requested.
+        """
+        config = current_app.config
+        state = FudoSyncService.get_state(resource)
+        now = datetime.utcnow()
+
+        if not state.last_seen_at:
+            since = now - timedelta(days=config.get('FUDO_SYNC_INITIAL_DAYS', 30))
+        elif resource == 'sales':
+            since = state.last_seen_at - timedelta(hours=config.get('FUDO_SYNC_OVERLAP_HOURS', 6))
+        else:
+            since = min(state.last_seen_at, now) - timedelta(days=config.get('FUDO_SYNC_EXPENSES_LOOKBACK_DAYS', 30))
+
+        params = {
+            'start_date': since.strftime('%Y-%m-%dT%H:%M:%SZ') if resource == 'sales' else since.date().isoformat(),
+            'end_date': None,
+            'update_existing': False,
+            'incremental': True
+        }
+        if resource == 'sales':
+            params['date_field'] = 'closedAt'
+        else:
+            if category_mapping is not None:
+                state.params = {**(state.params or {}), 'category_mapping': category_mapping}
+            params['category_mapping'] = (state.params or {}).get('category_mapping', {})
+        return params
+
+    @staticmethod
+    def create_incremental_job(resource, user_id=None, category_mapping=None):
+        """
+        Create an incremental job for the resource. Returns (job, created):
+        if another job for the resource is still active it is returned instead.
+        """
+        job = FudoSyncService.active_job(resource)
+        if job:
+            return job, False
+        params = FudoSyncService.incremental_params(resource, category_mapping)
+        return FudoSyncService.create_job(resource, params, user_id), True
+
+    @staticmethod
+    def _advance_state(job):
+        state = FudoSyncService.get_state(job.resource)
+        if job.high_water_at and (not state.last_seen_at or job.high_water_at > state.last_seen_at):
+            state.last_seen_at = job.high_water_at
+        state.last_job_id = job.id
+
+    @staticmethod
+    def can_resume(job):
+        """Failed jobs, and running/pending jobs whose worker stopped reporting progress"""
+        if job.status == 'failed':
+            return True
+        if job.status in ('running', 'pending'):
+            stale_after = timedelta(minutes=current_app.config.get('FUDO_SYNC_STALE_MINUTES', 10))
+            last_update = job.updated_at or job.created_at
+            return last_update < datetime.utcnow() - stale_after
+        return False
+
+    @staticmethod
+    def claim_job(job):
+        """
+        Atomically take over a job seen as resumable: only succeeds if its status
+        and updated_at are still the ones read, so of two concurrent resumes (or a
+        resume and the slow worker it considered stale) exactly one wins.
+        """
+        result = db.session.execute(
+            update(SyncJob)
+            .where(SyncJob.id == job.id, SyncJob.status == job.status, SyncJob.updated_at == job.updated_at)
+            .values(status='running', updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def _heartbeat(job, seen_updated_at):
+        """
+        Touch updated_at only if nobody claimed the job since seen_updated_at,
+        right before committing a page (the row stays locked until the commit,
+        so a concurrent claim waits and then fails). Returns the new value.
+        """
+        now = datetime.utcnow()
+        with db.session.no_autoflush:
+            result = db.session.execute(
+                update(SyncJob)
+                .where(SyncJob.id == job.id, SyncJob.updated_at == seen_updated_at)
+                .values(updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        if result.rowcount != 1:
+            raise JobSuperseded()
+        # Explicit value, so the flush of the job does not apply onupdate again
+        job.updated_at = now
+        return now
+
+    @staticmethod
+    def start_job(app, job_id):
+        """Run the job in a background thread (or inline when FUDO_SYNC_INLINE is set)"""
+        if app.config.get('FUDO_SYNC_INLINE'):
+            FudoSyncService.run_job(job_id)
+            return
+
+        def target():
+            with app.app_context():
+                FudoSyncService.run_job(job_id)
+                db.session.remove()
+
+        thread = threading.Thread(target=target, name=f'fudo-sync-{job_id}')
+        thread.daemon = True
+        thread.start()
+
+    @staticmethod
+    def _client():
+        return FudoClient(max_workers=current_app.config.get('FUDO_SYNC_CONCURRENCY', 4))
+
+    @staticmethod
+    def run_job(job_id, client=None):
+        """Process the job's pages from last_committed_page + 1 until the last page"""
+        job = db.session.get(SyncJob, job_id)
+        job.status = 'running'
+        job.error_message = None
+        job.started_at = job.started_at or datetime.utcnow()
+        job.finished_at = None
+        db.session.commit()
+        seen_updated_at = job.updated_at
+
+        params = job.params or {}
+        logger.info(f"Starting Fudo {job.resource} sync job {job.id} from page {job.last_committed_page + 1}")
+
+        try:
+            client = client or FudoSyncService._client()
+            if job.resource == 'sales':
+                pages = client.iter_sales_pages(params.get('start_date'), params.get('end_date'),
+                                                start_page=job.last_committed_page + 1,
+                                                date_field=params.get('date_field', 'createdAt'))
+            else:
+                pages = client.iter_expense_pages(params.get('start_date'), params.get('end_date'),
+                                                  start_page=job.last_committed_page + 1)
+
+            for page_number, items in pages:
+                if job.resource == 'sales':
+                    result = FudoSyncService._upsert_sales(items, params.get('update_existing', False))
+                else:
+                    result = FudoSyncService._upsert_expenses(
+                        items, params.get('update_existing', False), params.get('category_mapping') or {}
+                    )
+
+                job.total_fetched += len(items)
+                job.imported += result['imported']
+                job.updated += result['updated']
+                job.skipped += result['skipped']
+                job.no_category_mapping += result.get('no_category_mapping', 0)
+                job.add_errors(result['errors'])
+                job.advance_high_water(result['high_water'])
+                job.last_committed_page = page_number
+                seen_updated_at = FudoSyncService._heartbeat(job, seen_updated_at)
+                db.session.commit()
+
+                # Core writes bypass the ORM session hooks
+                report_cache.invalidate_dates(result['dates'])
+
+            FudoSyncService._heartbeat(job, seen_updated_at)
+            job.status = 'completed'
+            job.finished_at = datetime.utcnow()
+            if params.get('incremental'):
+                # Only a complete run guarantees nothing older than the mark is missing
+                FudoSyncService._advance_state(job)
+            db.session.commit()
+            logger.info(f"Fudo sync job {job.id} completed: {job.imported} imported, {job.updated} updated")
+
+        except JobSuperseded:
+            # The worker that claimed the job redoes the uncommitted page
+            db.session.rollback()
+            logger.warning(f"Fudo sync job {job_id} was resumed by another worker, stopping")
+            job = db.session.get(SyncJob, job_id)
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Fudo sync job {job_id} failed: {str(e)}")
+            job = db.session.get(SyncJob, job_id)
+            job.status = 'failed'
+            job.error_message = str(e)
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+
+        return job
+
+    @staticmethod
+    def _external_id(value):
+        return int(value) if value is not None else None
+
+    @staticmethod
+    def _utc_naive(value):
+        if value and value.tzinfo:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @staticmethod
+    def _high_water(parsed_rows, seen_at):
+        """Max seen_at of the parsed rows of a page"""
+        seen = [seen_at(row) for row in parsed_rows if seen_at(row)]
+        return max(seen) if seen else None
+
+    @staticmethod
+    def _split_page(model, parsed_rows, update_existing, extra_columns=()):
+        """
+        Separate a page into inserts and updates using one lookup of the
+        page's external_ids. Returns (inserts, updates, skipped, previous)
+        where previous maps external_id -> existing row (for its old dates).
+        """
+        external_ids = {row['external_id'] for row in parsed_rows}
+        previous = {
+            row.external_id: row for row in db.session.query(
+                model.id, model.external_id, *extra_columns
+            ).filter(model.external_id.in_(external_ids))
+        } if external_ids else {}
+
+        inserts = {}
+        updates = {}
+        skipped = 0
+        for row in parsed_rows:
+            external_id = row['external_id']
+            if external_id in previous:
+                if update_existing:
+                    values = {k: v for k, v in row.items() if k != 'external_id'}
+                    updates[external_id] = {'id': previous[external_id].id, **values}
+                else:
+                    skipped += 1
+            elif external_id in inserts:
+                # Repeated in the page: the first one is created, the rest behave as existing
+                if update_existing:
+                    inserts[external_id] = row
+                else:
+                    skipped += 1
+            else:
+                inserts[external_id] = row
+
+        return list(inserts.values()), list(updates.values()), skipped, previous
+
+    @staticmethod
+    def _upsert_sales(items, update_existing):
+        errors = []
+        parsed = []
+        for fudo_sale in items:
+            try:
+                sale_data = parse_fudo_sale(fudo_sale)
+                sale_data['external_id'] = FudoSyncService._external_id(sale_data['external_id'])
+                parsed.append(sale_data)
+            except Exception as e:
+                logger.error(f"Error processing Fudo sale {fudo_sale.get('id')}: {str(e)}")
+                errors.append({'sale_id': fudo_sale.get('id'), 'error': str(e)})
+
+        inserts, updates, skipped, previous = FudoSyncService._split_page(
+            Sale, parsed, update_existing, (Sale.fecha, Sale.cerrada)
+        )
+        if inserts:
+            db.session.execute(insert(Sale), inserts)
+        if updates:
+            db.session.execute(update(Sale), updates)
+
+        daily_dates = set()
+        hourly_dates = set()
+        changed = inserts + updates
+        old_rows = [previous[row['external_id']] for row in parsed
+                    if update_existing and row['external_id'] in previous]
+        for row in changed + [{'fecha': r.fecha, 'cerrada': r.cerrada} for r in old_rows]:
+            daily_dates.add(row['fecha'])
+            closed_date = SalesRollupService.local_closed_date(row['cerrada'])
+            if closed_date:
+                hourly_dates.add(closed_date)
+        if daily_dates or hourly_dates:
+            SalesRollupService.refresh_dates(daily_dates, hourly_dates)
+
+        return {
+            'imported': len(inserts),
+            'updated': len(parsed) - len(inserts) - skipped if update_existing else 0,
+            'skipped': skipped,
+            'errors': errors,
+            'dates': daily_dates | hourly_dates,
+            'high_water': FudoSyncService._high_water(
+                parsed, lambda row: FudoSyncService._utc_naive(row['cerrada'] or row['creacion'])
+            )
+        }
+
+    @staticmethod
+    def _upsert_expenses(items, update_existing, category_mapping):
+        errors = []
+        parsed = []
+        no_category_mapping = 0
+        for fudo_expense in items:
+            try:
+                expense_data = parse_fudo_expense(fudo_expense, category_mapping)
+                if not expense_data:
+                    errors.append({'expense_id': fudo_expense.get('id'), 'error': 'Error parsing expense data'})
+                    continue
+                if not expense_data.get('category_id'):
+                    no_category_mapping += 1
+                expense_data['external_id'] = FudoSyncService._external_id(expense_data['external_id'])
+                parsed.append(expense_data)
+            except Exception as e:
+                logger.error(f"Error processing Fudo expense {fudo_expense.get('id')}: {str(e)}")
+                errors.append({'expense_id': fudo_expense.get('id'), 'error': str(e)})
+
+        inserts, updates, skipped, previous = FudoSyncService._split_page(
+            Expense, parsed, update_existing, (Expense.fecha,)
+        )
+        if inserts:
+            db.session.execute(insert(Expense), inserts)
+        if updates:
+            db.session.execute(update(Expense), updates)
+
+        dates = {row['fecha'] for row in inserts + updates}
+        if update_existing:
+            dates |= {previous[row['external_id']].fecha for row in parsed if row['external_id'] in previous}
+
+        return {
+            'imported': len(inserts),
+            'updated': len(parsed) - len(inserts) - skipped if update_existing else 0,
+            'skipped': skipped,
+            'no_category_mapping': no_category_mapping,
+            'errors': errors,
+            'dates': dates,
+            'high_water': FudoSyncService._high_water(
+                parsed, lambda row: datetime.combine(row['fecha'], datetime.min.time())
+            )
+        }
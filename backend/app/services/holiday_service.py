@@ -1,5 +1,6 @@
 from app.extensions import db
 from app.models.ml_tracking import Holiday
+from app.utils.holiday_calendar import holiday_calendar
 from datetime import datetime, date
 
 class HolidayService:
@@ -57,12 +58,11 @@ class HolidayService:
     
     @staticmethod
     def is_holiday(check_date):
-        """Check if a date is a holiday"""
+        """Check if a date is a holiday (served from the in-memory holiday calendar)"""
         if isinstance(check_date, str):
             check_date = datetime.strptime(check_date, '%Y-%m-%d').date()
         
-        holiday = Holiday.query.filter_by(date=check_date).first()
-        return holiday is not None
+        return holiday_calendar.is_holiday(check_date)
     
     @staticmethod
     def get_holiday(check_date):
@@ -0,0 +1,91 @@
+import numpy as np
+
+from app.extensions import db
+from app.models.shift import Shift
+
+
+MINUTES_PER_DAY = 24 * 60
+
+# Hourly slot bounds over two days, so shifts crossing midnight (end <= start)
+# are measured in one pass and folded back onto hours 0-23
+_SLOT_STARTS = np.arange(48) * 60
+_SLOT_ENDS = _SLOT_STARTS + 60
+
+# 1970-01-01 (day 0 of datetime64[D]) was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+class LaborDistribution:
+    """
+    Scheduled hours and labor cost of every shift in a date range, by weekday
+    and by hour of day, computed with NumPy over column arrays.
+
+    Shifts are loaded with a single column query (no ORM objects); each shift's
+    effective rate applies the holiday multiplier, or the Sunday multiplier,
+    of the employee's job position (same rule as _shift_effective_rate).
+    """
+
+    def __init__(self, start_date, end_date, employee_rates, holiday_dates):
+        self.start_date = start_date
+        self.end_date = end_date
+
+        rows = db.session.query(
+            Shift.employee_id,
+            Shift.shift_date,
+            Shift.start_time,
+            Shift.end_time,
+            Shift.hours
+        ).filter(
+            Shift.shift_date >= start_date,
+            Shift.shift_date <= end_date
+        ).all()
+
+        count = len(rows)
+        employee_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+        dates = np.array([row[1] for row in rows], dtype='datetime64[D]').reshape(count)
+        self.start_minutes = np.fromiter(
+            (row[2].hour * 60 + row[2].minute for row in rows), dtype=np.int64, count=count
+        )
+        end_minutes = np.fromiter(
+            (row[3].hour * 60 + row[3].minute for row in rows), dtype=np.int64, count=count
+        )
+        self.end_minutes = np.where(end_minutes <= self.start_minutes, end_minutes + MINUTES_PER_DAY, end_minutes)
+        self.hours = np.fromiter((float(row[4]) for row in rows), dtype=np.float64, count=count)
+
+        self.weekdays = (dates.astype(np.int64) + _EPOCH_WEEKDAY) % 7
+        self.rates = self._effective_rates(employee_ids, dates, employee_rates, holiday_dates)
+
+    def _effective_rates(self, employee_ids, dates, employee_rates, holiday_dates):
+        unique_ids, inverse = np.unique(employee_ids, return_inverse=True)
+        lookup = np.array(
+            [employee_rates.get(int(emp_id), (0.0, 1.0, 1.0)) for emp_id in unique_ids],
+            dtype=np.float64
+        ).reshape(len(unique_ids), 3)
+        base_rate, sunday_mult, holiday_mult = lookup[inverse].T
+
+        is_holiday = np.isin(dates, np.array(sorted(holiday_dates), dtype='datetime64[D]'))
+        is_sunday = self.weekdays == 6
+        multiplier = np.where(is_holiday, holiday_mult, np.where(is_sunday, sunday_mult, 1.0))
+        return base_rate * multiplier
+
+    def by_weekday(self):
+        """(hours[7], cost[7]) indexed by weekday (0=Monday), from the shifts' stored hours"""
+        hours = np.bincount(self.weekdays, weights=self.hours, minlength=7)
+        cost = np.bincount(self.weekdays, weights=self.hours * self.rates, minlength=7)
+        return hours, cost
+
+    def by_hour(self):
+        """
+        (hours[24], cost[24], covered[24]) per hour of day from each shift's
+        start/end time, split at hour boundaries; covered marks the hours
+        touched by at least one shift.
+        """
+        starts = self.start_minutes[:, None]
+        ends = self.end_minutes[:, None]
+        overlap = np.clip(np.minimum(ends, _SLOT_ENDS) - np.maximum(starts, _SLOT_STARTS), 0, None)
+        minutes = overlap[:, :24] + overlap[:, 24:]
+
+        hours = minutes.sum(axis=0) / 60.0
+        cost = (self.rates @ minutes) / 60.0 if len(self.rates) else np.zeros(24)
+        covered = (minutes > 0).any(axis=0)
+        return hours, cost, covered
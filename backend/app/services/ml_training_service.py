@@ -0,0 +1,258 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.ml_training_job import MLTrainingJob
+from app.ml.staffing_predictor import StaffingPredictor
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Attempts to take the active slot when another worker keeps winning the race
+CREATE_ATTEMPTS = 3
+
+# App of each pool worker process, created once by _init_worker
+_worker_app = None
+
+
+def _init_worker(config_name):
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app(config_name)
+
+
+def _run_in_worker(job_id):
+    with _worker_app.app_context():
+        try:
+            MLTrainingService.run_job(job_id)
+        finally:
+            db.session.remove()
+
+
+class _Heartbeat:
+    """
+    Touch the job's updated_at every `interval` seconds from a thread while the
+    model is fitted, so a long fit or grid search does not look stale. Uses
+    its own connection; a non-positive interval disables it.
+    """
+
+    def __init__(self, engine, job_id, interval):
+        self.engine = engine
+        self.job_id = job_id
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'ml-training-heartbeat-{job_id}', daemon=True)
+
+    def _run(self):
+        table = MLTrainingJob.__table__
+        while not self._stop.wait(self.interval):
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(
+                        update(table)
+                        .where(table.c.id == self.job_id, table.c.status == 'running')
+                        .values(updated_at=datetime.utcnow())
+                    )
+            except Exception as e:
+                logger.warning(f"ML training job {self.job_id} heartbeat failed: {str(e)}")
+
+    def __enter__(self):
+        if self.interval > 0:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+class MLTrainingService:
+    """
+    Background training of the staffing model.
+
+    Jobs run in a process pool (ML_TRAINING_PROCESSES workers, spawned so
+    they do not inherit the web worker's DB connections), so fitting the
+    forest on all cores does not block a request worker. With
+    ML_TRAINING_INLINE (tests) the job runs inside the request instead.
+
+    Only one job is active at a time, enforced by the unique active_lock
+    column so it holds across web workers: new requests get the running job
+    back. While fitting, a heartbeat keeps updated_at fresh; a job without
+    updates for ML_TRAINING_STALE_MINUTES is considered abandoned.
+    """
+
+    @staticmethod
+    def is_stale(job):
+        """Pending/running job whose worker stopped reporting progress"""
+        stale_after = timedelta(minutes=current_app.config.get('ML_TRAINING_STALE_MINUTES', 30))
+        last_update = job.updated_at or job.created_at
+        return last_update < datetime.utcnow() - stale_after
+
+    @staticmethod
+    def active_job():
+        """Job holding the active slot, if it is still making progress"""
+        job = MLTrainingJob.query.filter(MLTrainingJob.active_lock.is_(True)).first()
+        if job and not MLTrainingService.is_stale(job):
+            return job
+        return None
+
+    @staticmethod
+    def release_stale():
+        """Mark an abandoned active job as failed, freeing the active slot (atomic)"""
+        stale_minutes = current_app.config.get('ML_TRAINING_STALE_MINUTES', 30)
+        now = datetime.utcnow()
+        db.session.execute(
+            update(MLTrainingJob)
+            .where(
+                MLTrainingJob.active_lock.is_(True),
+                func.coalesce(MLTrainingJob.updated_at, MLTrainingJob.created_at) < now - timedelta(minutes=stale_minutes)
+            )
+            .values(status='failed', active_lock=None, finished_at=now,
+                    error_message=f'No progress for {stale_minutes} minutes, abandoned')
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    @staticmethod
+    def create_job(params, user_id=None):
+        """
+        Create a training job. Returns (job, created): if another job is still
+        active it is returned instead, so concurrent requests share one training.
+        The insert takes the unique active slot, so of two workers racing past
+        the check only one creates its job.
+        """
+        for _ in range(CREATE_ATTEMPTS):
+            job = MLTrainingService.active_job()
+            if job:
+                return job, False
+            MLTrainingService.release_stale()
+
+            job = MLTrainingJob(status='pending', params=params, progress=0, created_by=user_id, active_lock=True)
+            db.session.add(job)
+            try:
+                db.session.commit()
+                return job, True
+            except IntegrityError:
+                # Another worker took the slot between the check and the insert
+                db.session.rollback()
+        raise RuntimeError('Could not create the training job: the active slot keeps changing')
+
+    @staticmethod
+    def _pool(app):
+        global _executor
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=app.config.get('ML_TRAINING_PROCESSES', 1),
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(app.config['CONFIG_NAME'],)
+                )
+            return _executor
+
+    @staticmethod
+    def shutdown_pool(wait=True):
+        """Stop the worker processes (they are started again on the next job)"""
+        global _executor
+        with _executor_lock:
+            if _executor is not None:
+                _executor.shutdown(wait=wait)
+                _executor = None
+
+    @staticmethod
+    def start_job(app, job_id):
+        """Run the job in the process pool (or inline when ML_TRAINING_INLINE is set)"""
+        if app.config.get('ML_TRAINING_INLINE'):
+            MLTrainingService.run_job(job_id)
+            return
+
+        def log_crash(future):
+            # run_job records its own failures; this only catches a dead worker process
+            if future.exception():
+                logger.error(f"ML training job {job_id} worker crashed: {future.exception()}")
+
+        MLTrainingService._pool(app).submit(_run_in_worker, job_id).add_done_callback(log_crash)
+
+    @staticmethod
+    def _finish(job_id, **values):
+        """
+        Take the job out of the active slot, only if it still holds it (atomic,
+        like release_stale): a job released as abandoned is not overwritten by
+        its late finish. The caller commits.
+        """
+        result = db.session.execute(
+            update(MLTrainingJob)
+            .where(MLTrainingJob.id == job_id, MLTrainingJob.active_lock.is_(True))
+            .values(active_lock=None, finished_at=datetime.utcnow(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def run_job(job_id):
+        """Train the model, recording stage/progress and the resulting metrics in the job"""
+        started = db.session.execute(
+            update(MLTrainingJob)
+            .where(MLTrainingJob.id == job_id, MLTrainingJob.active_lock.is_(True))
+            .values(status='running', error_message=None, started_at=datetime.utcnow(), finished_at=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+        db.session.commit()
+        job = db.session.get(MLTrainingJob, job_id)
+        if not started:
+            # Released as abandoned before a worker picked it up
+            logger.warning(f"ML training job {job_id} is no longer active, skipping")
+            return job
+
+        def progress(stage, percent):
+            job.stage = stage
+            job.progress = percent
+            db.session.commit()
+
+        def complete(version_id):
+            # Runs in the transaction that activates the new version
+            return MLTrainingService._finish(
+                job_id, status='completed', stage='completed', progress=100, model_version_id=version_id
+            )
+
+        params = job.params or {}
+        heartbeat = _Heartbeat(db.engine, job.id, current_app.config.get('ML_TRAINING_HEARTBEAT_SECONDS', 60))
+        try:
+            with heartbeat:
+                result = StaffingPredictor().train(
+                    min_weeks=params.get('min_weeks', 8),
+                    n_jobs=current_app.config.get('ML_TRAINING_N_JOBS', -1),
+                    progress=progress,
+                    commit_guard=complete
+                )
+            if result['success']:
+                job.result = result
+                db.session.commit()
+            elif MLTrainingService._finish(job_id, status='failed', error_message=result['error'], result=result):
+                db.session.commit()
+            else:
+                db.session.rollback()
+                logger.warning(f"ML training job {job_id} was released as abandoned, result discarded")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"ML training job {job_id} failed: {str(e)}")
+            if MLTrainingService._finish(job_id, status='failed', error_message=str(e)):
+                db.session.commit()
+            else:
+                db.session.rollback()
+
+        job = db.session.get(MLTrainingJob, job_id)
+        db.session.refresh(job)
+        logger.info(f"ML training job {job.id} {job.status}")
+        return job
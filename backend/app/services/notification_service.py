@@ -1,3 +1,4 @@
+from sqlalchemy import insert
 from app.extensions import db
 from app.models.notification import Notification, ScheduleChangeLog
 from app.models.shift import Shift
@@ -56,6 +57,47 @@ class NotificationService:
             db.session.add(log)
             db.session.commit()
     
+    @staticmethod
+    def notify_shifts_added(shifts, changed_by_user_id):
+        """
+        Notify employees of a batch of added shifts with one INSERT for the
+        notifications and one for the change logs. Does not commit, so the
+        caller can commit them with the shifts. Returns the notifications sent.
+        """
+        notifications = []
+        logs = []
+        for shift in shifts:
+            employee = shift.employee
+            if not employee or not employee.user_id:
+                continue
+
+            notifications.append({
+                'user_id': employee.user_id,
+                'title': "Nuevo turno asignado",
+                'message': f"Se te ha asignado un turno el {shift.shift_date} de {shift.start_time.strftime('%H:%M')} a {shift.end_time.strftime('%H:%M')}",
+                'type': 'shift_added',
+                'related_schedule_id': shift.schedule_id,
+                'related_shift_id': shift.id
+            })
+            logs.append({
+                'schedule_id': shift.schedule_id,
+                'shift_id': shift.id,
+                'change_type': 'shift_added',
+                'changed_by': changed_by_user_id,
+                'affected_employee_id': employee.id,
+                'new_data': {
+                    'shift_date': str(shift.shift_date),
+                    'start_time': str(shift.start_time),
+                    'end_time': str(shift.end_time),
+                    'hours': float(shift.hours)
+                }
+            })
+
+        if notifications:
+            db.session.execute(insert(Notification), notifications)
+            db.session.execute(insert(ScheduleChangeLog), logs)
+        return len(notifications)
+    
     @staticmethod
     def notify_shift_modified(shift, old_data, changed_by_user_id):
         """Notify employee when their shift is modified"""
@@ -0,0 +1,230 @@
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.absence_request import AbsenceRequest
+from app.models.employee import Employee
+from app.models.payroll import Payroll
+from app.models.shift import Shift
+from app.models.time_tracking import TimeTracking
+from app.models.work_block import WorkBlock
+from app.utils.payroll_utils import (
+    get_month_range,
+    build_daily_records,
+    calculate_cost_from_daily_records
+)
+from app.utils.report_cache import report_cache
+from app.utils.holiday_calendar import holiday_calendar
+
+
+_Block = namedtuple('_Block', 'id start_time end_time')
+_ScheduledShift = namedtuple('_ScheduledShift', 'start_time end_time hours')
+_Absence = namedtuple('_Absence', 'start_date end_date')
+
+
+class MonthSnapshot:
+    """
+    Everything needed to compute a month's payroll for many employees, loaded
+    with a fixed number of set-based queries (independent of headcount).
+    """
+
+    def __init__(self, year, month, employee_ids=None):
+        self.year = year
+        self.month = month
+        self.start_date, self.end_date = get_month_range(month, year)
+
+        self.time_records = defaultdict(list)   # employee_id -> [(tracking_date, [blocks])]
+        self.shifts = defaultdict(lambda: defaultdict(list))  # employee_id -> date -> [shifts]
+        self.absences = defaultdict(list)       # employee_id -> [absences]
+        self.holiday_dates = set()
+
+        self._load(employee_ids)
+
+    def _filter_employees(self, query, column, employee_ids):
+        return query.filter(column.in_(employee_ids)) if employee_ids is not None else query
+
+    def _load(self, employee_ids):
+        start_date, end_date = self.start_date, self.end_date
+
+        rows = self._filter_employees(db.session.query(
+            TimeTracking.employee_id,
+            TimeTracking.id,
+            TimeTracking.tracking_date,
+            WorkBlock.id,
+            WorkBlock.start_time,
+            WorkBlock.end_time
+        ).outerjoin(
+            WorkBlock, WorkBlock.time_tracking_id == TimeTracking.id
+        ).filter(
+            TimeTracking.tracking_date >= start_date,
+            TimeTracking.tracking_date < end_date
+        ), TimeTracking.employee_id, employee_ids).order_by(TimeTracking.id, WorkBlock.id).all()
+
+        records_by_id = {}
+        for employee_id, record_id, tracking_date, block_id, block_start, block_end in rows:
+            record = records_by_id.get(record_id)
+            if record is None:
+                record = records_by_id[record_id] = (tracking_date, [])
+                self.time_records[employee_id].append(record)
+            if block_id is not None:
+                record[1].append(_Block(block_id, block_start, block_end))
+
+        shifts = self._filter_employees(db.session.query(
+            Shift.employee_id, Shift.shift_date, Shift.start_time, Shift.end_time, Shift.hours
+        ).filter(
+            Shift.shift_date >= start_date,
+            Shift.shift_date < end_date
+        ), Shift.employee_id, employee_ids).order_by(Shift.id).all()
+
+        for employee_id, shift_date, shift_start, shift_end, hours in shifts:
+            self.shifts[employee_id][shift_date].append(_ScheduledShift(shift_start, shift_end, hours))
+
+        absences = self._filter_employees(db.session.query(
+            AbsenceRequest.employee_id, AbsenceRequest.start_date, AbsenceRequest.end_date
+        ).filter(
+            AbsenceRequest.status == 'approved',
+            AbsenceRequest.start_date <= end_date - timedelta(days=1),
+            AbsenceRequest.end_date >= start_date
+        ), AbsenceRequest.employee_id, employee_ids).all()
+
+        for employee_id, absence_start, absence_end in absences:
+            self.absences[employee_id].append(_Absence(absence_start, absence_end))
+
+        self.holiday_dates = set(holiday_calendar.holidays_between(start_date, end_date - timedelta(days=1)))
+
+    def employees_with_records(self):
+        return set(self.time_records.keys())
+
+    def worked_hours(self, employee_id):
+        """(total_hours, daily_records), same result as calculate_hours_from_time_tracking"""
+        employee_shifts = self.shifts.get(employee_id, {})
+        return build_daily_records(
+            self.time_records.get(employee_id, []),
+            self.absences.get(employee_id, []),
+            lambda current_date: employee_shifts.get(current_date, []),
+            self.start_date,
+            self.end_date
+        )
+
+    def scheduled_hours(self, employee_id):
+        """Same result as calculate_scheduled_hours (total only)"""
+        return sum(
+            float(shift.hours)
+            for shifts in self.shifts.get(employee_id, {}).values()
+            for shift in shifts
+        )
+
+
+class PayrollBatchService:
+    """Generates the monthly payroll of many employees at once"""
+
+    @staticmethod
+    def generate_month(year, month, generated_by, employee_ids=None, notes=''):
+        """
+        Compute and insert the payroll of every active employee with time
+        records in the month (or of the given employee_ids). Employees that
+        already have a payroll for the period or no hourly rate are skipped.
+        """
+        employees_query = Employee.query.options(db.joinedload(Employee.job_position))
+        if employee_ids is not None:
+            employees_query = employees_query.filter(Employee.id.in_(employee_ids))
+        else:
+            employees_query = employees_query.filter(Employee.status == 'activo')
+        employees = employees_query.all()
+
+        snapshot = MonthSnapshot(year, month, [e.id for e in employees])
+
+        existing = {
+            employee_id for (employee_id,) in db.session.query(Payroll.employee_id).filter(
+                Payroll.year == year,
+                Payroll.month == month
+            )
+        }
+
+        rows = []
+        created = []
+        skipped = []
+        with_records = snapshot.employees_with_records()
+
+        for employee in sorted(employees, key=lambda e: e.full_name):
+            if employee_ids is None and employee.id not in with_records:
+                continue
+
+            if employee.id in existing:
+                skipped.append({
+                    'employee_id': employee.id,
+                    'employee_name': employee.full_name,
+                    'reason': 'Ya existe una nómina para este empleado en este período'
+                })
+                continue
+
+            job_position = employee.job_position
+            if not job_position or not job_position.hourly_rate:
+                skipped.append({
+                    'employee_id': employee.id,
+                    'employee_name': employee.full_name,
+                    'reason': 'El empleado no tiene un puesto con tarifa horaria configurada'
+                })
+                continue
+
+            hourly_rate = float(job_position.hourly_rate)
+            worked_hours, daily_records = snapshot.worked_hours(employee.id)
+            scheduled_hours = snapshot.scheduled_hours(employee.id)
+            gross_salary = calculate_cost_from_daily_records(
+                daily_records, hourly_rate, job_position, holiday_dates=snapshot.holiday_dates
+            )
+
+            rows.append({
+                'employee_id': employee.id,
+                'month': month,
+                'year': year,
+                'hours_worked': Decimal(str(worked_hours)),
+                'scheduled_hours': Decimal(str(scheduled_hours)),
+                'hourly_rate': Decimal(str(hourly_rate)),
+                'gross_salary': Decimal(str(gross_salary)),
+                'extraordinary_amount': Decimal('0'),
+                'status': 'draft',
+                'pdf_generated': False,
+                'notes': notes,
+                'generated_by': generated_by
+            })
+            created.append({
+                'employee_id': employee.id,
+                'employee_name': employee.full_name,
+                'hours_worked': worked_hours,
+                'scheduled_hours': scheduled_hours,
+                'hourly_rate': hourly_rate,
+                'gross_salary': gross_salary
+            })
+
+        if rows:
+            try:
+                db.session.execute(insert(Payroll), rows)
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                return {
+                    'success': False,
+                    'error': 'Otra liquidación del período se generó en paralelo, reintente'
+                }
+
+            ids = dict(db.session.query(Payroll.employee_id, Payroll.id).filter(
+                Payroll.year == year,
+                Payroll.month == month,
+                Payroll.employee_id.in_([r['employee_id'] for r in rows])
+            ).all())
+            for item in created:
+                item['payroll_id'] = ids.get(item['employee_id'])
+
+            # La inserción masiva no pasa por los eventos ORM
+            report_cache.invalidate_range(snapshot.start_date, snapshot.end_date - timedelta(days=1))
+
+        return {
+            'success': True,
+            'created': created,
+            'skipped': skipped
+        }
@@ -0,0 +1,109 @@
+from itertools import islice
+
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models.sale import Sale
+from app.services.sales_rollup_service import SalesRollupService
+from app.utils.report_cache import report_cache
+
+
+class SalesImportService:
+    """Bulk import of sales from a Fudo CSV export"""
+
+    CHUNK_SIZE = 1000
+
+    @staticmethod
+    def _chunks(iterable, size):
+        iterator = iter(iterable)
+        while True:
+            chunk = list(islice(iterator, size))
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def import_rows(rows, chunk_size=CHUNK_SIZE):
+        """
+        Import CSV row dicts (as produced by csv.DictReader, header on line 1).
+
+        Each chunk of rows is parsed, checked against the existing external_ids
+        with a single IN query and written with one Core insert. Rows whose Id
+        already exists (in the database or earlier in the file) are skipped.
+        Returns the same results summary as the row-by-row import.
+        """
+        results = {
+            'total_rows': 0,
+            'imported': 0,
+            'updated': 0,
+            'skipped': 0,
+            'errors': []
+        }
+        seen_ids = set()
+        daily_dates = set()
+        hourly_dates = set()
+
+        rows = enumerate(rows, start=2)
+        for chunk in SalesImportService._chunks(rows, chunk_size):
+            results['total_rows'] += len(chunk)
+
+            chunk_ids = set()
+            for _, row in chunk:
+                external_id = (row.get('Id') or '').strip()
+                if external_id.isdigit():
+                    chunk_ids.add(int(external_id))
+
+            existing_ids = {
+                external_id for (external_id,) in db.session.query(Sale.external_id).filter(
+                    Sale.external_id.in_(chunk_ids)
+                )
+            } if chunk_ids else set()
+
+            to_insert = []
+            for row_num, row in chunk:
+                try:
+                    external_id = (row.get('Id') or '').strip()
+
+                    if external_id:
+                        external_id = int(external_id)
+                        if external_id in existing_ids or external_id in seen_ids:
+                            results['skipped'] += 1
+                            continue
+
+                    values = Sale.parse_csv_row(row)
+
+                    if not values['fecha']:
+                        results['errors'].append({
+                            'row': row_num,
+                            'data': dict(row),
+                            'errors': ['La fecha es requerida o tiene formato inválido']
+                        })
+                        continue
+
+                    if values['external_id'] is not None:
+                        seen_ids.add(values['external_id'])
+                    to_insert.append(values)
+
+                except Exception as e:
+                    results['errors'].append({
+                        'row': row_num,
+                        'data': dict(row),
+                        'errors': [str(e)]
+                    })
+
+            if to_insert:
+                db.session.execute(insert(Sale), to_insert)
+                results['imported'] += len(to_insert)
+                for values in to_insert:
+                    daily_dates.add(values['fecha'])
+                    closed_date = SalesRollupService.local_closed_date(values['cerrada'])
+                    if closed_date:
+                        hourly_dates.add(closed_date)
+
+        # Core inserts bypass the ORM session hooks: refresh rollups and cache explicitly
+        if daily_dates or hourly_dates:
+            SalesRollupService.refresh_dates(daily_dates, hourly_dates)
+        db.session.commit()
+        report_cache.invalidate_dates(daily_dates | hourly_dates)
+
+        return results
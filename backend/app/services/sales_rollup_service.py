@@ -0,0 +1,222 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import event, func, inspect, insert, delete, select
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.sale import Sale
+from app.models.sales_rollup import SalesDailyRollup, SalesHourlyRollup
+
+
+class SalesRollupService:
+    """Maintains the pre-aggregated daily/hourly sales tables used by reports"""
+
+    # Sale.cerrada is stored in UTC, reports group by local Argentina time
+    LOCAL_OFFSET = timedelta(hours=-3)
+
+    # Sale attributes that change what a sale contributes to the rollups
+    TRACKED_FIELDS = ('fecha', 'cerrada', 'estado', 'total', 'tipo_venta', 'medio_pago', 'sala')
+
+    PENDING_KEY = 'sales_rollup_pending'
+
+    @staticmethod
+    def local_closed_date(cerrada):
+        """Local (UTC-3) date of a closing timestamp, or None"""
+        if cerrada is None:
+            return None
+        return (cerrada + SalesRollupService.LOCAL_OFFSET).date()
+
+    @staticmethod
+    def refresh_dates(daily_dates=(), hourly_dates=(), connection=None):
+        """
+        Recompute the rollup rows for the given dates from the sales table.
+
+        daily_dates are sale dates (Sale.fecha), hourly_dates are local closing
+        dates. Consecutive dates are refreshed as a single range.
+        """
+        connection = connection or db.session.connection()
+
+        for start, end in SalesRollupService._date_runs(daily_dates):
+            SalesRollupService._refresh_daily_range(connection, start, end)
+
+        for start, end in SalesRollupService._date_runs(hourly_dates):
+            SalesRollupService._refresh_hourly_range(connection, start, end)
+
+    @staticmethod
+    def rebuild_all(connection=None):
+        """Rebuild both rollups from scratch (backfill)"""
+        connection = connection or db.session.connection()
+
+        bounds = connection.execute(
+            select(func.min(Sale.fecha), func.max(Sale.fecha),
+                   func.min(Sale.cerrada), func.max(Sale.cerrada))
+        ).first()
+
+        connection.execute(delete(SalesDailyRollup.__table__))
+        connection.execute(delete(SalesHourlyRollup.__table__))
+
+        min_fecha, max_fecha, min_cerrada, max_cerrada = bounds
+        if min_fecha:
+            SalesRollupService._refresh_daily_range(connection, min_fecha, max_fecha)
+        if min_cerrada:
+            SalesRollupService._refresh_hourly_range(
+                connection,
+                SalesRollupService.local_closed_date(min_cerrada),
+                SalesRollupService.local_closed_date(max_cerrada)
+            )
+
+    @staticmethod
+    def _date_runs(dates):
+        """Group dates into (start, end) runs of consecutive days"""
+        runs = []
+        for current in sorted({d for d in dates if d is not None}):
+            if runs and current - runs[-1][1] == timedelta(days=1):
+                runs[-1][1] = current
+            else:
+                runs.append([current, current])
+        return [(start, end) for start, end in runs]
+
+    @staticmethod
+    def _refresh_daily_range(connection, start_date, end_date):
+        table = SalesDailyRollup.__table__
+
+        connection.execute(
+            delete(table).where(table.c.fecha >= start_date, table.c.fecha <= end_date)
+        )
+
+        aggregated = select(
+            Sale.fecha,
+            Sale.tipo_venta,
+            Sale.medio_pago,
+            Sale.sala,
+            func.coalesce(func.sum(Sale.total), 0),
+            func.count(Sale.id)
+        ).where(
+            Sale.fecha >= start_date,
+            Sale.fecha <= end_date,
+            Sale.estado == 'Cerrada'
+        ).group_by(Sale.fecha, Sale.tipo_venta, Sale.medio_pago, Sale.sala)
+
+        connection.execute(
+            insert(table).from_select(
+                ['fecha', 'tipo_venta', 'medio_pago', 'sala', 'total', 'cantidad'],
+                aggregated
+            )
+        )
+
+    @staticmethod
+    def _refresh_hourly_range(connection, start_date, end_date):
+        table = SalesHourlyRollup.__table__
+
+        connection.execute(
+            delete(table).where(table.c.fecha >= start_date, table.c.fecha <= end_date)
+        )
+
+        # Local date D covers UTC timestamps [D 03:00, D+1 03:00). Filtering on
+        # the raw column keeps the query portable and able to use an index.
+        utc_start = SalesRollupService._local_day_start_utc(start_date)
+        utc_end = SalesRollupService._local_day_start_utc(end_date + timedelta(days=1))
+
+        rows = connection.execute(
+            select(Sale.cerrada, Sale.tipo_venta, Sale.medio_pago, Sale.sala, Sale.total).where(
+                Sale.cerrada >= utc_start,
+                Sale.cerrada < utc_end,
+                Sale.estado == 'Cerrada'
+            ).execution_options(yield_per=5000)
+        )
+
+        buckets = {}
+        for cerrada, tipo_venta, medio_pago, sala, total in rows:
+            local = cerrada + SalesRollupService.LOCAL_OFFSET
+            key = (local.date(), local.hour, tipo_venta, medio_pago, sala)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [Decimal('0'), 0]
+            bucket[0] += Decimal(str(total or 0))
+            bucket[1] += 1
+
+        if buckets:
+            connection.execute(insert(table), [
+                {
+                    'fecha': fecha,
+                    'hora': hora,
+                    'tipo_venta': tipo_venta,
+                    'medio_pago': medio_pago,
+                    'sala': sala,
+                    'total': total,
+                    'cantidad': cantidad
+                }
+                for (fecha, hora, tipo_venta, medio_pago, sala), (total, cantidad) in buckets.items()
+            ])
+
+    @staticmethod
+    def _local_day_start_utc(local_date):
+        return datetime.combine(local_date, datetime.min.time()) - SalesRollupService.LOCAL_OFFSET
+
+    # ---- Session hooks ----
+
+    @staticmethod
+    def register_listeners():
+        """Keep the rollups in sync with ORM writes on Sale (idempotent)"""
+        if not event.contains(Session, 'after_flush', _collect_sale_changes):
+            event.listen(Session, 'after_flush', _collect_sale_changes)
+            event.listen(Session, 'before_commit', _apply_pending_refresh)
+            event.listen(Session, 'after_rollback', _discard_pending_refresh)
+            # Load the previous dates when they are set on an expired instance,
+            # so the day the sale moves away from is refreshed too
+            event.listen(Sale.fecha, 'set', _keep_previous_value, active_history=True)
+            event.listen(Sale.cerrada, 'set', _keep_previous_value, active_history=True)
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+def _sale_values(sale, field):
+    """Current and previous values of a Sale attribute within a flush"""
+    history = inspect(sale).attrs[field].history
+    values = list(history.added) + list(history.deleted) + list(history.unchanged)
+    if not values:
+        values = [getattr(sale, field)]
+    return values
+
+
+def _collect_sale_changes(session, flush_context):
+    daily = set()
+    hourly = set()
+
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Sale):
+            daily.add(obj.fecha)
+            hourly.add(SalesRollupService.local_closed_date(obj.cerrada))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Sale):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[f].history.has_changes() for f in SalesRollupService.TRACKED_FIELDS):
+            continue
+        daily.update(_sale_values(obj, 'fecha'))
+        hourly.update(SalesRollupService.local_closed_date(c) for c in _sale_values(obj, 'cerrada'))
+
+    daily.discard(None)
+    hourly.discard(None)
+    if not daily and not hourly:
+        return
+
+    pending = session.info.setdefault(SalesRollupService.PENDING_KEY, {'daily': set(), 'hourly': set()})
+    pending['daily'].update(daily)
+    pending['hourly'].update(hourly)
+
+
+def _apply_pending_refresh(session):
+    # Make sure the last pending changes are flushed so they are collected
+    session.flush()
+    pending = session.info.pop(SalesRollupService.PENDING_KEY, None)
+    if pending:
+        SalesRollupService.refresh_dates(pending['daily'], pending['hourly'], session.connection())
+
+
+def _discard_pending_refresh(session):
+    session.info.pop(SalesRollupService.PENDING_KEY, None)
@@ -1,9 +1,12 @@
 from datetime import datetime, date, timedelta
-from sqlalchemy import and_
+from collections import defaultdict
+from sqlalchemy import and_, insert
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.models.schedule import Schedule
 from app.models.shift import Shift
 from app.models.employee import Employee
+from app.utils.report_cache import report_cache
 
 class ScheduleService:
     
@@ -175,55 +178,151 @@ class ScheduleService:
     
     @staticmethod
     def calculate_schedule_cost(schedule_id):
-        """Calculate total cost of a schedule based on employee hourly rates"""
-        shifts = Shift.query.filter_by(schedule_id=schedule_id).all()
-        
-        total_cost = 0
-        hours_by_employee = {}
-        
-        for shift in shifts:
-            employee = shift.employee
-            hours = float(shift.hours)
-            rate = float(employee.job_position.hourly_rate) if employee.job_position and employee.job_position.hourly_rate else 0.0
-            
-            if employee.id not in hours_by_employee:
-                hours_by_employee[employee.id] = {
-                    'employee_name': employee.full_name,
-                    'hours': 0,
-                    'rate': rate,
-                    'cost': 0
-                }
-            
-            hours_by_employee[employee.id]['hours'] += hours
-            hours_by_employee[employee.id]['cost'] += hours * rate
-            total_cost += hours * rate
-        
-        return {
-            'total_cost': total_cost,
-            'by_employee': list(hours_by_employee.values())
-        }
+        """Calculate total cost of a schedule based on employee hourly rates and Sunday/holiday multipliers"""
+        from app.services.schedule_summary_service import ScheduleSummaryService
+        return ScheduleSummaryService.summarize(schedule_id)['cost_summary']
     
     @staticmethod
     def get_employee_hours_summary(schedule_id):
         """Get summary of hours per employee for a schedule"""
-        shifts = Shift.query.filter_by(schedule_id=schedule_id).all()
-        
-        summary = {}
-        for shift in shifts:
-            emp_id = shift.employee_id
-            if emp_id not in summary:
-                summary[emp_id] = {
-                    'employee_id': emp_id,
-                    'employee_name': shift.employee.full_name,
-                    'total_hours': 0,
-                    'shift_count': 0
-                }
-            
-            summary[emp_id]['total_hours'] += float(shift.hours)
-            summary[emp_id]['shift_count'] += 1
-        
-        return list(summary.values())
+        from app.services.schedule_summary_service import ScheduleSummaryService
+        return ScheduleSummaryService.summarize(schedule_id)['hours_summary']
     
+    @staticmethod
+    def find_batch_conflicts(candidates):
+        """
+        Check a batch of new shifts for overlaps, against the existing shifts
+        (loaded in one query) and against each other.
+
+        candidates: dicts with employee_id, shift_date, start_time, end_time.
+        Returns a list of {'index', 'conflicting_shift' | 'conflicting_index'}
+        using the same overlap rule as check_shift_conflicts.
+        """
+        if not candidates:
+            return []
+
+        employee_ids = {c['employee_id'] for c in candidates}
+        dates = [c['shift_date'] for c in candidates]
+        existing_shifts = Shift.query.filter(
+            Shift.employee_id.in_(employee_ids),
+            Shift.shift_date >= min(dates),
+            Shift.shift_date <= max(dates)
+        ).all()
+
+        existing_by_day = defaultdict(list)
+        for existing in existing_shifts:
+            existing_by_day[(existing.employee_id, existing.shift_date)].append(existing)
+
+        conflicts = []
+        batch_by_day = defaultdict(list)
+        for index, c in enumerate(candidates):
+            key = (c['employee_id'], c['shift_date'])
+            existing = next(
+                (e for e in existing_by_day[key] if c['start_time'] < e.end_time and c['end_time'] > e.start_time),
+                None
+            )
+            other = next(
+                (i for i in batch_by_day[key]
+                 if c['start_time'] < candidates[i]['end_time'] and c['end_time'] > candidates[i]['start_time']),
+                None
+            )
+            if existing is not None:
+                conflicts.append({'index': index, 'conflicting_shift': existing})
+            elif other is not None:
+                conflicts.append({'index': index, 'conflicting_index': other})
+            batch_by_day[key].append(index)
+
+        return conflicts
+
+    @staticmethod
+    def serialize_conflicts(conflicts, candidates):
+        """JSON-ready view of find_batch_conflicts results"""
+        return [
+            {
+                'index': conflict['index'],
+                'employee_id': candidates[conflict['index']]['employee_id'],
+                'shift_date': candidates[conflict['index']]['shift_date'].isoformat(),
+                'conflicting_shift': conflict['conflicting_shift'].to_dict() if 'conflicting_shift' in conflict else None,
+                'conflicting_index': conflict.get('conflicting_index')
+            }
+            for conflict in conflicts
+        ]
+
+    @staticmethod
+    def add_shifts_bulk(schedule, candidates, changed_by_user_id=None):
+        """
+        Add a batch of shifts to a schedule in one transaction (one executemany
+        INSERT). Conflicts must be checked beforehand (find_batch_conflicts).
+        If the schedule is published, employees are notified in the same commit.
+        Returns the created shifts with their employees loaded.
+        """
+        from app.services.notification_service import NotificationService
+
+        if not candidates:
+            return []
+
+        rows = []
+        for c in candidates:
+            shift = Shift(**c)
+            shift.calculate_hours()
+            rows.append({
+                'schedule_id': schedule.id,
+                'employee_id': c['employee_id'],
+                'shift_date': c['shift_date'],
+                'start_time': c['start_time'],
+                'end_time': c['end_time'],
+                'hours': shift.hours
+            })
+        db.session.execute(insert(Shift), rows)
+
+        # The batch has no overlaps, so employee, date and times identify each new shift
+        keys = {(r['employee_id'], r['shift_date'], r['start_time'], r['end_time']) for r in rows}
+        query = Shift.query.options(joinedload(Shift.employee)).filter(
+            Shift.schedule_id == schedule.id,
+            Shift.employee_id.in_({r['employee_id'] for r in rows}),
+            Shift.shift_date >= min(r['shift_date'] for r in rows),
+            Shift.shift_date <= max(r['shift_date'] for r in rows)
+        ).order_by(Shift.shift_date, Shift.start_time, Shift.id)
+
+        def created_shifts():
+            return [
+                shift for shift in query.all()
+                if (shift.employee_id, shift.shift_date, shift.start_time, shift.end_time) in keys
+            ]
+
+        if schedule.status == 'published' and changed_by_user_id:
+            NotificationService.notify_shifts_added(created_shifts(), changed_by_user_id)
+
+        db.session.commit()
+        # The bulk insert does not go through the ORM events
+        report_cache.invalidate_range(min(r['shift_date'] for r in rows), max(r['shift_date'] for r in rows))
+
+        # Loaded after the commit so serializing them does not refresh each one
+        return created_shifts()
+
+    @staticmethod
+    def week_clone_candidates(source_schedule, source_week_start, target_week_start):
+        """
+        Shifts of source_schedule in the week starting at source_week_start,
+        moved to the week starting at target_week_start (same weekday and times).
+        """
+        offset = target_week_start - source_week_start
+        shifts = Shift.query.filter(
+            Shift.schedule_id == source_schedule.id,
+            Shift.shift_date >= source_week_start,
+            Shift.shift_date < source_week_start + timedelta(days=7)
+        ).order_by(Shift.shift_date, Shift.start_time, Shift.employee_id).all()
+
+        return [
+            {
+                'employee_id': shift.employee_id,
+                'shift_date': shift.shift_date + offset,
+                'start_time': shift.start_time,
+                'end_time': shift.end_time
+            }
+            for shift in shifts
+        ]
+
     @staticmethod
     def check_shift_conflicts(employee_id, shift_date, start_time, end_time, exclude_shift_id=None):
         """Check if a shift conflicts with existing shifts for an employee"""
@@ -0,0 +1,116 @@
+from sqlalchemy import case, extract, func
+
+from app.extensions import db
+from app.models.employee import Employee
+from app.models.job_position import JobPosition
+from app.models.schedule import Schedule
+from app.models.shift import Shift
+from app.utils.holiday_calendar import holiday_calendar
+
+
+HOLIDAY = 'holiday'
+SUNDAY = 'sunday'
+REGULAR = 'regular'
+
+
+class ScheduleSummaryService:
+    """
+    Hours and labor cost of a schedule per employee, aggregated in SQL.
+
+    Shifts are grouped by employee and day type (holiday, Sunday or regular)
+    in one join of shifts x employees x job_positions. Each group is priced
+    with the job position's hourly rate and the holiday multiplier, or the
+    Sunday multiplier (same rule as reports._shift_effective_rate).
+    """
+
+    @staticmethod
+    def _day_type(holiday_dates):
+        # extract('dow') is 0 for Sunday on both PostgreSQL and SQLite
+        return case(
+            (Shift.shift_date.in_(sorted(holiday_dates)), HOLIDAY),
+            (extract('dow', Shift.shift_date) == 0, SUNDAY),
+            else_=REGULAR
+        )
+
+    @staticmethod
+    def summarize(schedule_id):
+        """
+        Returns {'cost_summary': {'total_cost', 'by_employee'}, 'hours_summary': [...]}
+        with the same shape as ScheduleService.calculate_schedule_cost and
+        get_employee_hours_summary.
+        """
+        schedule = db.session.get(Schedule, schedule_id)
+        if not schedule:
+            return {'cost_summary': {'total_cost': 0, 'by_employee': []}, 'hours_summary': []}
+
+        holiday_dates = holiday_calendar.holidays_between(schedule.start_date, schedule.end_date)
+        day_type = ScheduleSummaryService._day_type(holiday_dates).label('day_type')
+
+        rows = db.session.query(
+            Employee.id,
+            Employee.first_name,
+            Employee.last_name,
+            JobPosition.hourly_rate,
+            JobPosition.sunday_rate_multiplier,
+            JobPosition.holiday_rate_multiplier,
+            day_type,
+            func.sum(Shift.hours),
+            func.count(Shift.id)
+        ).join(
+            Employee, Shift.employee_id == Employee.id
+        ).outerjoin(
+            JobPosition, Employee.current_job_position_id == JobPosition.id
+        ).filter(
+            Shift.schedule_id == schedule_id
+        ).group_by(
+            Employee.id,
+            Employee.first_name,
+            Employee.last_name,
+            JobPosition.hourly_rate,
+            JobPosition.sunday_rate_multiplier,
+            JobPosition.holiday_rate_multiplier,
+            day_type
+        ).order_by(
+            Employee.last_name, Employee.first_name, Employee.id
+        ).all()
+
+        by_employee = {}
+        for emp_id, first_name, last_name, rate, sunday_mult, holiday_mult, kind, hours, shift_count in rows:
+            rate = float(rate) if rate else 0.0
+            multiplier = {
+                HOLIDAY: float(holiday_mult) if holiday_mult else 1.0,
+                SUNDAY: float(sunday_mult) if sunday_mult else 1.0
+            }.get(kind, 1.0)
+            hours = float(hours or 0)
+
+            summary = by_employee.setdefault(emp_id, {
+                'employee_id': emp_id,
+                'employee_name': f"{first_name} {last_name}",
+                'hours': 0.0,
+                'rate': rate,
+                'cost': 0.0,
+                'shift_count': 0
+            })
+            summary['hours'] += hours
+            summary['cost'] += hours * rate * multiplier
+            summary['shift_count'] += shift_count
+
+        employees = list(by_employee.values())
+        return {
+            'cost_summary': {
+                'total_cost': sum(e['cost'] for e in employees),
+                'by_employee': [
+                    {key: e[key] for key in ('employee_id', 'employee_name', 'hours', 'rate', 'cost')}
+                    for e in employees
+                ]
+            },
+            'hours_summary': [
+                {
+                    'employee_id': e['employee_id'],
+                    'employee_name': e['employee_name'],
+                    'total_hours': e['hours'],
+                    'shift_count': e['shift_count']
+                }
+                for e in employees
+            ]
+        }
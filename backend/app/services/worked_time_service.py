@@ -0,0 +1,111 @@
+from sqlalchemy import bindparam, event, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.extensions import db
+from app.models.time_tracking import TimeTracking
+from app.models.work_block import WorkBlock
+
+
+class WorkedTimeService:
+    """
+    Maintains TimeTracking.total_worked_minutes and TimeTracking.open_block,
+    the per-record totals of its work blocks, so reports can SUM them in SQL
+    instead of loading every record's blocks.
+    """
+
+    @staticmethod
+    def block_minutes(start_time, end_time):
+        """
+        Minutes of a block at minute precision, as shown in time tracking.
+        A block with end_time == start_time is in progress and counts 0.
+        """
+        if end_time == start_time:
+            return 0
+        return (end_time.hour * 60 + end_time.minute) - (start_time.hour * 60 + start_time.minute)
+
+    @staticmethod
+    def refresh_records(tracking_ids, connection=None):
+        """
+        Recompute the stored totals of the given time tracking records from
+        their work blocks (one SELECT and one executemany UPDATE).
+        Returns {time_tracking_id: (total_worked_minutes, open_block)}.
+        """
+        tracking_ids = set(tracking_ids)
+        if not tracking_ids:
+            return {}
+        connection = connection or db.session.connection()
+
+        totals = {tracking_id: (0, False) for tracking_id in tracking_ids}
+        rows = connection.execute(
+            select(WorkBlock.time_tracking_id, WorkBlock.start_time, WorkBlock.end_time).where(
+                WorkBlock.time_tracking_id.in_(tracking_ids)
+            )
+        )
+        for tracking_id, start_time, end_time in rows:
+            minutes, open_block = totals[tracking_id]
+            totals[tracking_id] = (
+                minutes + WorkedTimeService.block_minutes(start_time, end_time),
+                open_block or end_time == start_time
+            )
+
+        table = TimeTracking.__table__
+        connection.execute(
+            update(table).where(table.c.id == bindparam('b_id')).values(
+                total_worked_minutes=bindparam('b_minutes'),
+                open_block=bindparam('b_open')
+            ),
+            [
+                {'b_id': tracking_id, 'b_minutes': minutes, 'b_open': open_block}
+                for tracking_id, (minutes, open_block) in totals.items()
+            ]
+        )
+        return totals
+
+    @staticmethod
+    def backfill(batch_size=1000, connection=None):
+        """Recompute the totals of every time tracking record (returns the count)"""
+        connection = connection or db.session.connection()
+        ids = [row[0] for row in connection.execute(select(TimeTracking.id).order_by(TimeTracking.id))]
+        for i in range(0, len(ids), batch_size):
+            WorkedTimeService.refresh_records(ids[i:i + batch_size], connection)
+        return len(ids)
+
+    # ---- Session hooks ----
+
+    @staticmethod
+    def register_listeners():
+        """Keep the stored totals in sync with ORM writes on WorkBlock (idempotent)"""
+        if not event.contains(Session, 'after_flush', _refresh_changed_records):
+            event.listen(Session, 'after_flush', _refresh_changed_records)
+            # Load the previous record when a block is moved to another one,
+            # so the record it leaves is refreshed too
+            event.listen(WorkBlock.time_tracking_id, 'set', _keep_previous_value, active_history=True)
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+def _block_tracking_ids(block):
+    history = inspect(block).attrs['time_tracking_id'].history
+    values = list(history.added) + list(history.deleted) + list(history.unchanged)
+    return {value for value in (values or [block.time_tracking_id]) if value is not None}
+
+
+def _refresh_changed_records(session, flush_context):
+    tracking_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, WorkBlock):
+            tracking_ids |= _block_tracking_ids(obj)
+    if not tracking_ids:
+        return
+
+    totals = WorkedTimeService.refresh_records(tracking_ids, session.connection())
+
+    # Records already in the session see the new totals without a reload
+    for tracking_id, (minutes, open_block) in totals.items():
+        record = session.identity_map.get(inspect(TimeTracking).identity_key_from_primary_key((tracking_id,)))
+        if record is not None:
+            set_committed_value(record, 'total_worked_minutes', minutes)
+            set_committed_value(record, 'open_block', open_block)
@@ -0,0 +1,63 @@
+"""
+Scheduled incremental sync with Fudo.
+Run periodically via cron (see setup_cron.sh): each run only downloads the
+sales closed since the last completed sync and the recent expense dates
+(see FudoSyncService.incremental_params).
+"""
+from app import create_app
+from app.services.fudo_sync_service import FudoSyncService
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+app = create_app()
+
+def incremental_sync(resource):
+    """
+    Run an incremental sync of sales or expenses in this process.
+    Skips the run if another sync of the resource is still in progress.
+    """
+    with app.app_context():
+        job, created = FudoSyncService.create_incremental_job(resource)
+        if not created:
+            logger.warning(f"⚠️ Fudo {resource} sync job {job.id} is still running, skipping")
+            return job.to_dict()
+        
+        logger.info(f"Starting incremental Fudo {resource} sync from {job.params.get('start_date')}")
+        job = FudoSyncService.run_job(job.id)
+        
+        if job.status == 'completed':
+            logger.info(f"✅ Fudo {resource} sync: {job.imported} imported, {job.skipped} already present")
+        else:
+            logger.error(f"❌ Fudo {resource} sync failed at page {job.last_committed_page + 1}: {job.error_message}")
+        
+        return job.to_dict()
+
+def resume_failed():
+    """Resume failed or stalled sync jobs from their last committed page"""
+    with app.app_context():
+        from app.models.sync_job import SyncJob
+        
+        jobs = SyncJob.query.filter(SyncJob.status.in_(('failed', 'running', 'pending'))).all()
+        for job in jobs:
+            if FudoSyncService.can_resume(job):
+                logger.info(f"Resuming Fudo {job.resource} sync job {job.id} from page {job.last_committed_page + 1}")
+                FudoSyncService.run_job(job.id)
+
+if __name__ == '__main__':
+    import sys
+    
+    if len(sys.argv) < 2:
+        print("Usage: python fudo_tasks.py [sales|expenses|resume_failed]")
+        sys.exit(1)
+    
+    task = sys.argv[1]
+    
+    if task in ('sales', 'expenses'):
+        incremental_sync(task)
+    elif task == 'resume_failed':
+        resume_failed()
+    else:
+        print(f"Unknown task: {task}")
+        sys.exit(1)
@@ -6,6 +6,7 @@ from app import create_app
 from app.ml.staffing_predictor import StaffingPredictor
 from app.services.ml_accuracy_service import MLAccuracyService
 from app.services.alert_service import AlertService
+from app.services.ml_training_service import MLTrainingService
 from datetime import datetime, timedelta
 import logging
 
@@ -108,10 +109,15 @@ def monthly_full_retrain():
     with app.app_context():
         logger.info("Starting monthly full model retraining...")
         
-        predictor = StaffingPredictor()
+        # Same job path as POST /ml/train, so it never overlaps a training started from the API
+        job, created = MLTrainingService.create_job({'min_weeks': 12})
+        if not created:
+            logger.warning(f"⚠️ ML training job {job.id} is still running, skipping")
+            return job.to_dict()
         
-        # Train with more weeks of data
-        result = predictor.train(min_weeks=12)
+        # Train with more weeks of data, in this process
+        job = MLTrainingService.run_job(job.id)
+        result = job.result or {'success': False, 'error': job.error_message}
         
         if result['success']:
             logger.info(f"✅ Model retrained successfully!")
@@ -123,7 +129,7 @@ def monthly_full_retrain():
             start_date = datetime.now().date()
             end_date = start_date + timedelta(weeks=4)
             
-            pred_result = predictor.generate_predictions(start_date, end_date)
+            pred_result = StaffingPredictor().generate_predictions(start_date, end_date)
             logger.info(f"✅ Generated {pred_result['predictions_created']} predictions")
         else:
             logger.error(f"❌ Failed to retrain model: {result.get('error')}")
@@ -0,0 +1,74 @@
+"""
+Exportación CSV en streaming.
+
+Las filas se leen como tuplas de columnas con yield_per (cursor del lado del
+servidor en PostgreSQL, sin hidratar objetos ORM) y el CSV se envía en bloques
+a medida que se genera, de modo que la memoria del worker no depende de la
+cantidad de filas exportadas.
+
+Si el cliente acepta gzip (Accept-Encoding) y CSV_EXPORT_GZIP está activo, la
+respuesta se comprime en el mismo stream.
+"""
+import csv
+import io
+import zlib
+
+from flask import Response, current_app, request, stream_with_context
+
+
+YIELD_PER = 1000
+ROWS_PER_CHUNK = 500
+
+
+def _client_accepts_gzip():
+    return current_app.config.get('CSV_EXPORT_GZIP', True) and 'gzip' in request.accept_encodings
+
+
+def iter_csv(header, rows, format_row, rows_per_chunk=ROWS_PER_CHUNK):
+    """Genera el CSV en bloques de texto de hasta rows_per_chunk filas"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    pending = 0
+    for row in rows:
+        writer.writerow(format_row(row))
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = formato gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_csv_response(query, header, format_row, filename):
+    """
+    Response con el CSV de query (una consulta de columnas, no de entidades)
+    generado en streaming.
+    """
+    rows = query.execution_options(yield_per=YIELD_PER)
+    chunks = (chunk.encode('utf-8') for chunk in iter_csv(header, rows, format_row))
+
+    headers = {'Content-Disposition': f'attachment; filename={filename}'}
+    if _client_accepts_gzip():
+        chunks = _gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype='text/csv',
+        headers=headers
+    )
@@ -1,7 +1,11 @@
 import requests
 import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable, Iterator, Tuple
+from requests.adapters import HTTPAdapter
 
 
 class FudoClient:
@@ -9,15 +13,29 @@ class FudoClient:
     
     AUTH_URL = "https://auth.fu.do/api"
     BASE_URL = "https://api.fu.do/v1alpha1"
+    PAGE_SIZE = 500
     
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 auth_url: Optional[str] = None, base_url: Optional[str] = None,
+                 max_workers: int = 4, timeout: float = 60):
         self.api_key = api_key or os.getenv('FUDO_API_KEY')
         self.api_secret = api_secret or os.getenv('FUDO_API_SECRET')
+        self.auth_url = auth_url or os.getenv('FUDO_AUTH_URL', self.AUTH_URL)
+        self.base_url = base_url or os.getenv('FUDO_API_URL', self.BASE_URL)
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
         self.token = None
         self.token_expiration = None
+        self._token_lock = threading.Lock()
         
         if not self.api_key or not self.api_secret:
             raise ValueError("FUDO_API_KEY and FUDO_API_SECRET must be set in environment variables")
+        
+        # Keep-alive connections shared by the concurrent page requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
     def _authenticate(self) -> str:
         """Authenticate with Fudo API and get access token"""
@@ -32,7 +50,7 @@ class FudoClient:
         }
         
         try:
-            response = requests.post(self.AUTH_URL, json=payload, headers=headers)
+            response = self.session.post(self.auth_url, json=payload, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -50,14 +68,15 @@ class FudoClient:
             raise Exception(f"Error authenticating with Fudo API: {str(e)}")
     
     def _get_valid_token(self) -> str:
-        """Get a valid token, refreshing if necessary"""
-        if not self.token or not self.token_expiration:
-            return self._authenticate()
-        
-        if datetime.now() >= self.token_expiration - timedelta(minutes=5):
-            return self._authenticate()
-        
-        return self.token
+        """Get a valid token, refreshing if necessary (one refresh at a time across threads)"""
+        with self._token_lock:
+            if not self.token or not self.token_expiration:
+                return self._authenticate()
+            
+            if datetime.now() >= self.token_expiration - timedelta(minutes=5):
+                return self._authenticate()
+            
+            return self.token
     
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """Make authenticated request to Fudo API"""
@@ -69,10 +88,10 @@ class FudoClient:
             "Content-Type": "application/json"
         }
         
-        url = f"{self.BASE_URL}{endpoint}"
+        url = f"{self.base_url}{endpoint}"
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
             
@@ -105,6 +124,75 @@ class FudoClient:
         
         return self._make_request('/sales', params)
     
+    @staticmethod
+    def sales_filters(start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      date_field: str = 'createdAt') -> Dict:
+        """
+        API filters for closed sales whose date_field (createdAt or closedAt)
+        is between start_date and end_date (ISO format)
+        """
+        filters = {}
+        if start_date and end_date:
+            # Format: and(gte.2024-01-01T00:00:00Z,lte.2024-01-31T23:59:59Z)
+            filters[date_field] = f'and(gte.{start_date},lte.{end_date})'
+        elif start_date:
+            # Format: gte.2024-01-01T00:00:00Z
+            filters[date_field] = f'gte.{start_date}'
+        elif end_date:
+            # Format: lte.2024-01-31T23:59:59Z
+            filters[date_field] = f'lte.{end_date}'
+        
+        # Only fetch closed sales
+        filters['saleState'] = 'in.(CLOSED)'
+        return filters
+    
+    def iter_pages(self,
+                   fetch_page: Callable[[int], Dict],
+                   start_page: int = 1,
+                   page_size: int = PAGE_SIZE) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Yield (page_number, items) in page order, fetching up to max_workers
+        pages ahead concurrently. Stops at the first empty or short page.
+        Only max_workers pages are held in memory at a time.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = deque()
+        next_page = start_page
+        try:
+            for _ in range(self.max_workers):
+                pending.append((next_page, executor.submit(fetch_page, next_page)))
+                next_page += 1
+            
+            while pending:
+                page_number, future = pending.popleft()
+                items = future.result().get('data', [])
+                
+                if not items:
+                    break
+                
+                yield page_number, items
+                
+                if len(items) < page_size:
+                    break
+                
+                pending.append((next_page, executor.submit(fetch_page, next_page)))
+                next_page += 1
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def iter_sales_pages(self,
+                         start_date: Optional[str] = None,
+                         end_date: Optional[str] = None,
+                         start_page: int = 1,
+                         date_field: str = 'createdAt') -> Iterator[Tuple[int, List[Dict]]]:
+        """Stream closed sales page by page (see iter_pages)"""
+        filters = self.sales_filters(start_date, end_date, date_field)
+        return self.iter_pages(
+            lambda page: self.get_sales(page_size=self.PAGE_SIZE, page_number=page, filters=filters),
+            start_page=start_page,
+            page_size=min(self.PAGE_SIZE, 500)
+        )
+    
     def get_all_sales(self, 
                       start_date: Optional[str] = None,
                       end_date: Optional[str] = None) -> List[Dict]:
@@ -119,38 +207,8 @@ class FudoClient:
             List of all sales
         """
         all_sales = []
-        page_number = 1
-        page_size = 500
-        
-        # Use API date filters if provided
-        filters = {}
-        if start_date and end_date:
-            # Format: and(gte.2024-01-01T00:00:00Z,lte.2024-01-31T23:59:59Z)
-            filters['createdAt'] = f'and(gte.{start_date},lte.{end_date})'
-        elif start_date:
-            # Format: gte.2024-01-01T00:00:00Z
-            filters['createdAt'] = f'gte.{start_date}'
-        elif end_date:
-            # Format: lte.2024-01-31T23:59:59Z
-            filters['createdAt'] = f'lte.{end_date}'
-        
-        # Only fetch closed sales
-        filters['saleState'] = 'in.(CLOSED)'
-        
-        while True:
-            response = self.get_sales(page_size=page_size, page_number=page_number, filters=filters)
-            sales_data = response.get('data', [])
-            
-            if not sales_data:
-                break
-            
+        for _, sales_data in self.iter_sales_pages(start_date, end_date):
             all_sales.extend(sales_data)
-            
-            if len(sales_data) < page_size:
-                break
-            
-            page_number += 1
-        
         return all_sales
     
     def get_expenses(self, 
@@ -180,6 +238,33 @@ class FudoClient:
         
         return self._make_request('/expenses', params)
     
+    @staticmethod
+    def expenses_filters(start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict:
+        """API filters for expenses dated between start_date and end_date (YYYY-MM-DD)"""
+        filters = {}
+        if start_date and end_date:
+            # Format: and(gte.2024-01-01,lte.2024-01-31)
+            filters['date'] = f'and(gte.{start_date},lte.{end_date})'
+        elif start_date:
+            # Format: gte.2024-01-01
+            filters['date'] = f'gte.{start_date}'
+        elif end_date:
+            # Format: lte.2024-01-31
+            filters['date'] = f'lte.{end_date}'
+        return filters
+    
+    def iter_expense_pages(self,
+                           start_date: Optional[str] = None,
+                           end_date: Optional[str] = None,
+                           start_page: int = 1) -> Iterator[Tuple[int, List[Dict]]]:
+        """Stream expenses page by page (see iter_pages)"""
+        filters = self.expenses_filters(start_date, end_date)
+        return self.iter_pages(
+            lambda page: self.get_expenses(page_size=self.PAGE_SIZE, page_number=page, filters=filters),
+            start_page=start_page,
+            page_size=min(self.PAGE_SIZE, 500)
+        )
+    
     def get_all_expenses(self, 
                          start_date: Optional[str] = None,
                          end_date: Optional[str] = None) -> List[Dict]:
@@ -194,35 +279,8 @@ class FudoClient:
             List of all expenses
         """
         all_expenses = []
-        page_number = 1
-        page_size = 500
-        
-        # Use API date filters if provided
-        filters = {}
-        if start_date and end_date:
-            # Format: and(gte.2024-01-01,lte.2024-01-31)
-            filters['date'] = f'and(gte.{start_date},lte.{end_date})'
-        elif start_date:
-            # Format: gte.2024-01-01
-            filters['date'] = f'gte.{start_date}'
-        elif end_date:
-            # Format: lte.2024-01-31
-            filters['date'] = f'lte.{end_date}'
-        
-        while True:
-            response = self.get_expenses(page_size=page_size, page_number=page_number, filters=filters)
-            expenses_data = response.get('data', [])
-            
-            if not expenses_data:
-                break
-            
+        for _, expenses_data in self.iter_expense_pages(start_date, end_date):
             all_expenses.extend(expenses_data)
-            
-            if len(expenses_data) < page_size:
-                break
-            
-            page_number += 1
-        
         return all_expenses
     
     def get_expense_categories(self, page_size: int = 500, page_number: int = 1) -> Dict:
@@ -0,0 +1,161 @@
+"""
+Calendario de feriados en memoria.
+
+Carga los feriados de un año completo con una sola consulta y los guarda
+como {fecha: impact_multiplier}, de modo que la liquidación de sueldos, el
+costo laboral y las predicciones de ML no consulten la tabla `holidays` por
+cada día o fila.
+
+Cada aplicación tiene su propio calendario (app.extensions). Los años se
+invalidan al confirmar cualquier alta, edición o baja de Holiday en la
+sesión; con varios workers los demás procesos se actualizan al vencer
+HOLIDAY_CALENDAR_TTL.
+"""
+import threading
+import time
+from datetime import date, datetime
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+
+class _YearCache:
+    """Años cargados de una aplicación, thread-safe"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._years = {}
+        self._lock = threading.Lock()
+
+    def get(self, year):
+        with self._lock:
+            entry = self._years.get(year)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            return entry[0]
+
+    def set(self, year, holidays):
+        with self._lock:
+            self._years[year] = (holidays, time.monotonic() + self.ttl)
+
+    def invalidate(self, years=None):
+        with self._lock:
+            if years is None:
+                self._years.clear()
+            else:
+                for year in years:
+                    self._years.pop(year, None)
+
+
+class HolidayCalendar:
+    """Consulta de feriados por fecha con cache por año"""
+
+    EXTENSION_KEY = 'holiday_calendar'
+    PENDING_KEY = 'holiday_calendar_pending'
+
+    def init_app(self, app):
+        app.config.setdefault('HOLIDAY_CALENDAR_TTL', 300)
+        app.extensions[self.EXTENSION_KEY] = _YearCache(app.config['HOLIDAY_CALENDAR_TTL'])
+        _register_listeners()
+
+    @staticmethod
+    def _cache():
+        from flask import current_app
+        return current_app.extensions[HolidayCalendar.EXTENSION_KEY]
+
+    @staticmethod
+    def _to_date(value):
+        if isinstance(value, str):
+            return datetime.fromisoformat(value).date()
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
+    def year(self, year):
+        """Feriados del año como {fecha: impact_multiplier}"""
+        cache = self._cache()
+        holidays = cache.get(year)
+        if holidays is None:
+            from app.extensions import db
+            from app.models.ml_tracking import Holiday
+            rows = db.session.query(Holiday.date, Holiday.impact_multiplier).filter(
+                Holiday.date >= date(year, 1, 1),
+                Holiday.date <= date(year, 12, 31)
+            ).all()
+            holidays = {d: (impact if impact is not None else 1.0) for d, impact in rows}
+            cache.set(year, holidays)
+        return holidays
+
+    def is_holiday(self, check_date):
+        check_date = self._to_date(check_date)
+        return check_date in self.year(check_date.year)
+
+    def get_impact(self, check_date, default=1.0):
+        """Multiplicador de impacto del feriado, o default si la fecha no es feriado"""
+        check_date = self._to_date(check_date)
+        return self.year(check_date.year).get(check_date, default)
+
+    def holidays_between(self, start_date, end_date):
+        """Feriados entre start_date y end_date (inclusive) como {fecha: impact_multiplier}"""
+        start_date, end_date = self._to_date(start_date), self._to_date(end_date)
+        result = {}
+        for year in range(start_date.year, end_date.year + 1):
+            result.update({
+                d: impact for d, impact in self.year(year).items()
+                if start_date <= d <= end_date
+            })
+        return result
+
+    def invalidate(self, years=None):
+        """Descarta los años indicados (o todos) para recargarlos en la próxima consulta"""
+        self._cache().invalidate(years)
+
+
+holiday_calendar = HolidayCalendar()
+
+
+# ---- Invalidación automática en escrituras ORM ----
+
+def _holiday_years(obj):
+    history = inspect(obj).attrs['date'].history
+    values = list(history.added) + list(history.deleted) + list(history.unchanged)
+    return {d.year for d in (values or [obj.date]) if d is not None}
+
+
+def _collect_changes(session, flush_context):
+    from app.models.ml_tracking import Holiday
+    years = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Holiday):
+            years |= _holiday_years(obj)
+    if years:
+        session.info.setdefault(HolidayCalendar.PENDING_KEY, set()).update(years)
+
+
+def _apply_invalidation(session):
+    years = session.info.pop(HolidayCalendar.PENDING_KEY, None)
+    if not years:
+        return
+    from flask import current_app, has_app_context
+    if has_app_context() and HolidayCalendar.EXTENSION_KEY in current_app.extensions:
+        holiday_calendar.invalidate(years)
+
+
+def _discard_pending(session):
+    session.info.pop(HolidayCalendar.PENDING_KEY, None)
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+def _register_listeners():
+    if event.contains(Session, 'after_flush', _collect_changes):
+        return
+    from app.models.ml_tracking import Holiday
+
+    event.listen(Session, 'after_flush', _collect_changes)
+    event.listen(Session, 'after_commit', _apply_invalidation)
+    event.listen(Session, 'after_rollback', _discard_pending)
+    # Al mover un feriado de año se invalidan ambos años
+    event.listen(Holiday.date, 'set', _keep_previous_value, active_history=True)
@@ -1,50 +1,42 @@
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
 from functools import wraps
+import logging
 import jwt
-from app.models.user import User
+from app.utils.principal_cache import principal_cache
+
+logger = logging.getLogger(__name__)
+
 
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Log para debugging
-        print(f"[AUTH DEBUG] Request path: {request.path}")
-        print(f"[AUTH DEBUG] Request method: {request.method}")
-        print(f"[AUTH DEBUG] Headers: {dict(request.headers)}")
-        
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            print(f"[AUTH DEBUG] Authorization header encontrado: {auth_header[:50]}...")
-            try:
-                token = auth_header.split(" ")[1]
-                print(f"[AUTH DEBUG] Token extraído: {token[:20]}...")
-            except IndexError:
-                print("[AUTH DEBUG] Error al extraer token del header")
-                return jsonify({'error': 'Token inválido'}), 401
-        else:
-            print("[AUTH DEBUG] No se encontró header Authorization")
-        
+        auth_header = request.headers.get('Authorization')
+        if not auth_header:
+            logger.debug('Request sin header Authorization: %s %s', request.method, request.path)
+            return jsonify({'error': 'Token requerido'}), 401
+
+        parts = auth_header.split(" ")
+        if len(parts) < 2:
+            return jsonify({'error': 'Token inválido'}), 401
+        token = parts[1]
+
         if not token:
-            print("[AUTH DEBUG] Token es None, retornando 401")
             return jsonify({'error': 'Token requerido'}), 401
-        
+
         try:
-            print(f"[AUTH DEBUG] Intentando decodificar token...")
             data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            print(f"[AUTH DEBUG] Token decodificado exitosamente. User ID: {data.get('user_id')}")
-            current_user = User.query.get(data['user_id'])
-            if not current_user:
-                print(f"[AUTH DEBUG] Usuario no encontrado en BD")
-                return jsonify({'error': 'Usuario no encontrado'}), 401
-            print(f"[AUTH DEBUG] Usuario encontrado: {current_user.email}")
-        except jwt.ExpiredSignatureError as e:
-            print(f"[AUTH DEBUG] Token expirado: {str(e)}")
+        except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token expirado'}), 401
         except jwt.InvalidTokenError as e:
-            print(f"[AUTH DEBUG] Token inválido: {str(e)}")
+            logger.debug('Token inválido en %s: %s', request.path, e)
             return jsonify({'error': 'Token inválido'}), 401
-        
+
+        current_user = principal_cache.load(data.get('user_id'), data.get('ver', 0))
+        if not current_user:
+            logger.debug('Usuario %s no encontrado, inactivo o con token revocado', data.get('user_id'))
+            return jsonify({'error': 'Usuario no encontrado'}), 401
+
+        g.current_user_id = current_user.id
         return f(current_user, *args, **kwargs)
-    
+
     return decorated
@@ -2,8 +2,20 @@ from datetime import datetime, timedelta, date
 from decimal import Decimal
 from app.models.time_tracking import TimeTracking
 from app.models.shift import Shift
-from app.models.ml_tracking import Holiday
 from app.models.absence_request import AbsenceRequest
+from app.utils.holiday_calendar import holiday_calendar
+
+
+def get_month_range(month, year):
+    """
+    Devuelve el rango de fechas de un mes como (primer día, primer día del mes siguiente).
+    """
+    start_date = datetime(year, month, 1).date()
+    if month == 12:
+        end_date = datetime(year + 1, 1, 1).date()
+    else:
+        end_date = datetime(year, month + 1, 1).date()
+    return start_date, end_date
 
 
 def calculate_hours_from_time_tracking(employee_id, month, year):
@@ -24,11 +36,7 @@ def calculate_hours_from_time_tracking(employee_id, month, year):
             - total_hours: Total de horas trabajadas (float)
             - daily_records: Lista de registros diarios con bloques de trabajo
     """
-    start_date = datetime(year, month, 1).date()
-    if month == 12:
-        end_date = datetime(year + 1, 1, 1).date()
-    else:
-        end_date = datetime(year, month + 1, 1).date()
+    start_date, end_date = get_month_range(month, year)
     
     time_records = TimeTracking.query.filter(
         TimeTracking.employee_id == employee_id,
@@ -36,14 +44,49 @@ def calculate_hours_from_time_tracking(employee_id, month, year):
         TimeTracking.tracking_date < end_date
     ).all()
     
+    approved_absences = AbsenceRequest.query.filter(
+        AbsenceRequest.employee_id == employee_id,
+        AbsenceRequest.status == 'approved',
+        AbsenceRequest.start_date <= end_date - timedelta(days=1),
+        AbsenceRequest.end_date >= start_date
+    ).all()
+    
+    return build_daily_records(
+        [(record.tracking_date, record.work_blocks) for record in time_records],
+        approved_absences,
+        lambda current_date: Shift.query.filter_by(
+            employee_id=employee_id,
+            shift_date=current_date
+        ).all(),
+        start_date,
+        end_date
+    )
+
+
+def build_daily_records(time_records, approved_absences, shifts_for_date, start_date, end_date):
+    """
+    Arma los registros diarios de un empleado a partir de datos ya cargados,
+    sin consultar la base. Lo usan el cálculo individual y la liquidación masiva.
+    
+    Args:
+        time_records: Iterable de (tracking_date, work_blocks); cada bloque
+            expone id, start_time y end_time
+        approved_absences: Iterable de ausencias aprobadas (start_date, end_date)
+        shifts_for_date: Función fecha -> turnos del empleado ese día
+        start_date: Primer día del período
+        end_date: Primer día posterior al período (exclusivo)
+        
+    Returns:
+        tuple: (total_hours, daily_records), igual que calculate_hours_from_time_tracking
+    """
     total_hours = Decimal('0.00')
     daily_records = []
     
-    for record in time_records:
+    for tracking_date, work_blocks in time_records:
         day_hours = Decimal('0.00')
         blocks = []
         
-        for block in record.work_blocks:
+        for block in work_blocks:
             start = datetime.combine(datetime.today(), block.start_time)
             end = datetime.combine(datetime.today(), block.end_time)
             
@@ -63,30 +106,20 @@ def calculate_hours_from_time_tracking(employee_id, month, year):
         
         total_hours += day_hours
         daily_records.append({
-            'date': record.tracking_date.isoformat(),
+            'date': tracking_date.isoformat(),
             'hours': float(day_hours),
             'blocks': blocks
         })
     
-    approved_absences = AbsenceRequest.query.filter(
-        AbsenceRequest.employee_id == employee_id,
-        AbsenceRequest.status == 'approved',
-        AbsenceRequest.start_date <= end_date - timedelta(days=1),
-        AbsenceRequest.end_date >= start_date
-    ).all()
+    recorded_dates = {r['date'] for r in daily_records}
     
     for absence in approved_absences:
         current_date = max(absence.start_date, start_date)
         absence_end = min(absence.end_date, end_date - timedelta(days=1))
         
         while current_date <= absence_end:
-            existing_record = next((r for r in daily_records if r['date'] == current_date.isoformat()), None)
-            
-            if not existing_record:
-                shifts = Shift.query.filter_by(
-                    employee_id=employee_id,
-                    shift_date=current_date
-                ).all()
+            if current_date.isoformat() not in recorded_dates:
+                shifts = shifts_for_date(current_date)
                 
                 if shifts:
                     absence_hours = sum(float(shift.hours) for shift in shifts)
@@ -103,6 +136,7 @@ def calculate_hours_from_time_tracking(employee_id, month, year):
                             'is_absence': True
                         }]
                     })
+                    recorded_dates.add(current_date.isoformat())
             
             current_date += timedelta(days=1)
     
@@ -214,11 +248,7 @@ def calculate_scheduled_hours(employee_id, month, year):
             - total_hours: Total de horas programadas (float)
             - scheduled_records: Lista de registros de turnos programados
     """
-    start_date = datetime(year, month, 1).date()
-    if month == 12:
-        end_date = datetime(year + 1, 1, 1).date()
-    else:
-        end_date = datetime(year, month + 1, 1).date()
+    start_date, end_date = get_month_range(month, year)
     
     shifts = Shift.query.filter(
         Shift.employee_id == employee_id,
@@ -257,7 +287,8 @@ def is_weekend(work_date):
 
 def is_holiday(work_date):
     """
-    Verifica si una fecha es feriado consultando la tabla de feriados.
+    Verifica si una fecha es feriado usando el calendario de feriados
+    (un año se carga una sola vez, no se consulta la tabla por cada día).
     
     Args:
         work_date: Fecha a verificar (date object o string ISO)
@@ -265,14 +296,10 @@ def is_holiday(work_date):
     Returns:
         bool: True si es feriado
     """
-    if isinstance(work_date, str):
-        work_date = datetime.fromisoformat(work_date).date()
-    
-    holiday = Holiday.query.filter_by(date=work_date).first()
-    return holiday is not None
+    return holiday_calendar.is_holiday(work_date)
 
 
-def calculate_employee_cost(hours_worked, hourly_rate, work_date=None, job_position=None):
+def calculate_employee_cost(hours_worked, hourly_rate, work_date=None, job_position=None, holiday_dates=None):
     """
     Calcula el costo total de un empleado basado en horas trabajadas y tarifa horaria.
     Aplica multiplicadores según el día de la semana y feriados.
@@ -287,6 +314,8 @@ def calculate_employee_cost(hours_worked, hourly_rate, work_date=None, job_posit
         hourly_rate: Tarifa horaria (float, int o Decimal)
         work_date: Fecha de trabajo (date object o string ISO) - opcional
         job_position: Objeto JobPosition con multiplicadores - opcional
+        holiday_dates: Set de fechas feriado ya cargado - opcional (evita
+            consultar la tabla de feriados por cada día)
         
     Returns:
         float: Costo total redondeado a 2 decimales
@@ -300,8 +329,13 @@ def calculate_employee_cost(hours_worked, hourly_rate, work_date=None, job_posit
         if isinstance(work_date, str):
             work_date = datetime.fromisoformat(work_date).date()
         
+        if holiday_dates is not None:
+            holiday = work_date in holiday_dates
+        else:
+            holiday = is_holiday(work_date)
+        
         # Prioridad 1: Feriado
-        if is_holiday(work_date) and job_position.holiday_rate_multiplier:
+        if holiday and job_position.holiday_rate_multiplier:
             multiplier = float(job_position.holiday_rate_multiplier)
             base_cost *= multiplier
         # Prioridad 2: Domingo
@@ -330,7 +364,7 @@ def calculate_total_hours_from_dict(hours, minutes):
     return hours + (minutes / 60.0)
 
 
-def calculate_payroll_with_multipliers(employee_id, month, year, hourly_rate, job_position):
+def calculate_payroll_with_multipliers(employee_id, month, year, hourly_rate, job_position, daily_records=None):
     """
     Calcula el costo total de nómina aplicando multiplicadores por día.
     Itera sobre cada día trabajado y aplica el multiplicador correspondiente
@@ -342,12 +376,30 @@ def calculate_payroll_with_multipliers(employee_id, month, year, hourly_rate, jo
         year: Año
         hourly_rate: Tarifa horaria base (float)
         job_position: Objeto JobPosition con multiplicadores
+        daily_records: Registros diarios ya calculados - opcional
         
     Returns:
         float: Costo total de nómina con multiplicadores aplicados
     """
-    _, daily_records = calculate_hours_from_time_tracking(employee_id, month, year)
+    if daily_records is None:
+        _, daily_records = calculate_hours_from_time_tracking(employee_id, month, year)
+    
+    return calculate_cost_from_daily_records(daily_records, hourly_rate, job_position)
+
+
+def calculate_cost_from_daily_records(daily_records, hourly_rate, job_position, holiday_dates=None):
+    """
+    Suma el costo de cada día trabajado aplicando su multiplicador.
     
+    Args:
+        daily_records: Registros diarios (ver build_daily_records)
+        hourly_rate: Tarifa horaria base (float)
+        job_position: Objeto JobPosition con multiplicadores
+        holiday_dates: Set de fechas feriado ya cargado - opcional
+        
+    Returns:
+        float: Costo total redondeado a 2 decimales
+    """
     total_cost = 0.0
     
     for record in daily_records:
@@ -358,7 +410,8 @@ def calculate_payroll_with_multipliers(employee_id, month, year, hourly_rate, jo
             day_hours,
             hourly_rate,
             work_date=work_date,
-            job_position=job_position
+            job_position=job_position,
+            holiday_dates=holiday_dates
         )
         
         total_cost += day_cost
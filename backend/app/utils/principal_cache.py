@@ -0,0 +1,154 @@
+"""
+Cache en memoria de usuarios autenticados.
+
+token_required resolvía el usuario del token con una consulta en cada
+request. El cache guarda, por (user_id, versión del token), los valores de
+columna del usuario durante USER_CACHE_TTL segundos y, en cada request, arma
+una instancia que se incorpora a la sesión con merge(load=False), sin
+consultar la base. Las relaciones (p. ej. user.employee) se siguen cargando
+a demanda.
+
+Cada aplicación tiene su propio cache (app.extensions). Las entradas de un
+usuario se invalidan al confirmar cualquier alta, edición o baja de User en
+la sesión; con varios workers los demás procesos se actualizan al vencer
+USER_CACHE_TTL. Cambiar la contraseña o desactivar el usuario incrementa
+token_version, lo que revoca los tokens emitidos antes.
+"""
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+
+class _EntryCache:
+    """Valores de usuario por (user_id, versión), thread-safe"""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            return entry[0]
+
+    def set(self, key, values):
+        with self._lock:
+            now = time.monotonic()
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[1] >= now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[key] = (values, now + self.ttl)
+
+    def invalidate(self, user_ids=None):
+        with self._lock:
+            if user_ids is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] in user_ids]:
+                    del self._entries[key]
+
+
+class PrincipalCache:
+    """Resolución del usuario de un token con cache por (user_id, versión)"""
+
+    EXTENSION_KEY = 'principal_cache'
+    PENDING_KEY = 'principal_cache_pending'
+
+    def init_app(self, app):
+        app.config.setdefault('USER_CACHE_TTL', 30)
+        app.config.setdefault('USER_CACHE_MAX_ENTRIES', 4096)
+        app.extensions[self.EXTENSION_KEY] = _EntryCache(
+            app.config['USER_CACHE_TTL'], app.config['USER_CACHE_MAX_ENTRIES']
+        )
+        _register_listeners()
+
+    @staticmethod
+    def _cache():
+        from flask import current_app
+        return current_app.extensions.get(PrincipalCache.EXTENSION_KEY)
+
+    def load(self, user_id, version):
+        """
+        Usuario activo con ese id y versión de token, incorporado a la sesión
+        actual, o None si no existe, está inactivo o el token fue revocado.
+        """
+        from app.extensions import db
+        from app.models.user import User
+
+        if user_id is None:
+            return None
+
+        cache = self._cache()
+        key = (user_id, version)
+        values = cache.get(key) if cache is not None else None
+        if values is not None:
+            user = User(**values)
+            make_transient_to_detached(user)
+            return db.session.merge(user, load=False)
+
+        user = db.session.get(User, user_id)
+        if user is None or not user.is_active or (user.token_version or 0) != version:
+            return None
+        if cache is not None:
+            cache.set(key, {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+        return user
+
+    def invalidate(self, user_ids=None):
+        cache = self._cache()
+        if cache is not None:
+            cache.invalidate(user_ids)
+
+
+principal_cache = PrincipalCache()
+
+
+# ---- Revocación e invalidación automáticas en escrituras ORM ----
+
+def _bump_token_versions(session, flush_context, instances):
+    from app.models.user import User
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        attrs = inspect(obj).attrs
+        deactivated = attrs.is_active.history.has_changes() and not obj.is_active
+        if attrs.password_hash.history.has_changes() or deactivated:
+            obj.token_version = (obj.token_version or 0) + 1
+
+
+def _collect_changes(session, flush_context):
+    from app.models.user import User
+    user_ids = {
+        obj.id for obj in list(session.dirty) + list(session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if user_ids:
+        session.info.setdefault(PrincipalCache.PENDING_KEY, set()).update(user_ids)
+
+
+def _apply_invalidation(session):
+    user_ids = session.info.pop(PrincipalCache.PENDING_KEY, None)
+    if not user_ids:
+        return
+    from flask import has_app_context
+    if has_app_context():
+        principal_cache.invalidate(user_ids)
+
+
+def _discard_pending(session):
+    session.info.pop(PrincipalCache.PENDING_KEY, None)
+
+
+def _register_listeners():
+    if event.contains(Session, 'after_flush', _collect_changes):
+        return
+    event.listen(Session, 'before_flush', _bump_token_versions)
+    event.listen(Session, 'after_flush', _collect_changes)
+    event.listen(Session, 'after_commit', _apply_invalidation)
+    event.listen(Session, 'after_rollback', _discard_pending)
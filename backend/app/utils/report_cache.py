@@ -0,0 +1,363 @@
+"""
+Cache de respuestas de reportes (dashboard, balance, productividad, análisis horario).
+
+Las entradas se indexan por endpoint + rango de fechas normalizado + filtros y
+guardan el rango de fechas del que dependen. Cuando se modifican ventas,
+gastos, sueldos o turnos, se invalidan sólo las entradas cuyo rango se
+superpone con las fechas afectadas. Los cambios en tablas de referencia
+(feriados, puestos, empleados, metas, categorías) invalidan todo el cache.
+
+Backends:
+- 'memory' (default): LRU en proceso. Con varios workers cada uno tiene su
+  propio cache y la invalidación sólo llega al worker que hizo el cambio, así
+  que por defecto todas las entradas expiran rápido (REPORT_CACHE_TTL_OPEN).
+- 'redis': cache compartido entre workers (requiere el paquete redis).
+- 'paquete.modulo:Clase': backend propio con la misma interfaz, construido
+  como Clase(app.config).
+"""
+import hashlib
+import importlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# TTL de rangos cerrados con un backend compartido, si no se configura otro
+SHARED_TTL_CLOSED = 24 * 3600
+
+
+class MemoryCacheBackend:
+    """LRU en memoria del proceso, thread-safe"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, _, _ = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, start_date, end_date):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl, start_date, end_date)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_range(self, start_date, end_date):
+        with self._lock:
+            stale = [
+                key for key, (_, _, entry_start, entry_end) in self._entries.items()
+                if entry_start <= end_date and entry_end >= start_date
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """
+    Cache compartido en Redis. Cada entrada se registra en un set por mes para invalidar por rango.
+
+    Los sets por mes viven al menos index_ttl (el TTL más largo configurado): si
+    expiraran con el TTL de la última entrada agregada (ej. un rango abierto de
+    60 s), las entradas más largas del mismo mes ya no se podrían invalidar.
+    """
+
+    def __init__(self, url, prefix='galia:report_cache', index_ttl=0, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError('REPORT_CACHE_BACKEND=redis requiere el paquete "redis" (pip install redis)')
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.index_ttl = int(index_ttl)
+
+    def _entry_key(self, key):
+        return f'{self.prefix}:entry:{key}'
+
+    def _month_key(self, year, month):
+        return f'{self.prefix}:month:{year:04d}-{month:02d}'
+
+    @staticmethod
+    def _months(start_date, end_date):
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            yield year, month
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+
+    def get(self, key):
+        raw = self.client.get(self._entry_key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl, start_date, end_date):
+        pipe = self.client.pipeline()
+        pipe.set(self._entry_key(key), json.dumps(value), ex=int(ttl))
+        for year, month in self._months(start_date, end_date):
+            month_key = self._month_key(year, month)
+            pipe.sadd(month_key, key)
+            pipe.expire(month_key, max(int(ttl), self.index_ttl))
+        pipe.execute()
+
+    def invalidate_range(self, start_date, end_date):
+        for year, month in self._months(start_date, end_date):
+            month_key = self._month_key(year, month)
+            keys = self.client.smembers(month_key)
+            if keys:
+                self.client.delete(*[self._entry_key(k.decode()) for k in keys])
+            self.client.delete(month_key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f'{self.prefix}:*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class ReportCache:
+    """Cache de respuestas de reportes con invalidación por rango de fechas"""
+
+    EXTENSION_KEY = 'report_cache'
+    PENDING_KEY = 'report_cache_pending'
+
+    def init_app(self, app):
+        app.config.setdefault('REPORT_CACHE_ENABLED', True)
+        app.config.setdefault('REPORT_CACHE_BACKEND', 'memory')
+        app.config.setdefault('REPORT_CACHE_MAX_ENTRIES', 512)
+        app.config.setdefault('REPORT_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('REPORT_CACHE_TTL_OPEN', 60)
+        app.config.setdefault('REPORT_CACHE_TTL_CLOSED', None)
+        self._resolve_closed_ttl(app.config)
+
+        app.extensions[self.EXTENSION_KEY] = self._create_backend(app.config)
+        _register_listeners()
+
+    @staticmethod
+    def _resolve_closed_ttl(config):
+        """
+        Con 'memory' los demás workers no se enteran de las invalidaciones: un
+        TTL largo les haría servir reportes viejos tras editar un período cerrado.
+        """
+        in_process = config['REPORT_CACHE_BACKEND'] == 'memory'
+        if config['REPORT_CACHE_TTL_CLOSED'] is None:
+            config['REPORT_CACHE_TTL_CLOSED'] = (
+                config['REPORT_CACHE_TTL_OPEN'] if in_process else SHARED_TTL_CLOSED
+            )
+        elif in_process and config['REPORT_CACHE_TTL_CLOSED'] > config['REPORT_CACHE_TTL_OPEN']:
+            logger.warning(
+                'REPORT_CACHE_TTL_CLOSED=%ss con el backend memory: con varios workers '
+                'los reportes de períodos cerrados pueden quedar desactualizados hasta que expiren; '
+                'usar REPORT_CACHE_BACKEND=redis', config['REPORT_CACHE_TTL_CLOSED']
+            )
+
+    @staticmethod
+    def _create_backend(config):
+        name = config['REPORT_CACHE_BACKEND']
+        if name == 'memory':
+            return MemoryCacheBackend(config['REPORT_CACHE_MAX_ENTRIES'])
+        if name == 'redis':
+            return RedisCacheBackend(
+                config['REPORT_CACHE_REDIS_URL'],
+                index_ttl=max(config['REPORT_CACHE_TTL_OPEN'], config['REPORT_CACHE_TTL_CLOSED'])
+            )
+        module_name, _, class_name = name.partition(':')
+        backend_class = getattr(importlib.import_module(module_name), class_name)
+        return backend_class(config)
+
+    @staticmethod
+    def _backend():
+        from flask import current_app
+        if not current_app.config.get('REPORT_CACHE_ENABLED'):
+            return None
+        return current_app.extensions.get(ReportCache.EXTENSION_KEY)
+
+    @staticmethod
+    def make_key(endpoint, start_date, end_date, filters=None):
+        """Clave normalizada: endpoint, fechas ISO y filtros no vacíos ordenados"""
+        normalized = {
+            'endpoint': endpoint,
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'filters': sorted((k, str(v)) for k, v in (filters or {}).items() if v not in (None, ''))
+        }
+        raw = json.dumps(normalized, sort_keys=True)
+        return f'{endpoint}:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+    def get_or_compute(self, endpoint, start_date, end_date, compute, filters=None, depends_on=None):
+        """
+        Devuelve la respuesta cacheada o la calcula con compute().
+
+        depends_on: rango (inicio, fin) de datos del que depende la respuesta,
+        si es más amplio que start_date/end_date (ej. el período anterior del dashboard).
+        """
+        backend = self._backend()
+        if backend is None:
+            return compute()
+
+        key = self.make_key(endpoint, start_date, end_date, filters)
+        cached = backend.get(key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        range_start, range_end = depends_on or (start_date, end_date)
+        backend.set(key, value, self._ttl(range_end), range_start, range_end)
+        return value
+
+    @staticmethod
+    def _ttl(range_end):
+        """Los rangos cerrados (antes de hoy) rara vez cambian: se cachean mucho más tiempo"""
+        from flask import current_app
+        if range_end < date.today():
+            return current_app.config['REPORT_CACHE_TTL_CLOSED']
+        return current_app.config['REPORT_CACHE_TTL_OPEN']
+
+    def invalidate_range(self, start_date, end_date):
+        backend = self._backend()
+        if backend is not None:
+            backend.invalidate_range(start_date, end_date)
+
+    def invalidate_dates(self, dates):
+        """Invalida las entradas que incluyen alguna de las fechas"""
+        dates = [d for d in dates if d is not None]
+        if dates:
+            self.invalidate_range(min(dates), max(dates))
+
+    def clear(self):
+        backend = self._backend()
+        if backend is not None:
+            backend.clear()
+
+
+report_cache = ReportCache()
+
+
+# ---- Invalidación automática en escrituras ORM ----
+
+def _month_range(year, month):
+    """Rango de fechas al que impacta un sueldo (13 = SAC1 en junio, 14 = SAC2 en diciembre)"""
+    if month == 13:
+        month = 6
+    elif month == 14:
+        month = 12
+    start = date(year, month, 1)
+    end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+def _values(obj, field):
+    history = inspect(obj).attrs[field].history
+    values = list(history.added) + list(history.deleted) + list(history.unchanged)
+    return values or [getattr(obj, field)]
+
+
+def _affected_ranges(obj):
+    """Rangos de fechas afectados por el alta/edición/baja de un objeto, o None para invalidar todo"""
+    from app.models.sale import Sale
+    from app.models.expense import Expense
+    from app.models.payroll import Payroll
+    from app.models.shift import Shift
+
+    if isinstance(obj, Sale):
+        dates = set(_values(obj, 'fecha'))
+        for cerrada in _values(obj, 'cerrada'):
+            if isinstance(cerrada, datetime):
+                dates.add((cerrada - timedelta(hours=3)).date())
+        return [(d, d) for d in dates if d is not None]
+    if isinstance(obj, Expense):
+        return [(d, d) for d in _values(obj, 'fecha') if d is not None]
+    if isinstance(obj, Shift):
+        return [(d, d) for d in _values(obj, 'shift_date') if d is not None]
+    if isinstance(obj, Payroll):
+        return [
+            _month_range(year, month)
+            for year in _values(obj, 'year') for month in _values(obj, 'month')
+            if year and month
+        ]
+    return None
+
+
+def _is_reference_data(obj):
+    from app.models.ml_tracking import Holiday
+    from app.models.job_position import JobPosition
+    from app.models.employee import Employee
+    from app.models.report_goal import ReportGoal
+    from app.models.expense import ExpenseCategory
+    return isinstance(obj, (Holiday, JobPosition, Employee, ReportGoal, ExpenseCategory))
+
+
+def _collect_changes(session, flush_context):
+    invalidate_all = False
+    ranges = []
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if _is_reference_data(obj):
+            invalidate_all = True
+            continue
+        ranges.extend(_affected_ranges(obj) or [])
+
+    if not invalidate_all and not ranges:
+        return
+    pending = session.info.setdefault(ReportCache.PENDING_KEY, {'ranges': [], 'all': False})
+    pending['all'] = pending['all'] or invalidate_all
+    pending['ranges'].extend(ranges)
+
+
+def _apply_invalidation(session):
+    pending = session.info.pop(ReportCache.PENDING_KEY, None)
+    if not pending:
+        return
+    from flask import has_app_context
+    if not has_app_context():
+        return
+    if pending['all']:
+        report_cache.clear()
+        return
+    for start, end in pending['ranges']:
+        report_cache.invalidate_range(start, end)
+
+
+def _discard_pending(session):
+    session.info.pop(ReportCache.PENDING_KEY, None)
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+def _register_listeners():
+    if event.contains(Session, 'after_flush', _collect_changes):
+        return
+    from app.models.expense import Expense
+    from app.models.payroll import Payroll
+    from app.models.shift import Shift
+
+    event.listen(Session, 'after_flush', _collect_changes)
+    event.listen(Session, 'after_commit', _apply_invalidation)
+    event.listen(Session, 'after_rollback', _discard_pending)
+    # Cargar la fecha anterior al modificar objetos expirados, para invalidar también el rango de origen
+    for attribute in (Expense.fecha, Shift.shift_date, Payroll.month, Payroll.year):
+        event.listen(attribute, 'set', _keep_previous_value, active_history=True)
@@ -0,0 +1,52 @@
+"""
+Log estructurado de requests con muestreo.
+
+Reemplaza los print por request: una línea JSON por request muestreado
+(método, ruta, estado, duración, origen y usuario; nunca el token), en el
+logger 'app.requests'. REQUEST_LOG_SAMPLE_RATE va de 0 (nada) a 1 (todos);
+las respuestas 5xx se registran siempre.
+"""
+import json
+import logging
+import random
+import time
+
+from flask import g, request
+
+logger = logging.getLogger('app.requests')
+
+
+def init_app(app):
+    app.config.setdefault('REQUEST_LOG_SAMPLE_RATE', 0.0)
+    sample_rate = float(app.config['REQUEST_LOG_SAMPLE_RATE'])
+
+    if sample_rate > 0 and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    @app.before_request
+    def start_request_log():
+        g.request_log_start = time.perf_counter()
+        g.request_log_sampled = sample_rate > 0 and random.random() < sample_rate
+
+    @app.after_request
+    def write_request_log(response):
+        sampled = g.get('request_log_sampled', False)
+        if not sampled and response.status_code < 500:
+            return response
+
+        start = g.get('request_log_start')
+        logger.log(logging.ERROR if response.status_code >= 500 else logging.INFO, json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 1) if start else None,
+            'origin': request.headers.get('Origin'),
+            'user_id': g.get('current_user_id'),
+            'authenticated': 'Authorization' in request.headers,
+            'cors_origin': response.headers.get('Access-Control-Allow-Origin')
+        }))
+        return response
@@ -0,0 +1,177 @@
+"""
+Profiler liviano de requests.
+
+Cuenta las consultas SQL y el tiempo de base de datos de cada request con
+los eventos del Engine de SQLAlchemy y los devuelve en los headers
+`X-Query-Count` y `Server-Timing` (visibles en las DevTools del navegador).
+Los requests que superan SLOW_REQUEST_MS o SLOW_REQUEST_QUERIES se registran
+en el logger 'app.profiler'.
+
+Además acumula, por ruta (método + regla de URL), las últimas
+REQUEST_PROFILER_WINDOW muestras de latencia y consultas para calcular
+p50/p95 (ver routes/perf_stats.py). Las estadísticas son por proceso.
+
+El costo por consulta son dos lecturas de reloj y una suma; se puede
+desactivar con REQUEST_PROFILER_ENABLED=false.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('app.profiler')
+
+
+class _RequestProfile:
+    __slots__ = ('started', 'queries', 'db_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+class RouteStats:
+    """Últimas muestras (ms, consultas) por ruta, thread-safe"""
+
+    def __init__(self, window):
+        self.window = window
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, blueprint, elapsed_ms, queries, slow):
+        with self._lock:
+            entry = self._routes.get(key)
+            if entry is None:
+                entry = self._routes[key] = {
+                    'blueprint': blueprint,
+                    'count': 0,
+                    'slow_count': 0,
+                    'samples': deque(maxlen=self.window)
+                }
+            entry['count'] += 1
+            entry['slow_count'] += int(slow)
+            entry['samples'].append((elapsed_ms, queries))
+
+    def snapshot(self):
+        """Lista de rutas con percentiles de latencia y consultas, de mayor a menor p95"""
+        with self._lock:
+            routes = [
+                (key, entry['blueprint'], entry['count'], entry['slow_count'], list(entry['samples']))
+                for key, entry in self._routes.items()
+            ]
+
+        result = []
+        for key, blueprint, count, slow_count, samples in routes:
+            values = np.array(samples, dtype=np.float64).reshape(len(samples), 2)
+            latency, queries = values[:, 0], values[:, 1]
+            p50_ms, p95_ms = np.percentile(latency, [50, 95])
+            method, _, rule = key.partition(' ')
+            result.append({
+                'route': rule,
+                'method': method,
+                'blueprint': blueprint,
+                'count': count,
+                'slow_count': slow_count,
+                'samples': len(samples),
+                'p50_ms': round(float(p50_ms), 2),
+                'p95_ms': round(float(p95_ms), 2),
+                'max_ms': round(float(latency.max()), 2),
+                'avg_queries': round(float(queries.mean()), 2),
+                'p95_queries': round(float(np.percentile(queries, 95)), 2),
+                'max_queries': int(queries.max())
+            })
+        result.sort(key=lambda r: r['p95_ms'], reverse=True)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+class RequestProfiler:
+    EXTENSION_KEY = 'request_profiler'
+
+    def init_app(self, app):
+        app.config.setdefault('REQUEST_PROFILER_ENABLED', True)
+        app.config.setdefault('REQUEST_PROFILER_WINDOW', 500)
+        app.config.setdefault('SLOW_REQUEST_MS', 1000)
+        app.config.setdefault('SLOW_REQUEST_QUERIES', 50)
+        if not app.config['REQUEST_PROFILER_ENABLED']:
+            return
+
+        app.extensions[self.EXTENSION_KEY] = RouteStats(app.config['REQUEST_PROFILER_WINDOW'])
+        _register_listeners()
+
+        @app.before_request
+        def start_profile():
+            g.request_profile = _RequestProfile()
+
+        @app.after_request
+        def finish_profile(response):
+            profile = g.pop('request_profile', None)
+            if profile is None:
+                return response
+
+            elapsed_ms = (time.perf_counter() - profile.started) * 1000
+            db_ms = profile.db_seconds * 1000
+            response.headers['X-Query-Count'] = str(profile.queries)
+            response.headers['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{profile.queries} queries", app;dur={elapsed_ms:.1f}'
+            )
+
+            slow = (elapsed_ms > app.config['SLOW_REQUEST_MS']
+                    or profile.queries > app.config['SLOW_REQUEST_QUERIES'])
+            if slow:
+                logger.warning(
+                    'Request lento: %s %s -> %s en %.1f ms (%d consultas, %.1f ms en base de datos)',
+                    request.method, request.path, response.status_code, elapsed_ms, profile.queries, db_ms
+                )
+
+            if request.url_rule is not None:
+                app.extensions[self.EXTENSION_KEY].record(
+                    f'{request.method} {request.url_rule.rule}', request.blueprint,
+                    elapsed_ms, profile.queries, slow
+                )
+            return response
+
+    def stats(self):
+        """RouteStats de la aplicación actual (None si el profiler está desactivado)"""
+        return current_app.extensions.get(self.EXTENSION_KEY)
+
+
+request_profiler = RequestProfiler()
+
+
+# ---- Eventos del Engine (todas las aplicaciones) ----
+
+def _current_profile():
+    if not has_request_context():
+        return None
+    return g.get('request_profile')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile() is not None:
+        conn.info.setdefault('request_profiler_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile()
+    starts = conn.info.get('request_profiler_start')
+    if profile is None or not starts:
+        return
+    profile.queries += 1
+    profile.db_seconds += time.perf_counter() - starts.pop()
+
+
+def _register_listeners():
+    if event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
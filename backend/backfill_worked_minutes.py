@@ -0,0 +1,27 @@
+"""
+Calcula time_tracking.total_worked_minutes y time_tracking.open_block a partir
+de los bloques de trabajo de cada registro. Correr una vez después de aplicar
+la migración add_time_tracking_worked_minutes (las escrituras posteriores los
+mantienen automáticamente).
+
+Uso: python backfill_worked_minutes.py
+"""
+from sqlalchemy import func
+
+from app import create_app
+from app.extensions import db
+from app.models.time_tracking import TimeTracking
+from app.services.worked_time_service import WorkedTimeService
+
+app = create_app()
+
+with app.app_context():
+    try:
+        count = WorkedTimeService.backfill()
+        db.session.commit()
+        total = db.session.query(func.coalesce(func.sum(TimeTracking.total_worked_minutes), 0)).scalar()
+        print(f'✓ Registros actualizados: {count}')
+        print(f'✓ Horas trabajadas registradas: {total // 60}h {total % 60}m')
+    except Exception as e:
+        print(f'Error: {e}')
+        db.session.rollback()
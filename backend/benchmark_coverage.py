@@ -0,0 +1,141 @@
+"""
+Benchmark de /coverage/hourly y /coverage/summary.
+
+Compara la implementación anterior (objetos Shift y defaultdicts anidados
+por día y hora, contando solo horas enteras) contra CoverageEngine (una
+consulta de columnas y un arreglo de diferencias en NumPy a resolución de
+minutos).
+
+Usa una base SQLite en memoria con un año de turnos sintéticos.
+
+Uso: python benchmark_coverage.py [--employees 40] [--shifts-per-week 5] [--runs 5]
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, time as dtime
+
+from sqlalchemy import event, insert
+
+from app import create_app
+from app.extensions import db
+from app.models.shift import Shift
+from app.services.coverage_engine import CoverageEngine
+
+
+def seed(n_employees, shifts_per_week):
+    rnd = random.Random(42)
+    shifts = []
+    start = date(2025, 1, 1)
+    for day in range(365):
+        shift_date = start + timedelta(days=day)
+        for emp_id in range(1, n_employees + 1):
+            if rnd.random() > shifts_per_week / 7:
+                continue
+            start_min = rnd.choice([8, 10, 12, 16, 18, 20]) * 60 + rnd.choice([0, 15, 30, 45])
+            length = rnd.choice([240, 360, 480, 510])
+            end_min = (start_min + length) % (24 * 60)
+            shifts.append({
+                'schedule_id': 1,
+                'employee_id': emp_id,
+                'shift_date': shift_date,
+                'start_time': dtime(start_min // 60, start_min % 60),
+                'end_time': dtime(end_min // 60, end_min % 60),
+                'hours': length / 60,
+                'created_at': datetime.utcnow()
+            })
+    db.session.execute(insert(Shift), shifts)
+    db.session.commit()
+    return len(shifts)
+
+
+def legacy_coverage(start, end):
+    """Implementación previa de /hourly y /summary"""
+    shifts = Shift.query.filter(Shift.shift_date >= start, Shift.shift_date <= end).all()
+    coverage_data = defaultdict(lambda: defaultdict(int))
+    for shift in shifts:
+        for hour in range(shift.start_time.hour, shift.end_time.hour):
+            coverage_data[str(shift.shift_date)][hour] += 1
+
+    result = []
+    current_date = start
+    while current_date <= end:
+        date_str = str(current_date)
+        result.append({
+            'date': date_str,
+            'hourly_coverage': [
+                {'hour': hour, 'employee_count': coverage_data[date_str].get(hour, 0)} for hour in range(24)
+            ]
+        })
+        current_date += timedelta(days=1)
+
+    shifts = Shift.query.filter(Shift.shift_date >= start, Shift.shift_date <= end).all()
+    hourly_counts = defaultdict(int)
+    for shift in shifts:
+        for hour in range(shift.start_time.hour, shift.end_time.hour):
+            hourly_counts[hour] += 1
+    return result, max(hourly_counts.items(), key=lambda x: x[1])
+
+
+def engine_coverage(start, end, resolution):
+    engine = CoverageEngine(start, end)
+    result = {'dates': [str(d) for d in engine.dates()], 'coverage': engine.curves(resolution).tolist()}
+    summary = CoverageEngine(start, end)
+    return result, summary.totals(), int(summary.curves(60).sum(axis=0).argmax())
+
+
+def measure(fn, args, runs):
+    queries = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    timings = []
+    try:
+        for _ in range(runs):
+            db.session.expire_all()
+            queries.clear()
+            t0 = time.perf_counter()
+            result = fn(*args)
+            timings.append((time.perf_counter() - t0) * 1000)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return result, statistics.median(timings), len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--employees', type=int, default=40)
+    parser.add_argument('--shifts-per-week', type=float, default=5)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        print(f'🌱 Generando un año de turnos para {args.employees} empleados...')
+        n_shifts = seed(args.employees, args.shifts_per_week)
+        print(f'   {n_shifts} turnos')
+
+        period = (date(2025, 1, 1), date(2025, 12, 31))
+        _, before_ms, before_q = measure(legacy_coverage, period, args.runs)
+        rows = [('antes (1 h)', before_ms, before_q)]
+        for resolution in (60, 15):
+            _, after_ms, after_q = measure(engine_coverage, period + (resolution,), args.runs)
+            rows.append((f'después ({resolution} min)', after_ms, after_q))
+
+        print(f'\n{"":<20}{"consultas":>12}{"mediana ms":>14}')
+        for label, ms, q in rows:
+            print(f'{label:<20}{q:>12}{ms:>14.1f}')
+        print(f'\n⚡ Speedup (60 min): {before_ms / rows[1][1]:.1f}x')
+        print('ℹ️  El motor nuevo cuenta minutos y turnos nocturnos, por lo que los conteos no coinciden exactamente')
+
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark de las métricas del dashboard de reportes.
+
+Compara la implementación anterior (consultas separadas por período y por
+tipo de gasto, sueldos sumados en Python) contra DashboardMetricsService
+(una consulta con agregación condicional por tabla).
+
+Usa una base SQLite en memoria con datos sintéticos.
+
+Uso: python benchmark_dashboard.py [--sales 50000] [--expenses 10000] [--employees 40] [--runs 20]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, func, insert, or_, and_
+
+from app import create_app
+from app.extensions import db
+from app.models.sale import Sale
+from app.models.expense import Expense, ExpenseCategory
+from app.models.payroll import Payroll
+from app.services.dashboard_metrics_service import DashboardMetricsService
+from app.services.sales_rollup_service import SalesRollupService
+
+
+def seed(n_sales, n_expenses, n_employees):
+    rnd = random.Random(42)
+    start = date(2025, 1, 1)
+    days = 540
+
+    directo = ExpenseCategory(name='Mercadería', expense_type='directo')
+    indirecto = ExpenseCategory(name='Servicios', expense_type='indirecto')
+    db.session.add_all([directo, indirecto])
+    db.session.flush()
+
+    sales = []
+    for i in range(n_sales):
+        fecha = start + timedelta(days=rnd.randrange(days))
+        cerrada = datetime.combine(fecha, datetime.min.time()) + timedelta(hours=rnd.randint(14, 26))
+        sales.append({
+            'external_id': i + 1,
+            'fecha': fecha,
+            'creacion': cerrada - timedelta(minutes=45),
+            'cerrada': cerrada,
+            'estado': 'Cerrada' if rnd.random() < 0.95 else 'Cancelada',
+            'total': round(rnd.uniform(2000, 60000), 2),
+            'tipo_venta': rnd.choice(['Local', 'Delivery', 'Mostrador']),
+            'medio_pago': rnd.choice(['Efectivo', 'Tarjeta', 'Mercado Pago']),
+            'sala': rnd.choice(['Salón', 'Terraza', None]),
+            'fiscal': False,
+            'created_at': cerrada
+        })
+    db.session.execute(insert(Sale), sales)
+
+    expenses = [{
+        'fecha': start + timedelta(days=rnd.randrange(days)),
+        'importe': round(rnd.uniform(1000, 200000), 2),
+        'category_id': rnd.choice([directo.id, indirecto.id, None]),
+        'cancelado': rnd.random() < 0.05,
+        'created_at': datetime.utcnow()
+    } for _ in range(n_expenses)]
+    db.session.execute(insert(Expense), expenses)
+
+    payrolls = []
+    for emp_id in range(1, n_employees + 1):
+        for year, month in [(2025, m) for m in range(1, 15)] + [(2026, m) for m in range(1, 7)]:
+            payrolls.append({
+                'employee_id': emp_id, 'month': month, 'year': year,
+                'hours_worked': rnd.randint(60, 180), 'scheduled_hours': 0,
+                'hourly_rate': 5000, 'gross_salary': rnd.randint(300000, 900000),
+                'extraordinary_amount': 0, 'status': 'draft', 'pdf_generated': False,
+                'generated_by': 1, 'generated_at': datetime.utcnow()
+            })
+    db.session.execute(insert(Payroll), payrolls)
+
+    SalesRollupService.rebuild_all()
+    db.session.commit()
+
+
+def legacy_dashboard_metrics(start_date, end_date, prev_start_date, prev_end_date):
+    """Implementación previa: 2 × (ventas + 3 gastos + 2 sueldos) consultas"""
+
+    def sales_metrics(s, e):
+        row = db.session.query(
+            func.coalesce(func.sum(Sale.total), 0), func.count(Sale.id)
+        ).filter(Sale.fecha >= s, Sale.fecha <= e, Sale.estado == 'Cerrada').first()
+        total, count = float(row[0] or 0), row[1] or 0
+        return {'total': total, 'count': count, 'ticket_promedio': round(total / count, 2) if count else 0}
+
+    def expenses_metrics(s, e):
+        base = [Expense.fecha >= s, Expense.fecha <= e, Expense.cancelado == False]
+        total = db.session.query(func.coalesce(func.sum(Expense.importe), 0)).filter(*base).scalar()
+        directos = db.session.query(func.coalesce(func.sum(Expense.importe), 0)).outerjoin(
+            ExpenseCategory, Expense.category_id == ExpenseCategory.id
+        ).filter(*base, ExpenseCategory.expense_type == 'directo').scalar()
+        indirectos = db.session.query(func.coalesce(func.sum(Expense.importe), 0)).outerjoin(
+            ExpenseCategory, Expense.category_id == ExpenseCategory.id
+        ).filter(*base, or_(ExpenseCategory.expense_type == 'indirecto', Expense.category_id.is_(None))).scalar()
+        return {'total': float(total or 0), 'directos': float(directos or 0), 'indirectos': float(indirectos or 0)}
+
+    def payroll_metrics(s, e):
+        regular = Payroll.query.filter(
+            Payroll.month <= 12,
+            or_(and_(Payroll.year == s.year, Payroll.month >= s.month), Payroll.year > s.year),
+            or_(and_(Payroll.year == e.year, Payroll.month <= e.month), Payroll.year < e.year)
+        ).all()
+        sac_conditions = []
+        for year in range(s.year, e.year + 1):
+            if s.replace(day=1) <= date(year, 6, 1) <= e.replace(day=1):
+                sac_conditions.append(and_(Payroll.year == year, Payroll.month == 13))
+            if s.replace(day=1) <= date(year, 12, 1) <= e.replace(day=1):
+                sac_conditions.append(and_(Payroll.year == year, Payroll.month == 14))
+        sac = Payroll.query.filter(or_(*sac_conditions)).all() if sac_conditions else []
+        payrolls = regular + sac
+        return {
+            'total': sum(float(p.gross_salary) + float(p.extraordinary_amount or 0) for p in payrolls),
+            'horas': sum(float(p.hours_worked) for p in payrolls)
+        }
+
+    return {
+        'sales': sales_metrics(start_date, end_date),
+        'prev_sales': sales_metrics(prev_start_date, prev_end_date),
+        'expenses': expenses_metrics(start_date, end_date),
+        'prev_expenses': expenses_metrics(prev_start_date, prev_end_date),
+        'payroll': payroll_metrics(start_date, end_date),
+        'prev_payroll': payroll_metrics(prev_start_date, prev_end_date)
+    }
+
+
+def measure(fn, args, runs):
+    queries = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    timings = []
+    try:
+        for _ in range(runs):
+            db.session.expire_all()
+            queries.clear()
+            t0 = time.perf_counter()
+            result = fn(*args)
+            timings.append((time.perf_counter() - t0) * 1000)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return result, statistics.median(timings), len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sales', type=int, default=50000)
+    parser.add_argument('--expenses', type=int, default=10000)
+    parser.add_argument('--employees', type=int, default=40)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        print(f'🌱 Generando {args.sales} ventas, {args.expenses} gastos, {args.employees} empleados...')
+        seed(args.sales, args.expenses, args.employees)
+
+        # Trimestre actual vs. anterior, con SAC1 incluido
+        periods = (date(2025, 4, 1), date(2025, 6, 30), date(2024, 12, 31), date(2025, 3, 31))
+
+        before, before_ms, before_q = measure(legacy_dashboard_metrics, periods, args.runs)
+        after, after_ms, after_q = measure(DashboardMetricsService.period_comparison, periods, args.runs)
+
+        print(f'\n{"":<12}{"consultas":>12}{"mediana ms":>14}')
+        print(f'{"antes":<12}{before_q:>12}{before_ms:>14.1f}')
+        print(f'{"después":<12}{after_q:>12}{after_ms:>14.1f}')
+        print(f'\n⚡ Speedup: {before_ms / after_ms:.1f}x')
+
+        same = all(
+            abs(before[k][m] - after[k][m]) < 0.01
+            for k in before for m in before[k]
+        )
+        print('✅ Resultados idénticos' if same else '❌ Los resultados difieren')
+
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
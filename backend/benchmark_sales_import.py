@@ -0,0 +1,128 @@
+"""
+Benchmark de la importación de ventas desde CSV.
+
+Compara la importación fila por fila anterior (una consulta por external_id
+y un objeto ORM por venta) contra SalesImportService (un IN por lote de filas
+e inserción en bloque con Core).
+
+Usa una base SQLite en memoria con un CSV sintético en formato Fudo.
+
+Uso: python benchmark_sales_import.py [--rows 100000] [--legacy-rows 20000] [--existing 0.1]
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import create_app
+from app.extensions import db
+from app.models.sale import Sale
+from app.services.sales_import_service import SalesImportService
+
+HEADER = [
+    'Id', 'Fecha', 'Creación', 'Cerrada', 'Caja', 'Estado', 'Cliente',
+    'Mesa', 'Sala', 'Personas', 'Camarero / Repartidor', 'Medio de Pago',
+    'Total', 'Fiscal', 'Tipo de Venta', 'Comentario', 'Origen', 'Id. Origen'
+]
+
+
+def synthetic_csv(n_rows):
+    rnd = random.Random(42)
+    start = datetime(2024, 1, 1)
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(HEADER)
+    for i in range(1, n_rows + 1):
+        creacion = start + timedelta(minutes=rnd.randrange(60 * 24 * 700))
+        cerrada = creacion + timedelta(minutes=rnd.randint(10, 120))
+        writer.writerow([
+            i, creacion.strftime('%d/%m/%Y'), creacion.strftime('%d/%m/%Y %H:%M:%S'),
+            cerrada.strftime('%d/%m/%Y %H:%M:%S'), 'Caja 1', 'Cerrada', '',
+            rnd.randint(1, 30), rnd.choice(['Salón', 'Terraza']), rnd.randint(1, 6), 'Mozo',
+            rnd.choice(['Efectivo', 'Tarjeta', 'Mercado Pago']), f'{rnd.uniform(2000, 60000):.2f}'.replace('.', ','),
+            rnd.choice(['Si', 'No']), rnd.choice(['Local', 'Delivery', 'Mostrador']), '', 'Fudo', ''
+        ])
+    return output.getvalue()
+
+
+def legacy_import(reader):
+    """Implementación previa: una consulta por fila y db.session.add por venta"""
+    results = {'total_rows': 0, 'imported': 0, 'updated': 0, 'skipped': 0, 'errors': []}
+    for row_num, row in enumerate(reader, start=2):
+        results['total_rows'] += 1
+        try:
+            external_id = row.get('Id', '').strip()
+            if external_id:
+                existing = Sale.query.filter_by(external_id=int(external_id)).first()
+                if existing:
+                    results['skipped'] += 1
+                    continue
+            sale = Sale.from_csv_row(row)
+            if not sale.fecha:
+                results['errors'].append({'row': row_num, 'data': dict(row),
+                                          'errors': ['La fecha es requerida o tiene formato inválido']})
+                continue
+            db.session.add(sale)
+            results['imported'] += 1
+        except Exception as e:
+            results['errors'].append({'row': row_num, 'data': dict(row), 'errors': [str(e)]})
+    db.session.commit()
+    return results
+
+
+def run(import_fn, content, existing_ratio):
+    db.drop_all()
+    db.create_all()
+    # Una parte de las ventas ya existe (reimportación parcial)
+    n_existing = int(content.count('\n') * existing_ratio)
+    if n_existing:
+        db.session.execute(insert(Sale), [{
+            'external_id': i, 'fecha': datetime(2024, 1, 1).date(), 'creacion': datetime(2024, 1, 1),
+            'estado': 'Cerrada', 'total': 0, 'tipo_venta': 'Local', 'fiscal': False
+        } for i in range(1, n_existing + 1)])
+        db.session.commit()
+
+    t0 = time.perf_counter()
+    results = import_fn(csv.DictReader(io.StringIO(content)))
+    elapsed = time.perf_counter() - t0
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--legacy-rows', type=int, default=20000,
+                        help='filas para la implementación anterior (es mucho más lenta)')
+    parser.add_argument('--existing', type=float, default=0.1)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        print(f'🌱 Generando CSV sintético de {args.rows} filas...')
+        content = synthetic_csv(args.rows)
+        legacy_content = '\n'.join(content.split('\n')[:args.legacy_rows + 1]) + '\n'
+
+        legacy, legacy_s = run(legacy_import, legacy_content, args.existing)
+        bulk_small, bulk_small_s = run(SalesImportService.import_rows, legacy_content, args.existing)
+        bulk, bulk_s = run(SalesImportService.import_rows, content, args.existing)
+
+        print(f'\n{"":<22}{"filas":>10}{"segundos":>12}{"filas/s":>12}')
+        print(f'{"antes (fila a fila)":<22}{args.legacy_rows:>10}{legacy_s:>12.2f}{args.legacy_rows / legacy_s:>12.0f}')
+        print(f'{"después (en bloque)":<22}{args.legacy_rows:>10}{bulk_small_s:>12.2f}{args.legacy_rows / bulk_small_s:>12.0f}')
+        print(f'{"después (en bloque)":<22}{args.rows:>10}{bulk_s:>12.2f}{args.rows / bulk_s:>12.0f}')
+        print(f'\n⚡ Speedup con {args.legacy_rows} filas: {legacy_s / bulk_small_s:.1f}x')
+
+        same = all(legacy[k] == bulk_small[k] for k in ('total_rows', 'imported', 'updated', 'skipped'))
+        print('✅ Resúmenes idénticos' if same else '❌ Los resúmenes difieren')
+        print(f"   importadas: {bulk['imported']}, omitidas: {bulk['skipped']}, errores: {len(bulk['errors'])}")
+
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Benchmark del costo laboral de /reports/time-analysis.
+
+Compara la implementación anterior (todos los turnos del rango como objetos
+ORM, cargados dos veces y recorridos minuto a minuto por franja) contra
+LaborDistribution (una consulta de columnas y matrices NumPy).
+
+Usa una base SQLite en memoria con un año de turnos sintéticos.
+
+Uso: python benchmark_time_analysis.py [--employees 40] [--shifts-per-week 5] [--runs 5]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta, time as dtime
+
+from sqlalchemy import event, insert
+
+from app import create_app
+from app.extensions import db
+from app.models.shift import Shift
+from app.routes.reports import (
+    _build_labor_lookups, _shift_effective_rate, distribute_shift_hours,
+    get_labor_by_weekday, get_labor_by_hour
+)
+from app.services.labor_distribution_service import LaborDistribution
+from app.utils.holiday_calendar import holiday_calendar
+
+
+def seed(n_employees, shifts_per_week):
+    from app.models.employee import Employee
+    from app.models.job_position import JobPosition
+    from app.models.ml_tracking import Holiday
+    from app.models.user import User
+
+    rnd = random.Random(42)
+    user = User(email='bench@example.com', password_hash='x', role='admin')
+    db.session.add(user)
+    db.session.flush()
+
+    positions = []
+    for i, rate in enumerate([1800, 2200, 2600, 3500]):
+        jp = JobPosition(name=f'Puesto {i}', contract_type='hourly', hourly_rate=rate,
+                         sunday_rate_multiplier=1.5, holiday_rate_multiplier=2.0, created_by_id=user.id)
+        db.session.add(jp)
+        positions.append(jp)
+    db.session.flush()
+
+    employees = []
+    for i in range(n_employees):
+        emp_user = User(email=f'emp{i}@example.com', password_hash='x', role='employee')
+        db.session.add(emp_user)
+        db.session.flush()
+        emp = Employee(user_id=emp_user.id, first_name=f'Emp{i}', last_name='Bench', dni=f'{30000000 + i}',
+                       hire_date=date(2024, 1, 1), current_job_position_id=rnd.choice(positions).id)
+        db.session.add(emp)
+        employees.append(emp)
+    db.session.flush()
+
+    for d in (date(2025, 1, 1), date(2025, 5, 25), date(2025, 7, 9), date(2025, 12, 25)):
+        db.session.add(Holiday(date=d, name=f'Feriado {d}', type='national'))
+
+    shifts = []
+    start = date(2025, 1, 1)
+    for day in range(365):
+        shift_date = start + timedelta(days=day)
+        for emp in employees:
+            if rnd.random() > shifts_per_week / 7:
+                continue
+            start_min = rnd.choice([8, 10, 12, 16, 18, 20]) * 60 + rnd.choice([0, 30])
+            length = rnd.choice([240, 360, 480, 510])
+            end_min = (start_min + length) % (24 * 60)
+            shifts.append({
+                'schedule_id': 1,
+                'employee_id': emp.id,
+                'shift_date': shift_date,
+                'start_time': dtime(start_min // 60, start_min % 60),
+                'end_time': dtime(end_min // 60, end_min % 60),
+                'hours': length / 60,
+                'created_at': datetime.utcnow()
+            })
+    db.session.execute(insert(Shift), shifts)
+    db.session.commit()
+    return len(shifts)
+
+
+def legacy_labor(start_date, end_date, employee_rates, holiday_dates):
+    """Implementación previa: dos cargas de objetos Shift y bucles por turno"""
+    by_dow = {i: {'sum_horas': 0.0, 'sum_costo': 0.0} for i in range(7)}
+    for shift in Shift.query.filter(Shift.shift_date >= start_date, Shift.shift_date <= end_date).all():
+        horas = float(shift.hours)
+        rate = _shift_effective_rate(shift, employee_rates, holiday_dates)
+        by_dow[shift.shift_date.weekday()]['sum_horas'] += horas
+        by_dow[shift.shift_date.weekday()]['sum_costo'] += horas * rate
+
+    by_hour = {}
+    for shift in Shift.query.filter(Shift.shift_date >= start_date, Shift.shift_date <= end_date).all():
+        rate = _shift_effective_rate(shift, employee_rates, holiday_dates)
+        for hora, fraccion in distribute_shift_hours(shift.start_time, shift.end_time).items():
+            slot = by_hour.setdefault(hora, {'sum_horas': 0.0, 'sum_costo': 0.0})
+            slot['sum_horas'] += fraccion
+            slot['sum_costo'] += fraccion * rate
+
+    return (
+        [round(by_dow[i]['sum_costo'], 2) for i in range(7)],
+        [round(by_hour[h]['sum_costo'], 2) for h in sorted(by_hour)]
+    )
+
+
+def vectorized_labor(start_date, end_date, employee_rates, holiday_dates):
+    distribution = LaborDistribution(start_date, end_date, employee_rates, holiday_dates)
+    labor_wd = get_labor_by_weekday(start_date, end_date, employee_rates, holiday_dates, distribution)
+    labor_hr = get_labor_by_hour(start_date, end_date, employee_rates, holiday_dates, distribution)
+    return [row['sum_costo'] for row in labor_wd], [row['sum_costo'] for row in labor_hr]
+
+
+def measure(fn, args, runs):
+    queries = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    timings = []
+    try:
+        for _ in range(runs):
+            db.session.expire_all()
+            queries.clear()
+            t0 = time.perf_counter()
+            result = fn(*args)
+            timings.append((time.perf_counter() - t0) * 1000)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return result, statistics.median(timings), len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--employees', type=int, default=40)
+    parser.add_argument('--shifts-per-week', type=float, default=5)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        print(f'🌱 Generando un año de turnos para {args.employees} empleados...')
+        n_shifts = seed(args.employees, args.shifts_per_week)
+        print(f'   {n_shifts} turnos')
+
+        holiday_calendar.invalidate()
+        start_date, end_date = date(2025, 1, 1), date(2025, 12, 31)
+        lookups = _build_labor_lookups(start_date, end_date)
+        period = (start_date, end_date) + lookups
+
+        before, before_ms, before_q = measure(legacy_labor, period, args.runs)
+        after, after_ms, after_q = measure(vectorized_labor, period, args.runs)
+
+        print(f'\n{"":<12}{"consultas":>12}{"mediana ms":>14}')
+        print(f'{"antes":<12}{before_q:>12}{before_ms:>14.1f}')
+        print(f'{"después":<12}{after_q:>12}{after_ms:>14.1f}')
+        print(f'\n⚡ Speedup: {before_ms / after_ms:.1f}x')
+
+        same = all(
+            len(b) == len(a) and all(abs(x - y) < 0.05 for x, y in zip(b, a))
+            for b, a in zip(before, after)
+        )
+        print('✅ Resultados idénticos' if same else '❌ Los resultados difieren')
+
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
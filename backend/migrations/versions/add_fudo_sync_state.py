@@ -0,0 +1,37 @@
+"""Add fudo_sync_state table and high-water columns on sync_jobs
+
+Revision ID: add_fudo_sync_state
+Revises: add_sync_jobs_table
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_fudo_sync_state'
+down_revision = 'add_sync_jobs_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('sync_jobs', sa.Column('high_water_at', sa.DateTime(), nullable=True))
+
+    op.create_table('fudo_sync_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resource', sa.String(length=20), nullable=False),
+        sa.Column('last_seen_at', sa.DateTime(), nullable=True),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('last_job_id', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['last_job_id'], ['sync_jobs.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('resource')
+    )
+
+
+def downgrade():
+    op.drop_table('fudo_sync_state')
+    op.drop_column('sync_jobs', 'high_water_at')
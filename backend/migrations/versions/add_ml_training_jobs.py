@@ -0,0 +1,45 @@
+"""Add ml_training_jobs table for background model training
+
+Revision ID: add_ml_training_jobs
+Revises: add_user_token_version
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_ml_training_jobs'
+down_revision = 'add_user_token_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ml_training_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('stage', sa.String(length=30), nullable=True),
+        sa.Column('progress', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('model_version_id', sa.Integer(), nullable=True),
+        sa.Column('active_lock', sa.Boolean(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['model_version_id'], ['ml_model_versions.id'], ),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('active_lock')
+    )
+    op.create_index('idx_ml_training_jobs_status', 'ml_training_jobs', ['status'])
+
+
+def downgrade():
+    op.drop_index('idx_ml_training_jobs_status', table_name='ml_training_jobs')
+    op.drop_table('ml_training_jobs')
@@ -0,0 +1,68 @@
+"""Add sales daily/hourly rollup tables
+
+Revision ID: add_sales_rollup_tables
+Revises: merge_heads_march8
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_sales_rollup_tables'
+down_revision = 'merge_heads_march8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sales_daily_rollup',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('tipo_venta', sa.String(length=50), nullable=True),
+        sa.Column('medio_pago', sa.String(length=100), nullable=True),
+        sa.Column('sala', sa.String(length=100), nullable=True),
+        sa.Column('total', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('cantidad', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_sales_daily_rollup_fecha', 'sales_daily_rollup', ['fecha'])
+
+    op.create_table('sales_hourly_rollup',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('hora', sa.Integer(), nullable=False),
+        sa.Column('tipo_venta', sa.String(length=50), nullable=True),
+        sa.Column('medio_pago', sa.String(length=100), nullable=True),
+        sa.Column('sala', sa.String(length=100), nullable=True),
+        sa.Column('total', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('cantidad', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_sales_hourly_rollup_fecha_hora', 'sales_hourly_rollup', ['fecha', 'hora'])
+
+    # Carga inicial desde las ventas existentes (cierre en hora local UTC-3)
+    op.execute("""
+        INSERT INTO sales_daily_rollup (fecha, tipo_venta, medio_pago, sala, total, cantidad)
+        SELECT fecha, tipo_venta, medio_pago, sala, COALESCE(SUM(total), 0), COUNT(id)
+        FROM sales
+        WHERE estado = 'Cerrada'
+        GROUP BY fecha, tipo_venta, medio_pago, sala
+    """)
+    op.execute("""
+        INSERT INTO sales_hourly_rollup (fecha, hora, tipo_venta, medio_pago, sala, total, cantidad)
+        SELECT CAST(cerrada - INTERVAL '3 hours' AS DATE),
+               CAST(EXTRACT(HOUR FROM cerrada - INTERVAL '3 hours') AS INTEGER),
+               tipo_venta, medio_pago, sala, COALESCE(SUM(total), 0), COUNT(id)
+        FROM sales
+        WHERE estado = 'Cerrada' AND cerrada IS NOT NULL
+        GROUP BY 1, 2, tipo_venta, medio_pago, sala
+    """)
+
+
+def downgrade():
+    op.drop_index('idx_sales_hourly_rollup_fecha_hora', table_name='sales_hourly_rollup')
+    op.drop_table('sales_hourly_rollup')
+    op.drop_index('idx_sales_daily_rollup_fecha', table_name='sales_daily_rollup')
+    op.drop_table('sales_daily_rollup')
@@ -0,0 +1,47 @@
+"""Add sync_jobs table for resumable Fudo sync
+
+Revision ID: add_sync_jobs_table
+Revises: add_sales_rollup_tables
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_sync_jobs_table'
+down_revision = 'add_sales_rollup_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sync_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resource', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('last_committed_page', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_fetched', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('imported', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('no_category_mapping', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', sa.JSON(), nullable=False),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_sync_jobs_resource_status', 'sync_jobs', ['resource', 'status'])
+
+
+def downgrade():
+    op.drop_index('idx_sync_jobs_resource_status', table_name='sync_jobs')
+    op.drop_table('sync_jobs')
@@ -0,0 +1,28 @@
+"""Add stored worked-minutes totals to time_tracking
+
+Revision ID: add_time_tracking_worked_minutes
+Revises: add_fudo_sync_state
+Create Date: 2026-10-17 18:00:00.000000
+
+Existing rows start at 0: run `python backfill_worked_minutes.py` after
+upgrading to compute them from work_blocks.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_time_tracking_worked_minutes'
+down_revision = 'add_fudo_sync_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('time_tracking', sa.Column('total_worked_minutes', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('time_tracking', sa.Column('open_block', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    op.drop_column('time_tracking', 'open_block')
+    op.drop_column('time_tracking', 'total_worked_minutes')
@@ -0,0 +1,26 @@
+"""Add token_version to users
+
+Revision ID: add_user_token_version
+Revises: add_time_tracking_worked_minutes
+Create Date: 2026-10-17 22:00:00.000000
+
+Tokens carry the version as the `ver` claim; bumping it (password change or
+deactivation) revokes the tokens issued before.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_token_version'
+down_revision = 'add_time_tracking_worked_minutes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,23 @@
+"""
+Reconstruye los agregados diarios/horarios de ventas (sales_daily_rollup y
+sales_hourly_rollup) a partir de la tabla sales.
+
+Uso: python rebuild_sales_rollup.py
+"""
+from app import create_app
+from app.extensions import db
+from app.models.sales_rollup import SalesDailyRollup, SalesHourlyRollup
+from app.services.sales_rollup_service import SalesRollupService
+
+app = create_app()
+
+with app.app_context():
+    try:
+        db.create_all()
+        SalesRollupService.rebuild_all()
+        db.session.commit()
+        print(f'✓ Agregado diario: {SalesDailyRollup.query.count()} filas')
+        print(f'✓ Agregado horario: {SalesHourlyRollup.query.count()} filas')
+    except Exception as e:
+        print(f'Error: {e}')
+        db.session.rollback()
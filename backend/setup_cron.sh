@@ -5,6 +5,7 @@
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 PYTHON_PATH="$SCRIPT_DIR/venv/bin/python"
 TASKS_PATH="$SCRIPT_DIR/app/tasks/ml_tasks.py"
+FUDO_TASKS_PATH="$SCRIPT_DIR/app/tasks/fudo_tasks.py"
 
 echo "Setting up ML maintenance cron jobs..."
 echo ""
@@ -25,8 +26,14 @@ echo ""
 echo "# Monthly full retrain (first day of month at 4:00 AM)"
 echo "0 4 1 * * cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH monthly_retrain"
 echo ""
+echo "# Incremental Fudo sales sync (every 15 minutes)"
+echo "*/15 * * * * cd $SCRIPT_DIR && $PYTHON_PATH $FUDO_TASKS_PATH sales"
+echo ""
+echo "# Incremental Fudo expenses sync (every hour)"
+echo "5 * * * * cd $SCRIPT_DIR && $PYTHON_PATH $FUDO_TASKS_PATH expenses"
+echo ""
 echo "To install these cron jobs, run:"
 echo ""
-echo "(crontab -l 2>/dev/null; echo '# ML Maintenance Tasks'; echo '0 1 * * * cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH daily_accuracy'; echo '0 2 * * 1 cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH weekly_retrain_check'; echo '0 3 * * 0 cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH weekly_predictions'; echo '0 9 * * * cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH daily_alerts'; echo '0 4 1 * * cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH monthly_retrain') | crontab -"
+echo "(crontab -l 2>/dev/null; echo '# ML Maintenance Tasks'; echo '0 1 * * * cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH daily_accuracy'; echo '0 2 * * 1 cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH weekly_retrain_check'; echo '0 3 * * 0 cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH weekly_predictions'; echo '0 9 * * * cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH daily_alerts'; echo '0 4 1 * * cd $SCRIPT_DIR && $PYTHON_PATH $TASKS_PATH monthly_retrain'; echo '# Fudo Sync Tasks'; echo '*/15 * * * * cd $SCRIPT_DIR && $PYTHON_PATH $FUDO_TASKS_PATH sales'; echo '5 * * * * cd $SCRIPT_DIR && $PYTHON_PATH $FUDO_TASKS_PATH expenses') | crontab -"
 echo ""
 echo "Or manually add them to your crontab with: crontab -e"
@@ -0,0 +1,64 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import jwt
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event
+from app.extensions import db
+from app.models.user import User
+
+
+def make_auth_headers(user):
+    """Headers con un JWT válido por una hora para el usuario dado"""
+    token = jwt.encode({
+        'user_id': user.id,
+        'email': user.email,
+        'exp': datetime.utcnow() + timedelta(hours=1)
+    }, current_app.config['SECRET_KEY'], algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture(scope='session')
+def count_queries():
+    """Context manager que junta las sentencias SQL ejecutadas en el bloque.
+
+    Para endpoints alcanza con leer el header X-Query-Count de la respuesta.
+    """
+    return _count_queries
+
+
+@pytest.fixture(scope='session')
+def auth_headers():
+    return make_auth_headers
+
+
+@pytest.fixture
+def admin(app):
+    user = User(email='admin@test.com', role='admin', is_active=True)
+    user.set_password('admin123')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def admin_headers(admin):
+    return make_auth_headers(admin)
@@ -0,0 +1,124 @@
+"""Servidor HTTP local que imita la API de Fudo (auth + /sales + /expenses) para los tests de sincronización"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class FakeFudo:
+    def __init__(self, sales=None, expenses=None):
+        self.sales = sales or []
+        self.expenses = expenses or []
+        self.fail_on_page = None
+        self.requests = []
+        self.filters = []
+        self._lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self.rfile.read(length)
+                self._send(200, {'token': 'fake-token', 'exp': int(time.time()) + 3600})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                page_size = int(query.get('page[size]', ['500'])[0])
+                page_number = int(query.get('page[number]', ['1'])[0])
+                filters = {key[7:-1]: values[0] for key, values in query.items() if key.startswith('filter[')}
+                with fake._lock:
+                    fake.requests.append((url.path, page_number))
+                    fake.filters.append(filters)
+
+                if self.headers.get('Authorization') != 'Bearer fake-token':
+                    return self._send(401, {'error': 'unauthorized'})
+                if fake.fail_on_page == page_number:
+                    return self._send(500, {'error': 'boom'})
+
+                items = {'/sales': fake.sales, '/expenses': fake.expenses}.get(url.path)
+                if items is None:
+                    return self._send(404, {'error': 'not found'})
+                fields = ('createdAt', 'closedAt') if url.path == '/sales' else ('date',)
+                items = [
+                    item for item in items
+                    if all(_matches(item['attributes'].get(field), filters.get(field)) for field in fields)
+                ]
+                start = (page_number - 1) * page_size
+                self._send(200, {'data': items[start:start + page_size]})
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _matches(value, expression):
+    """Soporta los filtros de rango que usa FudoClient: gte.X, lte.X y and(gte.X,lte.Y)"""
+    if not expression:
+        return True
+    if value is None:
+        return False
+    for op, bound in re.findall(r'(gte|lte)\.([^,)]+)', expression):
+        if op == 'gte' and value < bound:
+            return False
+        if op == 'lte' and value > bound:
+            return False
+    return True
+
+
+def fudo_sale(sale_id, created_at='2026-03-10T20:00:00Z', closed_at='2026-03-10T21:30:00Z', total=1000):
+    return {
+        'id': str(sale_id),
+        'type': 'Sale',
+        'attributes': {
+            'createdAt': created_at,
+            'closedAt': closed_at,
+            'total': total,
+            'status': 'CLOSED',
+            'type': 'TABLE',
+            'people': 2
+        },
+        'relationships': {}
+    }
+
+
+def fudo_expense(expense_id, date='2026-03-10', amount=500, category_id=None):
+    relationships = {}
+    if category_id:
+        relationships['expenseCategory'] = {'data': {'id': category_id, 'type': 'ExpenseCategory'}}
+    return {
+        'id': str(expense_id),
+        'type': 'Expense',
+        'attributes': {
+            'date': date,
+            'amount': amount,
+            'status': 'PAID',
+            'providerName': 'Proveedor'
+        },
+        'relationships': relationships
+    }
@@ -0,0 +1,106 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import jwt
+from datetime import date
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.employee import Employee
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def employee_user(app):
+    user = User(email='empleado@test.com', role='employee', is_active=True)
+    user.set_password('secret123')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Employee(user_id=user.id, first_name='Ana', last_name='Pérez', dni='30111222',
+                            hire_date=date(2025, 1, 1)))
+    db.session.commit()
+    return user
+
+
+def login(client, email, password):
+    response = client.post('/api/v1/auth/login', json={'email': email, 'password': password})
+    assert response.status_code == 200
+    return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+
+def user_queries(count_queries, client, url, headers):
+    db.session.expire_all()
+    with count_queries() as statements:
+        response = client.get(url, headers=headers)
+    return response, [s for s in statements if 'FROM users' in s]
+
+
+def test_token_carries_version_and_user_is_cached(app, client, admin, count_queries, capsys):
+    headers = login(client, 'admin@test.com', 'admin123')
+    token = headers['Authorization'].split(' ')[1]
+    assert jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])['ver'] == 0
+
+    response, first = user_queries(count_queries, client, '/api/v1/auth/me', headers)
+    assert response.status_code == 200 and len(first) == 1
+    response, second = user_queries(count_queries, client, '/api/v1/auth/me', headers)
+    assert response.get_json()['user']['email'] == 'admin@test.com'
+    assert second == []
+
+    # Sin prints por request en el camino de autenticación
+    assert capsys.readouterr().out == ''
+
+
+def test_cached_user_loads_relationships(client, employee_user):
+    headers = login(client, 'empleado@test.com', 'secret123')
+    for _ in range(2):
+        response = client.get('/api/v1/time-tracking/today', headers=headers)
+        assert response.status_code == 200
+
+
+def test_role_change_applies_immediately(client, admin):
+    headers = login(client, 'admin@test.com', 'admin123')
+    assert client.get('/api/v1/fudo/sync/jobs', headers=headers).status_code == 200
+
+    admin.role = 'employee'
+    db.session.commit()
+    assert client.get('/api/v1/fudo/sync/jobs', headers=headers).status_code == 403
+
+
+def test_password_change_and_deactivation_revoke_tokens(client, admin):
+    headers = login(client, 'admin@test.com', 'admin123')
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 200
+
+    admin.set_password('nueva123')
+    db.session.commit()
+    assert admin.token_version == 1
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 401
+
+    headers = login(client, 'admin@test.com', 'nueva123')
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 200
+
+    admin.is_active = False
+    db.session.commit()
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 401
+
+
+def test_legacy_tokens_without_version_still_work(client, admin_headers):
+    # make_auth_headers (conftest) no incluye 'ver', como los tokens emitidos antes del cambio
+    assert client.get('/api/v1/auth/me', headers=admin_headers).status_code == 200
+    assert client.get('/api/v1/auth/me', headers={'Authorization': 'Bearer'}).status_code == 401
+    assert client.get('/api/v1/auth/me').status_code == 401
@@ -0,0 +1,158 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import date, datetime, time
+from app import create_app
+from app.extensions import db
+from app.models.shift import Shift
+from app.models.time_tracking import TimeTracking
+from app.models.work_block import WorkBlock
+from app.services.coverage_engine import CoverageEngine, CoverageComparison
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def add_shift(employee_id, shift_date, start_time, end_time):
+    shift = Shift(schedule_id=1, employee_id=employee_id, shift_date=shift_date,
+                  start_time=start_time, end_time=end_time)
+    shift.calculate_hours()
+    db.session.add(shift)
+
+
+@pytest.fixture
+def shifts(app):
+    # 9:30-17:15, 12:00-20:00 y un nocturno 20:00-02:00 el 2/3; el 28/2 cierra otro nocturno 22:00-01:30
+    add_shift(1, date(2026, 2, 28), time(22), time(1, 30))
+    add_shift(1, date(2026, 3, 2), time(9, 30), time(17, 15))
+    add_shift(2, date(2026, 3, 2), time(12), time(20))
+    add_shift(3, date(2026, 3, 2), time(20), time(2))
+    db.session.commit()
+
+
+def add_attendance(employee_id, tracking_date, blocks):
+    record = TimeTracking(employee_id=employee_id, tracking_date=tracking_date)
+    db.session.add(record)
+    db.session.flush()
+    for start_time, end_time in blocks:
+        db.session.add(WorkBlock(time_tracking_id=record.id, start_time=start_time, end_time=end_time))
+
+
+@pytest.fixture
+def attendance(shifts):
+    # Llegó tarde (9:45), el segundo cubrió de más hasta las 21 y el nocturno sigue fichado (bloque abierto)
+    add_attendance(1, date(2026, 3, 2), [(time(9, 45), time(17, 15))])
+    add_attendance(2, date(2026, 3, 2), [(time(12), time(21))])
+    add_attendance(3, date(2026, 3, 2), [(time(20, 10), time(20, 10))])
+    db.session.commit()
+
+
+def test_curves_respect_minutes_and_overnight_shifts(shifts):
+    engine = CoverageEngine(date(2026, 3, 1), date(2026, 3, 3))
+    hourly = engine.curves(60)
+    assert hourly.shape == (3, 24)
+
+    sunday, monday, tuesday = hourly.tolist()
+    # El nocturno del 28/2 cubre la madrugada del 1/3
+    assert sunday[:2] == [1, 1] and sum(sunday[2:]) == 0
+    assert monday[9] == 1 and monday[12] == 2 and monday[17] == 2 and monday[19] == 1
+    assert monday[20:] == [1, 1, 1, 1]
+    assert tuesday[:2] == [1, 1] and tuesday[2] == 0
+
+    quarter = engine.curves(15)[1].tolist()
+    assert quarter[9 * 4 + 1] == 0 and quarter[9 * 4 + 2] == 1
+    assert quarter[17 * 4] == 2 and quarter[17 * 4 + 1] == 1
+
+    # Las persona-minutos suman las horas programadas que caen en el rango
+    assert engine.person_minutes(30).sum() == 90 + 465 + 480 + 360
+    assert engine.peak() == (date(2026, 3, 2), 12 * 60, 2)
+    assert engine.totals() == (3, 7.75 + 8 + 6, 3)
+
+
+def test_invalid_resolution_is_rejected(shifts):
+    with pytest.raises(ValueError):
+        CoverageEngine(date(2026, 3, 1), date(2026, 3, 1)).curves(20)
+
+
+def test_hourly_endpoint_formats(client, admin_headers, shifts):
+    params = 'start_date=2026-03-02&end_date=2026-03-03'
+    response = client.get(f'/api/v1/coverage/hourly?{params}', headers=admin_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [day['date'] for day in data] == ['2026-03-02', '2026-03-03']
+    assert data[0]['hourly_coverage'][17] == {'hour': 17, 'employee_count': 2}
+
+    response = client.get(f'/api/v1/coverage/hourly?{params}&resolution=30&format=compact', headers=admin_headers)
+    data = response.get_json()
+    assert data['resolution'] == 30 and len(data['slots']) == 48 and data['slots'][19] == '09:30'
+    assert data['dates'] == ['2026-03-02', '2026-03-03']
+    assert data['coverage'][0][19] == 1 and data['coverage'][1][:5] == [1, 1, 1, 1, 0]
+
+    response = client.get(f'/api/v1/coverage/hourly?{params}&resolution=45', headers=admin_headers)
+    assert response.status_code == 400
+    response = client.get('/api/v1/coverage/hourly?start_date=2026-03-03&end_date=2026-03-02', headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_summary_endpoint(client, admin_headers, shifts):
+    response = client.get('/api/v1/coverage/summary?start_date=2026-03-02&end_date=2026-03-03', headers=admin_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['total_shifts'] == 3
+    assert data['total_hours'] == round(7.75 + 8 + 6, 2)
+    assert data['unique_employees'] == 3
+    assert (data['peak_hour'], data['peak_hour_count']) == (12, 2)
+    assert (data['peak_concurrency'], data['peak_at']) == (2, '2026-03-02T12:00')
+    assert data['average_shifts_per_day'] == 1.5
+
+
+def test_actual_vs_scheduled_counts_only_elapsed_minutes(attendance):
+    now = datetime(2026, 3, 2, 22, 0)
+    comparison = CoverageComparison(date(2026, 3, 2), date(2026, 3, 2), now)
+
+    actual = comparison.actual.curves(15)[0].tolist()
+    assert actual[9 * 4 + 2] == 0 and actual[9 * 4 + 3] == 1
+    # El bloque abierto cuenta hasta "ahora" y no después
+    assert actual[21 * 4 + 3] == 1 and actual[22 * 4] == 0
+    assert comparison.slot_delta(60)[0].tolist()[20] == 1
+
+    understaffed, overstaffed = comparison.daily_totals()
+    # 15 min de llegada tarde; el segundo cubre al nocturno hasta que ficha y queda de más hasta las 21
+    assert understaffed.tolist() == [15]
+    assert overstaffed.tolist() == [50]
+
+    # Pasado el día, el bloque que quedó abierto no cuenta: faltan de 21 a 24
+    closed = CoverageComparison(date(2026, 3, 2), date(2026, 3, 2), datetime(2026, 3, 3, 8, 0))
+    assert closed.daily_totals()[0].tolist() == [15 + 180]
+
+
+def test_actual_vs_scheduled_endpoint(client, admin_headers, attendance):
+    response = client.get('/api/v1/coverage/actual-vs-scheduled?start_date=2026-03-01&end_date=2026-03-02'
+                          '&resolution=30', headers=admin_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['dates'] == ['2026-03-01', '2026-03-02']
+    assert len(data['scheduled'][1]) == len(data['actual'][1]) == len(data['delta'][1]) == 48
+    assert data['scheduled'][1][19] == 1 and data['actual'][1][19] == 1 and data['delta'][1][42] == -1
+    # El nocturno del 28/2 no se fichó; el del 2/3 quedó abierto en un día ya pasado
+    assert data['days'][0] == {'date': '2026-03-01', 'understaffed_minutes': 90, 'overstaffed_minutes': 0}
+    assert data['days'][1]['understaffed_minutes'] == 15 + 180
+    assert data['overstaffed_minutes'] == 0
+
+    response = client.get('/api/v1/coverage/actual-vs-scheduled', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['start_date'] == response.get_json()['end_date'] == response.get_json()['as_of'][:10]
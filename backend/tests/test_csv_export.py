@@ -0,0 +1,102 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import csv
+import gzip
+import io
+from datetime import date, datetime
+from app import create_app
+from app.extensions import db
+from app.models.sale import Sale
+from app.models.expense import Expense, ExpenseCategory
+from app.utils.csv_export import iter_csv
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def seeded(app):
+    category = ExpenseCategory(name='Mercadería', expense_type='directo')
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([
+        Sale(external_id=101, fecha=date(2026, 1, 10), creacion=datetime(2026, 1, 10, 20, 5),
+             cerrada=datetime(2026, 1, 10, 21, 30), estado='Cerrada', total=1500.5, fiscal=True,
+             medio_pago='Efectivo', sala='Salón', personas=2, tipo_venta='Local'),
+        Sale(fecha=date(2026, 2, 1), creacion=datetime(2026, 2, 1, 13), estado='En curso', total=800),
+        Expense(external_id=7, fecha=date(2026, 1, 5), proveedor='Proveedor SA', importe=1200,
+                category_id=category.id, de_caja=True),
+        Expense(fecha=date(2026, 2, 5), importe=300, cancelado=True),
+    ])
+    db.session.commit()
+
+
+def read_csv(data):
+    return list(csv.reader(io.StringIO(data.decode('utf-8'))))
+
+
+def test_sales_export_rows(client, admin_headers, seeded):
+    response = client.get('/api/v1/sales/export', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert 'ventas_export.csv' in response.headers['Content-Disposition']
+    rows = read_csv(response.data)
+    assert rows[0][:3] == ['Id', 'Fecha', 'Creación']
+    # Ordenadas por fecha descendente
+    assert rows[1][:2] == ['2', '01/02/2026']
+    assert rows[2] == ['101', '10/01/2026', '10/01/2026 20:05:00', '10/01/2026 21:30:00', '', 'Cerrada', '',
+                       '', 'Salón', '2', '', 'Efectivo', '1500.50', 'Si', 'Local', '', '', '']
+
+
+def test_sales_export_filters_and_validates_dates(client, admin_headers, seeded):
+    response = client.get('/api/v1/sales/export?fecha_desde=2026-01-15', headers=admin_headers)
+    assert len(read_csv(response.data)) == 2
+
+    response = client.get('/api/v1/sales/export?fecha_desde=15-01-2026', headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_expenses_export_includes_category(client, admin_headers, seeded):
+    response = client.get('/api/v1/expenses/export', headers=admin_headers)
+
+    rows = read_csv(response.data)
+    assert rows[1][4:6] == ['Sin categoría', '']
+    assert rows[1][-1] == 'Sí'
+    assert rows[2][:6] == ['7', '05/01/2026', '', 'Proveedor SA', 'Mercadería', 'directo']
+    assert rows[2][8:10] == ['1200.00', 'Sí']
+
+
+def test_export_is_gzipped_when_accepted(client, admin_headers, seeded):
+    plain = client.get('/api/v1/expenses/export', headers=admin_headers)
+    compressed = client.get('/api/v1/expenses/export',
+                            headers={**admin_headers, 'Accept-Encoding': 'gzip, deflate'})
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert 'Content-Encoding' not in plain.headers
+
+
+def test_iter_csv_yields_bounded_chunks():
+    rows = ((i, f'fila {i}') for i in range(1234))
+    chunks = list(iter_csv(['n', 'texto'], rows, list, rows_per_chunk=500))
+
+    assert len(chunks) == 3
+    parsed = list(csv.reader(io.StringIO(''.join(chunks))))
+    assert len(parsed) == 1235
+    assert parsed[-1] == ['1233', 'fila 1233']
@@ -0,0 +1,91 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import date, datetime
+from app import create_app
+from app.extensions import db
+from app.models.sale import Sale
+from app.models.expense import Expense, ExpenseCategory
+from app.models.payroll import Payroll
+from app.services.dashboard_metrics_service import DashboardMetricsService
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def seeded(app):
+    directo = ExpenseCategory(name='Mercadería', expense_type='directo')
+    indirecto = ExpenseCategory(name='Alquiler', expense_type='indirecto')
+    db.session.add_all([directo, indirecto])
+    db.session.flush()
+
+    db.session.add_all([
+        # Junio (período actual)
+        Sale(fecha=date(2026, 6, 10), creacion=datetime(2026, 6, 10, 15), cerrada=datetime(2026, 6, 10, 16),
+             total=1000, estado='Cerrada'),
+        Sale(fecha=date(2026, 6, 20), creacion=datetime(2026, 6, 20, 15), cerrada=datetime(2026, 6, 20, 16),
+             total=3000, estado='Cerrada'),
+        Sale(fecha=date(2026, 6, 21), creacion=datetime(2026, 6, 21, 15), total=500, estado='En curso'),
+        # Mayo (período anterior)
+        Sale(fecha=date(2026, 5, 15), creacion=datetime(2026, 5, 15, 15), cerrada=datetime(2026, 5, 15, 16),
+             total=2000, estado='Cerrada'),
+
+        Expense(fecha=date(2026, 6, 5), importe=400, category_id=directo.id),
+        Expense(fecha=date(2026, 6, 6), importe=300, category_id=indirecto.id),
+        Expense(fecha=date(2026, 6, 7), importe=200, category_id=None),
+        Expense(fecha=date(2026, 6, 8), importe=999, category_id=directo.id, cancelado=True),
+        Expense(fecha=date(2026, 5, 8), importe=150, category_id=directo.id),
+
+        Payroll(employee_id=1, month=6, year=2026, hours_worked=100, hourly_rate=10,
+                gross_salary=1000, extraordinary_amount=50, generated_by=1),
+        Payroll(employee_id=1, month=13, year=2026, hours_worked=0, hourly_rate=10,
+                gross_salary=500, generated_by=1),
+        Payroll(employee_id=1, month=5, year=2026, hours_worked=80, hourly_rate=10,
+                gross_salary=800, generated_by=1),
+    ])
+    db.session.commit()
+    return app
+
+
+def test_period_comparison_matches_expected_totals(seeded):
+    metrics = DashboardMetricsService.period_comparison(
+        date(2026, 6, 1), date(2026, 6, 30), date(2026, 5, 2), date(2026, 5, 31)
+    )
+
+    assert metrics['sales'] == {'total': 4000.0, 'count': 2, 'ticket_promedio': 2000.0}
+    assert metrics['prev_sales'] == {'total': 2000.0, 'count': 1, 'ticket_promedio': 2000.0}
+
+    assert metrics['expenses'] == {'total': 900.0, 'directos': 400.0, 'indirectos': 500.0}
+    assert metrics['prev_expenses'] == {'total': 150.0, 'directos': 150.0, 'indirectos': 0.0}
+
+    # Junio incluye el SAC1 (mes 13)
+    assert metrics['payroll'] == {'total': 1550.0, 'horas': 100.0}
+    assert metrics['prev_payroll'] == {'total': 800.0, 'horas': 80.0}
+
+
+def test_empty_period_returns_zeros(app):
+    metrics = DashboardMetricsService.period_comparison(
+        date(2026, 6, 1), date(2026, 6, 30), date(2026, 5, 2), date(2026, 5, 31)
+    )
+    assert metrics['sales'] == {'total': 0.0, 'count': 0, 'ticket_promedio': 0}
+    assert metrics['expenses'] == {'total': 0.0, 'directos': 0.0, 'indirectos': 0.0}
+    assert metrics['payroll'] == {'total': 0.0, 'horas': 0.0}
+
+
+def test_period_comparison_runs_one_query_per_table(seeded, count_queries):
+    with count_queries() as statements:
+        DashboardMetricsService.period_comparison(
+            date(2026, 6, 1), date(2026, 6, 30), date(2026, 5, 2), date(2026, 5, 31)
+        )
+
+    assert len(statements) == 3
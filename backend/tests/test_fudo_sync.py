@@ -0,0 +1,306 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import update
+from app import create_app
+from app.extensions import db
+from app.models.sale import Sale
+from app.models.expense import Expense, ExpenseCategory
+from app.models.sales_rollup import SalesDailyRollup
+from app.models.sync_job import SyncJob
+from app.models.fudo_sync_state import FudoSyncState
+from app.services.fudo_sync_service import FudoSyncService
+from app.utils.fudo_client import FudoClient
+from app.utils.report_cache import ReportCache
+from fudo_fake_server import FakeFudo, fudo_sale, fudo_expense
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def fudo(monkeypatch):
+    # 23 ventas en páginas de 5: 4 completas y una última de 3
+    server = FakeFudo(
+        sales=[fudo_sale(i, total=100 * i) for i in range(1, 24)],
+        expenses=[fudo_expense(i, category_id='9' if i % 2 else None) for i in range(1, 8)]
+    ).start()
+    monkeypatch.setenv('FUDO_API_KEY', 'key')
+    monkeypatch.setenv('FUDO_API_SECRET', 'secret')
+    monkeypatch.setenv('FUDO_AUTH_URL', f'{server.url}/auth')
+    monkeypatch.setenv('FUDO_API_URL', server.url)
+    monkeypatch.setattr(FudoClient, 'PAGE_SIZE', 5)
+    yield server
+    server.stop()
+
+
+def test_sync_sales_imports_every_page(app, fudo, admin):
+    job = FudoSyncService.create_job('sales', {'update_existing': False}, admin.id)
+    job = FudoSyncService.run_job(job.id)
+
+    assert job.status == 'completed'
+    assert job.last_committed_page == 5
+    assert job.total_fetched == 23
+    assert job.imported == 23
+    assert Sale.query.count() == 23
+    sale = Sale.query.filter_by(external_id=7).one()
+    assert float(sale.total) == 700.0
+    assert sale.origen == 'Fudo'
+    assert {1, 2, 3, 4, 5} <= {page for _, page in fudo.requests}
+
+    rollup = SalesDailyRollup.query.filter_by(fecha=date(2026, 3, 10)).one()
+    assert rollup.cantidad == 23
+
+
+def test_failed_job_resumes_from_last_committed_page(app, fudo, admin):
+    fudo.fail_on_page = 3
+    job = FudoSyncService.create_job('sales', {'update_existing': False}, admin.id)
+    job = FudoSyncService.run_job(job.id)
+
+    assert job.status == 'failed'
+    assert job.last_committed_page == 2
+    assert 'Error making request' in job.error_message
+    assert Sale.query.count() == 10
+    assert FudoSyncService.can_resume(job)
+
+    fudo.fail_on_page = None
+    fudo.requests.clear()
+    job = FudoSyncService.run_job(job.id)
+
+    assert job.status == 'completed'
+    assert job.imported == 23
+    assert job.skipped == 0
+    assert Sale.query.count() == 23
+    assert min(page for _, page in fudo.requests) == 3
+
+
+def test_concurrent_resumes_claim_the_job_once(app):
+    job = SyncJob(resource='sales', status='failed', params={}, errors=[])
+    db.session.add(job)
+    db.session.commit()
+    # Lo que leyeron dos requests de reanudación simultáneas
+    seen = SimpleNamespace(id=job.id, status=job.status, updated_at=job.updated_at)
+
+    assert FudoSyncService.claim_job(seen)
+    assert not FudoSyncService.claim_job(seen)
+    assert db.session.get(SyncJob, job.id).status == 'running'
+
+
+def test_superseded_worker_stops_without_touching_the_job(app, fudo, admin, monkeypatch):
+    iter_sales_pages = FudoClient.iter_sales_pages
+
+    def pages_resumed_elsewhere(self, *args, **kwargs):
+        for page_number, items in iter_sales_pages(self, *args, **kwargs):
+            if page_number == 3:
+                # Otro worker consideró caído el job y lo reanudó
+                db.session.execute(
+                    update(SyncJob).values(updated_at=datetime.utcnow() + timedelta(minutes=1))
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+            yield page_number, items
+
+    monkeypatch.setattr(FudoClient, 'iter_sales_pages', pages_resumed_elsewhere)
+    job = FudoSyncService.run_job(FudoSyncService.create_job('sales', {}, admin.id).id)
+
+    assert job.status == 'running'
+    assert job.error_message is None
+    assert job.last_committed_page == 2
+    assert Sale.query.count() == 10
+
+
+def test_update_existing_updates_rows_in_bulk(app, fudo, admin):
+    db.session.add(Sale(external_id=1, fecha=date(2026, 1, 1), creacion=datetime(2026, 1, 1, 12), total=1))
+    db.session.commit()
+
+    job = FudoSyncService.run_job(FudoSyncService.create_job('sales', {'update_existing': False}).id)
+    assert (job.imported, job.skipped, job.updated) == (22, 1, 0)
+    assert float(Sale.query.filter_by(external_id=1).one().total) == 1.0
+
+    job = FudoSyncService.run_job(FudoSyncService.create_job('sales', {'update_existing': True}).id)
+    assert (job.imported, job.skipped, job.updated) == (0, 0, 23)
+    sale = Sale.query.filter_by(external_id=1).one()
+    assert float(sale.total) == 100.0
+    assert sale.fecha == date(2026, 3, 10)
+    # El agregado de la fecha anterior de la venta también se recalcula
+    assert SalesDailyRollup.query.filter_by(fecha=date(2026, 1, 1)).count() == 0
+
+
+def test_sync_invalidates_report_cache(app, fudo, admin):
+    backend = app.extensions[ReportCache.EXTENSION_KEY]
+    backend.set('marzo', 1, 60, date(2026, 3, 1), date(2026, 3, 31))
+    backend.set('abril', 2, 60, date(2026, 4, 1), date(2026, 4, 30))
+
+    FudoSyncService.run_job(FudoSyncService.create_job('sales', {}).id)
+
+    assert backend.get('marzo') is None
+    assert backend.get('abril') == 2
+
+
+def test_sync_expenses_endpoint_and_job_status(client, fudo, admin_headers):
+    category = ExpenseCategory(name='Mercadería', expense_type='directo')
+    db.session.add(category)
+    db.session.commit()
+
+    response = client.post('/api/v1/fudo/sync/expenses?start_date=2026-03-01&end_date=2026-03-31',
+                           headers=admin_headers, json={'category_mapping': {'9': category.id}})
+
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+
+    response = client.get(f'/api/v1/fudo/sync/jobs/{job_id}', headers=admin_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['status'] == 'completed'
+    assert data['resource'] == 'expenses'
+    assert data['imported'] == 7
+    assert data['no_category_mapping'] == 3
+    assert Expense.query.filter_by(category_id=category.id).count() == 4
+
+    response = client.get('/api/v1/fudo/sync/jobs', headers=admin_headers)
+    assert [job['id'] for job in response.get_json()['jobs']] == [job_id]
+
+    response = client.post(f'/api/v1/fudo/sync/jobs/{job_id}/resume', headers=admin_headers)
+    assert response.status_code == 400
+    assert client.get('/api/v1/fudo/sync/jobs/999', headers=admin_headers).status_code == 404
+
+
+def test_resume_endpoint_rejects_running_job(app, client, fudo, admin_headers):
+    job = SyncJob(resource='sales', status='running', params={}, errors=[])
+    db.session.add(job)
+    db.session.commit()
+
+    response = client.post(f'/api/v1/fudo/sync/jobs/{job.id}/resume', headers=admin_headers)
+    assert response.status_code == 409
+
+    # Sin avance durante más de FUDO_SYNC_STALE_MINUTES se considera caído
+    job.updated_at = datetime.utcnow() - timedelta(hours=1)
+    db.session.commit()
+    response = client.post(f'/api/v1/fudo/sync/jobs/{job.id}/resume', headers=admin_headers)
+    assert response.status_code == 202
+    assert db.session.get(SyncJob, job.id).status == 'completed'
+    assert Sale.query.count() == 23
+
+
+@pytest.fixture
+def incremental_fudo(fudo):
+    fudo.sales = (
+        [fudo_sale(i, created_at='2026-03-09T15:00:00Z', closed_at='2026-03-09T16:00:00Z') for i in range(1, 6)]
+        + [fudo_sale(i, created_at='2026-03-10T08:00:00Z', closed_at='2026-03-10T09:00:00Z') for i in range(6, 9)]
+        + [fudo_sale(i, created_at='2026-03-10T20:00:00Z') for i in range(9, 13)]
+        # Mesa abierta desde la madrugada: se creó antes de la marca pero cierra después
+        + [fudo_sale(13, created_at='2026-03-10T01:00:00Z', closed_at='2026-03-10T23:00:00Z')]
+    )
+    return fudo
+
+
+def test_incremental_sync_requests_only_from_high_water_mark(app, incremental_fudo, admin):
+    # Ventas 6-8 ya importadas por la corrida anterior, que dejó la marca en 12:00
+    db.session.add(FudoSyncState(resource='sales', last_seen_at=datetime(2026, 3, 10, 12)))
+    for i in range(6, 9):
+        db.session.add(Sale(external_id=i, fecha=date(2026, 3, 10), creacion=datetime(2026, 3, 10, 8), total=1))
+    db.session.commit()
+
+    job, created = FudoSyncService.create_incremental_job('sales', admin.id)
+    assert created
+    # Marca menos FUDO_SYNC_OVERLAP_HOURS (6 h)
+    assert job.params['start_date'] == '2026-03-10T06:00:00Z'
+    job = FudoSyncService.run_job(job.id)
+
+    assert job.status == 'completed'
+    # Se filtra por hora de cierre: la venta 13 entra aunque se creó antes de la marca
+    assert incremental_fudo.filters[0]['closedAt'] == 'gte.2026-03-10T06:00:00Z'
+    assert 'createdAt' not in incremental_fudo.filters[0]
+    assert (job.total_fetched, job.imported, job.skipped) == (8, 5, 3)
+    assert Sale.query.filter_by(external_id=13).count() == 1
+    state = FudoSyncState.query.filter_by(resource='sales').one()
+    assert state.last_seen_at == datetime(2026, 3, 10, 23)
+    assert state.last_job_id == job.id
+
+    # Sin novedades, la siguiente corrida sólo vuelve a pedir la ventana de solapamiento
+    job, _ = FudoSyncService.create_incremental_job('sales')
+    job = FudoSyncService.run_job(job.id)
+    assert job.params['start_date'] == '2026-03-10T17:00:00Z'
+    assert (job.total_fetched, job.imported) == (5, 0)
+    assert Sale.query.count() == 8
+
+
+def test_failed_incremental_sync_keeps_the_mark(app, incremental_fudo, admin):
+    db.session.add(FudoSyncState(resource='sales', last_seen_at=datetime(2026, 3, 9, 12)))
+    db.session.commit()
+    incremental_fudo.fail_on_page = 2
+
+    job, _ = FudoSyncService.create_incremental_job('sales')
+    job = FudoSyncService.run_job(job.id)
+
+    assert job.status == 'failed'
+    assert job.high_water_at is not None
+    state = FudoSyncState.query.filter_by(resource='sales').one()
+    assert state.last_seen_at == datetime(2026, 3, 9, 12)
+
+    incremental_fudo.fail_on_page = None
+    job = FudoSyncService.run_job(job.id)
+    assert job.status == 'completed'
+    assert state.last_seen_at == datetime(2026, 3, 10, 23)
+    assert Sale.query.count() == 13
+
+
+def test_incremental_endpoint_stores_mapping_and_rejects_concurrent_runs(client, fudo, admin_headers):
+    db.session.add(FudoSyncState(resource='expenses', last_seen_at=datetime(2026, 3, 9)))
+    db.session.commit()
+
+    response = client.post('/api/v1/fudo/sync/incremental/expenses', headers=admin_headers,
+                           json={'category_mapping': {'9': 1}})
+    assert response.status_code == 202
+    # FUDO_SYNC_EXPENSES_LOOKBACK_DAYS (30) antes de la marca
+    assert response.get_json()['start_date'] == '2026-02-07'
+    job = db.session.get(SyncJob, response.get_json()['job_id'])
+    assert job.status == 'completed'
+    assert job.imported == 7
+
+    state = client.get('/api/v1/fudo/sync/state', headers=admin_headers).get_json()['state']
+    assert state[0]['params'] == {'category_mapping': {'9': 1}}
+    assert state[0]['last_seen_at'] == '2026-03-10T00:00:00'
+
+    # Las corridas programadas reutilizan el mapeo guardado
+    job, _ = FudoSyncService.create_incremental_job('expenses')
+    assert job.params['category_mapping'] == {'9': 1}
+    job.status = 'running'
+    db.session.commit()
+    response = client.post('/api/v1/fudo/sync/incremental/expenses', headers=admin_headers)
+    assert response.status_code == 409
+    assert response.get_json()['job_id'] == job.id
+
+    assert client.post('/api/v1/fudo/sync/incremental/otros', headers=admin_headers).status_code == 400
+
+
+def test_incremental_expenses_pick_up_backdated_entries(app, fudo):
+    # Gasto cargado hoy con fecha de la semana pasada, anterior a la marca
+    fudo.expenses.append(fudo_expense(8, date='2026-03-03'))
+    db.session.add(FudoSyncState(resource='expenses', last_seen_at=datetime(2026, 3, 10)))
+    db.session.commit()
+
+    job, _ = FudoSyncService.create_incremental_job('expenses')
+    job = FudoSyncService.run_job(job.id)
+
+    assert job.params['start_date'] == '2026-02-08'
+    assert job.status == 'completed'
+    assert Expense.query.filter_by(external_id=8).count() == 1
+    assert FudoSyncState.query.filter_by(resource='expenses').one().last_seen_at == datetime(2026, 3, 10)
@@ -0,0 +1,96 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+from datetime import date
+from app import create_app
+from app.extensions import db
+from app.models.ml_tracking import Holiday
+from app.ml.staffing_predictor import StaffingPredictor
+from app.utils.holiday_calendar import holiday_calendar
+from app.utils.payroll_utils import is_holiday, calculate_employee_cost
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Holiday(date=date(2026, 3, 24), name='Día de la Memoria', type='national', impact_multiplier=0.5),
+            Holiday(date=date(2026, 12, 31), name='Fin de Año', type='national', impact_multiplier=1.8),
+            Holiday(date=date(2027, 1, 1), name='Año Nuevo', type='national', impact_multiplier=0.3),
+        ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_year_is_loaded_once(app, count_queries):
+    for expected in (1, 0):
+        with count_queries() as statements:
+            for day in range(1, 32):
+                is_holiday(date(2026, 3, day))
+        assert len(statements) == expected
+    assert is_holiday('2026-03-24')
+    assert not is_holiday(date(2026, 3, 25))
+
+
+def test_holidays_between_spans_years(app):
+    holidays = holiday_calendar.holidays_between(date(2026, 12, 1), date(2027, 1, 31))
+    assert holidays == {date(2026, 12, 31): 1.8, date(2027, 1, 1): 0.3}
+    assert holiday_calendar.get_impact(date(2026, 3, 24)) == 0.5
+    assert holiday_calendar.get_impact(date(2026, 3, 25)) == 1.0
+
+
+def test_holiday_changes_invalidate_calendar(app):
+    assert not is_holiday(date(2026, 5, 1))
+
+    holiday = Holiday(date=date(2026, 5, 1), name='Día del Trabajador', type='national')
+    db.session.add(holiday)
+    db.session.commit()
+    assert is_holiday(date(2026, 5, 1))
+
+    # Mover el feriado a otro año invalida ambos años
+    assert not is_holiday(date(2025, 5, 1))
+    holiday.date = date(2025, 5, 1)
+    db.session.commit()
+    assert not is_holiday(date(2026, 5, 1))
+    assert is_holiday(date(2025, 5, 1))
+
+    db.session.delete(holiday)
+    db.session.commit()
+    assert not is_holiday(date(2025, 5, 1))
+
+
+def test_rollback_keeps_calendar_and_delete_invalidates(app):
+    holiday = Holiday.query.filter_by(date=date(2026, 3, 24)).first()
+    assert is_holiday(date(2026, 3, 24))
+
+    db.session.delete(holiday)
+    db.session.rollback()
+    assert is_holiday(date(2026, 3, 24))
+
+    db.session.delete(holiday)
+    db.session.commit()
+    assert not is_holiday(date(2026, 3, 24))
+    assert calculate_employee_cost(8, 100, date(2026, 3, 24), None) == 800.0
+
+
+def test_prepare_features_uses_calendar(app, count_queries):
+    df = pd.DataFrame({
+        'date': [date(2026, 3, 23), date(2026, 3, 24), date(2026, 3, 24)],
+        'hour': [12, 13, 20],
+        'day_of_week': [0, 1, 1]
+    })
+    predictor = StaffingPredictor()
+
+    with count_queries() as statements:
+        result = predictor.prepare_features(df)
+
+    assert len(statements) <= 1
+    assert list(result['is_holiday']) == [0, 1, 1]
+    assert list(result['holiday_impact']) == [1.0, 0.5, 0.5]
@@ -0,0 +1,194 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, update
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models.staffing_metrics import StaffingMetrics
+from app.models.ml_tracking import MLModelVersion
+from app.models.ml_training_job import MLTrainingJob
+from app.ml.model_registry import model_registry
+from app.ml.staffing_predictor import StaffingPredictor
+from app.services.ml_training_service import MLTrainingService
+
+
+def make_app(tmp_path):
+    app = create_app('testing')
+    app.config['ML_MODELS_DIR'] = str(tmp_path)
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def seed_metrics(weeks=8):
+    today = datetime.now().date()
+    db.session.execute(insert(StaffingMetrics), [
+        {'date': today - timedelta(days=offset), 'hour': hour, 'day_of_week': (today - timedelta(days=offset)).weekday(),
+         'employees_scheduled': 3, 'sales_count': 10 + (offset + hour) % 7, 'sales_amount': 5000,
+         'is_holiday': False, 'created_at': datetime.utcnow()}
+        for offset in range(weeks * 7) for hour in range(8, 21)
+    ])
+    db.session.commit()
+
+
+def test_train_runs_as_job_and_reports_metrics(client, admin_headers, tmp_path):
+    seed_metrics()
+
+    response = client.post('/api/v1/ml/train', headers=admin_headers, json={'min_weeks': 8})
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data['created'] is True
+
+    job = client.get(f"/api/v1/ml/train/jobs/{data['job_id']}", headers=admin_headers).get_json()
+    assert job['status'] == 'completed' and job['progress'] == 100
+    assert job['result']['records'] == 56 * 13 and 'test_score' in job['result']
+
+    version = db.session.get(MLModelVersion, job['model_version_id'])
+    assert version.is_active and version.hyperparameters['n_jobs'] == -1
+    assert os.path.exists(tmp_path / f'sales_model_{version.id}.pkl')
+
+    jobs = client.get('/api/v1/ml/train/jobs', headers=admin_headers).get_json()['jobs']
+    assert [j['id'] for j in jobs] == [data['job_id']]
+    assert client.get('/api/v1/ml/train/jobs/999', headers=admin_headers).status_code == 404
+
+
+def test_concurrent_requests_share_the_active_job(client, admin_headers):
+    running = MLTrainingJob(status='running', params={'min_weeks': 8}, stage='fitting', progress=30, active_lock=True)
+    db.session.add(running)
+    db.session.commit()
+
+    response = client.post('/api/v1/ml/train', headers=admin_headers, json={})
+    assert response.status_code == 202
+    assert response.get_json()['job_id'] == running.id and response.get_json()['created'] is False
+    assert MLTrainingJob.query.count() == 1
+
+    # Un job sin avances por más de ML_TRAINING_STALE_MINUTES no bloquea un nuevo entrenamiento
+    running.updated_at = datetime.utcnow() - timedelta(hours=1)
+    db.session.commit()
+    response = client.post('/api/v1/ml/train', headers=admin_headers, json={})
+    assert response.get_json()['created'] is True
+    assert MLTrainingJob.query.count() == 2
+    abandoned = db.session.get(MLTrainingJob, running.id)
+    assert abandoned.status == 'failed' and abandoned.active_lock is None
+
+
+def test_active_slot_is_enforced_by_the_database(app, monkeypatch):
+    running = MLTrainingJob(status='running', params={}, progress=30, active_lock=True)
+    db.session.add(running)
+    db.session.commit()
+
+    # Otro worker pasó el chequeo antes de que este job existiera
+    active_job = MLTrainingService.active_job
+    calls = []
+
+    def racing_active_job():
+        calls.append(1)
+        return None if len(calls) == 1 else active_job()
+
+    monkeypatch.setattr(MLTrainingService, 'active_job', staticmethod(racing_active_job))
+    job, created = MLTrainingService.create_job({'min_weeks': 8})
+
+    assert created is False and job.id == running.id
+    assert MLTrainingJob.query.count() == 1
+
+
+def test_late_finish_does_not_overwrite_an_abandoned_job(app, tmp_path, monkeypatch):
+    seed_metrics()
+    job, _ = MLTrainingService.create_job({'min_weeks': 8})
+    train = StaffingPredictor.train
+
+    def train_while_released(self, **kwargs):
+        # Mientras entrena, otro worker lo da por abandonado y arranca otro entrenamiento
+        db.session.execute(
+            update(MLTrainingJob).where(MLTrainingJob.id == job.id)
+            .values(updated_at=datetime.utcnow() - timedelta(hours=1))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        assert MLTrainingService.create_job({'min_weeks': 8})[1]
+        return train(self, **kwargs)
+
+    monkeypatch.setattr(StaffingPredictor, 'train', train_while_released)
+    job = MLTrainingService.run_job(job.id)
+
+    assert job.status == 'failed' and 'abandoned' in job.error_message
+    assert job.model_version_id is None
+    assert MLModelVersion.query.count() == 0 and os.listdir(tmp_path) == []
+    assert model_registry.get_active() is None
+    assert MLTrainingService.active_job().id != job.id
+
+
+def test_heartbeat_keeps_a_long_fit_from_looking_stale(app, monkeypatch):
+    app.config['ML_TRAINING_HEARTBEAT_SECONDS'] = 0.05
+    job, _ = MLTrainingService.create_job({'min_weeks': 8})
+    seen = []
+
+    def slow_train(self, **kwargs):
+        updated_at = select(MLTrainingJob.updated_at).where(MLTrainingJob.id == job.id)
+        seen.append(db.session.execute(updated_at).scalar())
+        time.sleep(0.3)
+        seen.append(db.session.execute(updated_at).scalar())
+        return {'success': False, 'error': 'done'}
+
+    monkeypatch.setattr(StaffingPredictor, 'train', slow_train)
+    job = MLTrainingService.run_job(job.id)
+
+    assert seen[1] > seen[0]
+    assert job.status == 'failed' and job.active_lock is None
+
+
+def test_failed_training_is_recorded(client, admin_headers):
+    response = client.post('/api/v1/ml/train', headers=admin_headers, json={'min_weeks': 4})
+    job = response.get_json()['job']
+    assert job['status'] == 'failed'
+    assert 'Insufficient data' in job['error_message']
+
+    assert client.post('/api/v1/ml/train', headers=admin_headers, json={'min_weeks': 'ocho'}).status_code == 400
+
+
+def test_job_runs_in_process_pool(tmp_path, monkeypatch):
+    # El worker crea su propia app (lee el entorno): la base tiene que ser un archivo compartido
+    database_url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    monkeypatch.setenv('TEST_DATABASE_URL', database_url)
+    monkeypatch.setenv('ML_MODELS_DIR', str(tmp_path))
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', database_url)
+    app = make_app(tmp_path)
+    app.config['ML_TRAINING_INLINE'] = False
+    with app.app_context():
+        db.create_all()
+        seed_metrics()
+        job, _ = MLTrainingService.create_job({'min_weeks': 8})
+        try:
+            MLTrainingService.start_job(app, job.id)
+            deadline = time.monotonic() + 120
+            while time.monotonic() < deadline:
+                db.session.expire_all()
+                if db.session.get(MLTrainingJob, job.id).status in ('completed', 'failed'):
+                    break
+                time.sleep(0.2)
+        finally:
+            MLTrainingService.shutdown_pool()
+
+        job = db.session.get(MLTrainingJob, job.id)
+        assert job.status == 'completed', job.error_message
+        assert os.path.exists(tmp_path / f'sales_model_{job.model_version_id}.pkl')
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,189 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import date, time
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.employee import Employee
+from app.models.job_position import JobPosition
+from app.models.schedule import Schedule
+from app.models.shift import Shift
+from app.models.time_tracking import TimeTracking
+from app.models.work_block import WorkBlock
+from app.models.absence_request import AbsenceRequest
+from app.models.ml_tracking import Holiday
+from app.models.payroll import Payroll
+from app.services.payroll_batch_service import PayrollBatchService
+from app.utils.holiday_calendar import holiday_calendar
+from app.utils.principal_cache import principal_cache
+from app.utils.payroll_utils import (
+    calculate_hours_from_time_tracking,
+    calculate_scheduled_hours,
+    calculate_payroll_with_multipliers
+)
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def seed_month(admin, n_employees, start=1):
+    """Empleados con fichadas en marzo 2026: domingo, feriado, turno nocturno y una ausencia aprobada"""
+    position = JobPosition.query.filter_by(name='Cocina').first()
+    if position is None:
+        position = JobPosition(name='Cocina', contract_type='por_hora', hourly_rate=5000,
+                               sunday_rate_multiplier=1.5, holiday_rate_multiplier=2.0)
+        schedule = Schedule(start_date=date(2026, 3, 1), end_date=date(2026, 3, 31), created_by=admin.id)
+        db.session.add_all([position, schedule,
+                            Holiday(date=date(2026, 3, 24), name='Día de la Memoria', type='national')])
+        db.session.flush()
+    schedule = Schedule.query.first()
+
+    employees = []
+    for i in range(start, start + n_employees):
+        user = User(email=f'emp{i}@test.com', role='employee', is_active=True)
+        user.set_password('secret123')
+        db.session.add(user)
+        db.session.flush()
+        employee = Employee(user_id=user.id, first_name='Empleado', last_name=f'{i:03d}', dni=f'{30000000 + i}',
+                            hire_date=date(2025, 1, 1), current_job_position_id=position.id)
+        db.session.add(employee)
+        db.session.flush()
+        employees.append(employee)
+
+        for day, start_time, end_time in [(2, time(9), time(17)), (22, time(10), time(14)),
+                                          (24, time(18), time(23, 30)), (27, time(20), time(2))]:
+            record = TimeTracking(employee_id=employee.id, tracking_date=date(2026, 3, day))
+            db.session.add(record)
+            db.session.flush()
+            db.session.add(WorkBlock(time_tracking_id=record.id, start_time=start_time, end_time=end_time))
+
+        for day in (2, 10, 11, 22):
+            db.session.add(Shift(schedule_id=schedule.id, employee_id=employee.id, shift_date=date(2026, 3, day),
+                                 start_time=time(9), end_time=time(15), hours=6))
+        db.session.add(AbsenceRequest(employee_id=employee.id, start_date=date(2026, 3, 10),
+                                      end_date=date(2026, 3, 12), status='approved',
+                                      justification='Licencia por enfermedad'))
+    db.session.commit()
+    return employees
+
+
+def test_batch_matches_individual_calculation(app, admin):
+    employees = seed_month(admin, 3)
+    expected = {}
+    for employee in employees:
+        hours, daily_records = calculate_hours_from_time_tracking(employee.id, 3, 2026)
+        scheduled, _ = calculate_scheduled_hours(employee.id, 3, 2026)
+        gross = calculate_payroll_with_multipliers(employee.id, 3, 2026, 5000.0, employee.job_position)
+        expected[employee.id] = (hours, scheduled, gross)
+
+    result = PayrollBatchService.generate_month(2026, 3, admin.id)
+
+    assert result['success']
+    assert len(result['created']) == 3
+    for item in result['created']:
+        hours, scheduled, gross = expected[item['employee_id']]
+        assert item['hours_worked'] == hours
+        assert item['scheduled_hours'] == scheduled
+        assert item['gross_salary'] == gross
+
+        payroll = Payroll.query.get(item['payroll_id'])
+        assert payroll.status == 'draft'
+        assert float(payroll.gross_salary) == gross
+        assert float(payroll.hours_worked) == round(hours, 2)
+
+
+def test_batch_query_count_does_not_grow_with_headcount(app, admin, count_queries):
+    seed_month(admin, 2)
+    with count_queries() as small:
+        PayrollBatchService.generate_month(2026, 3, admin.id)
+
+    Payroll.query.delete()
+    db.session.commit()
+    seed_month(admin, 8, start=3)
+    holiday_calendar.invalidate()
+    with count_queries() as large:
+        result = PayrollBatchService.generate_month(2026, 3, admin.id)
+
+    assert len(result['created']) == 10
+    assert len(small) == len(large)
+
+
+def test_batch_skips_existing_and_unconfigured(client, admin_headers, admin):
+    employees = seed_month(admin, 3)
+    db.session.add(Payroll(employee_id=employees[0].id, month=3, year=2026, hours_worked=1,
+                           hourly_rate=1, gross_salary=1, generated_by=admin.id))
+    employees[1].current_job_position_id = None
+    db.session.commit()
+
+    response = client.post('/api/v1/payroll/generate-batch', json={'year': 2026, 'month': 3},
+                           headers=admin_headers)
+
+    assert response.status_code == 201
+    data = response.get_json()
+    assert [c['employee_id'] for c in data['created']] == [employees[2].id]
+    assert {s['employee_id'] for s in data['skipped']} == {employees[0].id, employees[1].id}
+
+    # Repetir no crea nada
+    response = client.post('/api/v1/payroll/generate-batch', json={'year': 2026, 'month': 3},
+                           headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['total_created'] == 0
+
+
+def test_batch_validates_input(client, admin_headers):
+    response = client.post('/api/v1/payroll/generate-batch', json={'year': 2026, 'month': 13},
+                           headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_employees_status_matches_individual_calculation(client, admin_headers, admin):
+    employees = seed_month(admin, 3)
+    db.session.add(Payroll(employee_id=employees[0].id, month=3, year=2026, hours_worked=1,
+                           hourly_rate=1, gross_salary=1234.5, generated_by=admin.id))
+    employees[1].current_job_position_id = None
+    db.session.commit()
+
+    response = client.get('/api/v1/payroll/employees-status/2026/3', headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['total_employees'] == 3
+    assert data['with_payroll'] == 1
+    by_id = {e['employee_id']: e for e in data['employees']}
+    for employee in employees:
+        hours, _ = calculate_hours_from_time_tracking(employee.id, 3, 2026)
+        assert by_id[employee.id]['hours_worked'] == hours
+    assert by_id[employees[0].id]['gross_salary'] == 1234.5
+    assert by_id[employees[0].id]['payroll_status'] == 'draft'
+    assert by_id[employees[1].id]['job_position'] is None
+    assert by_id[employees[2].id]['job_position'] == 'Cocina'
+    assert by_id[employees[2].id]['pdf_generated'] is False
+
+
+def test_employees_status_query_count_does_not_grow_with_headcount(client, admin_headers, admin):
+    url = '/api/v1/payroll/employees-status/2026/3'
+    seed_month(admin, 2)
+    small = client.get(url, headers=admin_headers).headers['X-Query-Count']
+
+    seed_month(admin, 8, start=3)
+    holiday_calendar.invalidate()
+    principal_cache.invalidate()
+    response = client.get(url, headers=admin_headers)
+
+    assert response.get_json()['total_employees'] == 10
+    assert int(response.headers['X-Query-Count']) == int(small)
@@ -0,0 +1,186 @@
+"""
+Presupuesto de consultas SQL y tiempo para los endpoints más usados.
+
+Carga un año de operación realista (40 empleados, 12 meses de fichadas, un
+año de turnos y 100k ventas) y verifica que cada endpoint quede por debajo
+de un máximo de consultas (X-Query-Count) y de milisegundos. Un N+1 sobre
+empleados, días o turnos supera el presupuesto y hace fallar la suite.
+
+Corre sobre SQLite en memoria; con TEST_DATABASE_URL apunta a PostgreSQL.
+PERF_BUDGET_TIME_FACTOR escala los tiempos máximos en máquinas lentas.
+"""
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+import time as timer
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import insert
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.employee import Employee
+from app.models.job_position import JobPosition
+from app.models.time_tracking import TimeTracking
+from app.models.work_block import WorkBlock
+from app.models.schedule import Schedule
+from app.models.shift import Shift
+from app.models.sale import Sale
+from app.models.payroll import Payroll
+from app.models.ml_tracking import Holiday
+from app.services.sales_rollup_service import SalesRollupService
+from app.utils.holiday_calendar import holiday_calendar
+from app.utils.principal_cache import principal_cache
+from app.utils.report_cache import report_cache
+
+N_EMPLOYEES = 40
+N_SALES = 100000
+YEAR_START = date(2025, 1, 1)
+YEAR_DAYS = 365
+
+TIME_FACTOR = float(os.environ.get('PERF_BUDGET_TIME_FACTOR', 1))
+
+# (endpoint, máximo de consultas, máximo de ms con los caches vacíos)
+BUDGETS = [
+    ('/api/v1/reports/dashboard?start_date=2025-06-01&end_date=2025-06-30', 6, 1500),
+    ('/api/v1/reports/time-analysis?start_date=2025-06-01&end_date=2025-06-30', 8, 3000),
+    ('/api/v1/payroll/employees-status/2025/6', 8, 1500),
+    ('/api/v1/time-tracking/calendar?year=2025&month=6', 4, 1500),
+    ('/api/v1/payroll/aguinaldo/preview?year=2025&semester=1', 3, 1000),
+    ('/api/v1/coverage/hourly?start_date=2025-06-01&end_date=2025-06-30', 4, 1500),
+]
+
+
+@pytest.fixture(scope='module')
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed_year()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='module')
+def headers(app, auth_headers):
+    return auth_headers(User.query.filter_by(email='admin@test.com').first())
+
+
+def seed_year():
+    rnd = random.Random(7)
+    admin = User(email='admin@test.com', password_hash='x', role='admin', is_active=True)
+    positions = [
+        JobPosition(name='Salón', contract_type='por_hora', hourly_rate=1000,
+                    sunday_rate_multiplier=1.5, holiday_rate_multiplier=2.0),
+        JobPosition(name='Cocina', contract_type='por_hora', hourly_rate=1200,
+                    sunday_rate_multiplier=1.5, holiday_rate_multiplier=2.0)
+    ]
+    db.session.add_all([admin] + positions + [
+        Holiday(date=date(2025, 5, 25), name='Revolución de Mayo', type='national'),
+        Holiday(date=date(2025, 6, 20), name='Día de la Bandera', type='national'),
+        Holiday(date=date(2025, 7, 9), name='Día de la Independencia', type='national')
+    ])
+    db.session.flush()
+
+    employee_ids = []
+    for i in range(N_EMPLOYEES):
+        user = User(email=f'staff{i}@test.com', password_hash='x', role='employee', is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        employee = Employee(user_id=user.id, first_name='Staff', last_name=f'{i:03d}', dni=f'{35000000 + i}',
+                            hire_date=date(2024, 1, 1), current_job_position_id=positions[i % 2].id)
+        db.session.add(employee)
+        db.session.flush()
+        employee_ids.append(employee.id)
+
+    days = [YEAR_START + timedelta(days=d) for d in range(YEAR_DAYS)]
+
+    # Un turno de 4 u 8 horas por empleado y día, salvo su franco semanal
+    schedules = [Schedule(start_date=day, end_date=day + timedelta(days=6), status='published', created_by=admin.id)
+                 for day in days[::7]]
+    db.session.add_all(schedules)
+    db.session.flush()
+    work = [(day, schedules[index // 7].id, emp_id, n)
+            for index, day in enumerate(days)
+            for n, emp_id in enumerate(employee_ids) if day.weekday() != n % 7]
+    start_hour = lambda n: 10 if n % 2 else 15
+    hours = lambda n: 8 if n % 3 else 4
+    db.session.execute(insert(Shift), [{
+        'schedule_id': schedule_id, 'employee_id': emp_id, 'shift_date': day,
+        'start_time': time(start_hour(n)), 'end_time': time(start_hour(n) + hours(n)),
+        'hours': hours(n), 'created_at': datetime.utcnow()
+    } for day, schedule_id, emp_id, n in work])
+
+    # Fichadas: un registro por día trabajado con un bloque igual al turno
+    db.session.execute(insert(TimeTracking), [{
+        'employee_id': emp_id, 'tracking_date': day, 'total_worked_minutes': hours(n) * 60,
+        'open_block': False, 'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow()
+    } for day, _, emp_id, n in work])
+    tracking_ids = dict(((emp_id, day), tracking_id) for tracking_id, emp_id, day in
+                        db.session.query(TimeTracking.id, TimeTracking.employee_id, TimeTracking.tracking_date))
+    db.session.execute(insert(WorkBlock), [{
+        'time_tracking_id': tracking_ids[(emp_id, day)], 'start_time': time(start_hour(n)),
+        'end_time': time(start_hour(n) + hours(n)), 'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow()
+    } for day, _, emp_id, n in work])
+
+    sales = []
+    for i in range(N_SALES):
+        fecha = days[rnd.randrange(YEAR_DAYS)]
+        cerrada = datetime.combine(fecha, time()) + timedelta(hours=rnd.randint(14, 26))
+        sales.append({
+            'external_id': i + 1, 'fecha': fecha, 'creacion': cerrada - timedelta(minutes=45),
+            'cerrada': cerrada, 'estado': 'Cerrada' if rnd.random() < 0.95 else 'Cancelada',
+            'total': round(rnd.uniform(2000, 60000), 2), 'tipo_venta': 'Local', 'fiscal': False,
+            'created_at': cerrada
+        })
+    db.session.execute(insert(Sale), sales)
+    SalesRollupService.rebuild_all()
+
+    db.session.execute(insert(Payroll), [{
+        'employee_id': emp_id, 'month': month, 'year': 2025, 'hours_worked': 120, 'scheduled_hours': 120,
+        'hourly_rate': 1000, 'gross_salary': 120000 + 1000 * month, 'extraordinary_amount': 0,
+        'status': 'validated', 'pdf_generated': False, 'generated_by': admin.id, 'generated_at': datetime.utcnow()
+    } for emp_id in employee_ids for month in range(1, 6)])
+    db.session.commit()
+
+
+@pytest.fixture
+def fetch_cold(app, headers):
+    client = app.test_client()
+
+    def fetch(url):
+        # Caches vacíos: se mide el camino completo, no una respuesta ya calculada
+        db.session.expire_all()
+        report_cache.clear()
+        holiday_calendar.invalidate()
+        principal_cache.invalidate()
+        started = timer.perf_counter()
+        response = client.get(url, headers=headers)
+        return response, (timer.perf_counter() - started) * 1000
+
+    return fetch
+
+
+@pytest.mark.parametrize('url, max_queries, max_ms', BUDGETS, ids=[b[0].split('?')[0] for b in BUDGETS])
+def test_endpoint_stays_within_budget(fetch_cold, url, max_queries, max_ms):
+    response, elapsed_ms = fetch_cold(url)
+
+    assert response.status_code == 200
+    queries = int(response.headers['X-Query-Count'])
+    assert queries <= max_queries, f'{url}: {queries} consultas (máximo {max_queries})'
+    assert elapsed_ms <= max_ms * TIME_FACTOR, f'{url}: {elapsed_ms:.0f} ms (máximo {max_ms * TIME_FACTOR:.0f})'
+
+
+def test_aguinaldo_preview_uses_best_semester_salary(fetch_cold):
+    response, _ = fetch_cold('/api/v1/payroll/aguinaldo/preview?year=2025&semester=1')
+    results = response.get_json()['results']
+
+    assert len(results) == N_EMPLOYEES
+    assert all(r['best_gross_salary'] == 125000 and r['aguinaldo_amount'] == 62500 for r in results)
+    assert not any(r['already_generated'] for r in results)
+
+    response, _ = fetch_cold('/api/v1/payroll/aguinaldo/preview?year=2025&semester=2')
+    assert not any(r['has_payrolls'] for r in response.get_json()['results'])
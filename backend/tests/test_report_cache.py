@@ -0,0 +1,226 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+from datetime import date, datetime
+from app import create_app
+from app.extensions import db
+from app.models.sale import Sale
+from app.models.expense import Expense
+from app.models.payroll import Payroll
+from app.utils.report_cache import MemoryCacheBackend, RedisCacheBackend, ReportCache, report_cache
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _backend(app):
+    return app.extensions[ReportCache.EXTENSION_KEY]
+
+
+# ---- Backend en memoria ----
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set('a', 1, 60, date(2026, 1, 1), date(2026, 1, 31))
+    backend.set('b', 2, 60, date(2026, 1, 1), date(2026, 1, 31))
+    assert backend.get('a') == 1  # 'a' pasa a ser la más reciente
+    backend.set('c', 3, 60, date(2026, 1, 1), date(2026, 1, 31))
+
+    assert backend.get('b') is None
+    assert backend.get('a') == 1
+    assert backend.get('c') == 3
+
+
+def test_memory_backend_expires_entries():
+    backend = MemoryCacheBackend()
+    backend.set('a', 1, 0, date(2026, 1, 1), date(2026, 1, 31))
+    time.sleep(0.01)
+    assert backend.get('a') is None
+
+
+def test_memory_backend_invalidates_only_overlapping_ranges():
+    backend = MemoryCacheBackend()
+    backend.set('enero', 1, 60, date(2026, 1, 1), date(2026, 1, 31))
+    backend.set('febrero', 2, 60, date(2026, 2, 1), date(2026, 2, 28))
+
+    backend.invalidate_range(date(2026, 2, 10), date(2026, 2, 10))
+
+    assert backend.get('enero') == 1
+    assert backend.get('febrero') is None
+
+
+def test_closed_ttl_defaults_to_open_ttl_for_memory_backend():
+    config = {'REPORT_CACHE_BACKEND': 'memory', 'REPORT_CACHE_TTL_OPEN': 60, 'REPORT_CACHE_TTL_CLOSED': None}
+    ReportCache._resolve_closed_ttl(config)
+    assert config['REPORT_CACHE_TTL_CLOSED'] == 60
+
+    config = {'REPORT_CACHE_BACKEND': 'redis', 'REPORT_CACHE_TTL_OPEN': 60, 'REPORT_CACHE_TTL_CLOSED': None}
+    ReportCache._resolve_closed_ttl(config)
+    assert config['REPORT_CACHE_TTL_CLOSED'] == 24 * 3600
+
+    config = {'REPORT_CACHE_BACKEND': 'memory', 'REPORT_CACHE_TTL_OPEN': 60, 'REPORT_CACHE_TTL_CLOSED': 3600}
+    ReportCache._resolve_closed_ttl(config)
+    assert config['REPORT_CACHE_TTL_CLOSED'] == 3600
+
+
+class FakeRedis:
+    """Lo mínimo de redis.Redis que usa RedisCacheBackend, con reloj manual para los TTL"""
+
+    def __init__(self):
+        self.now = 0
+        self.values = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= self.now:
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+    def get(self, key):
+        return self.values[key] if self._alive(key) else None
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+        if ex is not None:
+            self.expires[key] = self.now + ex
+
+    def sadd(self, key, member):
+        if not self._alive(key):
+            self.values[key] = set()
+        self.values[key].add(member.encode())
+
+    def expire(self, key, seconds):
+        if self._alive(key):
+            self.expires[key] = self.now + seconds
+
+    def smembers(self, key):
+        return set(self.values[key]) if self._alive(key) else set()
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+
+
+def test_redis_month_index_outlives_short_entries(app):
+    redis_client = FakeRedis()
+    backend = RedisCacheBackend(None, index_ttl=24 * 3600, client=redis_client)
+    app.extensions[ReportCache.EXTENSION_KEY] = backend
+
+    # Rango cerrado (24 h) y rango abierto (60 s) del mismo mes
+    backend.set('cerrado', {'total': 1}, 24 * 3600, date(2026, 3, 1), date(2026, 3, 15))
+    backend.set('abierto', {'total': 2}, 60, date(2026, 3, 1), date(2026, 3, 31))
+    redis_client.now = 120
+    assert backend.get('abierto') is None
+    assert backend.get('cerrado') == {'total': 1}
+
+    # Una venta atrasada del mismo mes todavía encuentra la entrada cerrada en el índice
+    db.session.add(Sale(fecha=date(2026, 3, 10), creacion=datetime(2026, 3, 10, 12), total=100))
+    db.session.commit()
+
+    assert backend.get('cerrado') is None
+
+
+def test_key_is_normalized():
+    key = ReportCache.make_key('sales', date(2026, 1, 1), date(2026, 1, 31), {'b': 2, 'a': 1, 'c': None})
+    same = ReportCache.make_key('sales', date(2026, 1, 1), date(2026, 1, 31), {'a': '1', 'b': '2'})
+    other = ReportCache.make_key('sales', date(2026, 1, 1), date(2026, 1, 30), {'a': 1, 'b': 2})
+    assert key == same
+    assert key != other
+
+
+# ---- Endpoints de reportes ----
+
+def test_balance_is_served_from_cache(client, admin_headers, app):
+    url = '/api/v1/reports/balance?start_date=2026-01-01&end_date=2026-01-31'
+
+    first = client.get(url, headers=admin_headers)
+    assert first.status_code == 200
+    assert len(_backend(app)._entries) == 1
+
+    second = client.get(url, headers=admin_headers)
+    assert second.get_json() == first.get_json()
+
+
+def test_sale_write_invalidates_overlapping_reports(client, admin_headers, app):
+    january = '/api/v1/reports/balance?start_date=2026-01-01&end_date=2026-01-31'
+    march = '/api/v1/reports/balance?start_date=2026-03-01&end_date=2026-03-31'
+    assert client.get(january, headers=admin_headers).get_json()['ingresos']['ventas'] == 0
+    client.get(march, headers=admin_headers)
+    assert len(_backend(app)._entries) == 2
+
+    db.session.add(Sale(fecha=date(2026, 1, 15), creacion=datetime(2026, 1, 15, 15),
+                        cerrada=datetime(2026, 1, 15, 16), total=1200, estado='Cerrada'))
+    db.session.commit()
+
+    # Sólo se invalida el rango de enero
+    assert len(_backend(app)._entries) == 1
+    assert client.get(january, headers=admin_headers).get_json()['ingresos']['ventas'] == 1200
+
+
+def test_dashboard_invalidated_by_previous_period_changes(client, admin_headers, app):
+    url = '/api/v1/reports/dashboard?start_date=2026-02-01&end_date=2026-02-28'
+    assert client.get(url, headers=admin_headers).get_json()['gastos']['variacion'] == 0
+
+    # Un gasto del período anterior (enero) cambia la variación
+    db.session.add(Expense(fecha=date(2026, 1, 20), importe=500))
+    db.session.commit()
+
+    assert client.get(url, headers=admin_headers).get_json()['gastos']['variacion'] == -100.0
+
+
+def test_payroll_update_moves_invalidation_to_old_and_new_month(app):
+    payroll = Payroll(employee_id=1, month=1, year=2026, hours_worked=10, hourly_rate=10,
+                      gross_salary=100, generated_by=1)
+    db.session.add(payroll)
+    db.session.commit()
+
+    _backend(app).set('enero', 1, 60, date(2026, 1, 1), date(2026, 1, 31))
+    _backend(app).set('junio', 2, 60, date(2026, 6, 1), date(2026, 6, 30))
+    _backend(app).set('abril', 3, 60, date(2026, 4, 1), date(2026, 4, 30))
+
+    payroll.month = 13  # SAC1: impacta en junio
+    db.session.commit()
+
+    assert _backend(app).get('enero') is None
+    assert _backend(app).get('junio') is None
+    assert _backend(app).get('abril') == 3
+
+
+def test_rollback_does_not_invalidate(app):
+    _backend(app).set('enero', 1, 60, date(2026, 1, 1), date(2026, 1, 31))
+    db.session.add(Expense(fecha=date(2026, 1, 20), importe=500))
+    db.session.flush()
+    db.session.rollback()
+
+    assert _backend(app).get('enero') == 1
+
+
+def test_cache_can_be_disabled(app):
+    app.config['REPORT_CACHE_ENABLED'] = False
+    calls = []
+    for _ in range(2):
+        report_cache.get_or_compute('x', date(2026, 1, 1), date(2026, 1, 2), lambda: calls.append(1) or {})
+    assert len(calls) == 2
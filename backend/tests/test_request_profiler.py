@@ -0,0 +1,90 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import logging
+from datetime import date
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.employee import Employee
+from app.utils.principal_cache import principal_cache
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def seed_employees(n):
+    for i in range(n):
+        user = User(email=f'staff{i}@test.com', password_hash='x', role='employee', is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Employee(user_id=user.id, first_name='Staff', last_name=f'{i:03d}', dni=f'{34000000 + i}',
+                                hire_date=date(2025, 1, 1)))
+    db.session.commit()
+
+
+def test_headers_report_query_count_and_timing(client, admin_headers, count_queries):
+    seed_employees(3)
+    principal_cache.invalidate()
+    with count_queries() as statements:
+        response = client.get('/api/v1/employees', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) == len(statements) > 0
+    db_timing, app_timing = response.headers['Server-Timing'].split(', ')
+    assert db_timing.startswith('db;dur=') and db_timing.endswith(f'desc="{len(statements)} queries"')
+    assert app_timing.startswith('app;dur=')
+
+    # Un endpoint sin consultas informa 0
+    assert client.get('/health').headers['X-Query-Count'] == '0'
+
+
+def test_slow_requests_are_logged(app, client, admin_headers, caplog):
+    app.config['SLOW_REQUEST_MS'] = 0
+    with caplog.at_level(logging.WARNING, logger='app.profiler'):
+        client.get('/api/v1/employees', headers=admin_headers)
+    assert any('Request lento: GET /api/v1/employees' in r.getMessage() for r in caplog.records)
+
+    caplog.clear()
+    app.config['SLOW_REQUEST_MS'] = 60000
+    with caplog.at_level(logging.WARNING, logger='app.profiler'):
+        client.get('/api/v1/employees', headers=admin_headers)
+    assert not [r for r in caplog.records if r.name == 'app.profiler']
+
+
+def test_admin_stats_aggregate_per_route(app, client, admin_headers, auth_headers):
+    seed_employees(2)
+    for _ in range(5):
+        client.get('/api/v1/employees', headers=admin_headers)
+    client.get('/health')
+
+    response = client.get('/api/v1/admin/perf', headers=admin_headers)
+    assert response.status_code == 200
+    routes = {(r['method'], r['route']): r for r in response.get_json()['routes']}
+    employees = routes[('GET', '/api/v1/employees')]
+    assert employees['blueprint'] == 'employees'
+    assert employees['count'] == 5
+    assert 0 < employees['p50_ms'] <= employees['p95_ms'] <= employees['max_ms']
+    assert employees['avg_queries'] > 0 and employees['max_queries'] >= employees['p95_queries']
+    assert routes[('GET', '/health')]['max_queries'] == 0
+
+    employee = User.query.filter_by(email='staff0@test.com').first()
+    assert client.get('/api/v1/admin/perf', headers=auth_headers(employee)).status_code == 403
+
+    assert client.delete('/api/v1/admin/perf', headers=admin_headers).status_code == 200
+    routes = client.get('/api/v1/admin/perf', headers=admin_headers).get_json()['routes']
+    assert [r['route'] for r in routes] == ['/api/v1/admin/perf']
@@ -0,0 +1,104 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import io
+from datetime import date, datetime
+from app import create_app
+from app.extensions import db
+from app.models.sale import Sale
+from app.models.sales_rollup import SalesDailyRollup
+from app.services.sales_import_service import SalesImportService
+from app.utils.report_cache import ReportCache
+
+HEADER = 'Id,Fecha,Creación,Cerrada,Estado,Total,Medio de Pago,Tipo de Venta\n'
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def upload(client, headers, content):
+    return client.post('/api/v1/sales/import', headers=headers, content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(content.encode('utf-8-sig')), 'ventas.csv')})
+
+
+def test_import_summary_matches_row_by_row_rules(client, admin_headers):
+    db.session.add(Sale(external_id=1, fecha=date(2026, 1, 1), creacion=datetime(2026, 1, 1, 12), total=10))
+    db.session.commit()
+
+    content = HEADER + (
+        '1,01/01/2026,01/01/2026 12:00:00,,Cerrada,10,Efectivo,Local\n'          # ya existe
+        '2,02/01/2026,02/01/2026 20:00:00,02/01/2026 21:00:00,Cerrada,"1500,50",Tarjeta,Delivery\n'
+        '2,02/01/2026,02/01/2026 20:00:00,,Cerrada,99,Efectivo,Local\n'           # repetido en el archivo
+        '3,fecha mala,,,Cerrada,5,,\n'                                          # sin fecha válida
+        'abc,03/01/2026,,,Cerrada,5,,\n'                                        # id inválido
+        ',04/01/2026,04/01/2026 10:00:00,,En curso,7,,\n'                       # sin id
+    )
+    response = upload(client, admin_headers, content)
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert results['total_rows'] == 6
+    assert results['imported'] == 2
+    assert results['skipped'] == 2
+    assert results['updated'] == 0
+    assert [e['row'] for e in results['errors']] == [5, 6]
+    assert results['errors'][0]['errors'] == ['La fecha es requerida o tiene formato inválido']
+
+    sale = Sale.query.filter_by(external_id=2).one()
+    assert float(sale.total) == 1500.5
+    assert sale.tipo_venta == 'Delivery'
+    assert sale.created_at is not None
+    assert Sale.query.filter(Sale.external_id.is_(None)).one().estado == 'En curso'
+
+
+def test_import_refreshes_rollups_and_report_cache(app):
+    backend = app.extensions[ReportCache.EXTENSION_KEY]
+    backend.set('enero', 1, 60, date(2026, 1, 1), date(2026, 1, 31))
+    backend.set('marzo', 2, 60, date(2026, 3, 1), date(2026, 3, 31))
+
+    rows = [
+        {'Id': '10', 'Fecha': '15/01/2026', 'Creación': '15/01/2026 20:00:00',
+         'Cerrada': '15/01/2026 23:00:00', 'Estado': 'Cerrada', 'Total': '1000'},
+        {'Id': '11', 'Fecha': '15/01/2026', 'Creación': '15/01/2026 21:00:00',
+         'Cerrada': '15/01/2026 23:30:00', 'Estado': 'Cerrada', 'Total': '500'},
+    ]
+    results = SalesImportService.import_rows(rows)
+
+    assert results['imported'] == 2
+    rollup = SalesDailyRollup.query.filter_by(fecha=date(2026, 1, 15)).one()
+    assert float(rollup.total) == 1500.0
+    assert rollup.cantidad == 2
+    assert backend.get('enero') is None
+    assert backend.get('marzo') == 2
+
+
+def test_import_runs_one_lookup_and_insert_per_chunk(app, count_queries):
+    rows = [
+        {'Id': str(i), 'Fecha': '10/02/2026', 'Creación': '10/02/2026 12:00:00', 'Estado': 'En curso', 'Total': '1'}
+        for i in range(1, 251)
+    ]
+    with count_queries() as executed:
+        results = SalesImportService.import_rows(rows, chunk_size=100)
+    statements = [
+        statement.split()[0].upper() for statement in executed
+        if statement.lstrip().upper().startswith(('SELECT', 'INSERT')) and 'sales' in statement
+    ]
+
+    assert results['imported'] == 250
+    assert Sale.query.count() == 250
+    # 3 lotes: un SELECT de ids existentes y un INSERT por lote, luego el refresco de los agregados
+    assert statements[:6] == ['SELECT', 'INSERT'] * 3
@@ -0,0 +1,131 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import date, datetime
+from app import create_app
+from app.extensions import db
+from app.models.sale import Sale
+from app.models.sales_rollup import SalesDailyRollup, SalesHourlyRollup
+from app.services.sales_rollup_service import SalesRollupService
+from app.routes.reports import get_sales_metrics, get_sales_by_weekday, get_sales_by_hour
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _sale(fecha, cerrada, total, estado='Cerrada', **kwargs):
+    return Sale(
+        fecha=fecha,
+        creacion=cerrada,
+        cerrada=cerrada,
+        total=total,
+        estado=estado,
+        **kwargs
+    )
+
+
+def test_insert_updates_daily_and_hourly_rollup(app):
+    db.session.add_all([
+        _sale(date(2026, 7, 6), datetime(2026, 7, 6, 16, 0), 10000, medio_pago='Efectivo'),
+        _sale(date(2026, 7, 6), datetime(2026, 7, 6, 16, 30), 5000, medio_pago='Efectivo'),
+        _sale(date(2026, 7, 6), datetime(2026, 7, 6, 23, 0), 2000, medio_pago='Tarjeta'),
+    ])
+    db.session.commit()
+
+    daily = SalesDailyRollup.query.filter_by(fecha=date(2026, 7, 6)).all()
+    assert sum(r.cantidad for r in daily) == 3
+    assert sum(float(r.total) for r in daily) == pytest.approx(17000)
+    assert {r.medio_pago for r in daily} == {'Efectivo', 'Tarjeta'}
+
+    # 16:00 UTC → 13h local, 23:00 UTC → 20h local
+    hourly = {r.hora: r for r in SalesHourlyRollup.query.all()}
+    assert hourly[13].cantidad == 2
+    assert float(hourly[13].total) == pytest.approx(15000)
+    assert hourly[20].cantidad == 1
+
+
+def test_non_closed_sales_are_excluded(app):
+    db.session.add(_sale(date(2026, 7, 6), datetime(2026, 7, 6, 16, 0), 9999, estado='En curso'))
+    db.session.commit()
+
+    assert SalesDailyRollup.query.count() == 0
+    assert get_sales_metrics(date(2026, 7, 6), date(2026, 7, 6))['count'] == 0
+
+
+def test_update_moves_sale_between_dates(app):
+    sale = _sale(date(2026, 7, 6), datetime(2026, 7, 6, 16, 0), 1000)
+    db.session.add(sale)
+    db.session.commit()
+
+    sale.fecha = date(2026, 7, 7)
+    sale.cerrada = datetime(2026, 7, 7, 16, 0)
+    sale.total = 1500
+    db.session.commit()
+
+    assert get_sales_metrics(date(2026, 7, 6), date(2026, 7, 6))['total'] == 0
+    metrics = get_sales_metrics(date(2026, 7, 7), date(2026, 7, 7))
+    assert metrics['total'] == pytest.approx(1500)
+    assert metrics['count'] == 1
+
+
+def test_closing_and_deleting_sale(app):
+    sale = _sale(date(2026, 7, 6), datetime(2026, 7, 6, 16, 0), 1000, estado='En curso')
+    db.session.add(sale)
+    db.session.commit()
+
+    sale.estado = 'Cerrada'
+    db.session.commit()
+    assert get_sales_metrics(date(2026, 7, 6), date(2026, 7, 6))['count'] == 1
+
+    db.session.delete(sale)
+    db.session.commit()
+    assert get_sales_metrics(date(2026, 7, 6), date(2026, 7, 6))['count'] == 0
+    assert SalesHourlyRollup.query.count() == 0
+
+
+def test_rollback_discards_pending_refresh(app):
+    db.session.add(_sale(date(2026, 7, 6), datetime(2026, 7, 6, 16, 0), 1000))
+    db.session.flush()
+    db.session.rollback()
+
+    assert 'sales_rollup_pending' not in db.session.info
+    assert SalesDailyRollup.query.count() == 0
+
+
+def test_weekday_and_hour_use_local_closing_time(app):
+    # Cerrada 02:00 UTC del martes → lunes 23h en hora local
+    db.session.add(_sale(date(2026, 7, 6), datetime(2026, 7, 7, 2, 0), 4000))
+    db.session.commit()
+
+    weekday = get_sales_by_weekday(date(2026, 7, 6), date(2026, 7, 7))
+    lunes = next(r for r in weekday if r['dow'] == 0)
+    assert lunes['sum_ventas'] == pytest.approx(4000)
+    assert lunes['count_ventas'] == 1
+
+    by_hour = get_sales_by_hour(date(2026, 7, 6), date(2026, 7, 6))
+    assert by_hour == [{'hora': 23, 'sum_ventas': 4000.0, 'count_ventas': 1, 'promedio_ventas': 4000.0}]
+
+
+def test_rebuild_all_matches_incremental(app):
+    db.session.add_all([
+        _sale(date(2026, 7, d), datetime(2026, 7, d, 15, 0), 100 * d, sala='Salón')
+        for d in range(1, 10)
+    ])
+    db.session.commit()
+    before = sorted((r.fecha, r.sala, float(r.total), r.cantidad) for r in SalesDailyRollup.query.all())
+
+    SalesRollupService.rebuild_all()
+    db.session.commit()
+    after = sorted((r.fecha, r.sala, float(r.total), r.cantidad) for r in SalesDailyRollup.query.all())
+
+    assert before == after
+    assert len(after) == 9
@@ -0,0 +1,100 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import date, time
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.employee import Employee
+from app.models.job_position import JobPosition
+from app.models.schedule import Schedule
+from app.models.shift import Shift
+from app.models.ml_tracking import Holiday
+from app.utils.holiday_calendar import holiday_calendar
+from app.utils.principal_cache import principal_cache
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def schedule(admin):
+    # Semana del lunes 23/3/2026: el martes 24 es feriado y el domingo 29 se paga con recargo
+    position = JobPosition(name='Salón', contract_type='por_hora', hourly_rate=1000,
+                           sunday_rate_multiplier=1.5, holiday_rate_multiplier=2.0)
+    db.session.add_all([position, Holiday(date=date(2026, 3, 24), name='Día de la Memoria', type='national')])
+    schedule = Schedule(start_date=date(2026, 3, 23), end_date=date(2026, 3, 29), status='draft', created_by=admin.id)
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule, position
+
+
+def seed_staff(schedule, position, n_employees, start=0):
+    for i in range(start, start + n_employees):
+        user = User(email=f'staff{i}@test.com', password_hash='x', role='employee', is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        employee = Employee(user_id=user.id, first_name='Staff', last_name=f'{i:03d}', dni=f'{33000000 + i}',
+                            hire_date=date(2025, 1, 1),
+                            current_job_position_id=position.id if i % 3 else None)
+        db.session.add(employee)
+        db.session.flush()
+        for day in (23, 24, 29):
+            shift = Shift(schedule_id=schedule.id, employee_id=employee.id, shift_date=date(2026, 3, day),
+                          start_time=time(10), end_time=time(14))
+            shift.calculate_hours()
+            db.session.add(shift)
+    db.session.commit()
+
+
+def test_summary_applies_sunday_and_holiday_multipliers(client, admin_headers, schedule):
+    schedule, position = schedule
+    seed_staff(schedule, position, 3)
+
+    response = client.get(f'/api/v1/schedules/{schedule.id}/summary', headers=admin_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+
+    # Con puesto: 4 h normales + 4 h de feriado x2 + 4 h de domingo x1.5; sin puesto no suma costo
+    paid = [e for e in data['cost_summary']['by_employee'] if e['rate']]
+    assert len(paid) == 2
+    assert all(e['hours'] == 12 and e['cost'] == 4 * 1000 + 4 * 2000 + 4 * 1500 for e in paid)
+    assert data['cost_summary']['total_cost'] == 2 * 18000
+    assert [e['employee_name'] for e in data['hours_summary']] == ['Staff 000', 'Staff 001', 'Staff 002']
+    assert all(e['total_hours'] == 12 and e['shift_count'] == 3 for e in data['hours_summary'])
+
+
+def test_summary_and_serialization_do_not_query_per_shift(client, admin_headers, schedule):
+    schedule, position = schedule
+    seed_staff(schedule, position, 2)
+
+    def fetch():
+        db.session.expire_all()
+        holiday_calendar.invalidate()
+        principal_cache.invalidate()
+        summary = client.get(f'/api/v1/schedules/{schedule.id}/summary', headers=admin_headers)
+        detail = client.get(f'/api/v1/schedules/{schedule.id}', headers=admin_headers)
+        return summary, detail
+
+    small = [response.headers['X-Query-Count'] for response in fetch()]
+    seed_staff(schedule, position, 10, start=2)
+    large_summary, large_detail = fetch()
+
+    assert len(large_detail.get_json()['shifts']) == 36
+    assert all(shift['employee_name'].startswith('Staff') for shift in large_detail.get_json()['shifts'])
+    assert len(large_summary.get_json()['hours_summary']) == 12
+    assert [large_summary.headers['X-Query-Count'], large_detail.headers['X-Query-Count']] == small
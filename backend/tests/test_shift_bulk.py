@@ -0,0 +1,147 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import date, time, timedelta
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.employee import Employee
+from app.models.schedule import Schedule
+from app.models.shift import Shift
+from app.models.notification import Notification, ScheduleChangeLog
+from app.utils.principal_cache import principal_cache
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def seed_employees(n):
+    ids = []
+    for i in range(n):
+        user = User(email=f'staff{i}@test.com', password_hash='x', role='employee', is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        employee = Employee(user_id=user.id, first_name='Staff', last_name=f'{i:03d}', dni=f'{32000000 + i}',
+                            hire_date=date(2025, 1, 1))
+        db.session.add(employee)
+        db.session.flush()
+        ids.append(employee.id)
+    db.session.commit()
+    return ids
+
+
+def make_schedule(admin, status='draft'):
+    # Grilla de dos semanas desde el lunes 2/3/2026
+    schedule = Schedule(start_date=date(2026, 3, 2), end_date=date(2026, 3, 15), status=status, created_by=admin.id)
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule
+
+
+def week_items(employee_ids, monday, days=7):
+    return [
+        {'employee_id': emp_id, 'shift_date': (monday + timedelta(days=d)).isoformat(),
+         'start_time': '09:00' if i % 2 else '14:00', 'end_time': '13:00' if i % 2 else '22:00'}
+        for i, emp_id in enumerate(employee_ids) for d in range(days)
+    ]
+
+
+def post_bulk(client, headers, schedule_id, items):
+    principal_cache.invalidate()
+    return client.post('/api/v1/shifts/bulk', headers=headers,
+                       json={'schedule_id': schedule_id, 'shifts': items})
+
+
+def test_bulk_create_notifies_in_one_transaction(client, admin_headers, admin):
+    employee_ids = seed_employees(6)
+    schedule = make_schedule(admin, status='published')
+
+    response = post_bulk(client, admin_headers, schedule.id, week_items(employee_ids[:2], date(2026, 3, 2), 1))
+    assert response.status_code == 201
+    small_queries = response.headers['X-Query-Count']
+
+    response = post_bulk(client, admin_headers, schedule.id, week_items(employee_ids, date(2026, 3, 9)))
+    assert response.status_code == 201
+    large_queries = response.headers['X-Query-Count']
+    data = response.get_json()
+    assert data['created'] == 42
+    assert data['shifts'][0]['employee_name'].startswith('Staff')
+    assert {s['hours'] for s in data['shifts']} == {4.0, 8.0}
+
+    # Las consultas por lote no crecen con la cantidad de turnos (las inserciones van en executemany)
+    assert large_queries == small_queries
+    assert Notification.query.filter_by(type='shift_added').count() == 44
+    assert ScheduleChangeLog.query.count() == 44
+
+
+def test_bulk_rejects_conflicts_and_invalid_items(client, admin_headers, admin):
+    employee_ids = seed_employees(2)
+    schedule = make_schedule(admin)
+    db.session.add(Shift(schedule_id=schedule.id, employee_id=employee_ids[0], shift_date=date(2026, 3, 3),
+                         start_time=time(12), end_time=time(16), hours=4))
+    db.session.commit()
+
+    items = [
+        {'employee_id': employee_ids[1], 'shift_date': '2026-03-03', 'start_time': '09:00', 'end_time': '13:00'},
+        {'employee_id': employee_ids[0], 'shift_date': '2026-03-03', 'start_time': '09:00', 'end_time': '13:00'},
+        {'employee_id': employee_ids[1], 'shift_date': '2026-03-03', 'start_time': '12:30', 'end_time': '18:00'},
+    ]
+    response = post_bulk(client, admin_headers, schedule.id, items)
+    assert response.status_code == 409
+    conflicts = response.get_json()['conflicts']
+    assert [c['index'] for c in conflicts] == [1, 2]
+    assert conflicts[0]['conflicting_shift']['start_time'] == '12:00'
+    assert conflicts[1]['conflicting_index'] == 0
+    assert Shift.query.count() == 1
+
+    items[1]['start_time'] = '9'
+    items.append({'employee_id': 999, 'shift_date': '2026-03-04', 'start_time': '09:00', 'end_time': '13:00'})
+    response = post_bulk(client, admin_headers, schedule.id, items)
+    assert response.status_code == 400
+    assert [e['index'] for e in response.get_json()['errors']] == [1]
+
+    del items[1]
+    response = post_bulk(client, admin_headers, schedule.id, items[:1] + items[2:])
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == [{'index': 1, 'error': 'Empleado no encontrado'}]
+
+    response = post_bulk(client, admin_headers, 999, items[:1])
+    assert response.status_code == 404
+
+
+def test_clone_week(client, admin_headers, admin):
+    employee_ids = seed_employees(3)
+    schedule = make_schedule(admin)
+    response = post_bulk(client, admin_headers, schedule.id, week_items(employee_ids, date(2026, 3, 2), 5))
+    assert response.status_code == 201
+
+    body = {'source_week_start': '2026-03-02', 'target_week_start': '2026-03-09'}
+    response = client.post(f'/api/v1/schedules/{schedule.id}/clone-week', headers=admin_headers, json=body)
+    assert response.status_code == 201
+    assert response.get_json()['created'] == 15
+    cloned = Shift.query.filter(Shift.shift_date >= date(2026, 3, 9)).order_by(Shift.shift_date).all()
+    assert cloned[0].shift_date == date(2026, 3, 9) and cloned[-1].shift_date == date(2026, 3, 13)
+
+    # Repetir la copia choca con los turnos recién creados
+    response = client.post(f'/api/v1/schedules/{schedule.id}/clone-week', headers=admin_headers, json=body)
+    assert response.status_code == 409
+    assert len(response.get_json()['conflicts']) == 15
+
+    response = client.post(f'/api/v1/schedules/{schedule.id}/clone-week', headers=admin_headers,
+                           json={'source_week_start': '2026-03-09', 'target_week_start': '2026-03-16'})
+    assert response.status_code == 400
+    assert Shift.query.count() == 30
@@ -0,0 +1,218 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import joblib
+import numpy as np
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert
+from app import create_app
+from app.extensions import db
+from app.models.staffing_metrics import StaffingMetrics, StaffingPrediction
+from app.models.ml_tracking import Holiday, MLModelVersion
+from app.ml.staffing_predictor import StaffingPredictor
+from app.ml import feature_pipeline, model_selection
+from app.ml.model_registry import model_registry
+from app.utils.holiday_calendar import holiday_calendar
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def predictor(app, tmp_path):
+    # Ocho semanas de métricas: más ventas al mediodía, a la noche y los fines de semana
+    today = datetime.now().date()
+    rows = []
+    for offset in range(56):
+        day = today - timedelta(days=offset)
+        for hour in range(8, 21):
+            base = 10 + (12 if hour in (12, 13, 20) else 0) + (8 if day.weekday() >= 5 else 0)
+            rows.append({'date': day, 'hour': hour, 'day_of_week': day.weekday(), 'employees_scheduled': 3,
+                         'sales_count': base + (offset * 7 + hour) % 5, 'sales_amount': base * 500,
+                         'is_holiday': False, 'created_at': datetime.utcnow()})
+    db.session.execute(insert(StaffingMetrics), rows)
+    db.session.commit()
+
+    app.config['ML_MODELS_DIR'] = str(tmp_path)
+    predictor = StaffingPredictor()
+    assert predictor.train()['success']
+    return predictor
+
+
+def test_predict_range_matches_single_slot_predictions(predictor):
+    db.session.add(Holiday(date=date(2026, 5, 25), name='Revolución de Mayo', type='national'))
+    db.session.commit()
+
+    batch = predictor.predict_range(date(2026, 5, 23), date(2026, 5, 26))
+    assert len(batch) == 4 * 13
+    assert list(batch['hour'][:13]) == list(range(8, 21))
+
+    for _, row in batch.iloc[::7].iterrows():
+        single = predictor.predict_for_date_hour(row['date'], int(row['hour']))
+        assert single['predicted_sales_count'] == row['predicted_sales_count']
+        assert single['recommended_staff_count'] == row['recommended_staff_count']
+        assert single['confidence_score'] == row['confidence_score']
+
+    assert ((batch['confidence_score'] >= 0) & (batch['confidence_score'] <= 0.95)).all()
+    assert (batch['recommended_staff_count'] >= 1).all()
+    features = predictor.build_feature_matrix(date(2026, 5, 25), date(2026, 5, 25))
+    assert features['is_holiday'].eq(1).all() and np.allclose(features['hour_sin'][4], np.sin(np.pi))
+
+
+def test_training_and_inference_share_features(predictor, count_queries):
+    today = datetime.now().date()
+    db.session.add_all([Holiday(date=today - timedelta(days=d), name=f'Feriado {d}', type='national')
+                        for d in (3, 10, 17)])
+    db.session.commit()
+
+    # Cargar métricas y armar features no depende de la cantidad de filas ni de feriados
+    retrained = StaffingPredictor()
+    holiday_calendar.invalidate()
+    with count_queries() as statements:
+        result = retrained.train()
+    assert result['success'] and result['records'] == 56 * 13
+    assert len(statements) <= 6
+
+    training = retrained.prepare_features(retrained.load_training_data(min_weeks=8))
+    inference = retrained.build_feature_matrix(training['date'].min(), training['date'].max())
+    merged = training.merge(inference, on=['date', 'hour'], suffixes=('_train', '_infer'))
+    assert len(merged) == len(training)
+    for column in feature_pipeline.FEATURE_COLUMNS:
+        if column not in ('date', 'hour'):
+            assert np.allclose(merged[f'{column}_train'], merged[f'{column}_infer']), column
+    assert training['is_holiday'].sum() == 3 * 13
+
+
+def test_generate_predictions_upserts_in_bulk(predictor, count_queries):
+    start = date(2026, 7, 1)
+    holiday_calendar.invalidate()
+    with count_queries() as week:
+        predictor.generate_predictions(start, start + timedelta(days=6))
+    holiday_calendar.invalidate()
+    with count_queries() as quarter:
+        result = predictor.generate_predictions(start, start + timedelta(days=91))
+
+    assert result['predictions_created'] == 92 * 13
+    assert len(quarter) == len(week) + 1  # Una sola consulta extra: el UPDATE de la semana ya existente
+    assert StaffingPrediction.query.count() == 92 * 13
+
+    predictor.model_version = '2.0.0'
+    predictor.generate_predictions(start, start + timedelta(days=91))
+    assert StaffingPrediction.query.count() == 92 * 13
+    assert {p.model_version for p in StaffingPrediction.query} == {'2.0.0'}
+
+
+def test_predict_endpoint_caps_range_at_a_quarter(client, admin_headers):
+    response = client.post('/api/v1/ml/predict', headers=admin_headers,
+                           json={'start_date': '2026-07-01', 'end_date': '2026-10-02'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'El rango máximo es de 92 días'
+
+
+def test_registry_caches_active_model_per_version(predictor, tmp_path):
+    first_id = predictor.model_version_id
+    assert sorted(os.listdir(tmp_path)) == [f'sales_model_{first_id}.pkl', f'scaler_{first_id}.pkl']
+
+    # El modelo recién entrenado queda en cache: no se vuelve a leer del disco
+    loaded = StaffingPredictor()
+    assert loaded.load_models() and loaded.sales_model is predictor.sales_model
+
+    model_registry.invalidate()
+    reloaded = StaffingPredictor()
+    assert reloaded.load_models() and reloaded.sales_model is not predictor.sales_model
+    # El error de validación cruzada se lee de la versión, no del modelo serializado
+    version = db.session.get(MLModelVersion, first_id)
+    assert reloaded.cv_rmse == version.hyperparameters['selection']['cv_rmse'] == predictor.cv_rmse
+    assert StaffingPredictor().load_models() and model_registry.get_active().sales_model is reloaded.sales_model
+    day = date(2026, 7, 1)
+    assert predictor.predict_for_date_hour(day, 13) == reloaded.predict_for_date_hour(day, 13)
+
+    # Un nuevo entrenamiento escribe otros archivos y cambia la versión activa
+    retrained = StaffingPredictor()
+    assert retrained.train()['success']
+    assert retrained.model_version_id != first_id
+    assert os.path.exists(tmp_path / f'sales_model_{first_id}.pkl')
+    current = StaffingPredictor()
+    assert current.load_models() and current.model_version_id == retrained.model_version_id
+
+
+def test_registry_falls_back_to_legacy_files(app, tmp_path):
+    app.config['ML_MODELS_DIR'] = str(tmp_path)
+    assert not StaffingPredictor().load_models()
+
+    joblib.dump({'coef': [1, 2]}, tmp_path / 'sales_model.pkl')
+    joblib.dump({'mean': [0]}, tmp_path / 'scaler.pkl')
+    joblib.dump({'model_version': '0.9.0'}, tmp_path / 'metadata.pkl')
+
+    legacy = StaffingPredictor()
+    assert legacy.load_models()
+    assert legacy.model_version == '0.9.0' and legacy.model_version_id is None
+    assert legacy.sales_model == {'coef': [1, 2]}
+
+    # Una versión activa sin archivos propios no cae en los legados (pueden tener otras features)
+    db.session.add(MLModelVersion(version='2.0.0', training_records=1, is_active=True))
+    db.session.commit()
+    assert not StaffingPredictor().load_models()
+    assert StaffingPredictor().predict_range(date(2026, 7, 1), date(2026, 7, 1)) is None
+
+
+def test_training_selects_fastest_candidate_within_tolerance(predictor):
+    version = db.session.get(MLModelVersion, predictor.model_version_id)
+    params = version.hyperparameters
+    selection = params['selection']
+    candidates = selection['candidates']
+
+    assert len(candidates) == len(model_selection.candidate_configs())
+    assert {c['estimator'] for c in candidates} == {'random_forest', 'hist_gradient_boosting'}
+    eligible = [c for c in candidates if c['cv_score'] >= candidates[0]['cv_score'] - selection['tolerance']]
+    chosen = min(eligible, key=lambda c: c['fit_seconds'] + c['predict_seconds'])
+    assert (params['estimator'], selection['cv_score']) == (chosen['estimator'], chosen['cv_score'])
+    assert all(params[key] == value for key, value in chosen['params'].items())
+
+
+def test_deployed_model_is_refitted_on_every_row(predictor):
+    version = db.session.get(MLModelVersion, predictor.model_version_id)
+
+    # test_score sale del modelo sin las filas más recientes; el que se guarda las incluye
+    assert predictor.scaler.n_samples_seen_ == version.training_records == 56 * 13
+    assert not hasattr(predictor.sales_model, 'cv_rmse_')
+
+
+def test_time_series_folds_never_train_on_future_rows():
+    X = np.arange(200, dtype=float).reshape(-1, 1)
+    y = np.sin(X[:, 0] / 10)
+
+    splits = list(model_selection.TimeSeriesSplit(n_splits=4).split(X))
+    assert all(train.max() < test.min() for train, test in splits)
+
+    best, results = model_selection.select_model(X, y, n_splits=4, tolerance=1.0, n_jobs=1)
+    # Con tolerancia amplia todos califican y gana el más rápido
+    assert best == min(results, key=lambda r: r['fit_seconds'] + r['predict_seconds'])
+    assert [r['cv_score'] for r in results] == sorted((r['cv_score'] for r in results), reverse=True)
+
+
+def test_gradient_boosting_confidence_uses_cv_error(predictor):
+    model = model_selection.build_estimator('hist_gradient_boosting', {'max_iter': 50})
+    X = predictor.scaler.transform(feature_pipeline.feature_matrix(
+        predictor.build_feature_matrix(date(2026, 7, 1), date(2026, 7, 14))))
+    model.fit(X, np.linspace(5, 30, len(X)))
+    predictor.sales_model = model
+    predictor.cv_rmse = 3.0
+
+    batch = predictor.predict_range(date(2026, 7, 1), date(2026, 7, 2))
+    expected = np.clip(1 - 3.0 / np.maximum(model.predict(X[:26]).clip(0), 1), 0, 0.95).round(2)
+    assert np.allclose(batch['confidence_score'], expected)
@@ -246,3 +246,61 @@ def test_labor_by_hour_distributes_fractional(app_ctx):
     assert slot_16['sum_costo'] == pytest.approx(1000.0)
     assert slot_17 is not None
     assert slot_17['sum_costo'] == pytest.approx(750.0)
+
+
+def test_labor_engine_matches_per_shift_reference(app_ctx, count_queries):
+    """Random shifts (overnight, Sunday, holiday) → same totals as the per-shift loop"""
+    import random
+    from datetime import timedelta
+    from app.models.ml_tracking import Holiday
+    from app.routes.reports import _shift_effective_rate
+    from app.utils.holiday_calendar import holiday_calendar
+
+    rnd = random.Random(7)
+    employees = [_make_employee_with_job_position(db.session, suffix=s, hourly_rate=rate)
+                 for s, rate in (('X', 1000), ('Y', 1500), ('Z', 2200))]
+    start, end = date(2026, 6, 1), date(2026, 7, 31)
+    db.session.add(Holiday(date=date(2026, 7, 9), name='Independencia', type='national'))
+    shifts = []
+    for _ in range(300):
+        start_time = time(rnd.randrange(24), rnd.choice([0, 15, 30, 45]))
+        end_time = time(rnd.randrange(24), rnd.choice([0, 20, 45]))
+        shifts.append(Shift(
+            employee_id=rnd.choice(employees).id,
+            schedule_id=1,
+            shift_date=start + timedelta(days=rnd.randrange(61)),
+            start_time=start_time,
+            end_time=end_time,
+            hours=round(rnd.uniform(1, 10), 2)
+        ))
+    db.session.add_all(shifts)
+    db.session.commit()
+    holiday_calendar.invalidate()
+
+    employee_rates, holiday_dates = _build_labor_lookups(start, end)
+    assert holiday_dates == {date(2026, 7, 9)}
+
+    expected_wd = {dow: [0.0, 0.0] for dow in range(7)}
+    expected_hr = {}
+    for shift in shifts:
+        rate = _shift_effective_rate(shift, employee_rates, holiday_dates)
+        expected_wd[shift.shift_date.weekday()][0] += float(shift.hours)
+        expected_wd[shift.shift_date.weekday()][1] += float(shift.hours) * rate
+        for hora, fraccion in distribute_shift_hours(shift.start_time, shift.end_time).items():
+            slot = expected_hr.setdefault(hora, [0.0, 0.0])
+            slot[0] += fraccion
+            slot[1] += fraccion * rate
+
+    with count_queries() as statements:
+        labor_wd = get_labor_by_weekday(start, end, employee_rates, holiday_dates)
+        labor_hr = get_labor_by_hour(start, end, employee_rates, holiday_dates)
+
+    # Una consulta de columnas por llamada
+    assert len(statements) == 2
+    for row in labor_wd:
+        assert row['sum_horas'] == pytest.approx(round(expected_wd[row['dow']][0], 2), abs=0.011)
+        assert row['sum_costo'] == pytest.approx(round(expected_wd[row['dow']][1], 2), abs=0.011)
+    assert [row['hora'] for row in labor_hr] == sorted(expected_hr)
+    for row in labor_hr:
+        assert row['sum_horas'] == pytest.approx(round(expected_hr[row['hora']][0], 2), abs=0.011)
+        assert row['sum_costo'] == pytest.approx(round(expected_hr[row['hora']][1], 2), abs=0.011)
@@ -0,0 +1,100 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import date, time
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.employee import Employee
+from app.models.job_position import JobPosition
+from app.models.time_tracking import TimeTracking
+from app.models.work_block import WorkBlock
+from app.models.ml_tracking import Holiday
+from app.utils.holiday_calendar import holiday_calendar
+from app.utils.principal_cache import principal_cache
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# Lunes 8 h, domingo 4 h y feriado (martes 24/3) 5 h 30 m
+WORKED_DAYS = [(2, time(9), time(17)), (22, time(10), time(14)), (24, time(18), time(23, 30))]
+
+
+def seed_staff(n_employees, start=1, with_position=True):
+    position = JobPosition.query.filter_by(name='Salón').first()
+    if position is None:
+        position = JobPosition(name='Salón', contract_type='por_hora', hourly_rate=1000,
+                               sunday_rate_multiplier=1.5, holiday_rate_multiplier=2.0)
+        db.session.add_all([position, Holiday(date=date(2026, 3, 24), name='Día de la Memoria', type='national')])
+        db.session.flush()
+
+    for i in range(start, start + n_employees):
+        user = User(email=f'staff{i}@test.com', password_hash='x', role='employee', is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        employee = Employee(user_id=user.id, first_name='Staff', last_name=f'{i:03d}', dni=f'{31000000 + i}',
+                            hire_date=date(2025, 1, 1),
+                            current_job_position_id=position.id if with_position else None)
+        db.session.add(employee)
+        db.session.flush()
+        for day, start_time, end_time in WORKED_DAYS:
+            record = TimeTracking(employee_id=employee.id, tracking_date=date(2026, 3, day))
+            db.session.add(record)
+            db.session.flush()
+            db.session.add(WorkBlock(time_tracking_id=record.id, start_time=start_time, end_time=end_time))
+    db.session.commit()
+
+
+def get_calendar(client, headers):
+    db.session.expire_all()
+    holiday_calendar.invalidate()
+    principal_cache.invalidate()
+    response = client.get('/api/v1/time-tracking/calendar?year=2026&month=3', headers=headers)
+    assert response.status_code == 200
+    return response.get_json(), int(response.headers['X-Query-Count'])
+
+
+def test_calendar_totals_and_costs(client, admin_headers):
+    seed_staff(2)
+    seed_staff(1, start=3, with_position=False)
+
+    data, _ = get_calendar(client, admin_headers)
+    days = {day['date']: day for day in data['days']}
+
+    assert len(days) == 31
+    monday = days['2026-03-02']
+    assert (monday['total_hours'], monday['total_minutes'], monday['employee_count']) == (24, 0, 3)
+    assert monday['daily_cost'] == 16000.0
+    assert days['2026-03-22']['daily_cost'] == 2 * 4 * 1000 * 1.5
+    holiday = days['2026-03-24']
+    assert (holiday['total_hours'], holiday['total_minutes']) == (16, 30)
+    assert holiday['daily_cost'] == 2 * 5.5 * 1000 * 2.0
+    assert data['total_cost'] == 16000 + 12000 + 22000
+    assert holiday['employees'][0]['hours'] == 5 and holiday['employees'][0]['minutes'] == 30
+
+
+def test_calendar_query_count_does_not_grow_with_staff(client, admin_headers):
+    seed_staff(3)
+    small, small_queries = get_calendar(client, admin_headers)
+
+    seed_staff(27, start=4)
+    large, large_queries = get_calendar(client, admin_headers)
+
+    assert large['total_cost'] == 10 * small['total_cost']
+    assert large_queries == small_queries
+    assert large_queries <= 4
@@ -0,0 +1,136 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import update
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.employee import Employee
+from app.models.time_tracking import TimeTracking
+from app.models.work_block import WorkBlock
+from app.services.worked_time_service import WorkedTimeService
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def employee(app):
+    user = User(email='empleado@test.com', role='employee', is_active=True)
+    user.set_password('secret123')
+    db.session.add(user)
+    db.session.flush()
+    employee = Employee(user_id=user.id, first_name='Ana', last_name='Pérez', dni='30111222',
+                        hire_date=date(2025, 1, 1))
+    db.session.add(employee)
+    db.session.commit()
+    return employee
+
+
+@pytest.fixture
+def employee_headers(employee, auth_headers):
+    return auth_headers(employee.user)
+
+
+def add_record(employee, tracking_date, blocks):
+    record = TimeTracking(employee_id=employee.id, tracking_date=tracking_date)
+    db.session.add(record)
+    db.session.flush()
+    for start_time, end_time in blocks:
+        db.session.add(WorkBlock(time_tracking_id=record.id, start_time=start_time, end_time=end_time))
+    db.session.commit()
+    return record
+
+
+def test_totals_follow_block_inserts_updates_and_deletes(app, employee):
+    record = add_record(employee, date(2026, 3, 2), [(time(9), time(13, 15)), (time(14), time(17, 50))])
+    assert (record.total_worked_minutes, record.open_block) == (255 + 230, False)
+    assert (record.to_dict()['total_hours'], record.to_dict()['total_minutes']) == (8, 5)
+
+    # Entrada sin salida: bloque en curso
+    open_block = WorkBlock(time_tracking_id=record.id, start_time=time(19), end_time=time(19))
+    db.session.add(open_block)
+    db.session.commit()
+    assert (record.total_worked_minutes, record.open_block) == (485, True)
+
+    open_block.end_time = time(21, 30)
+    db.session.commit()
+    assert (record.total_worked_minutes, record.open_block) == (635, False)
+
+    db.session.delete(open_block)
+    db.session.commit()
+    assert record.total_worked_minutes == 485
+
+
+def test_moving_a_block_refreshes_both_records(app, employee):
+    monday = add_record(employee, date(2026, 3, 2), [(time(9), time(12))])
+    tuesday = add_record(employee, date(2026, 3, 3), [(time(10), time(11))])
+
+    block = WorkBlock.query.filter_by(time_tracking_id=monday.id).one()
+    db.session.expire_all()
+    block.time_tracking_id = tuesday.id
+    db.session.commit()
+
+    assert db.session.get(TimeTracking, monday.id).total_worked_minutes == 0
+    assert db.session.get(TimeTracking, tuesday.id).total_worked_minutes == 240
+
+
+def test_backfill_recomputes_stored_totals(app, employee):
+    first = add_record(employee, date(2026, 3, 2), [(time(9), time(17))])
+    second = add_record(employee, date(2026, 3, 3), [(time(9), time(9))])
+    db.session.execute(update(TimeTracking).values(total_worked_minutes=0, open_block=False))
+    db.session.commit()
+
+    assert WorkedTimeService.backfill(batch_size=1) == 2
+    db.session.commit()
+
+    assert db.session.get(TimeTracking, first.id).total_worked_minutes == 480
+    assert db.session.get(TimeTracking, second.id).open_block is True
+
+
+def test_current_week_worked_sums_in_sql(client, employee, employee_headers, count_queries):
+    monday = date.today() - timedelta(days=date.today().weekday())
+    for offset in range(3):
+        add_record(employee, monday + timedelta(days=offset),
+                   [(time(9), time(12, 40)), (time(13), time(15, 30))])
+    add_record(employee, monday - timedelta(days=1), [(time(9), time(18))])
+
+    with count_queries() as statements:
+        response = client.get('/api/v1/time-tracking/current-week-worked', headers=employee_headers)
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert (data['total_hours'], data['total_minutes']) == (18, 30)
+    assert data['total_hours_decimal'] == 18.5
+    assert data['record_count'] == 3
+    assert not any('work_blocks' in statement for statement in statements)
+
+
+def test_check_in_and_out_keep_the_open_flag(client, employee, employee_headers):
+    response = client.post('/api/v1/time-tracking/check-in', headers=employee_headers, json={})
+    assert response.status_code == 201
+    assert response.get_json()['record']['open_block'] is True
+
+    response = client.post('/api/v1/time-tracking/check-out', headers=employee_headers, json={})
+    assert response.status_code == 200
+    record = response.get_json()['record']
+    assert record['open_block'] is False
+    block = record['work_blocks'][0]
+    start = datetime.strptime(block['start_time'], '%H:%M:%S')
+    end = datetime.strptime(block['end_time'], '%H:%M:%S')
+    assert record['total_hours'] * 60 + record['total_minutes'] == (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)